@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Any, List
+from typing import Any
 
 from ndbc_api.api.handlers._base import BaseHandler
 from ndbc_api.api.parsers.http.adcp import AdcpParser
@@ -25,10 +25,26 @@ from ndbc_api.api.requests.http.swdir2 import Swdir2Request
 from ndbc_api.api.requests.http.swr1 import Swr1Request
 from ndbc_api.api.requests.http.swr2 import Swr2Request
 from ndbc_api.exceptions import RequestException, ResponseException
+from ndbc_api.utilities.columnar import ColumnarData
 
 
 class DataHandler(BaseHandler):
 
+    # the request builder of each mode, used to plan queries
+    _REQUESTS = {
+        'adcp': AdcpRequest,
+        'cwind': CwindRequest,
+        'ocean': OceanRequest,
+        'spec': SpecRequest,
+        'stdmet': StdmetRequest,
+        'supl': SuplRequest,
+        'swden': SwdenRequest,
+        'swdir': SwdirRequest,
+        'swdir2': Swdir2Request,
+        'swr1': Swr1Request,
+        'swr2': Swr2Request,
+    }
+
     @classmethod
     def adcp(
         cls,
@@ -37,7 +53,7 @@ class DataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
-    ) -> List[dict]:
+    ) -> ColumnarData:
         """adcp"""
         try:
             reqs = AdcpRequest.build_request(station_id=station_id,
@@ -46,11 +62,13 @@ class DataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = handler.handle_requests(station_id=station_id,
+                                            reqs=reqs,
+                                            since=start_time)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
-        return AdcpParser.parse_responses(responses=resps,
-                                            use_timestamp=use_timestamp)
+        return AdcpParser.parse_columns(responses=resps,
+                                        use_timestamp=use_timestamp)
 
     @classmethod
     def cwind(
@@ -60,7 +78,7 @@ class DataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
-    ) -> List[dict]:
+    ) -> ColumnarData:
         """cwind"""
         try:
             reqs = CwindRequest.build_request(station_id=station_id,
@@ -69,11 +87,13 @@ class DataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = handler.handle_requests(station_id=station_id,
+                                            reqs=reqs,
+                                            since=start_time)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
-        return CwindParser.parse_responses(responses=resps,
-                                             use_timestamp=use_timestamp)
+        return CwindParser.parse_columns(responses=resps,
+                                         use_timestamp=use_timestamp)
 
     @classmethod
     def ocean(
@@ -83,7 +103,7 @@ class DataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
-    ) -> List[dict]:
+    ) -> ColumnarData:
         """ocean"""
         try:
             reqs = OceanRequest.build_request(station_id=station_id,
@@ -92,11 +112,13 @@ class DataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = handler.handle_requests(station_id=station_id,
+                                            reqs=reqs,
+                                            since=start_time)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
-        return OceanParser.parse_responses(responses=resps,
-                                             use_timestamp=use_timestamp)
+        return OceanParser.parse_columns(responses=resps,
+                                         use_timestamp=use_timestamp)
 
     @classmethod
     def spec(
@@ -106,7 +128,7 @@ class DataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
-    ) -> List[dict]:
+    ) -> ColumnarData:
         """spec"""
         try:
             reqs = SpecRequest.build_request(station_id=station_id,
@@ -115,11 +137,13 @@ class DataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = handler.handle_requests(station_id=station_id,
+                                            reqs=reqs,
+                                            since=start_time)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
-        return SpecParser.parse_responses(responses=resps,
-                                            use_timestamp=use_timestamp)
+        return SpecParser.parse_columns(responses=resps,
+                                        use_timestamp=use_timestamp)
 
     @classmethod
     def stdmet(
@@ -129,7 +153,7 @@ class DataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
-    ) -> List[dict]:
+    ) -> ColumnarData:
         """stdmet"""
         try:
             reqs = StdmetRequest.build_request(station_id=station_id,
@@ -138,11 +162,13 @@ class DataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = handler.handle_requests(station_id=station_id,
+                                            reqs=reqs,
+                                            since=start_time)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
-        return StdmetParser.parse_responses(responses=resps,
-                                              use_timestamp=use_timestamp)
+        return StdmetParser.parse_columns(responses=resps,
+                                          use_timestamp=use_timestamp)
 
     @classmethod
     def supl(
@@ -152,7 +178,7 @@ class DataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
-    ) -> List[dict]:
+    ) -> ColumnarData:
         """supl"""
         try:
             reqs = SuplRequest.build_request(station_id=station_id,
@@ -161,11 +187,13 @@ class DataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = handler.handle_requests(station_id=station_id,
+                                            reqs=reqs,
+                                            since=start_time)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
-        return SuplParser.parse_responses(responses=resps,
-                                            use_timestamp=use_timestamp)
+        return SuplParser.parse_columns(responses=resps,
+                                        use_timestamp=use_timestamp)
 
     @classmethod
     def swden(
@@ -175,7 +203,7 @@ class DataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
-    ) -> List[dict]:
+    ) -> ColumnarData:
         """swden"""
         try:
             reqs = SwdenRequest.build_request(station_id=station_id,
@@ -184,11 +212,13 @@ class DataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = handler.handle_requests(station_id=station_id,
+                                            reqs=reqs,
+                                            since=start_time)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
-        return SwdenParser.parse_responses(responses=resps,
-                                             use_timestamp=use_timestamp)
+        return SwdenParser.parse_columns(responses=resps,
+                                         use_timestamp=use_timestamp)
 
     @classmethod
     def swdir(
@@ -198,7 +228,7 @@ class DataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
-    ) -> List[dict]:
+    ) -> ColumnarData:
         """swdir"""
         try:
             reqs = SwdirRequest.build_request(station_id=station_id,
@@ -207,11 +237,13 @@ class DataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = handler.handle_requests(station_id=station_id,
+                                            reqs=reqs,
+                                            since=start_time)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
-        return SwdirParser.parse_responses(responses=resps,
-                                             use_timestamp=use_timestamp)
+        return SwdirParser.parse_columns(responses=resps,
+                                         use_timestamp=use_timestamp)
 
     @classmethod
     def swdir2(
@@ -221,7 +253,7 @@ class DataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
-    ) -> List[dict]:
+    ) -> ColumnarData:
         """swdir2"""
         try:
             reqs = Swdir2Request.build_request(station_id=station_id,
@@ -230,11 +262,13 @@ class DataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = handler.handle_requests(station_id=station_id,
+                                            reqs=reqs,
+                                            since=start_time)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
-        return Swdir2Parser.parse_responses(responses=resps,
-                                              use_timestamp=use_timestamp)
+        return Swdir2Parser.parse_columns(responses=resps,
+                                          use_timestamp=use_timestamp)
 
     @classmethod
     def swr1(
@@ -244,7 +278,7 @@ class DataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
-    ) -> List[dict]:
+    ) -> ColumnarData:
         """swr1"""
         try:
             reqs = Swr1Request.build_request(station_id=station_id,
@@ -253,11 +287,13 @@ class DataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = handler.handle_requests(station_id=station_id,
+                                            reqs=reqs,
+                                            since=start_time)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
-        return Swr1Parser.parse_responses(responses=resps,
-                                            use_timestamp=use_timestamp)
+        return Swr1Parser.parse_columns(responses=resps,
+                                        use_timestamp=use_timestamp)
 
     @classmethod
     def swr2(
@@ -267,7 +303,7 @@ class DataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
-    ) -> List[dict]:
+    ) -> ColumnarData:
         """swr2"""
         try:
             reqs = Swr2Request.build_request(station_id=station_id,
@@ -276,8 +312,10 @@ class DataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = handler.handle_requests(station_id=station_id,
+                                            reqs=reqs,
+                                            since=start_time)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
-        return Swr2Parser.parse_responses(responses=resps,
-                                            use_timestamp=use_timestamp)
+        return Swr2Parser.parse_columns(responses=resps,
+                                        use_timestamp=use_timestamp)
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
-from typing import Any, TYPE_CHECKING
+from functools import partial
+from typing import Any, List, Optional, Tuple, TYPE_CHECKING, Union
 
 try:
     import xarray
@@ -24,10 +25,34 @@ from ndbc_api.api.requests.opendap.swden import SwdenRequest
 from ndbc_api.api.requests.opendap.wlevel import WlevelRequest
 from ndbc_api.api.requests.opendap.hfradar import HfradarRequest
 from ndbc_api.exceptions import ParserException, RequestException, ResponseException
+from ndbc_api.utilities.opendap.dap import DapSubset
 
 
 class OpenDapDataHandler(BaseHandler):
 
+    # the request builder of each mode, used to plan queries
+    _REQUESTS = {
+        'adcp': AdcpRequest,
+        'cwind': CwindRequest,
+        'ocean': OceanRequest,
+        'pwind': PwindRequest,
+        'stdmet': StdmetRequest,
+        'swden': SwdenRequest,
+        'wlevel': WlevelRequest,
+        'hfradar': HfradarRequest,
+    }
+    # the parser of each mode, used to decode server-side subsets
+    _PARSERS = {
+        'adcp': AdcpParser,
+        'cwind': CwindParser,
+        'ocean': OceanParser,
+        'pwind': PwindParser,
+        'stdmet': StdmetParser,
+        'swden': SwdenParser,
+        'wlevel': WlevelParser,
+        'hfradar': HfradarParser,
+    }
+
     @classmethod
     def adcp(
         cls,
@@ -36,6 +61,8 @@ class OpenDapDataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
     ) -> 'xarray.Dataset':
         """adcp"""
         try:
@@ -45,12 +72,16 @@ class OpenDapDataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = cls._handle_requests(handler=handler,
+                                         station_id=station_id,
+                                         reqs=reqs)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
         try:
             return AdcpParser.nc_from_responses(responses=resps,
-                                                use_timestamp=use_timestamp)
+                                                use_timestamp=use_timestamp,
+                                                bbox=bbox,
+                                                stride=stride)
         except ParserException as e:
             raise ResponseException('Failed to parse response.') from e
 
@@ -62,6 +93,8 @@ class OpenDapDataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
     ) -> 'xarray.Dataset':
         """cwind"""
         try:
@@ -71,12 +104,16 @@ class OpenDapDataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = cls._handle_requests(handler=handler,
+                                         station_id=station_id,
+                                         reqs=reqs)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
         try:
             return CwindParser.nc_from_responses(responses=resps,
-                                                 use_timestamp=use_timestamp)
+                                                 use_timestamp=use_timestamp,
+                                                 bbox=bbox,
+                                                 stride=stride)
         except ParserException as e:
             raise ResponseException('Failed to parse response.') from e
 
@@ -88,6 +125,8 @@ class OpenDapDataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
     ) -> 'xarray.Dataset':
         """ocean"""
         try:
@@ -97,12 +136,16 @@ class OpenDapDataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = cls._handle_requests(handler=handler,
+                                         station_id=station_id,
+                                         reqs=reqs)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
         try:
             return OceanParser.nc_from_responses(responses=resps,
-                                                 use_timestamp=use_timestamp)
+                                                 use_timestamp=use_timestamp,
+                                                 bbox=bbox,
+                                                 stride=stride)
         except ParserException as e:
             raise ResponseException('Failed to parse response.') from e
 
@@ -114,6 +157,8 @@ class OpenDapDataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
     ) -> 'xarray.Dataset':
         """pwind"""
         try:
@@ -123,12 +168,16 @@ class OpenDapDataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = cls._handle_requests(handler=handler,
+                                         station_id=station_id,
+                                         reqs=reqs)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
         try:
             return PwindParser.nc_from_responses(responses=resps,
-                                                 use_timestamp=use_timestamp)
+                                                 use_timestamp=use_timestamp,
+                                                 bbox=bbox,
+                                                 stride=stride)
         except ParserException as e:
             raise ResponseException('Failed to parse response.') from e
 
@@ -140,6 +189,8 @@ class OpenDapDataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
     ) -> 'xarray.Dataset':
         """stdmet"""
         try:
@@ -149,12 +200,16 @@ class OpenDapDataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = cls._handle_requests(handler=handler,
+                                         station_id=station_id,
+                                         reqs=reqs)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
         try:
             return StdmetParser.nc_from_responses(responses=resps,
-                                                  use_timestamp=use_timestamp)
+                                                  use_timestamp=use_timestamp,
+                                                  bbox=bbox,
+                                                  stride=stride)
         except ParserException as e:
             raise ResponseException('Failed to parse response.') from e
 
@@ -166,6 +221,8 @@ class OpenDapDataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
     ) -> 'xarray.Dataset':
         """swden"""
         try:
@@ -175,12 +232,16 @@ class OpenDapDataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = cls._handle_requests(handler=handler,
+                                         station_id=station_id,
+                                         reqs=reqs)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
         try:
             return SwdenParser.nc_from_responses(responses=resps,
-                                                 use_timestamp=use_timestamp)
+                                                 use_timestamp=use_timestamp,
+                                                 bbox=bbox,
+                                                 stride=stride)
         except ParserException as e:
             raise ResponseException('Failed to parse response.') from e
 
@@ -192,6 +253,8 @@ class OpenDapDataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
     ) -> 'xarray.Dataset':
         """wlevel"""
         try:
@@ -201,12 +264,16 @@ class OpenDapDataHandler(BaseHandler):
         except Exception as e:
             raise RequestException('Failed to build request.') from e
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            resps = cls._handle_requests(handler=handler,
+                                         station_id=station_id,
+                                         reqs=reqs)
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
         try:
             return WlevelParser.nc_from_responses(responses=resps,
-                                                  use_timestamp=use_timestamp)
+                                                  use_timestamp=use_timestamp,
+                                                  bbox=bbox,
+                                                  stride=stride)
         except ParserException as e:
             raise ResponseException('Failed to parse response.') from e
 
@@ -218,6 +285,8 @@ class OpenDapDataHandler(BaseHandler):
         start_time: datetime = datetime.now() - timedelta(days=30),
         end_time: datetime = datetime.now(),
         use_timestamp: bool = True,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
     ) -> 'xarray.Dataset':
         """hfradar"""
         try:
@@ -226,12 +295,86 @@ class OpenDapDataHandler(BaseHandler):
                                                  end_time=end_time)
         except Exception as e:
             raise RequestException('Failed to build request.') from e
+        # each hour is decoded into the cube as soon as it is received
         try:
-            resps = handler.handle_requests(station_id=station_id, reqs=reqs)
+            cube = HfradarParser.time_cube(slots=len(reqs))
+            callback = partial(HfradarParser.add_response,
+                               cube,
+                               bbox=bbox,
+                               stride=stride)
+            handler.stream_requests(station_id=station_id,
+                                    reqs=reqs,
+                                    callback=callback)
+        except ParserException as e:
+            raise ResponseException('Failed to parse response.') from e
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
         try:
-            return HfradarParser.nc_from_responses(responses=resps,
-                                                    use_timestamp=use_timestamp)
+            return HfradarParser.nc_from_cube(cube=cube)
         except ParserException as e:
             raise ResponseException('Failed to parse response.') from e
+
+    @classmethod
+    def _subset(
+        cls,
+        handler: Any,
+        mode: str,
+        station_id: str,
+        start_time: datetime = datetime.now() - timedelta(days=30),
+        end_time: datetime = datetime.now(),
+        cols: Optional[List[str]] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
+    ) -> 'xarray.Dataset':
+        """Subset the datasets of a mode on the THREDDS server, through DAP.
+
+        Only the `cols`, within the time range and the
+        `(min_lon, min_lat, max_lon, max_lat)` `bbox`, and at every `stride`
+        of the latitudes and longitudes, are downloaded.
+        """
+        if mode not in cls._REQUESTS:
+            raise RequestException(
+                'Please supply a supported mode from `get_modes()`.')
+        try:
+            urls = cls._REQUESTS[mode].build_dap_request(station_id=station_id,
+                                                        start_time=start_time,
+                                                        end_time=end_time)
+        except Exception as e:
+            raise RequestException('Failed to build request.') from e
+        subset = DapSubset(urls,
+                           variables=cols,
+                           start_time=start_time,
+                           end_time=end_time,
+                           bbox=bbox,
+                           stride=stride)
+        try:
+            while not subset.done:
+                subset.feed(
+                    handler.handle_requests(station_id=station_id,
+                                            reqs=subset.requests()))
+        except Exception as e:
+            raise ResponseException('Failed to execute requests.') from e
+        try:
+            return cls._PARSERS[mode].nc_from_dap(subset)
+        except ParserException as e:
+            raise ResponseException('Failed to parse response.') from e
+
+    @classmethod
+    def _handle_requests(
+        cls,
+        handler: Any,
+        station_id: str,
+        reqs: List[str],
+    ) -> List[Union[dict, 'xarray.Dataset']]:
+        """Request the files of `reqs` which are not in the dataset store.
+
+        Without a store, the response to each request is returned; with one,
+        the files are stored and their stored datasets are returned, opened
+        lazily, in place of their responses.
+        """
+        store = getattr(handler, 'dataset_store', None)
+        if store is None:
+            return handler.handle_requests(station_id=station_id, reqs=reqs)
+        pending = store.pending(reqs)
+        resps = handler.handle_requests(station_id=station_id, reqs=pending)
+        return store.datasets(reqs, dict(zip(pending, resps)))
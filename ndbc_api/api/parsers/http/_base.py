@@ -1,8 +1,15 @@
 from datetime import datetime
 from io import StringIO
-from typing import List, Tuple
+from typing import List, Optional, Tuple, Union
 
+import numpy as np
+
+from ndbc_api.api.parsers.http._columnar import (first_unique_order,
+                                                 read_columns,
+                                                 records_from_columns)
+from ndbc_api.config import PARSER_ENGINE
 from ndbc_api.exceptions import ParserException
+from ndbc_api.utilities.columnar import ColumnarData
 
 
 try:
@@ -19,11 +26,30 @@ class BaseParser:
     PARSE_DATES = [0, 1, 2, 3, 4]
     INDEX_COL = False
     REVERT_COL_NAMES = []
+    ENGINES = ('numpy', 'python')
+    ENGINE = PARSER_ENGINE
 
     @classmethod
     def parse_responses(cls,
                         responses: List[dict],
-                        use_timestamp: bool = True) -> List[dict]:
+                        use_timestamp: bool = True,
+                        engine: Optional[str] = None) -> List[dict]:
+        """Parse successful text responses into one `dict` per row.
+
+        Args:
+            responses: The responses from the NDBC data service, those
+                without a 200 status are skipped.
+            use_timestamp: Whether to replace the date columns with a
+                `timestamp`, dropping duplicate timestamps and sorting by time.
+            engine: The parsing engine, either `'numpy'` or `'python'`.
+                Defaults to the class-level `ENGINE`, which may be set to
+                change the engine globally.
+
+        Raises:
+            ParserException: The requested engine is not supported.
+        """
+        if cls._check_engine(engine) == 'numpy':
+            return cls._parse_responses_numpy(responses, use_timestamp)
         components = []
         for response in responses:
             if response.get('status') == 200:
@@ -43,6 +69,97 @@ class BaseParser:
             components = unique_components
         return components
 
+    @classmethod
+    def parse_columns(cls,
+                      responses: List[dict],
+                      use_timestamp: bool = True,
+                      engine: Optional[str] = None) -> ColumnarData:
+        """Parse successful text responses into typed column arrays.
+
+        Accepts the same arguments as `parse_responses`, but returns the rows
+        as a `ColumnarData` rather than one `dict` per row.
+
+        Raises:
+            ParserException: The requested engine is not supported.
+        """
+        if cls._check_engine(engine) == 'python':
+            return ColumnarData.from_records(
+                cls.parse_responses(responses,
+                                    use_timestamp=use_timestamp,
+                                    engine='python'))
+        parts = []
+        for response in responses:
+            if response.get('status') != 200:
+                continue
+            parsed = cls._read_response_numpy(response, use_timestamp)
+            if parsed is None:
+                parts.append(
+                    ColumnarData.from_records(
+                        cls._read_response_fallback(response, use_timestamp)))
+            else:
+                parts.append(ColumnarData(*parsed))
+        data = ColumnarData.concat(parts)
+        if use_timestamp and data.timestamp is not None:
+            data = data.take(first_unique_order(data.timestamp))
+        return data
+
+    @classmethod
+    def _check_engine(cls, engine: Optional[str]) -> str:
+        engine = engine or cls.ENGINE
+        if engine not in cls.ENGINES:
+            raise ParserException(
+                f'Unsupported parser engine {engine}, must be one of '
+                f'{cls.ENGINES}.')
+        return engine
+
+    @classmethod
+    def _parse_responses_numpy(cls, responses: List[dict],
+                               use_timestamp: bool) -> List[dict]:
+        components = []
+        timestamps = []
+        for response in responses:
+            if response.get('status') != 200:
+                continue
+            parsed = cls._read_response_numpy(response, use_timestamp)
+            if parsed is None:
+                rows = cls._read_response_fallback(response, use_timestamp)
+                ts = np.array([r.get('timestamp') for r in rows],
+                              dtype='datetime64[ns]')
+            else:
+                rows = records_from_columns(*parsed)
+                ts = parsed[1]
+            components.extend(rows)
+            timestamps.append(ts)
+        if use_timestamp and components:
+            order = first_unique_order(np.concatenate(timestamps))
+            components = [components[i] for i in order]
+        return components
+
+    @classmethod
+    def _read_response_numpy(cls, response: dict, use_timestamp: bool):
+        body = response.get('body')
+        header, data = cls._parse_body(body, as_bytes=True)
+        names = cls._parse_header(header)
+        if not data or not names:
+            return None
+        first_line = (data.split(b'\n', 1)[0]
+                      if isinstance(data, bytes) else data[0])
+        if len(first_line.split()) != len(names):
+            names = cls.REVERT_COL_NAMES
+        if isinstance(data, bytes):
+            if b'(' in first_line:
+                data = cls._clean_data(
+                    StringIO(data.decode('ascii')).readlines())
+        elif '(' in data[0]:
+            data = cls._clean_data(data)
+        if not data:
+            return None
+        return read_columns(data,
+                            names,
+                            nan_values=cls.NAN_VALUES,
+                            use_timestamp=use_timestamp,
+                            date_parser=cls.DATE_PARSER,
+                            parse_dates=cls.PARSE_DATES)
 
     @classmethod
     def _read_response_fallback(cls, response: dict,
@@ -99,7 +216,28 @@ class BaseParser:
         return rows
 
     @staticmethod
-    def _parse_body(body: str) -> Tuple[List[str], List[str]]:
+    def _parse_body(
+        body: Union[str, bytes],
+        as_bytes: bool = False,
+    ) -> Tuple[List[str], Union[List[str], bytes]]:
+        """Split a body into its header lines and its data lines.
+
+        Bodies decompressed from gzip archives are `bytes`. If `as_bytes`
+        is set and such a body is ASCII with its header lines first, the data
+        section is returned as a single `bytes` object, otherwise the body
+        is decoded.
+        """
+        if isinstance(body, bytes):
+            if as_bytes and body.isascii():
+                header = []
+                pos = 0
+                while body.startswith(b'#', pos):
+                    end = body.find(b'\n', pos) + 1 or len(body)
+                    header.append(body[pos:end].decode('ascii'))
+                    pos = end
+                if b'\n#' not in body[pos:]:
+                    return header, body[pos:]
+            body = body.decode('utf-8', errors='replace')
         buf = StringIO(body)
         data = []
         header = []
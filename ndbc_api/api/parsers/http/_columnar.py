@@ -0,0 +1,250 @@
+"""Vectorized parsing of whitespace-delimited NDBC text responses.
+
+The functions in this module back the `'numpy'` engine of the http
+`BaseParser`. Rather than converting every cell and timestamp in Python,
+the data section of a response is tokenized once into a 2-D array, numeric
+columns are converted in bulk into a float buffer, NaN sentinels are masked
+per column, and timestamps are assembled from the integer `YY MM DD hh mm`
+columns with `numpy.datetime64` arithmetic.
+
+The data section may be given either as `str` lines or, for bodies which
+were decompressed from gzip archives, as a single ASCII `bytes` object which
+is tokenized without decoding.
+
+The results are value-for-value identical to the per-row fallback parser.
+Any layout which the vectorized path cannot reproduce exactly (ragged rows,
+non-standard date columns, unusual whitespace) is reported by returning
+`None`, so that the caller can defer to the fallback parser.
+"""
+import re
+import warnings
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ndbc_api.utilities.columnar import to_python
+
+NUMERIC_CHARS = '0123456789.+-'
+STANDARD_DATE_PARSER = '%Y %m %d %H %M'
+STANDARD_PARSE_DATES = [0, 1, 2, 3, 4]
+TIMESTAMP_DTYPE = 'datetime64[ns]'
+# whitespace other than ' ' and '\n' is tokenized differently by `str.split`
+UNSUPPORTED_WHITESPACE = re.compile(r'[^\S \n]')
+UNSUPPORTED_WHITESPACE_BYTES = re.compile(rb'[\t\r\x0b\x0c\x1c-\x1f]')
+NON_NUMERIC = re.compile(rb'[^0-9.+\-\s]')
+
+
+def read_columns(
+    data: Union[List[str], bytes],
+    names: List[str],
+    nan_values: Optional[Sequence[Any]],
+    use_timestamp: bool,
+    date_parser: str = STANDARD_DATE_PARSER,
+    parse_dates: Sequence[int] = STANDARD_PARSE_DATES,
+) -> Optional[Tuple[Dict[str, np.ndarray], Optional[np.ndarray]]]:
+    """Parse the data lines of a response into typed column arrays.
+
+    Args:
+        data: The (non-header) lines of the response body, or the data
+            section as ASCII `bytes`.
+        names: The column names parsed from the response header.
+        nan_values: The string and numeric sentinels which represent
+            missing values in this data mode.
+        use_timestamp: Whether to build a timestamp from the date columns
+            and drop the date columns from the result.
+        date_parser: The `strptime` format of the date columns.
+        parse_dates: The indices of the date columns.
+
+    Returns:
+        A tuple of the ordered `{name: array}` columns and the timestamps
+        (`datetime64[ns]`, `NaT` where the date columns are invalid, `None`
+        if `use_timestamp` is `False`), or `None` if the response must be
+        parsed by the fallback parser.
+    """
+    if isinstance(data, bytes):
+        if not names or UNSUPPORTED_WHITESPACE_BYTES.search(data):
+            return None
+        body = data
+        data = data.decode('ascii').split('\n')
+    else:
+        text = ''.join(data)
+        if not names or UNSUPPORTED_WHITESPACE.search(text):
+            return None
+        body = text.encode('ascii') if text.isascii() else None
+    str_nans = [v for v in (nan_values or []) if isinstance(v, str)]
+    num_nans = [float(v) for v in (nan_values or []) if not isinstance(v, str)]
+    tokenized = _tokenize_numeric(body, str_nans) if body is not None else None
+    if tokenized is None:
+        tokenized = _tokenize(data, str_nans)
+    if tokenized is None:
+        return None
+    values, tokens, has_dot, is_str_nan = tokenized
+    width = min(has_dot.shape[1], len(names))
+    names = names[:width]
+    if len(set(names)) != width:
+        return None
+    # the date columns may be anywhere, but must be in `YY MM DD hh mm` order
+    if use_timestamp and (date_parser != STANDARD_DATE_PARSER or
+                          len(parse_dates) != len(STANDARD_PARSE_DATES) or
+                          width <= max(parse_dates)):
+        return None
+
+    columns: Dict[str, np.ndarray] = {}
+    integral: Dict[str, np.ndarray] = {}
+    for idx, name in enumerate(names):
+        if values is not None:
+            col = values[:, idx].copy()
+        else:
+            col = _float_column(tokens[:, idx], is_str_nan[:, idx])
+            if col is None:
+                columns[name] = _object_column(tokens[:, idx], nan_values)
+                continue
+        nan_mask = is_str_nan[:, idx]
+        if num_nans:
+            nan_mask = nan_mask | np.isin(col, num_nans)
+        col[nan_mask] = np.nan
+        if not has_dot[:, idx].any() and not nan_mask.any():
+            col = col.astype(np.int64)
+        integral[name] = ~nan_mask & ~has_dot[:, idx]
+        columns[name] = col
+
+    if not use_timestamp:
+        return columns, None
+
+    date_names = [names[i] for i in parse_dates]
+    if any(n not in integral for n in date_names):
+        return None
+    timestamps = _timestamps_from_columns(
+        [columns[n] for n in date_names],
+        np.logical_and.reduce([integral[n] for n in date_names]),
+    )
+    for n in date_names:
+        del columns[n]
+    return columns, timestamps
+
+
+def first_unique_order(timestamps: np.ndarray) -> np.ndarray:
+    """Indices of the first row for each unique timestamp, in time order.
+
+    `NaT` timestamps are treated as a single value which sorts before all
+    valid timestamps, mirroring the fallback parser's de-duplication.
+    """
+    keys = timestamps.astype(TIMESTAMP_DTYPE).view(np.int64)
+    _, first = np.unique(keys, return_index=True)
+    return first
+
+
+def records_from_columns(columns: Dict[str, np.ndarray],
+                         timestamps: Optional[np.ndarray]) -> List[dict]:
+    """Materialize typed column arrays as one `dict` per row."""
+    names = list(columns)
+    values = [to_python(columns[n]) for n in names]
+    if timestamps is not None:
+        names.append('timestamp')
+        values.append(timestamps.astype('datetime64[us]').tolist())
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+""" PRIVATE """
+
+
+def _tokenize_numeric(
+    body: bytes,
+    str_nans: List[str],
+) -> Optional[Tuple[np.ndarray, None, np.ndarray, np.ndarray]]:
+    """Tokenize and convert a body made up only of numbers and NaN sentinels.
+
+    The body is scanned once as bytes to find token boundaries, decimal
+    points and the number of tokens on each line, and all values are then
+    converted to floats in a single call.
+    """
+    sentinels = (re.compile(rb'(?<!\S)(?:%s)(?!\S)' % b'|'.join(
+        re.escape(v.encode()) for v in str_nans)) if str_nans else None)
+    # tokens such as `1e5` or `nan` are valid floats, but are kept as strings
+    # by the fallback parser, so only plain decimal tokens are accepted.
+    if NON_NUMERIC.search(sentinels.sub(b'', body) if sentinels else body):
+        return None
+    if sentinels:
+        body = sentinels.sub(b'nan', body)
+    raw = np.frombuffer(body, dtype=np.uint8)
+    is_sep = (raw == ord(' ')) | (raw == ord('\n'))
+    is_start = ~is_sep & np.concatenate(([True], is_sep[:-1]))
+    starts = np.flatnonzero(is_start)
+    if not len(starts):
+        return None
+    _, per_line = np.unique(np.cumsum(raw == ord('\n'))[starts],
+                            return_counts=True)
+    if np.any(per_line != per_line[0]):
+        return None
+    with warnings.catch_warnings():
+        # a malformed token stops the conversion early, caught by the length
+        warnings.simplefilter('ignore', DeprecationWarning)
+        values = np.fromstring(body, dtype=np.float64, sep=' ')
+    if len(values) != len(starts):
+        return None
+    has_dot = np.zeros(len(starts), dtype=bool)
+    has_dot[(np.cumsum(is_start) - 1)[raw == ord('.')]] = True
+    shape = (len(per_line), per_line[0])
+    return (values.reshape(shape), None, has_dot.reshape(shape),
+            (raw[starts] == ord('n')).reshape(shape))
+
+
+def _tokenize(
+    data: List[str],
+    str_nans: List[str],
+) -> Optional[Tuple[None, np.ndarray, np.ndarray, np.ndarray]]:
+    """Tokenize a body which includes non-numeric columns."""
+    rows = [r for r in (line.split() for line in data) if r]
+    if not rows or any(len(r) != len(rows[0]) for r in rows):
+        return None
+    tokens = np.array(rows, dtype=str)
+    is_str_nan = (np.isin(tokens, str_nans)
+                  if str_nans else np.zeros(tokens.shape, dtype=bool))
+    return None, tokens, np.char.find(tokens, '.') >= 0, is_str_nan
+
+
+def _float_column(tokens: np.ndarray,
+                  is_str_nan: np.ndarray) -> Optional[np.ndarray]:
+    """Convert a column of tokens to floats, or `None` if non-numeric."""
+    is_plain = np.char.strip(tokens, NUMERIC_CHARS) == ''
+    if not np.all(is_plain | is_str_nan):
+        return None
+    try:
+        return np.where(is_str_nan, 'nan', tokens).astype(np.float64)
+    except ValueError:
+        return None
+
+
+def _object_column(tokens: np.ndarray,
+                   nan_values: Optional[Sequence[Any]]) -> np.ndarray:
+    """Convert a non-numeric column cell-by-cell, as the fallback does."""
+    col = np.empty(len(tokens), dtype=object)
+    for i, val in enumerate(tokens.tolist()):
+        if nan_values and val in nan_values:
+            col[i] = None
+            continue
+        try:
+            parsed_val = float(val) if '.' in val else int(val)
+        except ValueError:
+            parsed_val = val
+        col[i] = None if nan_values and parsed_val in nan_values else parsed_val
+    return col
+
+
+def _timestamps_from_columns(date_cols: List[np.ndarray],
+                             valid: np.ndarray) -> np.ndarray:
+    """Build timestamps from year, month, day, hour and minute columns."""
+    year, month, day, hour, minute = (
+        np.where(valid, c, 0).astype(np.int64) for c in date_cols)
+    valid &= ((year >= 1000) & (year <= 9999) & (month >= 1) & (month <= 12) &
+              (day >= 1) & (day <= 31) & (hour >= 0) & (hour <= 23) &
+              (minute >= 0) & (minute <= 59))
+    year, month, day, hour, minute = (np.where(valid, c, 1)
+                                      for c in (year, month, day, hour, minute))
+    months = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    days = months.astype('datetime64[D]') + (day - 1)
+    valid &= days.astype('datetime64[M]') == months  # e.g. Feb. 30th
+    timestamps = (days.astype('datetime64[m]') + hour * 60 +
+                  minute).astype(TIMESTAMP_DTYPE)
+    timestamps[~valid] = np.datetime64('NaT')
+    return timestamps
@@ -0,0 +1,95 @@
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+from ndbc_api.api.parsers.http.stdmet import StdmetParser
+from ndbc_api.exceptions import ParserException, ResponseException
+from ndbc_api.utilities.columnar import ColumnarData
+from ndbc_api.utilities.columnar import STATION_COL as STATION_ID_COL
+from ndbc_api.utilities.data_helpers import handle_data
+
+
+class LatestObservationsParser(StdmetParser):
+    """Parser for the latest observation of every station, in one file.
+
+    The file has the standard meteorological columns, preceded by the
+    station id and its position, and its date columns follow them.
+    """
+
+    PARSE_DATES = [3, 4, 5, 6, 7]
+    STATION_COL = 'STN'
+
+    @classmethod
+    def parse_response(cls,
+                       response: dict,
+                       station_ids: Optional[Sequence[str]] = None,
+                       use_timestamp: bool = True,
+                       engine: Optional[str] = None) -> ColumnarData:
+        """Parse the response into one row per station.
+
+        Args:
+            response: The response from the NDBC data service.
+            station_ids: The (lowercase) station ids to keep, `None` to keep
+                every station.
+            use_timestamp: Whether to replace the date columns with a
+                `timestamp`.
+            engine: The parsing engine, either `'numpy'` or `'python'`.
+
+        Returns:
+            The observations, attributed to their lowercase station ids.
+
+        Raises:
+            ResponseException: The request was not successful.
+            ParserException: The response could not be parsed.
+        """
+        if response.get('status') != 200:
+            raise ResponseException(
+                f'Failed to retrieve the latest observations, status '
+                f'{response.get("status")}.')
+        parsed = None
+        if cls._check_engine(engine) == 'numpy':
+            parsed = cls._read_response_numpy(response, use_timestamp)
+        if parsed is None:
+            data = ColumnarData.from_records(
+                cls._read_response_fallback(response, use_timestamp))
+            parsed = data.columns, data.timestamp
+        columns, timestamp = parsed
+        # ids such as `41001` are read as numbers, so use the raw tokens
+        columns.pop(cls.STATION_COL, None)
+        ids = cls._station_ids(response)
+        if len(ids) != len(ColumnarData(columns, timestamp)):
+            raise ParserException(
+                'Failed to parse the station ids of the latest observations.')
+        data = ColumnarData(columns, timestamp, np.arange(len(ids)), ids)
+        if station_ids is not None:
+            keep = set(station_ids)
+            data = data.take(np.array([i in keep for i in ids], dtype=bool))
+        return data
+
+    @classmethod
+    def _station_ids(cls, response: dict) -> List[str]:
+        _, data = cls._parse_body(response.get('body'))
+        return [
+            line.split(None, 1)[0].lower() for line in data if line.strip()
+        ]
+
+
+def handle_latest_data(data: ColumnarData,
+                       as_df: bool = True,
+                       as_pl: bool = False,
+                       cols: Optional[List[str]] = None) -> Any:
+    """Convert the parsed observations to the return format.
+
+    DataFrames are indexed (pandas) or keyed (polars) by `station_id`,
+    matching the ids of the `stations` data, and `dict` results map each
+    station id to its observation.
+
+    Raises:
+        ParserException: If column selection fails.
+    """
+    data = handle_data(data, as_df=False, as_pl=False, cols=cols)
+    if as_pl:
+        return handle_data(data, as_df=False, as_pl=True)
+    if as_df:
+        return handle_data(data, as_df=True).set_index(STATION_ID_COL)
+    return {row.pop(STATION_ID_COL): row for row in data.to_records()}
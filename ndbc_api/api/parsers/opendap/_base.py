@@ -1,6 +1,4 @@
-import os
-import tempfile
-from typing import List, Optional, TYPE_CHECKING
+from typing import List, Optional, Tuple, TYPE_CHECKING
 
 try:
     import xarray
@@ -8,7 +6,12 @@ except ImportError:
     xarray = None
 
 from ndbc_api.exceptions import ParserException
-from ndbc_api.utilities.opendap.dataset import concat_datasets
+from ndbc_api.utilities.opendap.dataset import (concat_datasets,
+                                                filter_dataset_by_grid)
+from ndbc_api.utilities.opendap.memory import SPILL_DIRECTORY, open_netcdf
+
+if TYPE_CHECKING:
+    from ndbc_api.utilities.opendap.dap import DapSubset
 
 
 class BaseParser:
@@ -21,12 +24,24 @@ class BaseParser:
         cls,
         responses: List[dict],
         use_timestamp: bool = False,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
     ) -> 'xarray.Dataset':
         """Build the netCDF dataset from the responses.
+
+        Bodies are opened from memory, and their variables loaded lazily.
+        Bodies which must be written to the `SPILL_DIRECTORY` are kept
+        until the returned dataset is garbage collected. Each body is
+        subset to the `bbox` and `stride` as it is opened, so that cells
+        outside of them are never read.
         
         Args: 
             responses (List[dict]): All responses from the THREDDS
-                server regardless of content or HTTP code.
+                server regardless of content or HTTP code, or the datasets
+                opened from the dataset store in their place.
+            bbox: The `(min_lon, min_lat, max_lon, max_lat)` bounds of the
+                data, if any.
+            stride: Keep every `stride`-th latitude and longitude, if any.
         
         Returns:
             xarray.open_dataset: The netCDF dataset.
@@ -42,20 +57,40 @@ class BaseParser:
             else:
                 content = r
             try:
-                # if the content bytes begin with b'\x1f\x8b\x08' we need to write to a temporary file
-                if content.startswith(b'\x89HDF\r'):
-                    # This is a gzip-compressed HDF5 file, we need to write it to a temporary file
-                    with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-                        tmp_file.write(content)
-                        tmp_file_path = tmp_file.name
-                    xrds = xarray.open_dataset(tmp_file_path, engine='h5netcdf')
-                    os.remove(tmp_file_path)
-                else:
-                    xrds = xarray.open_dataset(content)
-                datasets.append(xrds)
+                # datasets reopened from the dataset store are already open
+                if not isinstance(content, xarray.Dataset):
+                    content = open_netcdf(content)
+                datasets.append(
+                    filter_dataset_by_grid(content, bbox=bbox, stride=stride))
             except Exception as e:
                 raise ParserException from e
 
+        merged = cls._merge_datasets(datasets)
+        SPILL_DIRECTORY.hold(
+            merged, [ds.encoding.get('source') for ds in datasets])
+        return merged
+
+    @classmethod
+    def nc_from_dap(cls, subset: 'DapSubset') -> 'xarray.Dataset':
+        """Build the netCDF dataset from a subset of the THREDDS datasets.
+
+        Args:
+            subset (DapSubset): The server-side subset, once `done`.
+
+        Returns:
+            xarray.Dataset: The subset.
+
+        Raises:
+            ParserException: No dataset holds data within the subset.
+        """
+        if xarray is None:
+            raise ImportError("xarray is required for OpenDAP support. If you uninstalled it to create a lightweight environment, you must reinstall it to use this feature.")
+        try:
+            datasets = subset.datasets()
+        except Exception as e:
+            raise ParserException from e
+        if not datasets:
+            raise ParserException('No dataset holds data within the subset.')
         return cls._merge_datasets(datasets)
 
     @classmethod
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional, Tuple
 
 
 
@@ -13,5 +13,9 @@ class CwindParser(BaseParser):
     @classmethod
     def nc_from_responses(cls,
                           responses: List[dict],
-                          use_timestamp: bool = False) -> 'xarray.Dataset':
-        return super(CwindParser, cls).nc_from_responses(responses, use_timestamp=use_timestamp)
+                          use_timestamp: bool = False,
+                          bbox: Optional[Tuple[float, float, float,
+                                               float]] = None,
+                          stride: Optional[int] = None) -> 'xarray.Dataset':
+        return super(CwindParser, cls).nc_from_responses(
+            responses, use_timestamp=use_timestamp, bbox=bbox, stride=stride)
@@ -1,8 +1,10 @@
-from typing import List
-
-
+from typing import List, Optional, Tuple, Union
 
 from ndbc_api.api.parsers.opendap._base import BaseParser
+from ndbc_api.exceptions import ParserException
+from ndbc_api.utilities.opendap.cube import TimeCube
+from ndbc_api.utilities.opendap.dataset import filter_dataset_by_grid
+from ndbc_api.utilities.opendap.memory import open_netcdf
 
 
 class HfradarParser(BaseParser):
@@ -13,5 +15,66 @@ class HfradarParser(BaseParser):
     @classmethod
     def nc_from_responses(cls,
                           responses: List[dict],
-                          use_timestamp: bool = False) -> 'xarray.Dataset':
-        return super(HfradarParser, cls).nc_from_responses(responses, use_timestamp=use_timestamp)
+                          use_timestamp: bool = False,
+                          bbox: Optional[Tuple[float, float, float,
+                                               float]] = None,
+                          stride: Optional[int] = None) -> 'xarray.Dataset':
+        """Build the HF radar dataset from its hourly responses.
+
+        Each hour is copied into one `TimeCube` as it is opened, rather than
+        all hours being opened and concatenated.
+        """
+        cube = cls.time_cube(slots=len(responses))
+        for index, response in enumerate(responses):
+            cls.add_response(cube=cube,
+                             index=index,
+                             response=response,
+                             bbox=bbox,
+                             stride=stride)
+        return cls.nc_from_cube(cube=cube)
+
+    @classmethod
+    def time_cube(cls, slots: int) -> TimeCube:
+        """A `TimeCube` of `slots` hourly files, joined along time."""
+        return TimeCube(slots=slots, time_dim=cls.TEMPORAL_DIM)
+
+    @classmethod
+    def add_response(cls,
+                     cube: TimeCube,
+                     index: int,
+                     response: Union[dict, bytes],
+                     bbox: Optional[Tuple[float, float, float, float]] = None,
+                     stride: Optional[int] = None) -> bool:
+        """Open the hourly `response` and copy it into slot `index`.
+
+        Only the cells of the grid within the `bbox`, and at every `stride`,
+        are read from the response. Responses other than 200, such as hours
+        not found, are recorded as missing. This is safe to call
+        concurrently, for distinct slots.
+
+        Returns:
+            Whether the hour was added to the cube.
+        """
+        if isinstance(response, dict):
+            if 'status' in response and response.get('status') != 200:
+                cube.drop(index)
+                return False
+            response = response['body']
+        try:
+            dataset = open_netcdf(response)
+            try:
+                return cube.add(
+                    index,
+                    filter_dataset_by_grid(dataset, bbox=bbox, stride=stride))
+            finally:
+                dataset.close()
+        except Exception as e:
+            raise ParserException from e
+
+    @classmethod
+    def nc_from_cube(cls, cube: TimeCube) -> 'xarray.Dataset':
+        """Assemble the hours of the `cube`, without those missing."""
+        try:
+            return cube.dataset()
+        except ValueError as e:
+            raise ParserException from e
@@ -1,96 +1,220 @@
 import os
-from calendar import month_abbr
+from calendar import month_abbr, monthrange
 from datetime import datetime, timedelta
 from typing import List
 
 from ndbc_api.api.requests.http._core import CoreRequest
+from ndbc_api.config import HISTORICAL_TRANSPORT
+
+FIVE_DAY = '5day'
+REALTIME = 'realtime'
+CURRENT_MONTH = 'current_month'
+MONTHLY = 'monthly'
+YEARLY = 'yearly'
+
+
+class PlannedRequest:
+    """A file requested to cover part of a data query.
+
+    Attributes:
+        url (:str:): The url of the file.
+        family (:str:): The file family, one of `'5day'`, `'realtime'`
+            (45 days), `'current_month'`, `'monthly'` or `'yearly'`.
+        start (:obj:`datetime.datetime`): The start of the period covered by
+            the file.
+        end (:obj:`datetime.datetime`): The end of the period covered by the
+            file.
+    """
+
+    __slots__ = 'url', 'family', 'start', 'end'
+
+    def __init__(self, url: str, family: str, start: datetime,
+                 end: datetime) -> None:
+        self.url = url
+        self.family = family
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return (f'PlannedRequest(family={self.family!r}, '
+                f'start={self.start.isoformat()}, '
+                f'end={self.end.isoformat()}, url={self.url!r})')
+
+    @property
+    def days(self) -> float:
+        """The number of days of observations in the file."""
+        return (self.end - self.start).total_seconds() / (24 * 60 * 60)
 
 
 class BaseRequest(CoreRequest):
 
     REAL_TIME_URL_PREFIX = 'data/realtime2/'
+    FIVE_DAY_URL_PREFIX = 'data/5day2/'
     HISTORICAL_FILE_EXTENSION_SUFFIX = '.txt.gz'
     HISTORICAL_DATA_PREFIX = '&dir=data/'
     HISTORICAL_URL_PREFIX = 'view_text_file.php?filename='
     HISTORICAL_SUFFIX = 'historical/'
     HISTORICAL_IDENTIFIER = 'h'
+    HISTORICAL_GZIP_PREFIX = 'data/'
+    HISTORICAL_TRANSPORTS = ('text', 'gzip')
+    HISTORICAL_TRANSPORT = HISTORICAL_TRANSPORT
     FORMAT = ''
     FILE_FORMAT = ''
+    # the suffix of the 5-day realtime file, empty if the mode has none
+    FIVE_DAY_FILE_FORMAT = ''
+    FIVE_DAY_DAYS = 5
+    REALTIME_DAYS = 44
 
     @classmethod
     def build_request(cls, station_id: str, start_time: datetime,
                       end_time: datetime) -> List[str]:
-
-        if 'MOCKDATE' in os.environ:
-            now = datetime.strptime(os.getenv('MOCKDATE'), '%Y-%m-%d')
-        else:
-            now = datetime.now()
-        is_historical = (now - start_time) >= timedelta(days=44)
-        if is_historical:
-            return cls._build_request_historical(
+        return [
+            planned.url for planned in cls.plan(
                 station_id=station_id,
                 start_time=start_time,
                 end_time=end_time,
-                now=now,
             )
-        return cls._build_request_realtime(station_id=station_id)
+        ]
+
+    @classmethod
+    def plan(cls, station_id: str, start_time: datetime,
+             end_time: datetime) -> List[PlannedRequest]:
+        """Plan the smallest set of files covering a data query.
+
+        The observations of the last `REALTIME_DAYS` days are read from a
+        realtime file, the 5-day file if it covers `start_time` and the
+        45-day file otherwise. Older observations are read from the monthly
+        archives of the current year and the yearly archives of past years,
+        each of which is only requested if it overlaps the query.
+
+        Returns:
+            The `PlannedRequest`s of the files, oldest first.
+        """
+        if not cls.FORMAT:  # pragma: no cover
+            raise ValueError(
+                'Please provide a format for this historical data request, or call a formatted child class\'s method.'
+            )
+        if cls.HISTORICAL_TRANSPORT not in cls.HISTORICAL_TRANSPORTS:
+            raise ValueError(
+                f'Unsupported historical transport {cls.HISTORICAL_TRANSPORT}, '
+                f'must be one of {cls.HISTORICAL_TRANSPORTS}.')
+        now = cls._now()
+        realtime_start = now - timedelta(days=cls.REALTIME_DAYS)
+        plan = []
+        if start_time <= realtime_start:
+            plan.extend(
+                cls._plan_archives(station_id=station_id,
+                                   start_time=start_time,
+                                   end_time=end_time,
+                                   now=now))
+            if end_time <= realtime_start:
+                return plan
+        plan.append(
+            cls._plan_realtime(station_id=station_id,
+                               start_time=start_time,
+                               now=now))
+        return plan
+
+    @classmethod
+    def _now(cls) -> datetime:
+        if 'MOCKDATE' in os.environ:
+            return datetime.strptime(os.getenv('MOCKDATE'), '%Y-%m-%d')
+        return datetime.now()
 
     @classmethod
-    def _build_request_historical(
+    def _plan_archives(
         cls,
         station_id: str,
         start_time: datetime,
         end_time: datetime,
         now: datetime,
-    ) -> List[str]:
+    ) -> List[PlannedRequest]:
+        # fetch the raw `.txt.gz` archives rather than the server-side
+        # decompressed text, these are decompressed while streaming
+        use_gzip = cls.HISTORICAL_TRANSPORT == 'gzip'
+        plan = []
+
+        # the monthly archives cover the year of the last archived month,
+        # and the yearly archives the years before it
+        last_archived = now - timedelta(days=cls.REALTIME_DAYS)
+        months_year = last_archived.year
+        last_avail_month = last_archived.month
+
+        for year in range(start_time.year, min(months_year,
+                                                end_time.year + 1)):
+            plan.append(
+                PlannedRequest(
+                    url=cls._url_yearly(station_id, year, use_gzip),
+                    family=YEARLY,
+                    start=datetime(year, 1, 1),
+                    end=datetime(year + 1, 1, 1),
+                ))
+
+        if start_time.year <= months_year <= end_time.year:
+            first = start_time.month if start_time.year == months_year else 1
+            last = end_time.month if end_time.year == months_year else 12
+            for month in range(first, min(last, last_avail_month) + 1):
+                plan.append(
+                    PlannedRequest(
+                        url=cls._url_monthly(station_id, months_year, month,
+                                             use_gzip),
+                        family=MONTHLY,
+                        start=datetime(months_year, month, 1),
+                        end=cls._month_end(months_year, month),
+                    ))
+            if last_avail_month <= last:
+                plan.append(
+                    PlannedRequest(
+                        url=cls._url_current_month(station_id,
+                                                   last_avail_month),
+                        family=CURRENT_MONTH,
+                        start=datetime(months_year, last_avail_month, 1),
+                        end=cls._month_end(months_year, last_avail_month),
+                    ))
+        return plan
 
-        def req_hist_helper_year(req_year: int) -> str:
-            return f'{cls.BASE_URL}{cls.HISTORICAL_URL_PREFIX}{station_id}{cls.HISTORICAL_IDENTIFIER}{req_year}{cls.HISTORICAL_FILE_EXTENSION_SUFFIX}{cls.HISTORICAL_DATA_PREFIX}{cls.HISTORICAL_SUFFIX}{cls.FORMAT}/'
+    @classmethod
+    def _plan_realtime(cls, station_id: str, start_time: datetime,
+                       now: datetime) -> PlannedRequest:
+        five_day_start = now - timedelta(days=cls.FIVE_DAY_DAYS)
+        if cls.FIVE_DAY_FILE_FORMAT and start_time >= five_day_start:
+            return PlannedRequest(
+                url=f'{cls.BASE_URL}{cls.FIVE_DAY_URL_PREFIX}'
+                f'{station_id.upper()}_5day{cls.FIVE_DAY_FILE_FORMAT}',
+                family=FIVE_DAY,
+                start=five_day_start,
+                end=now,
+            )
+        return PlannedRequest(
+            url=cls._build_request_realtime(station_id=station_id)[0],
+            family=REALTIME,
+            start=now - timedelta(days=cls.REALTIME_DAYS + 1),
+            end=now,
+        )
+
+    @staticmethod
+    def _month_end(year: int, month: int) -> datetime:
+        return datetime(year, month, monthrange(year, month)[1]) + timedelta(
+            days=1)
 
-        def req_hist_helper_month(req_year: int, req_month: int) -> str:
-            month = month_abbr[req_month]
-            month = month.capitalize()
-            return f'{cls.BASE_URL}{cls.HISTORICAL_URL_PREFIX}{station_id}{req_month}{req_year}{cls.HISTORICAL_FILE_EXTENSION_SUFFIX}{cls.HISTORICAL_DATA_PREFIX}{cls.FORMAT}/{month}/'
+    @classmethod
+    def _url_yearly(cls, station_id: str, year: int, use_gzip: bool) -> str:
+        if use_gzip:
+            return f'{cls.BASE_URL}{cls.HISTORICAL_GZIP_PREFIX}{cls.HISTORICAL_SUFFIX}{cls.FORMAT}/{station_id}{cls.HISTORICAL_IDENTIFIER}{year}{cls.HISTORICAL_FILE_EXTENSION_SUFFIX}'
+        return f'{cls.BASE_URL}{cls.HISTORICAL_URL_PREFIX}{station_id}{cls.HISTORICAL_IDENTIFIER}{year}{cls.HISTORICAL_FILE_EXTENSION_SUFFIX}{cls.HISTORICAL_DATA_PREFIX}{cls.HISTORICAL_SUFFIX}{cls.FORMAT}/'
 
-        def req_hist_helper_month_current(current_month: int) -> str:
-            month = month_abbr[current_month]
-            month = month.capitalize()
-            return f'{cls.BASE_URL}data/{cls.FORMAT}/{month}/{station_id.lower()}.txt'
+    @classmethod
+    def _url_monthly(cls, station_id: str, year: int, month: int,
+                     use_gzip: bool) -> str:
+        month_name = month_abbr[month].capitalize()
+        if use_gzip:
+            return f'{cls.BASE_URL}{cls.HISTORICAL_GZIP_PREFIX}{cls.FORMAT}/{month_name}/{station_id}{month}{year}{cls.HISTORICAL_FILE_EXTENSION_SUFFIX}'
+        return f'{cls.BASE_URL}{cls.HISTORICAL_URL_PREFIX}{station_id}{month}{year}{cls.HISTORICAL_FILE_EXTENSION_SUFFIX}{cls.HISTORICAL_DATA_PREFIX}{cls.FORMAT}/{month_name}/'
 
-        if not cls.FORMAT:  # pragma: no cover
-            raise ValueError(
-                'Please provide a format for this historical data request, or call a formatted child class\'s method.'
-            )
-        # store request urls
-        reqs = []
-
-        current_year = now.year
-        has_realtime = (now - end_time) < timedelta(days=44)
-        months_req_year = (now - timedelta(days=44)).year
-        last_avail_month = (now - timedelta(days=44)).month
-
-        # handle year requests
-        for hist_year in range(int(start_time.year),
-                               min(int(current_year),
-                                   int(end_time.year) + 1)):
-            reqs.append(req_hist_helper_year(hist_year))
-
-        # handle month requests
-        if end_time.year == months_req_year:
-            for hist_month in range(
-                    int(start_time.month),
-                    min(int(end_time.month), int(last_avail_month)) + 1):
-                reqs.append(req_hist_helper_month(months_req_year, hist_month))
-            if int(last_avail_month) <= (end_time.month):
-                reqs.append(req_hist_helper_month_current(
-                    int(last_avail_month)))
-
-        if has_realtime:
-            reqs.append(
-                cls._build_request_realtime(
-                    station_id=station_id)[0]  # only one URL
-            )
-        return reqs
+    @classmethod
+    def _url_current_month(cls, station_id: str, month: int) -> str:
+        month_name = month_abbr[month].capitalize()
+        return f'{cls.BASE_URL}data/{cls.FORMAT}/{month_name}/{station_id.lower()}.txt'
 
     @classmethod
     def _build_request_realtime(cls, station_id: str) -> List[str]:
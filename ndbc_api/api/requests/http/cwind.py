@@ -8,6 +8,7 @@ class CwindRequest(BaseRequest):
 
     FORMAT = 'cwind'
     FILE_FORMAT = '.cwind'
+    FIVE_DAY_FILE_FORMAT = '.cwind'
     HISTORICAL_IDENTIFIER = 'c'
 
     @classmethod
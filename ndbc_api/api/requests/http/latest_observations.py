@@ -0,0 +1,10 @@
+from ndbc_api.api.requests.http._core import CoreRequest
+
+
+class LatestObservationsRequest(CoreRequest):
+
+    LATEST_OBS_URL = 'data/latest_obs/latest_obs.txt'
+
+    @classmethod
+    def build_request(cls) -> str:
+        return f'{cls.BASE_URL}{cls.LATEST_OBS_URL}'
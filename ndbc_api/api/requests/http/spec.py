@@ -8,6 +8,7 @@ class SpecRequest(BaseRequest):
 
     FORMAT = 'spec'
     FILE_FORMAT = '.spec'
+    FIVE_DAY_FILE_FORMAT = '.spec'
 
     @classmethod
     def build_request(cls, station_id: str, start_time: datetime,
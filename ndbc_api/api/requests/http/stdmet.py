@@ -8,6 +8,7 @@ class StdmetRequest(BaseRequest):
 
     FORMAT = 'stdmet'
     FILE_FORMAT = '.txt'
+    FIVE_DAY_FILE_FORMAT = '.txt'
 
     @classmethod
     def build_request(cls, station_id: str, start_time: datetime,
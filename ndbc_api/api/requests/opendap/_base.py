@@ -4,6 +4,10 @@ from typing import List
 
 from ndbc_api.api.requests.opendap._core import CoreRequest
 
+# the THREDDS endpoints serving whole files, and subsets through DAP2
+FILE_SERVER_PREFIX = 'fileServer/'
+DAP_PREFIX = 'dodsC/'
+
 
 class BaseRequest(CoreRequest):
 
@@ -33,6 +37,19 @@ class BaseRequest(CoreRequest):
             )
         return cls._build_request_realtime(station_id=station_id)
 
+    @classmethod
+    def build_dap_request(cls, station_id: str, start_time: datetime,
+                          end_time: datetime) -> List[str]:
+        """The DAP2 urls of the datasets of `build_request`, which may be
+        subset on the server rather than downloaded whole."""
+        return [
+            url.replace(f'{cls.BASE_URL}{FILE_SERVER_PREFIX}',
+                        f'{cls.BASE_URL}{DAP_PREFIX}', 1)
+            for url in cls.build_request(station_id=station_id,
+                                         start_time=start_time,
+                                         end_time=end_time)
+        ]
+
     @classmethod
     def _build_request_historical(
         cls,
@@ -32,10 +32,12 @@ Attributes:
         request handler.
 """
 import asyncio
+import functools
 import logging
 import pickle
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
 
 try:
     import pandas as pd
@@ -51,12 +53,18 @@ except ImportError:
     xarray = None
 
 from .config import (
+    CACHE_BYTES_LIMIT,
+    DATASET_STORE_PATH,
     DEFAULT_CACHE_LIMIT,
+    DISK_CACHE_COMPRESSION,
+    DISK_CACHE_LIMIT,
+    DISK_CACHE_PATH,
     HTTP_BACKOFF_FACTOR,
     HTTP_DEBUG,
-    HTTP_DELAY,
     HTTP_RETRY,
     LOGGER_NAME,
+    MAX_WORKERS,
+    PARSE_EXECUTOR,
     VERIFY_HTTPS,
 )
 from .exceptions import (
@@ -66,18 +74,20 @@ from .exceptions import (
     ResponseException,
 )
 from .utilities.async_req_handler import AsyncRequestHandler
+from .utilities.cache_policy import CachePolicy
+from .utilities.disk_cache import DiskCache
 from .utilities.log_formatter import LogFormatter
+from .utilities.opendap.dap import DapSubset
+from .utilities.opendap.store import DatasetStore
+from .utilities.rate_limiter import RateLimiter
 from .utilities.data_helpers import (
     parse_station_id,
     handle_timestamp,
-    enforce_timerange,
     handle_data,
     handle_accumulate_data,
 )
-from .utilities.opendap.dataset import (
-    filter_dataset_by_time_range,
-    filter_dataset_by_variable,
-)
+from .utilities.query_plan import handle_plan_data, planned_requests, plan_row
+from .utilities.station_data import parse_station_data
 
 # --- HTTP request builders ---------------------------------------------------
 from .api.requests.http.adcp import AdcpRequest as HttpAdcpRequest
@@ -128,11 +138,16 @@ from .api.parsers.opendap.hfradar import HfradarParser as OpendapHfradarParser
 # --- station request builders & parsers --------------------------------------
 from .api.requests.http.active_stations import ActiveStationsRequest
 from .api.requests.http.historical_stations import HistoricalStationsRequest
+from .api.requests.http.latest_observations import LatestObservationsRequest
 from .api.requests.http.station_metadata import MetadataRequest
 from .api.requests.http.station_realtime import RealtimeRequest
 from .api.requests.http.station_historical import HistoricalRequest
 from .api.parsers.http.active_stations import ActiveStationsParser
 from .api.parsers.http.historical_stations import HistoricalStationsParser
+from .api.parsers.http.latest_observations import (
+    LatestObservationsParser,
+    handle_latest_data,
+)
 from .api.parsers.http.station_metadata import MetadataParser
 from .api.parsers.http.station_realtime import RealtimeParser
 from .api.parsers.http.station_historical import HistoricalParser
@@ -202,11 +217,21 @@ class AsyncNdbcApi:
         filename: Any = None,
         cache_limit: int = DEFAULT_CACHE_LIMIT,
         headers: Optional[dict] = None,
-        delay: int = HTTP_DELAY,
+        delay: Optional[int] = None,
         retries: int = HTTP_RETRY,
         backoff_factor: float = HTTP_BACKOFF_FACTOR,
         verify_https: bool = VERIFY_HTTPS,
         debug: bool = HTTP_DEBUG,
+        cache_path: Optional[str] = DISK_CACHE_PATH,
+        disk_cache_limit: int = DISK_CACHE_LIMIT,
+        cache_bytes_limit: Optional[int] = CACHE_BYTES_LIMIT,
+        rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        cache_ttl: Optional[Dict[str, Optional[float]]] = None,
+        stale_while_revalidate: Optional[Dict[str, Optional[float]]] = None,
+        negative_ttl: Optional[Dict[str, Optional[float]]] = None,
+        executor: Union[str, Executor] = PARSE_EXECUTOR,
+        max_workers: int = MAX_WORKERS,
+        dataset_store_path: Optional[str] = DATASET_STORE_PATH,
     ):
         """Initialise the ``AsyncNdbcApi`` and configure logging.
 
@@ -217,13 +242,54 @@ class AsyncNdbcApi:
             cache_limit: The per-station LRU cache limit for the
                 underlying :class:`AsyncRequestHandler`.
             headers: Optional HTTP headers to send with each request.
-            delay: The inter-request delay in milliseconds.
+            delay: The inter-request delay in milliseconds, for each host
+                without a limit in ``rate_limits``.  If ``None``, the NDBC
+                hosts use ``config.HTTP_RATE_LIMITS`` and other hosts
+                ``config.HTTP_DELAY``.
             retries: The maximum number of retry attempts per request.
             backoff_factor: The exponential back-off factor applied
                 between retries.
             verify_https: Whether to verify TLS certificates.
             debug: If ``True``, enables verbose logging.
+            cache_path: The filepath of a sqlite database in which to
+                persist successful responses, shared across processes and
+                runs.  If ``None``, responses are only cached in memory.
+            disk_cache_limit: The size limit of the persistent cache, in
+                bytes.
+            cache_bytes_limit: The limit on the total size of the
+                responses cached in memory across all stations, in bytes,
+                or ``None`` to limit only the number of responses cached
+                for each station.
+            rate_limits: The ``(requests per second, burst)`` rate limit
+                of requests to a host, overriding ``delay`` for that host,
+                defaulting to ``config.HTTP_RATE_LIMITS``.
+            cache_ttl: The number of seconds for which cached responses
+                are fresh, by data class (``'immutable'``, ``'monthly'`` or
+                ``'realtime'``), overriding ``config.CACHE_TTL``.
+            stale_while_revalidate: The number of seconds after their TTL
+                for which stale responses are served while they are
+                refreshed, by data class, overriding
+                ``config.CACHE_STALE_WHILE_REVALIDATE``.
+            negative_ttl: The number of seconds for which requests which
+                were not found are not requested again, by data class,
+                overriding ``config.CACHE_NEGATIVE_TTL``.
+            executor: Where responses are parsed, filtered and accumulated,
+                off the event loop: ``'thread'`` for a thread pool,
+                ``'process'`` for a process pool (for GIL-bound parsing of
+                large queries), or an existing ``concurrent.futures``
+                executor, which is not shut down with the API.
+            max_workers: The size of the thread or process pool created
+                for ``executor``.
+            dataset_store_path: The directory in which the netCDF files of
+                ``use_opendap`` queries are kept by station, mode and year,
+                and reopened lazily.  If ``None``, the files are opened from
+                their responses.
         """
+        if isinstance(executor, str) and executor not in ('thread',
+                                                          'process'):
+            raise ValueError(
+                f'Unsupported executor {executor}, must be `thread`, '
+                '`process` or a `concurrent.futures.Executor`.')
         self.cache_limit = cache_limit
         self.headers = headers or {}
         self._delay = delay
@@ -231,6 +297,22 @@ class AsyncNdbcApi:
         self._backoff_factor = backoff_factor
         self._verify_https = verify_https
         self._debug = debug
+        self._disk_cache = (DiskCache(path=cache_path,
+                                      limit=disk_cache_limit,
+                                      compression=DISK_CACHE_COMPRESSION)
+                            if cache_path else None)
+        self._dataset_store = (DatasetStore(path=dataset_store_path)
+                               if dataset_store_path else None)
+        self._cache_bytes_limit = cache_bytes_limit
+        self._rate_limiter = RateLimiter.from_delay(delay, limits=rate_limits)
+        self._cache_policy = CachePolicy(
+            ttl=cache_ttl,
+            stale_while_revalidate=stale_while_revalidate,
+            negative_ttl=negative_ttl)
+        self._executor_type = executor
+        self._max_workers = max_workers
+        self._executor: Optional[Executor] = (
+            None if isinstance(executor, str) else executor)
         self._handler: AsyncRequestHandler = None
         self.configure_logging(level=logging_level, filename=filename)
 
@@ -246,6 +328,10 @@ class AsyncNdbcApi:
             headers=self.headers,
             debug=self._debug,
             verify_https=self._verify_https,
+            disk_cache=self._disk_cache,
+            cache_policy=self._cache_policy,
+            cache_bytes_limit=self._cache_bytes_limit,
+            rate_limiter=self._rate_limiter,
         )
         await self._handler.__aenter__()
         return self
@@ -253,6 +339,9 @@ class AsyncNdbcApi:
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
         if self._handler:
             await self._handler.__aexit__(exc_type, exc_val, exc_tb)
+        if isinstance(self._executor_type, str) and self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
 
     # --- logging -----------------------------------------------------------
 
@@ -338,10 +427,39 @@ class AsyncNdbcApi:
         else:
             return data
 
+    def load_cache(self, src: Union[str, dict]):
+        """Load request/response pairs dumped by :meth:`dump_cache`.
+
+        The responses are added to the handler's per-station caches, and
+        to the persistent cache if a *cache_path* was configured.  Pickled
+        dumps should only be loaded from trusted sources.
+
+        Args:
+            src: The ``dict`` returned by :meth:`dump_cache`, or the
+                filepath to which a dump was written.
+
+        Raises:
+            HandlerException: The API has no handler (it is not within an
+                ``async with`` block) and no persistent cache.
+        """
+        if isinstance(src, dict):
+            data = src
+        else:
+            with open(src, 'rb') as f:
+                data = pickle.load(f)
+        if self._handler:
+            self._handler.load_responses(data)
+        elif self._disk_cache is not None:
+            self._disk_cache.load(data)
+        else:
+            raise HandlerException(
+                'Responses can only be loaded within `async with`, or '
+                'into a persistent cache.')
+
     def clear_cache(self):
         """Clear all cached requests and station state."""
         if self._handler:
-            self._handler.stations = []
+            self._handler.clear()
 
     def set_cache_limit(self, new_limit: int):
         """Set the per-station LRU cache limit.
@@ -362,6 +480,20 @@ class AsyncNdbcApi:
         """
         return self.cache_limit
 
+    def cache_stats(self) -> Optional[dict]:
+        """Get the occupancy of the in-memory request cache.
+
+        Returns:
+            A ``dict`` of the byte ``limit`` and current ``size`` of the
+            cache, the number of cached ``entries`` and ``stations``, the
+            ``hits`` and ``evictions`` so far, and the bytes used by each
+            station; or ``None`` outside ``async with`` or if the cache
+            has no ``cache_bytes_limit``.
+        """
+        if self._handler is None:
+            return None
+        return self._handler.cache_stats()
+
     def get_headers(self) -> dict:
         """Return the current headers used by the request handler."""
         if self._handler:
@@ -447,6 +579,54 @@ class AsyncNdbcApi:
         except (ResponseException, ValueError, KeyError) as e:
             raise ResponseException('Failed to handle returned data.') from e
 
+    async def latest_observations(
+        self,
+        station_ids: Optional[Sequence[Union[int, str]]] = None,
+        as_df: bool = True,
+        as_pl: bool = False,
+        cols: List[str] = None,
+    ) -> Any:
+        """Get the latest observation of every station from the NDBC.
+
+        Query the NDBC data service for its combined file of the latest
+        standard meteorological observation of each station, in a single
+        request.  Observations are returned with one row per station,
+        indexed by ``station_id`` so that they join with the ``Station``
+        column of :meth:`stations`.
+
+        Args:
+            station_ids: The stations for which to return observations,
+                or ``None`` for every station reporting to the NDBC.
+            as_df: If ``True`` (default), return a ``pandas.DataFrame``.
+                If ``False``, return a ``dict`` of observations by
+                station id.
+            as_pl: If ``True``, return a ``polars.DataFrame``.
+            cols: Optional column selection, such as
+                ``['WSPD', 'ATMP']``.
+
+        Returns:
+            The latest observation of each station.
+
+        Raises:
+            ResponseException: An error occurred while retrieving and
+                parsing responses from the NDBC data service.
+            ParserException: The requested columns are not available.
+        """
+        if as_pl:
+            as_df = False
+        keep = (None if station_ids is None else
+                [parse_station_id(s) for s in station_ids])
+        try:
+            req = LatestObservationsRequest.build_request()
+            resp = await self._handler.handle_request('latest_obs', req)
+            data = await self._run_in_executor(
+                LatestObservationsParser.parse_response, resp,
+                station_ids=keep)
+        except (ResponseException, ParserException, ValueError,
+                KeyError) as e:
+            raise ResponseException('Failed to handle returned data.') from e
+        return handle_latest_data(data, as_df=as_df, as_pl=as_pl, cols=cols)
+
     async def nearest_station(
         self,
         lat: Union[str, float, None] = None,
@@ -670,6 +850,9 @@ class AsyncNdbcApi:
         modes: Union[List[str], None] = None,
         as_xarray_dataset: bool = False,
         use_opendap: Optional[bool] = None,
+        use_dap: bool = False,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
     ) -> Any:
         """Execute a data query against the specified NDBC station(s).
 
@@ -697,19 +880,40 @@ class AsyncNdbcApi:
             as_xarray_dataset: If ``True``, return an
                 ``xarray.Dataset`` via the THREDDS/OpenDAP service.
             use_opendap: Alias for *as_xarray_dataset*.
+            use_dap: If ``True``, subset the ``xarray.Dataset`` on the
+                THREDDS server, through DAP, so that only the *cols*
+                within the time range and *bbox* are downloaded.
+                Implies *as_xarray_dataset*.
+            bbox: The ``(min_lon, min_lat, max_lon, max_lat)`` bounds of
+                an ``xarray.Dataset`` query, applied as each file is
+                decoded, or on the server with *use_dap*.
+            stride: Decimate the grid of an ``xarray.Dataset`` query to
+                every *stride*-th latitude and longitude, within the
+                *bbox* if any.  Applied as the *bbox*.
 
         Returns:
             The station measurements as a ``pandas.DataFrame``,
             ``polars.DataFrame``, ``xarray.Dataset``, or ``dict``.
 
         Raises:
-            ValueError: Invalid station/mode argument combinations.
+            ValueError: Invalid station/mode argument combinations, *bbox*
+                or *stride* given without an ``xarray.Dataset`` query, a
+                *stride* less than 1, or *use_dap* with *use_opendap* set
+                to ``False``.
             RequestException: The specified mode is not available.
             ResponseException: There was an error executing requests.
             HandlerException: There was an error handling returned data.
         """
         if use_opendap is not None:
             as_xarray_dataset = use_opendap
+        if use_dap and use_opendap is False:
+            raise ValueError('`use_dap` cannot be used without `use_opendap`.')
+        as_xarray_dataset = as_xarray_dataset or use_dap
+        if not as_xarray_dataset and (bbox is not None or stride is not None):
+            raise ValueError(
+                '`bbox` and `stride` require an `xarray.Dataset` query.')
+        if stride is not None and stride < 1:
+            raise ValueError('`stride` must be positive.')
 
         if as_pl:
             as_df = False
@@ -718,42 +922,13 @@ class AsyncNdbcApi:
         self.log(logging.DEBUG,
                  message=f"`get_data` called with arguments: {locals()}")
 
-        # --- validate inputs -----------------------------------------------
-        if station_id is None and station_ids is None:
-            raise ValueError('Both `station_id` and `station_ids` are `None`.')
-        if station_id is not None and station_ids is not None:
-            raise ValueError(
-                '`station_id` and `station_ids` cannot both be specified.')
-        if modes is not None:
-            if not isinstance(modes, list):
-                raise ValueError('`modes` must be a list of strings.')
-            if any(not isinstance(m, str) for m in modes):
-                raise ValueError('All elements in `modes` must be strings.')
-            if any(m == 'hfradar' for m in modes):
-                raise ValueError(
-                    'HF radar data cannot be requested with `modes`. '
-                    'Please use `mode` to specify a single `hfradar` mode.')
-        if mode is None and modes is None:
-            raise ValueError('Both `mode` and `modes` are `None`.')
-        if mode is not None and modes is not None:
-            raise ValueError(
-                '`mode` and `modes` cannot both be specified.')
-
-        handle_station_ids: List[Union[int, str]] = []
-        handle_modes: List[str] = []
-
-        if station_id is not None:
-            handle_station_ids.append(station_id)
-        if station_ids is not None:
-            handle_station_ids.extend(station_ids)
-        if mode is not None:
-            handle_modes.append(mode)
-        if modes is not None:
-            handle_modes.extend(modes)
-
-        for m in handle_modes:
-            if m not in self.get_modes(use_opendap=as_xarray_dataset):
-                raise RequestException(f"Mode {m} is not available.")
+        handle_station_ids, handle_modes = self._handle_query_targets(
+            station_id=station_id,
+            station_ids=station_ids,
+            mode=mode,
+            modes=modes,
+            use_opendap=as_xarray_dataset,
+        )
 
         self.log(logging.INFO,
                  message=(f"Processing request for station_ids "
@@ -776,6 +951,9 @@ class AsyncNdbcApi:
                     as_pl=as_pl,
                     cols=cols,
                     use_opendap=as_xarray_dataset,
+                    use_dap=use_dap,
+                    bbox=bbox,
+                    stride=stride,
                 )
                 for sid in handle_station_ids
             ]
@@ -799,20 +977,240 @@ class AsyncNdbcApi:
                              station_id=sid,
                              message=(f"Successfully processed request "
                                       f"for station_id {sid}"))
-                    if not as_xarray_dataset:
-                        # station_data is a list of dicts
-                        for row in station_data:
-                            row['station_id'] = sid
                     accumulated_data[m].append(station_data)
 
         self.log(logging.INFO, message="Finished processing request.")
-        return handle_accumulate_data(
+        return await self._run_in_executor(
+            handle_accumulate_data,
             accumulated_data,
             as_df=as_df,
             as_pl=as_pl,
             as_xarray_dataset=as_xarray_dataset,
         )
 
+    async def aiter_data(
+        self,
+        station_id: Union[int, str, None] = None,
+        mode: Union[str, None] = None,
+        start_time: Union[str, datetime] = datetime.now() - timedelta(days=30),
+        end_time: Union[str, datetime] = datetime.now(),
+        use_timestamp: bool = True,
+        as_df: bool = True,
+        as_pl: bool = False,
+        cols: List[str] = None,
+        station_ids: Union[Sequence[Union[int, str]], None] = None,
+        modes: Union[List[str], None] = None,
+        as_xarray_dataset: bool = False,
+        use_opendap: Optional[bool] = None,
+        use_dap: bool = False,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
+        max_buffered: int = 8,
+    ) -> AsyncIterator[Tuple[str, str, Any]]:
+        """Stream the data of each station and mode as it completes.
+
+        Accepts the same query as :meth:`get_data`, but rather than
+        merging every station's data into one result, yields a
+        ``(station_id, mode, data)`` tuple for each station and mode as
+        soon as it is parsed, in order of completion.  Each ``data`` has
+        the format ``get_data`` would return for that station and mode
+        alone.
+
+        At most ``max_workers`` stations are fetched and parsed at once,
+        and at most ``max_buffered`` parsed results wait for the caller,
+        so memory stays flat however many stations are queried.
+        Stations which fail are logged and skipped, as in ``get_data``.
+        Breaking out of the ``async for`` cancels the remaining work.
+
+        Example::
+
+            async for station_id, mode, df in api.aiter_data(
+                    station_ids=ids, mode='stdmet'):
+                ...
+
+        Args:
+            max_buffered: The maximum number of parsed results held for
+                the caller before fetching pauses.
+
+        Yields:
+            ``(station_id, mode, data)`` tuples.
+
+        Raises:
+            ValueError: Invalid station/mode argument combinations, or
+                invalid *bbox*, *stride* or *use_dap* arguments, as in
+                :meth:`get_data`.
+            RequestException: The specified mode is not available.
+        """
+        if use_opendap is not None:
+            as_xarray_dataset = use_opendap
+        if use_dap and use_opendap is False:
+            raise ValueError('`use_dap` cannot be used without `use_opendap`.')
+        as_xarray_dataset = as_xarray_dataset or use_dap
+        if not as_xarray_dataset and (bbox is not None or stride is not None):
+            raise ValueError(
+                '`bbox` and `stride` require an `xarray.Dataset` query.')
+        if stride is not None and stride < 1:
+            raise ValueError('`stride` must be positive.')
+        if as_pl:
+            as_df = False
+        as_df = as_df and not as_xarray_dataset
+        if max_buffered < 1:
+            raise ValueError('`max_buffered` must be positive.')
+
+        handle_station_ids, handle_modes = self._handle_query_targets(
+            station_id=station_id,
+            station_ids=station_ids,
+            mode=mode,
+            modes=modes,
+            use_opendap=as_xarray_dataset,
+        )
+        targets = [(m, sid) for m in handle_modes for sid in handle_station_ids]
+        pending = iter(targets)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+
+        async def stream_targets() -> None:
+            # workers share `pending`, so each target is handled once
+            for m, sid in pending:
+                try:
+                    station_data, sid = await self._async_handle_get_data(
+                        mode=m,
+                        station_id=sid,
+                        start_time=start_time,
+                        end_time=end_time,
+                        use_timestamp=use_timestamp,
+                        as_df=as_df,
+                        as_pl=as_pl,
+                        cols=cols,
+                        use_opendap=as_xarray_dataset,
+                        use_dap=use_dap,
+                        bbox=bbox,
+                        stride=stride,
+                    )
+                    data = await self._run_in_executor(
+                        handle_accumulate_data,
+                        {m: [station_data]},
+                        as_df=as_df,
+                        as_pl=as_pl,
+                        as_xarray_dataset=as_xarray_dataset,
+                    )
+                except (RequestException, ResponseException,
+                        HandlerException) as e:
+                    self.log(level=logging.WARN,
+                             station_id=sid,
+                             message=f"Failed to process request: {e}")
+                    continue
+                if isinstance(data, dict) and m in data:
+                    data = data[m][0]
+                # blocks while `max_buffered` results wait for the caller
+                await queue.put((sid, m, data))
+
+        async def close_queue(workers: List[asyncio.Task]) -> None:
+            try:
+                await asyncio.gather(*workers)
+            except Exception as e:
+                await queue.put(e)
+            else:
+                await queue.put(None)
+
+        workers = [
+            asyncio.create_task(stream_targets())
+            for _ in range(min(self._max_workers, len(targets)))
+        ]
+        closer = asyncio.create_task(close_queue(workers))
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            for task in (*workers, closer):
+                task.cancel()
+            await asyncio.gather(*workers, closer, return_exceptions=True)
+        self.log(logging.INFO, message="Finished streaming request.")
+
+    async def plan(
+        self,
+        station_id: Union[int, str, None] = None,
+        mode: Union[str, None] = None,
+        start_time: Union[str, datetime] = datetime.now() - timedelta(days=30),
+        end_time: Union[str, datetime] = datetime.now(),
+        as_df: bool = True,
+        as_pl: bool = False,
+        station_ids: Union[Sequence[Union[int, str]], None] = None,
+        modes: Union[List[str], None] = None,
+        use_opendap: bool = False,
+    ) -> Any:
+        """Plan a data query, without executing its requests.
+
+        Resolve the requests which ``get_data`` would execute for the
+        same arguments, one row per station, mode and request, with
+        where the response is ``cached`` (``'memory'`` or ``'disk'``, or
+        ``'missing'`` if it is known not to exist), its cache ``state``,
+        whether it would be fetched with HTTP ``range`` requests, and its
+        estimated ``size`` and download ``bytes``.  Uncached sizes are
+        estimated from ``config.PLAN_BYTES_PER_DAY``.
+
+        Args:
+            station_id: A single NDBC station ID.
+            station_ids: A list of NDBC station IDs.
+            mode: The measurement type (e.g. ``'stdmet'``, ``'cwind'``).
+            modes: A list of measurement types.
+            start_time: The start of the time range (UTC).
+            end_time: The end of the time range (UTC).
+            as_df: If ``True`` (default), return a
+                ``pandas.DataFrame``, otherwise a list of dicts.
+            as_pl: If ``True``, return a ``polars.DataFrame``.
+            use_opendap: If ``True``, plan the requests of an
+                ``xarray.Dataset`` query.
+
+        Returns:
+            The requests of the query, with the columns ``station_id``,
+            ``mode``, ``url``, ``family``, ``cached``, ``state``,
+            ``range``, ``size`` and ``bytes``.
+
+        Raises:
+            ValueError: Invalid station/mode argument combinations.
+            RequestException: The specified mode is not available, or
+                its requests could not be built.
+        """
+        handle_station_ids, handle_modes = self._handle_query_targets(
+            station_id=station_id,
+            station_ids=station_ids,
+            mode=mode,
+            modes=modes,
+            use_opendap=use_opendap,
+        )
+        start_time = handle_timestamp(start_time)
+        end_time = handle_timestamp(end_time)
+        dispatch = (self._OPENDAP_DISPATCH
+                    if use_opendap else self._HTTP_DISPATCH)
+        targets = []
+        for m in handle_modes:
+            for sid in handle_station_ids:
+                sid = parse_station_id(sid)
+                try:
+                    reqs = planned_requests(dispatch[m][0],
+                                            station_id=sid,
+                                            start_time=start_time,
+                                            end_time=end_time)
+                except Exception as e:
+                    raise RequestException('Failed to build request.') from e
+                targets.extend((sid, m, req) for req in reqs)
+        infos = await asyncio.gather(*[
+            self._handler.inspect(station_id=sid,
+                                  req=getattr(req, 'url', req),
+                                  since=start_time)
+            for sid, _, req in targets
+        ])
+        rows = [
+            plan_row(sid, m, req, info, since=start_time)
+            for (sid, m, req), info in zip(targets, infos)
+        ]
+        return handle_plan_data(rows, as_df=as_df, as_pl=as_pl)
+
     def get_modes(
         self,
         use_opendap: bool = False,
@@ -854,6 +1252,60 @@ class AsyncNdbcApi:
 
     # --- private async dispatch --------------------------------------------
 
+    def _handle_query_targets(
+        self,
+        station_id: Union[int, str, None],
+        station_ids: Union[Sequence[Union[int, str]], None],
+        mode: Union[str, None],
+        modes: Union[List[str], None],
+        use_opendap: bool,
+    ) -> Tuple[List[Union[int, str]], List[str]]:
+        """Validate the stations and modes of a data query.
+
+        Returns:
+            The station ids and modes to query, as lists.
+
+        Raises:
+            ValueError: Invalid station/mode argument combinations.
+            RequestException: The specified mode is not available.
+        """
+        if station_id is None and station_ids is None:
+            raise ValueError('Both `station_id` and `station_ids` are `None`.')
+        if station_id is not None and station_ids is not None:
+            raise ValueError(
+                '`station_id` and `station_ids` cannot both be specified.')
+        if modes is not None:
+            if not isinstance(modes, list):
+                raise ValueError('`modes` must be a list of strings.')
+            if any(not isinstance(m, str) for m in modes):
+                raise ValueError('All elements in `modes` must be strings.')
+            if any(m == 'hfradar' for m in modes):
+                raise ValueError(
+                    'HF radar data cannot be requested with `modes`. '
+                    'Please use `mode` to specify a single `hfradar` mode.')
+        if mode is None and modes is None:
+            raise ValueError('Both `mode` and `modes` are `None`.')
+        if mode is not None and modes is not None:
+            raise ValueError(
+                '`mode` and `modes` cannot both be specified.')
+
+        handle_station_ids: List[Union[int, str]] = []
+        handle_modes: List[str] = []
+
+        if station_id is not None:
+            handle_station_ids.append(station_id)
+        if station_ids is not None:
+            handle_station_ids.extend(station_ids)
+        if mode is not None:
+            handle_modes.append(mode)
+        if modes is not None:
+            handle_modes.extend(modes)
+
+        for m in handle_modes:
+            if m not in self.get_modes(use_opendap=use_opendap):
+                raise RequestException(f"Mode {m} is not available.")
+        return handle_station_ids, handle_modes
+
     async def _async_handle_get_data(
         self,
         mode: str,
@@ -865,11 +1317,18 @@ class AsyncNdbcApi:
         as_pl: bool = False,
         cols: List[str] = None,
         use_opendap: bool = False,
+        use_dap: bool = False,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
     ) -> Tuple[Any, str]:
         """Async version of :meth:`NdbcApi._handle_get_data`.
 
         Directly composes request builders -> async handler -> parsers,
-        bypassing the synchronous handler classmethods.
+        bypassing the synchronous handler classmethods.  Only the requests
+        run on the event loop; the responses are parsed in the executor.
+        With *use_dap*, each stage of the ``DapSubset`` is one batch of
+        concurrent requests.  Parsers with a ``time_cube``, such as that of
+        HF radar, decode each response into the cube as it is received.
         """
         start_time = handle_timestamp(start_time)
         end_time = handle_timestamp(end_time)
@@ -883,50 +1342,87 @@ class AsyncNdbcApi:
                 'Please supply a supported mode from `get_modes()`.')
         RequestBuilder, Parser = entry
 
+        use_dap = use_opendap and use_dap
         # 1. Build request URLs (sync — pure CPU)
         try:
-            reqs = RequestBuilder.build_request(station_id=station_id,
-                                                start_time=start_time,
-                                                end_time=end_time)
+            if use_dap:
+                reqs = RequestBuilder.build_dap_request(station_id=station_id,
+                                                        start_time=start_time,
+                                                        end_time=end_time)
+            else:
+                reqs = RequestBuilder.build_request(station_id=station_id,
+                                                    start_time=start_time,
+                                                    end_time=end_time)
         except Exception as e:  # pragma: no cover
             raise RequestException('Failed to build request.') from e
 
         # 2. Execute requests (async — I/O)
         try:
-            resps = await self._handler.handle_requests(
-                station_id=station_id, reqs=reqs)
+            if use_dap:
+                resps = DapSubset(reqs,
+                                  variables=cols,
+                                  start_time=start_time,
+                                  end_time=end_time,
+                                  bbox=bbox,
+                                  stride=stride)
+                while not resps.done:
+                    resps.feed(await self._handler.handle_requests(
+                        station_id=station_id, reqs=resps.requests()))
+            elif use_opendap and hasattr(Parser, 'time_cube'):
+                resps = Parser.time_cube(slots=len(reqs))
+                await self._handler.stream_requests(
+                    station_id=station_id,
+                    reqs=reqs,
+                    callback=functools.partial(Parser.add_response,
+                                               resps,
+                                               bbox=bbox,
+                                               stride=stride))
+            elif use_opendap and self._dataset_store is not None:
+                pending = self._dataset_store.pending(reqs)
+                resps = await self._handler.handle_requests(
+                    station_id=station_id, reqs=pending, since=start_time)
+                resps = await asyncio.to_thread(
+                    self._dataset_store.datasets, reqs,
+                    dict(zip(pending, resps)))
+            else:
+                resps = await self._handler.handle_requests(
+                    station_id=station_id, reqs=reqs, since=start_time)
+        except ParserException as e:
+            raise ResponseException('Failed to parse response.') from e
         except Exception as e:
             raise ResponseException('Failed to execute requests.') from e
 
-        # 3. Parse responses (sync — CPU)
-        try:
-            if use_opendap:
-                data = Parser.nc_from_responses(responses=resps,
-                                                use_timestamp=use_timestamp)
-            else:
-                data = Parser.parse_responses(responses=resps,
-                                              use_timestamp=use_timestamp)
-        except Exception as e:  # pragma: no cover
-            raise ResponseException(
-                f'Failed to parse responses.\nRaised from {e}') from e
+        # 3. Parse, filter and attribute responses (executor — CPU)
+        handled_data = await self._run_in_executor(
+            parse_station_data,
+            Parser,
+            resps,
+            station_id,
+            start_time,
+            end_time,
+            use_timestamp=use_timestamp,
+            cols=cols,
+            use_opendap=use_opendap,
+            load=isinstance(self._get_executor(), ProcessPoolExecutor),
+            bbox=bbox,
+            stride=stride,
+        )
+        return (handled_data, station_id)
 
-        # 4. Post-process: time range enforcement and column selection
-        if use_timestamp:
-            if use_opendap:
-                data = filter_dataset_by_time_range(data, start_time, end_time)
-            else:
-                data = enforce_timerange(df=data,
-                                         start_time=start_time,
-                                         end_time=end_time)
-        try:
-            if use_opendap:
-                handled_data = (filter_dataset_by_variable(data, cols)
-                                if cols else data)
+    def _get_executor(self) -> Executor:
+        """Get the parse executor, creating it on first use."""
+        if self._executor is None:
+            if self._executor_type == 'process':
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers)
             else:
-                # Keep it as raw list of dicts during accumulation to make merging easy!
-                handled_data = handle_data(data, as_df=False, as_pl=False, cols=cols)
-        except (ValueError, KeyError, AttributeError) as e:  # pragma: no cover
-            raise ParserException(
-                f'Failed to handle returned data.\nRaised from {e}') from e
-
-        return (handled_data, station_id)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix='ndbc-api-parse')
+        return self._executor
+
+    async def _run_in_executor(self, fn, *args, **kwargs) -> Any:
+        """Run a CPU-bound stage in the executor, leaving the loop to I/O."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), functools.partial(fn, *args, **kwargs))
@@ -10,10 +10,59 @@ Attributes:
         service.
     HTTP_BACKOFF_FACTOR (:float:): The backoff factor used when executing retry
         requests to the NDBC data service.
-    HTTP_DELAY (:int:) The delay between requests submitted to the NDBC data
-        service, in milliseconds.
+    HTTP_DELAY (:int:) The delay between requests submitted to hosts other
+        than those in `HTTP_RATE_LIMITS`, in milliseconds.
+    HTTP_RATE_LIMITS (:dict:): The `(requests per second, burst)` rate limit
+        of requests to each NDBC host, independent of the number of
+        concurrent connections, unless a `delay` is given explicitly.
+    HTTP_POOL_SIZE (:int:): The size of the HTTP connection pool, and the
+        maximum number of requests executed at once by `get_data`.
+    MAX_WORKERS (:int:): The maximum number of station and mode tasks run at
+        once by `get_data`, across all of its calls.
+    PARSE_EXECUTOR (:str:): Where `AsyncNdbcApi` parses responses, off the
+        event loop, either `'thread'` (a thread pool) or `'process'` (a
+        process pool, for GIL-bound parsing).
     HTTP_DEBUG (:bool:): Whether to log requests and responses to the NDBC API's
         log (a `logging.Logger`) as debug messages.
+    PARSER_ENGINE (:str:): The default engine used to parse text responses
+        from the NDBC data service, either `'numpy'` (vectorized) or
+        `'python'` (row by row).
+    HISTORICAL_TRANSPORT (:str:): How historical text files are requested
+        from the NDBC data service, either `'text'` (decompressed by the
+        service) or `'gzip'` (the `.txt.gz` archives, decompressed while
+        streaming the response).
+    DISK_CACHE_PATH (:str:): The filepath of the sqlite database used to
+        persist responses across processes and runs, `None` to keep
+        responses in memory only.
+    DISK_CACHE_LIMIT (:int:): The size limit of the persistent response
+        cache, in bytes, beyond which the least recently used responses are
+        evicted.
+    DISK_CACHE_COMPRESSION (:int:): The zlib compression level of response
+        bodies in the persistent cache, `0` to store them uncompressed.
+    DATASET_STORE_PATH (:str:): The directory in which the netCDF files of
+        `use_opendap` queries are kept by station, mode and year, and from
+        which they are reopened lazily, `None` to keep no files.
+    CACHE_BYTES_LIMIT (:int:): The limit on the total size of the responses
+        cached in memory across all stations, in bytes, beyond which
+        responses are evicted by size and recency.
+    CACHE_TTL (:dict:): The number of seconds for which cached responses are
+        fresh, for each of the `'immutable'` (yearly archives), `'monthly'`
+        and `'realtime'` data classes; `None` if they never become stale.
+    CACHE_STALE_WHILE_REVALIDATE (:dict:): The number of seconds after their
+        TTL for which stale responses of each data class are served while
+        they are refreshed in the background, before they must be fetched
+        again.
+    CACHE_NEGATIVE_TTL (:dict:): The number of seconds for which a request
+        of each data class which was not found (`404`) is known to be
+        missing, and is not requested again; `None` if it never is.
+    TAIL_FETCH_WINDOW (:int:): The longest query, in seconds before now, for
+        which only the leading bytes of realtime files are requested with an
+        HTTP `Range` header, `None` to always request the whole file.
+    TAIL_FETCH_BYTES (:int:): The size of the first range requested from
+        realtime files, doubled until it covers the query.
+    PLAN_BYTES_PER_DAY (:dict:): A rough prior of the number of bytes per day
+        of observations in the files of each mode, used by `plan` to
+        estimate the size of responses which are not cached.
 """
 LOGGER_NAME = 'NDBC-API'
 DEFAULT_CACHE_LIMIT = 36
@@ -21,4 +70,47 @@ VERIFY_HTTPS = True
 HTTP_RETRY = 5
 HTTP_BACKOFF_FACTOR = 0.8
 HTTP_DELAY = 2000
+HTTP_RATE_LIMITS = {
+    'www.ndbc.noaa.gov': (10.0, 20),
+    'dods.ndbc.noaa.gov': (10.0, 20),
+}
+HTTP_POOL_SIZE = 10
+MAX_WORKERS = 16
+PARSE_EXECUTOR = 'thread'
 HTTP_DEBUG = False
+PARSER_ENGINE = 'numpy'
+HISTORICAL_TRANSPORT = 'text'
+DISK_CACHE_PATH = None
+DISK_CACHE_LIMIT = 2 * 1024**3
+DISK_CACHE_COMPRESSION = 6
+DATASET_STORE_PATH = None
+CACHE_BYTES_LIMIT = 512 * 1024**2
+CACHE_TTL = {'immutable': None, 'monthly': 24 * 60 * 60, 'realtime': 10 * 60}
+CACHE_STALE_WHILE_REVALIDATE = {
+    'immutable': None,
+    'monthly': 7 * 24 * 60 * 60,
+    'realtime': 60 * 60,
+}
+CACHE_NEGATIVE_TTL = {
+    'immutable': 30 * 24 * 60 * 60,
+    'monthly': 24 * 60 * 60,
+    'realtime': 10 * 60,
+}
+TAIL_FETCH_WINDOW = 24 * 60 * 60
+TAIL_FETCH_BYTES = 4 * 1024
+PLAN_BYTES_PER_DAY = {
+    'adcp': 24 * 1024,
+    'cwind': 8 * 1024,
+    'ocean': 4 * 1024,
+    'pwind': 2 * 1024,
+    'spec': 3 * 1024,
+    'stdmet': 8 * 1024,
+    'supl': 4 * 1024,
+    'swden': 12 * 1024,
+    'swdir': 10 * 1024,
+    'swdir2': 10 * 1024,
+    'swr1': 8 * 1024,
+    'swr2': 8 * 1024,
+    'wlevel': 2 * 1024,
+    'hfradar': 48 * 1024**2,
+}
@@ -28,7 +28,7 @@ Attributes:
 import logging
 import pickle
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 from datetime import datetime, timedelta
 from typing import Any, List, Sequence, Tuple, Union, Dict, Optional, TYPE_CHECKING
 
@@ -47,11 +47,20 @@ except ImportError:
 
 from .api.handlers.http.data import DataHandler
 from .api.handlers.http.stations import StationsHandler
-from .config import (DEFAULT_CACHE_LIMIT, HTTP_BACKOFF_FACTOR, HTTP_DEBUG,
-                     HTTP_DELAY, HTTP_RETRY, LOGGER_NAME, VERIFY_HTTPS)
+from .config import (CACHE_BYTES_LIMIT, DATASET_STORE_PATH,
+                     DEFAULT_CACHE_LIMIT, DISK_CACHE_COMPRESSION,
+                     DISK_CACHE_LIMIT, DISK_CACHE_PATH, HTTP_BACKOFF_FACTOR,
+                     HTTP_DEBUG, HTTP_DELAY, HTTP_POOL_SIZE, HTTP_RETRY,
+                     LOGGER_NAME, MAX_WORKERS, VERIFY_HTTPS)
 from .exceptions import (HandlerException, ParserException, RequestException,
                          ResponseException)
+from .utilities.cache_policy import CachePolicy
+from .utilities.columnar import ColumnarData
+from .utilities.disk_cache import DiskCache
+from .utilities.opendap.store import DatasetStore
+from .utilities.rate_limiter import RateLimiter
 from .utilities.req_handler import RequestHandler
+from .utilities.scheduler import Scheduler
 from .utilities.singleton import Singleton
 from .utilities.log_formatter import LogFormatter
 from .utilities.data_helpers import (
@@ -61,12 +70,20 @@ from .utilities.data_helpers import (
     handle_data as _handle_data_impl,
     handle_accumulate_data as _handle_accumulate_data_impl,
 )
+from .utilities.query_plan import (planned_requests, plan_row,
+                                   handle_plan_data as _handle_plan_data_impl)
 from .api.handlers.opendap.data import OpenDapDataHandler
-from .utilities.opendap.dataset import filter_dataset_by_variable, filter_dataset_by_time_range
+from .utilities.opendap.dataset import (filter_dataset_by_variable,
+                                        filter_dataset_by_time_range)
 from .api.requests.http.active_stations import ActiveStationsRequest
 from .api.requests.http.historical_stations import HistoricalStationsRequest
+from .api.requests.http.latest_observations import LatestObservationsRequest
 from .api.parsers.http.active_stations import ActiveStationsParser
 from .api.parsers.http.historical_stations import HistoricalStationsParser
+from .api.parsers.http.latest_observations import (
+    LatestObservationsParser,
+    handle_latest_data as _handle_latest_data_impl,
+)
 
 
 class NdbcApi(metaclass=Singleton):
@@ -84,7 +101,10 @@ class NdbcApi(metaclass=Singleton):
             `NdbcApi` responses. This is implemented as a least-recently
             used cache, designed to conserve NDBC resources when querying
             measurements for a given station over similar time ranges.
-        delay: The HTTP(s) request delay parameter, in seconds.
+        delay: The HTTP(s) request delay parameter, in milliseconds, applied
+            to each host without a rate limit in `rate_limits`. If `None`,
+            the NDBC hosts use `config.HTTP_RATE_LIMITS` and other hosts
+            `config.HTTP_DELAY`.
         retries: = The number of times to retry a request to the NDBC data
             service.
         backoff_factor: The back-off parameter, used in conjunction with
@@ -94,6 +114,34 @@ class NdbcApi(metaclass=Singleton):
         debug: A flag for verbose logging and response-level status reporting.
             Affects the instance's `logging.Logger` and the behavior of its
             private `RequestHandler` instance.
+        cache_path: The filepath of a sqlite database in which to persist
+            successful responses, shared across processes and runs. If
+            `None`, responses are only cached in memory.
+        disk_cache_limit: The size limit of the persistent cache, in bytes.
+        dataset_store_path: The directory in which the netCDF files of
+            `use_opendap` queries are kept by station, mode and year, and
+            reopened lazily, such that stored yearly files are not requested
+            again and new realtime records are appended to the stored files.
+            If `None`, the files are opened from their responses.
+        cache_bytes_limit: The limit on the total size of the responses
+            cached in memory across all stations, in bytes, or `None` to
+            limit only the number of responses cached for each station.
+        max_workers: The maximum number of station and mode tasks which
+            `get_data` runs at once, shared by all of its calls.
+        max_connections: The size of the HTTP connection pool, and the
+            maximum number of requests executed at once.
+        rate_limits: The `(requests per second, burst)` rate limit of
+            requests to a host, overriding `delay` for that host, defaulting
+            to `config.HTTP_RATE_LIMITS`.
+        cache_ttl: The number of seconds for which cached responses are
+            fresh, by data class (`'immutable'`, `'monthly'` or
+            `'realtime'`), overriding the defaults in `config.CACHE_TTL`.
+        stale_while_revalidate: The number of seconds after their TTL for
+            which stale responses are served while they are refreshed, by
+            data class, overriding `config.CACHE_STALE_WHILE_REVALIDATE`.
+        negative_ttl: The number of seconds for which requests which were
+            not found are not requested again, by data class, overriding
+            `config.CACHE_NEGATIVE_TTL`.
     """
 
     logger = logging.getLogger(LOGGER_NAME)
@@ -104,15 +152,39 @@ class NdbcApi(metaclass=Singleton):
         filename: Any = None,
         cache_limit: int = DEFAULT_CACHE_LIMIT,
         headers: Optional[dict] = None,
-        delay: int = HTTP_DELAY,
+        delay: Optional[int] = None,
         retries: int = HTTP_RETRY,
         backoff_factor: float = HTTP_BACKOFF_FACTOR,
         verify_https: bool = VERIFY_HTTPS,
         debug: bool = HTTP_DEBUG,
+        cache_path: Optional[str] = DISK_CACHE_PATH,
+        disk_cache_limit: int = DISK_CACHE_LIMIT,
+        cache_bytes_limit: Optional[int] = CACHE_BYTES_LIMIT,
+        max_workers: int = MAX_WORKERS,
+        max_connections: int = HTTP_POOL_SIZE,
+        rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        cache_ttl: Optional[Dict[str, Optional[float]]] = None,
+        stale_while_revalidate: Optional[Dict[str, Optional[float]]] = None,
+        negative_ttl: Optional[Dict[str, Optional[float]]] = None,
+        dataset_store_path: Optional[str] = DATASET_STORE_PATH,
     ):
         """Initializes the singleton `NdbcApi`, sets associated handlers."""
         self.cache_limit = cache_limit
         self.headers = headers or {}
+        self._disk_cache = (DiskCache(path=cache_path,
+                                      limit=disk_cache_limit,
+                                      compression=DISK_CACHE_COMPRESSION)
+                            if cache_path else None)
+        self._dataset_store = (DatasetStore(path=dataset_store_path)
+                               if dataset_store_path else None)
+        self._cache_bytes_limit = cache_bytes_limit
+        self._rate_limiter = RateLimiter.from_delay(delay, limits=rate_limits)
+        self._scheduler = Scheduler(max_workers=max_workers,
+                                    max_connections=max_connections)
+        self._cache_policy = CachePolicy(
+            ttl=cache_ttl,
+            stale_while_revalidate=stale_while_revalidate,
+            negative_ttl=negative_ttl)
         self._handler = self._get_request_handler(
             cache_limit=self.cache_limit,
             delay=delay,
@@ -143,24 +215,37 @@ class NdbcApi(metaclass=Singleton):
             The cached request, response pairs as a `dict`, or `None` if a
             `dest_fp` is specified when calling the method.
         """
-        data = dict()
-        ids = [r.id_ for r in self._handler.stations]
-        caches = [r.reqs.cache for r in self._handler.stations]
-        if ids:
-            for station_id, cache in zip(ids, caches):
-                data[station_id] = dict()
-                reqs = cache.keys()
-                for req in reqs:
-                    resp = cache[req].v
-                    data[station_id][req] = resp
+        data = self._handler.dump_responses()
         if dest_fp:
             with open(dest_fp, 'wb') as f:
                 pickle.dump(data, f)
         else:
             return data
 
+    def load_cache(self, src: Union[str, dict]) -> None:
+        """Load request, response pairs dumped by `dump_cache`.
+
+        The responses are added to the `NdbcApi`'s request cache, and to its
+        persistent cache if a `cache_path` was configured. Pickled dumps
+        should only be loaded from trusted sources.
+
+        Args:
+            src: The `dict` returned by `dump_cache`, or the filepath to
+                which a dump was written.
+        """
+        if isinstance(src, dict):
+            data = src
+        else:
+            with open(src, 'rb') as f:
+                data = pickle.load(f)
+        self._handler.load_responses(data)
+
     def clear_cache(self) -> None:
-        """Clear the request cache and create a new handler."""
+        """Clear the request cache and create a new handler.
+
+        Responses in the persistent cache are kept, as they may be shared
+        with other processes.
+        """
         del self._handler
         self._handler = self._get_request_handler(
             cache_limit=self.cache_limit,
@@ -180,6 +265,17 @@ class NdbcApi(metaclass=Singleton):
         """Get the cache limit for the API's request cache."""
         return self._handler.get_cache_limit()
 
+    def cache_stats(self) -> Optional[dict]:
+        """Get the occupancy of the API's in-memory request cache.
+
+        Returns:
+            A `dict` of the byte `limit` and current `size` of the cache, the
+            number of cached `entries` and `stations`, the `hits` and
+            `evictions` so far, and the bytes used by each station, or `None`
+            if the cache has no `cache_bytes_limit`.
+        """
+        return self._handler.cache_stats()
+
     def get_headers(self) -> dict:
         """Return the current headers used by the request handler."""
         return self._handler.get_headers()
@@ -307,6 +403,54 @@ class NdbcApi(metaclass=Singleton):
         except (ResponseException, ValueError, KeyError) as e:
             raise ResponseException('Failed to handle returned data.') from e
 
+    def latest_observations(self,
+                            station_ids: Optional[Sequence[Union[int,
+                                                                 str]]] = None,
+                            as_df: bool = True,
+                            as_pl: bool = False,
+                            cols: List[str] = None) -> Any:
+        """Get the latest observation of every station from the NDBC.
+
+        Query the NDBC data service for its combined file of the latest
+        standard meteorological observation of each station, in a single
+        request, rather than one realtime request per station. Observations
+        are returned with one row per station, indexed by `station_id` so
+        that they join with the `Station` column of `stations()`.
+
+        Args:
+            station_ids: The stations for which to return observations, or
+                `None` for every station reporting to the NDBC.
+            as_df: Flag indicating whether to return the observations as a
+                `pandas.DataFrame` if set to `True` or as a `dict` of
+                observations by station id if `False`.
+            as_pl: Flag indicating whether to return the observations as a
+                `polars.DataFrame` if set to `True`.
+            cols: A list of columns of interest which are selected from the
+                available data columns, such as `['WSPD', 'ATMP']`.
+
+        Returns:
+            The latest observations, either as a `pandas.DataFrame`,
+            `polars.DataFrame`, or as a `dict`.
+
+        Raises:
+            ResponseException: An error occurred while retrieving and parsing
+                responses from the NDBC data service.
+            ParserException: The requested columns are not available.
+        """
+        if as_pl:
+            as_df = False
+        keep = (None if station_ids is None else
+                [self._parse_station_id(s) for s in station_ids])
+        try:
+            req = LatestObservationsRequest.build_request()
+            resp = self._handler.handle_request('latest_obs', req)
+            data = LatestObservationsParser.parse_response(resp,
+                                                           station_ids=keep)
+        except (ResponseException, ParserException, ValueError,
+                KeyError) as e:
+            raise ResponseException('Failed to handle returned data.') from e
+        return _handle_latest_data_impl(data, as_df=as_df, as_pl=as_pl, cols=cols)
+
     def nearest_station(
         self,
         lat: Union[str, float, None] = None,
@@ -556,6 +700,9 @@ class NdbcApi(metaclass=Singleton):
         modes: Union[List[str], None] = None,
         as_xarray_dataset: bool = False,
         use_opendap: Optional[bool] = None,
+        use_dap: bool = False,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
     ) -> Any:
         """Execute data query against the specified NDBC station(s).
 
@@ -598,6 +745,17 @@ class NdbcApi(metaclass=Singleton):
                 available data columns, such that only the desired columns are
                 returned. All columns are returned if `None` is specified.
             use_opendap: An alias for `as_xarray_dataset`.
+            use_dap: Whether to subset the `xarray.Dataset` on the THREDDS
+                server, through DAP, such that only the `cols` within the
+                time range and `bbox` are downloaded, rather than whole
+                files. Implies `as_xarray_dataset`.
+            bbox: The `(min_lon, min_lat, max_lon, max_lat)` bounds of an
+                `xarray.Dataset` query, applied to its latitude and longitude
+                dimensions as each file is decoded, or on the server with
+                `use_dap`, such that cells outside of it are never read.
+            stride: Decimate the grid of an `xarray.Dataset` query, such as
+                that of `'hfradar'`, to every `stride`-th latitude and
+                longitude, within the `bbox` if any. Applied as the `bbox`.
 
         Returns:
             The available station(s) measurements for the specified modes, time
@@ -607,7 +765,10 @@ class NdbcApi(metaclass=Singleton):
         Raises:
             ValueError: Both `station_id` and `station_ids` are `None`, or both
                 are not `None`. This is also raised if `mode` and `modes` are
-                `None`, or both are not `None`
+                `None`, or both are not `None`, if `bbox` or `stride` is given
+                for a query that is not an `xarray.Dataset` query, if `stride`
+                is less than 1, or if `use_dap` is given with `use_opendap`
+                set to `False`.
             RequestException: The specified mode is not available.
             ResponseException: There was an error in executing and parsing the
                 required requests against the NDBC data service.
@@ -616,6 +777,14 @@ class NdbcApi(metaclass=Singleton):
         """
         if use_opendap is not None:
             as_xarray_dataset = use_opendap
+        if use_dap and use_opendap is False:
+            raise ValueError('`use_dap` cannot be used without `use_opendap`.')
+        as_xarray_dataset = as_xarray_dataset or use_dap
+        if not as_xarray_dataset and (bbox is not None or stride is not None):
+            raise ValueError(
+                '`bbox` and `stride` require an `xarray.Dataset` query.')
+        if stride is not None and stride < 1:
+            raise ValueError('`stride` must be positive.')
 
         if as_pl:
             as_df = False
@@ -624,40 +793,13 @@ class NdbcApi(metaclass=Singleton):
         self.log(logging.DEBUG,
                  message=f"`get_data` called with arguments: {locals()}")
 
-        if station_id is None and station_ids is None:
-            raise ValueError('Both `station_id` and `station_ids` are `None`.')
-        if station_id is not None and station_ids is not None:
-            raise ValueError('`station_id` and `station_ids` cannot both be '
-                             'specified.')
-        if modes is not None:
-            if not isinstance(modes, list):
-                raise ValueError('`modes` must be a list of strings.')
-            if any(not isinstance(m, str) for m in modes):
-                raise ValueError('All elements in `modes` must be strings.')
-            if any(m == 'hfradar' for m in modes):
-                raise ValueError(
-                    'HF radar data cannot be requested with `modes`. '
-                    'Please use `mode` to specify a single `hfradar` mode.')
-        if mode is None and modes is None:
-            raise ValueError('Both `mode` and `modes` are `None`.')
-        if mode is not None and modes is not None:
-            raise ValueError('`mode` and `modes` cannot both be specified.')
-
-        handle_station_ids: List[Union[int, str]] = []
-        handle_modes: List[str] = []
-
-        if station_id is not None:
-            handle_station_ids.append(station_id)
-        if station_ids is not None:
-            handle_station_ids.extend(station_ids)
-        if mode is not None:
-            handle_modes.append(mode)
-        if modes is not None:
-            handle_modes.extend(modes)
-
-        for mode in handle_modes:
-            if mode not in self.get_modes(use_opendap=as_xarray_dataset):
-                raise RequestException(f"Mode {mode} is not available.")
+        handle_station_ids, handle_modes = self._handle_query_targets(
+            station_id=station_id,
+            station_ids=station_ids,
+            mode=mode,
+            modes=modes,
+            use_opendap=as_xarray_dataset,
+        )
 
         self.log(logging.INFO,
                  message=(f"Processing request for station_ids "
@@ -667,48 +809,54 @@ class NdbcApi(metaclass=Singleton):
         # accumulated_data records the handled response and parsed station_id
         # as a tuple, with the data as the first value and the id as the second.
         accumulated_data: Dict[str, List[Any]] = {}
+        # every (station, mode) task shares the bounded scheduler, so that
+        # the modes are processed concurrently rather than one after another
+        station_futures = {}
         for mode in handle_modes:
             accumulated_data[mode] = []
-
-            with ThreadPoolExecutor(
-                    max_workers=len(handle_station_ids)) as station_executor:
-                station_futures = {}
-                for station_id in handle_station_ids:
-                    station_futures[station_id] = station_executor.submit(
-                        self._handle_get_data,
-                        mode=mode,
-                        station_id=station_id,
-                        start_time=start_time,
-                        end_time=end_time,
-                        use_timestamp=use_timestamp,
-                        as_df=as_df,
-                        as_pl=as_pl,
-                        cols=cols,
-                        use_opendap=as_xarray_dataset,
-                    )
-
-                for future in as_completed(station_futures.values()):
-                    try:
-                        station_data, station_id = future.result()
-                        self.log(
-                            level=logging.DEBUG,
-                            station_id=station_id,
-                            message=
-                            f"Successfully processed request for station_id {station_id}"
-                        )
-                        if not as_xarray_dataset:
-                            # station_data is a list of dicts
-                            for row in station_data:
-                                row['station_id'] = station_id
-                        accumulated_data[mode].append(station_data)
-                    except (RequestException, ResponseException,
-                            HandlerException) as e:  # pragma: no cover
-                        self.log(
-                            level=logging.WARN,
-                            station_id=station_id,
-                            message=(
-                                f"Failed to process request for station_id "
-                                f"{station_id} with error: {e}"))
+            for station_id in handle_station_ids:
+                future = self._scheduler.submit(
+                    self._handle_get_data,
+                    mode=mode,
+                    station_id=station_id,
+                    start_time=start_time,
+                    end_time=end_time,
+                    use_timestamp=use_timestamp,
+                    as_df=as_df,
+                    as_pl=as_pl,
+                    cols=cols,
+                    use_opendap=as_xarray_dataset,
+                    use_dap=use_dap,
+                    bbox=bbox,
+                    stride=stride,
+                )
+                station_futures[future] = (mode, station_id)
+
+        for future in as_completed(station_futures):
+            mode, station_id = station_futures[future]
+            try:
+                station_data, station_id = future.result()
+                self.log(
+                    level=logging.DEBUG,
+                    station_id=station_id,
+                    message=
+                    f"Successfully processed request for station_id {station_id}"
+                )
+                if isinstance(station_data, ColumnarData):
+                    station_data = station_data.with_station(station_id)
+                elif not as_xarray_dataset:
+                    # station_data is a list of dicts
+                    for row in station_data:
+                        row['station_id'] = station_id
+                accumulated_data[mode].append(station_data)
+            except (RequestException, ResponseException,
+                    HandlerException) as e:  # pragma: no cover
+                self.log(
+                    level=logging.WARN,
+                    station_id=station_id,
+                    message=(
+                        f"Failed to process request for station_id "
+                        f"{station_id} with error: {e}"))
         self.log(logging.INFO, message="Finished processing request.")
         return self._handle_accumulate_data(
             accumulated_data,
@@ -717,6 +865,88 @@ class NdbcApi(metaclass=Singleton):
             as_xarray_dataset=as_xarray_dataset,
         )
 
+    def plan(
+        self,
+        station_id: Union[int, str, None] = None,
+        mode: Union[str, None] = None,
+        start_time: Union[str, datetime] = datetime.now() - timedelta(days=30),
+        end_time: Union[str, datetime] = datetime.now(),
+        as_df: bool = True,
+        as_pl: bool = False,
+        station_ids: Union[Sequence[Union[int, str]], None] = None,
+        modes: Union[List[str], None] = None,
+        use_opendap: bool = False,
+    ) -> Any:
+        """Plan a data query, without executing its requests.
+
+        Resolve the requests which `get_data` would execute for the same
+        arguments, with one row per station, mode and request. Each row
+        describes whether the response is already cached, in `'memory'` or
+        on `'disk'`, or known to be `'missing'`, the `state` of the cached
+        response (`'fresh'`, `'stale'` or `'expired'`), and whether the
+        request would be made with HTTP `range` requests. The `size` of each
+        response is that of the cached response, or estimated from
+        `config.PLAN_BYTES_PER_DAY`, and `bytes` is the estimated download,
+        `0` for fresh and missing responses.
+
+        Args:
+            station_id: The NDBC station ID (e.g. `'tplm2'` or `41001`) for the
+                station of interest.
+            station_ids: A list of NDBC station IDs for the stations of
+                interest.
+            mode: The data measurement type to plan for the station.
+            modes: A list of data measurement types to plan for the stations.
+            start_time: The first timestamp of interest (in UTC) for the data
+                query, defaulting to 30 days before the current system time.
+            end_time: The last timestamp of interest (in UTC) for the data
+                query, defaulting to the current system time.
+            as_df: Whether to return the plan as a `pandas.DataFrame`,
+                defaults to `True`, if `False` a list of `dict` is returned.
+            as_pl: Whether to return the plan as a `polars.DataFrame`,
+                defaults to `False`.
+            use_opendap: Whether to plan the requests of an `xarray.Dataset`
+                query, as for `get_data(..., use_opendap=True)`.
+
+        Returns:
+            The requests of the query, with the columns `station_id`, `mode`,
+            `url`, `family`, `cached`, `state`, `range`, `size` and `bytes`.
+
+        Raises:
+            ValueError: Invalid station/mode argument combinations.
+            RequestException: The specified mode is not available, or its
+                requests could not be built.
+        """
+        handle_station_ids, handle_modes = self._handle_query_targets(
+            station_id=station_id,
+            station_ids=station_ids,
+            mode=mode,
+            modes=modes,
+            use_opendap=use_opendap,
+        )
+        start_time = self._handle_timestamp(start_time)
+        end_time = self._handle_timestamp(end_time)
+        data_api = self._opendap_data_api if use_opendap else self._data_api
+        rows = []
+        for mode in handle_modes:
+            for station_id in handle_station_ids:
+                station_id = self._parse_station_id(station_id)
+                try:
+                    reqs = planned_requests(data_api._REQUESTS[mode],
+                                            station_id=station_id,
+                                            start_time=start_time,
+                                            end_time=end_time)
+                except Exception as e:
+                    raise RequestException('Failed to build request.') from e
+                for req in reqs:
+                    info = self._handler.inspect(
+                        station_id=station_id,
+                        req=getattr(req, 'url', req),
+                        since=start_time)
+                    rows.append(
+                        plan_row(station_id, mode, req, info,
+                                 since=start_time))
+        return _handle_plan_data_impl(rows, as_df=as_df, as_pl=as_pl)
+
     def get_modes(self,
                   use_opendap: bool = False,
                   as_xarray_dataset: Optional[bool] = None) -> List[str]:
@@ -768,6 +998,59 @@ class NdbcApi(metaclass=Singleton):
 
     """ PRIVATE """
 
+    def _handle_query_targets(
+        self,
+        station_id: Union[int, str, None],
+        station_ids: Union[Sequence[Union[int, str]], None],
+        mode: Union[str, None],
+        modes: Union[List[str], None],
+        use_opendap: bool,
+    ) -> Tuple[List[Union[int, str]], List[str]]:
+        """Validate the stations and modes of a data query.
+
+        Returns:
+            The station ids and modes to query, as lists.
+
+        Raises:
+            ValueError: Invalid station/mode argument combinations.
+            RequestException: The specified mode is not available.
+        """
+        if station_id is None and station_ids is None:
+            raise ValueError('Both `station_id` and `station_ids` are `None`.')
+        if station_id is not None and station_ids is not None:
+            raise ValueError('`station_id` and `station_ids` cannot both be '
+                             'specified.')
+        if modes is not None:
+            if not isinstance(modes, list):
+                raise ValueError('`modes` must be a list of strings.')
+            if any(not isinstance(m, str) for m in modes):
+                raise ValueError('All elements in `modes` must be strings.')
+            if any(m == 'hfradar' for m in modes):
+                raise ValueError(
+                    'HF radar data cannot be requested with `modes`. '
+                    'Please use `mode` to specify a single `hfradar` mode.')
+        if mode is None and modes is None:
+            raise ValueError('Both `mode` and `modes` are `None`.')
+        if mode is not None and modes is not None:
+            raise ValueError('`mode` and `modes` cannot both be specified.')
+
+        handle_station_ids: List[Union[int, str]] = []
+        handle_modes: List[str] = []
+
+        if station_id is not None:
+            handle_station_ids.append(station_id)
+        if station_ids is not None:
+            handle_station_ids.extend(station_ids)
+        if mode is not None:
+            handle_modes.append(mode)
+        if modes is not None:
+            handle_modes.extend(modes)
+
+        for mode in handle_modes:
+            if mode not in self.get_modes(use_opendap=use_opendap):
+                raise RequestException(f"Mode {mode} is not available.")
+        return handle_station_ids, handle_modes
+
     def _get_request_handler(
         self,
         cache_limit: int,
@@ -788,6 +1071,13 @@ class NdbcApi(metaclass=Singleton):
             headers=headers,
             debug=debug,
             verify_https=verify_https,
+            disk_cache=self._disk_cache,
+            cache_policy=self._cache_policy,
+            cache_bytes_limit=self._cache_bytes_limit,
+            max_connections=self._scheduler.max_connections,
+            scheduler=self._scheduler,
+            rate_limiter=self._rate_limiter,
+            dataset_store=self._dataset_store,
         )
 
     @staticmethod
@@ -843,11 +1133,17 @@ class NdbcApi(metaclass=Singleton):
         as_pl: bool = False,
         cols: List[str] = None,
         use_opendap: bool = False,
+        use_dap: bool = False,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        stride: Optional[int] = None,
     ) -> Tuple[Any, str]:
         start_time = self._handle_timestamp(start_time)
         end_time = self._handle_timestamp(end_time)
         station_id = self._parse_station_id(station_id)
-        if use_opendap:
+        use_dap = use_opendap and use_dap
+        if use_dap:
+            data_api_call = self._opendap_data_api._subset
+        elif use_opendap:
             data_api_call = getattr(self._opendap_data_api, mode, None)  # pragma: no cover
         else:
             data_api_call = getattr(self._data_api, mode, None)
@@ -855,13 +1151,32 @@ class NdbcApi(metaclass=Singleton):
             raise RequestException(
                 'Please supply a supported mode from `get_modes()`.')
         try:
-            data = data_api_call(
-                self._handler,
-                station_id,
-                start_time,
-                end_time,
-                use_timestamp,
-            )
+            if use_dap:
+                data = data_api_call(self._handler,
+                                     mode=mode,
+                                     station_id=station_id,
+                                     start_time=start_time,
+                                     end_time=end_time,
+                                     cols=cols,
+                                     bbox=bbox,
+                                     stride=stride)
+            elif use_opendap:
+                # the grid is subset as each file is decoded
+                data = data_api_call(self._handler,
+                                     station_id,
+                                     start_time,
+                                     end_time,
+                                     use_timestamp,
+                                     bbox=bbox,
+                                     stride=stride)
+            else:
+                data = data_api_call(
+                    self._handler,
+                    station_id,
+                    start_time,
+                    end_time,
+                    use_timestamp,
+                )
         except (ResponseException, ValueError, TypeError, KeyError) as e:  # pragma: no cover
             raise ResponseException(
                 f'Failed to handle API call.\nRaised from {e}') from e
@@ -879,7 +1194,7 @@ class NdbcApi(metaclass=Singleton):
                 else:
                     handled_data = data
             else:
-                # Keep it as raw list of dicts during accumulation to make merging easy!
+                # Keep the columnar data until accumulation to merge stations cheaply
                 handled_data = self._handle_data(data, as_df=False, as_pl=False, cols=cols)
         except (ValueError, KeyError, AttributeError) as e:  # pragma: no cover
             raise ParserException(
@@ -13,11 +13,37 @@ Example::
 """
 import asyncio
 import logging
-from typing import Dict, List, Union, Callable
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union, Callable
 
 import aiohttp
 
+from .cache_budget import CacheBudget
+from .cache_policy import (
+    EXPIRED,
+    FRESH,
+    NOT_MODIFIED,
+    STALE,
+    CachePolicy,
+    conditional_headers,
+    response_validators,
+    revalidated,
+)
+from .disk_cache import DiskCache
+from .negative_cache import NOT_FOUND, NegativeCache, not_found
+from .query_plan import (DISK, MEMORY, describe, describe_missing,
+                         memory_entry)
+from .gzip_stream import GZIP_CHUNK_SIZE, GZIP_FILE_SUFFIX, GzipStream
+from .rate_limiter import RateLimiter
 from .req_cache import RequestCache
+from .tail_fetch import (
+    PARTIAL_CONTENT,
+    TAIL_SUFFIX,
+    TailFetch,
+    content_length,
+    covers,
+    tail_eligible,
+)
 
 
 class AsyncRequestHandler:
@@ -31,27 +57,44 @@ class AsyncRequestHandler:
 
     Attributes:
         stations: A list of cached ``Station`` objects.
+        disk_cache: An optional persistent :class:`DiskCache`, consulted
+            on a miss of the in-memory station cache.
+        cache_budget: An optional :class:`CacheBudget` limiting the total
+            size of the responses cached in memory across all stations.
+        cache_policy: The :class:`CachePolicy` deciding whether cached
+            responses are fresh, stale or expired.
+        rate_limiter: The per-host :class:`RateLimiter`, by default
+            ``RateLimiter.from_delay(delay)``.
     """
 
     class Station:
         """Per-station request cache container."""
         __slots__ = 'id_', 'reqs'
 
-        def __init__(self, station_id: str, cache_limit: int) -> None:
+        def __init__(self,
+                     station_id: str,
+                     cache_limit: int,
+                     budget: Optional[CacheBudget] = None) -> None:
             self.id_ = station_id
-            self.reqs = RequestCache(cache_limit)
+            self.reqs = RequestCache(cache_limit,
+                                     budget=budget,
+                                     station_id=station_id)
 
     def __init__(
         self,
         cache_limit: int,
         log: Callable,
-        delay: int,
+        delay: Optional[int],
         retries: int,
         backoff_factor: float,
         headers: dict = None,
         debug: bool = True,
         verify_https: bool = True,
         max_connections: int = 10,
+        disk_cache: Optional[DiskCache] = None,
+        cache_policy: Optional[CachePolicy] = None,
+        cache_bytes_limit: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ) -> None:
         self._cache_limit = cache_limit
         self._request_headers = headers or {}
@@ -63,8 +106,16 @@ class AsyncRequestHandler:
         self._debug = debug
         self._verify_https = verify_https
         self._max_connections = max_connections
+        self._disk_cache = disk_cache
+        self._cache_policy = cache_policy or CachePolicy()
+        self._negative_cache = NegativeCache(cache_policy=self._cache_policy,
+                                             disk_cache=disk_cache)
+        self._cache_budget = (CacheBudget(limit=cache_bytes_limit)
+                              if cache_bytes_limit else None)
+        self._revalidations: Dict[str, asyncio.Task] = {}
+        self._rate_limiter = rate_limiter or RateLimiter.from_delay(delay)
         self._semaphore = asyncio.Semaphore(max_connections)
-        self._station_locks: Dict[str, asyncio.Lock] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
         self._session: aiohttp.ClientSession = None
 
     # --- context manager ---------------------------------------------------
@@ -79,6 +130,15 @@ class AsyncRequestHandler:
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        pending = [
+            t for t in (*self._revalidations.values(),
+                        *self._inflight.values()) if not t.done()
+        ]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._revalidations = {}
+        self._inflight = {}
         if self._session and not self._session.closed:
             await self._session.close()
             self.log(logging.DEBUG, message='Closed async session.')
@@ -105,8 +165,21 @@ class AsyncRequestHandler:
         """Replace all request headers."""
         self._request_headers = request_headers
 
+    def cache_stats(self) -> Optional[dict]:
+        """Return the occupancy of the in-memory cache's byte budget, if any."""
+        if self._cache_budget is None:
+            return None
+        return self._cache_budget.stats()
+
+    def clear(self) -> None:
+        """Drop the cached responses of every station."""
+        self.stations = []
+        if self._cache_budget is not None:
+            self._cache_budget.clear()
+
     def has_station(self, station_id: Union[str, int]) -> bool:
         """Check if we have a cache for this station."""
+        station_id = str(station_id)
         for s in self.stations:
             if s.id_ == station_id:
                 return True
@@ -114,8 +187,7 @@ class AsyncRequestHandler:
 
     def get_station(self, station_id: Union[str, int]) -> 'Station':
         """Get or create a :class:`Station` cache entry."""
-        if isinstance(station_id, int):
-            station_id = str(station_id)
+        station_id = str(station_id)
         if not self.has_station(station_id):
             self.log(logging.DEBUG,
                      station_id=station_id,
@@ -128,66 +200,163 @@ class AsyncRequestHandler:
     def add_station(self, station_id: Union[str, int]) -> None:
         """Create a new :class:`Station` cache entry."""
         self.stations.append(
-            AsyncRequestHandler.Station(station_id=station_id,
-                                        cache_limit=self._cache_limit))
+            AsyncRequestHandler.Station(station_id=str(station_id),
+                                        cache_limit=self._cache_limit,
+                                        budget=self._cache_budget))
 
-    # --- async I/O ---------------------------------------------------------
+    def load_responses(self, data: Dict[str, Dict[str, dict]]) -> None:
+        """Add the ``{station_id: {request: response}}`` pairs of a dump."""
+        for station_id, reqs in data.items():
+            stn = self.get_station(station_id=station_id)
+            for req, resp in reqs.items():
+                stn.reqs.put(request=req, response=resp)
+        if self._disk_cache is not None:
+            self._disk_cache.load(data)
 
-    async def handle_requests(self, station_id: Union[str, int],
-                              reqs: List[str]) -> List[dict]:
-        """Handle a batch of requests for one station, sequentially.
+    # --- async I/O ---------------------------------------------------------
 
-        Requests within a single station are processed one at a time
-        (mirroring the synchronous handler).  Concurrency *across*
-        stations is achieved at the ``AsyncNdbcApi`` level via
-        ``asyncio.gather``.
+    async def handle_requests(self,
+                              station_id: Union[str, int],
+                              reqs: List[str],
+                              since: Optional[datetime] = None) -> List[dict]:
+        """Handle a batch of requests for one station, concurrently.
+
+        Every request of the station is fetched at once, bounded only by
+        the global ``max_connections`` semaphore and the ``rate_limiter``,
+        so a multi-year query takes roughly one round trip rather than
+        one per year.  Responses are returned in the order of ``reqs``.
+        Concurrency *across* stations is achieved at the ``AsyncNdbcApi``
+        level via ``asyncio.gather``.
         """
         self.log(
             logging.INFO,
             message=f'Handling {len(reqs)} requests for station {station_id}.')
-        responses = []
-        for req in reqs:
-            responses.append(
-                await self.handle_request(station_id=station_id, req=req))
-        return responses
-
-    async def handle_request(self, station_id: Union[str, int],
-                             req: str) -> dict:
+        return list(await asyncio.gather(*[
+            self.handle_request(station_id=station_id, req=req, since=since)
+            for req in reqs
+        ]))
+
+    async def stream_requests(
+            self, station_id: Union[str, int], reqs: List[str],
+            callback: Callable[[int, dict], Any]) -> List[Any]:
+        """Handle a batch of requests, passing each response to `callback`.
+
+        The requests are fetched concurrently, as by ``handle_requests``,
+        and ``callback`` is called with the index of each request in
+        ``reqs`` and its response as soon as it is received, in a worker
+        thread, so that decoding overlaps the remaining fetches.  Returns
+        the value of ``callback`` for each request, in the order of
+        ``reqs``.
+        """
+        self.log(
+            logging.INFO,
+            message=f'Streaming {len(reqs)} requests for station {station_id}.')
+
+        async def handle(index: int, req: str) -> Any:
+            response = await self.handle_request(station_id=station_id,
+                                                 req=req)
+            return await asyncio.to_thread(callback, index, response)
+
+        return list(await asyncio.gather(
+            *[handle(index, req) for index, req in enumerate(reqs)]))
+
+    async def handle_request(self,
+                             station_id: Union[str, int],
+                             req: str,
+                             since: Optional[datetime] = None) -> dict:
         """Check cache, fetch on miss, return response dict.
 
-        Uses a per-station ``asyncio.Lock`` so that concurrent
-        coroutines requesting the same URL don't both fire the HTTP
-        request.
+        Fetches are single-flight per URL: concurrent coroutines
+        requesting a URL which is already in flight await the same
+        task rather than firing another HTTP request, while different
+        URLs are fetched in parallel.  Cached responses are served while
+        fresh under the ``cache_policy``; stale responses are served
+        while a background task refreshes them, and expired responses
+        are fetched again.  Both are requested conditionally on their
+        ``ETag`` and ``Last-Modified`` validators, and renewed without
+        their body if not modified.
+
+        Realtime files are only requested up to the observations
+        ``since``, if it is within ``config.TAIL_FETCH_WINDOW``, using
+        HTTP ``Range`` requests.  Requests which were not found are not
+        requested again for the negative time-to-live of the
+        ``cache_policy``.
         """
         if isinstance(station_id, int):
             station_id = str(station_id)
-        if station_id not in self._station_locks:
-            self._station_locks[station_id] = asyncio.Lock()
-
-        async with self._station_locks[station_id]:
-            stn = self.get_station(station_id=station_id)
-            self.log(logging.DEBUG, message=f'Handling request {req}.')
-            if req not in stn.reqs.cache:
-                self.log(logging.DEBUG,
-                         message=f'Adding request {req} to cache.')
-                resp = await self.execute_request(
-                    url=req,
-                    station_id=station_id,
-                    headers=self._request_headers)
-                stn.reqs.put(request=req, response=resp)
-            else:
+        stn = self.get_station(station_id=station_id)
+        self.log(logging.DEBUG, message=f'Handling request {req}.')
+        tail = tail_eligible(url=req, since=since)
+        entry = await self._get_cached(stn=stn, req=req)
+        if entry is None and await self._missing(req):
+            self.log(logging.DEBUG,
+                     message=f'Request {req} is known to be missing.')
+            return not_found()
+        if entry is not None:
+            resp, created = entry
+            state = self._cache_policy.state(url=req, created=created)
+            if state == FRESH or (state == STALE and not tail):
+                if state == STALE:
+                    self._revalidate(stn=stn, req=req, cached=resp)
+                return resp
+            if not tail:
                 self.log(logging.DEBUG,
-                         message=f'Request {req} already in cache.')
-        return stn.reqs.get(request=req)
+                         message=f'Request {req} expired in cache.')
+        else:
+            resp = None
+        if tail:
+            return await self._fetch_tail(stn=stn, req=req, since=since)
+        inflight = self._inflight.get(req)
+        if inflight is None:
+            inflight = asyncio.create_task(
+                self._fetch(stn=stn, req=req, cached=resp))
+            self._inflight[req] = inflight
+            inflight.add_done_callback(
+                lambda _: self._inflight.pop(req, None))
+        else:
+            self.log(logging.DEBUG,
+                     message=f'Waiting for request {req} in flight.')
+        # a cancelled caller must not cancel the fetch shared by the others
+        return await asyncio.shield(inflight)
+
+    async def inspect(self,
+                      station_id: Union[str, int],
+                      req: str,
+                      since: Optional[datetime] = None) -> dict:
+        """Describe how ``handle_request`` would handle a request, without it.
+
+        Returns a dict with where the response is ``cached``
+        (``'memory'``, ``'disk'``, ``'missing'`` or ``None``), its
+        ``state`` under the ``cache_policy`` and body ``size`` if cached,
+        and whether the request would be made with HTTP ``range``
+        requests.
+        """
+        if isinstance(station_id, int):
+            station_id = str(station_id)
+        stn = self.get_station(station_id=station_id)
+        tail = tail_eligible(url=req, since=since)
+        entry = memory_entry(stn.reqs, req)
+        if entry is not None:
+            return describe(self._cache_policy, req, tail, MEMORY, entry)
+        if self._disk_cache is not None:
+            entry = await asyncio.to_thread(self._disk_cache.stat, req)
+            if entry is not None:
+                return describe(self._cache_policy, req, tail, DISK, entry)
+        if await self._missing(req):
+            return describe_missing(tail)
+        if tail:
+            entry = memory_entry(stn.reqs, req + TAIL_SUFFIX, since=since)
+        return describe(self._cache_policy, req, tail, MEMORY, entry)
 
     async def execute_request(self, station_id: Union[str, int], url: str,
                               headers: dict) -> dict:
         """Execute an HTTP GET with retry, exponential backoff, and throttle.
 
-        Acquires the concurrency semaphore before making the request
-        so that at most ``max_connections`` requests are in-flight
-        globally.  Also sleeps ``delay`` ms before each request
-        to throttle request rate (mirroring the sync handler).
+        Waits for the host's ``rate_limiter`` before each attempt, then
+        acquires the concurrency semaphore so that at most
+        ``max_connections`` requests are in-flight globally.  Waiting for
+        the rate limit does not hold a connection, so the request rate
+        is independent of how long responses take.
         """
         self.log(logging.DEBUG,
                  station_id=station_id,
@@ -197,10 +366,8 @@ class AsyncRequestHandler:
 
         last_exc = None
         for attempt in range(self._retries + 1):
+            await self._rate_limiter.acquire_async(url)
             async with self._semaphore:
-                # Throttle: sleep before issuing the request
-                if self._delay > 0:
-                    await asyncio.sleep(self._delay / 1000)
                 try:
                     async with self._session.get(
                         url,
@@ -211,8 +378,27 @@ class AsyncRequestHandler:
                         self.log(logging.DEBUG,
                                  station_id=station_id,
                                  message=f'Response status: {status}')
+                        validators = response_validators(response.headers)
+                        if status == NOT_MODIFIED:
+                            return dict(status=status, body='', **validators)
+                        if status == PARTIAL_CONTENT:
+                            return dict(status=status,
+                                        body=await response.text(),
+                                        length=content_length(
+                                            response.headers.get(
+                                                'Content-Range')),
+                                        **validators)
                         if status != 200:
                             return dict(status=status, body='')
+                        if url.endswith(GZIP_FILE_SUFFIX):
+                            # decompress the archive while streaming it
+                            stream = GzipStream()
+                            async for chunk in response.content.iter_chunked(
+                                    GZIP_CHUNK_SIZE):
+                                stream.feed(chunk)
+                            return dict(status=status,
+                                        body=stream.close(),
+                                        **validators)
                         content_type = response.headers.get(
                             'Content-Type', '').lower()
                         if any(t in content_type
@@ -220,7 +406,7 @@ class AsyncRequestHandler:
                             body = await response.read()
                         else:
                             body = await response.text()
-                        return dict(status=status, body=body)
+                        return dict(status=status, body=body, **validators)
                 except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
                     last_exc = exc
                     if attempt < self._retries:
@@ -236,3 +422,205 @@ class AsyncRequestHandler:
                  message=f'All {self._retries} retries exhausted for {url}')
         from ndbc_api.exceptions import RequestException
         raise RequestException(f"Max retries exceeded for {url}") from last_exc
+
+    # --- cache internals ---------------------------------------------------
+
+    async def _get_cached(self, stn: 'Station',
+                          req: str) -> Optional[Tuple[dict, float]]:
+        """Find a cached response and its creation time, in memory or on disk."""
+        if req in stn.reqs.cache:
+            self.log(logging.DEBUG, message=f'Request {req} already in cache.')
+            return stn.reqs.get(request=req), stn.reqs.created(request=req)
+        if self._disk_cache is None:
+            return None
+        # sqlite is blocking, so the disk tier is read in a thread
+        entry = await asyncio.to_thread(self._disk_cache.get_entry, req)
+        if entry is not None:
+            self.log(logging.DEBUG,
+                     message=f'Request {req} found in disk cache.')
+            stn.reqs.put(request=req, response=entry[0], created=entry[1])
+        return entry
+
+    async def _missing(self, req: str) -> bool:
+        """Whether a request is known to be missing, in memory or on disk."""
+        if self._negative_cache.missing(request=req, persistent=False):
+            return True
+        if self._disk_cache is None:
+            return False
+        return await asyncio.to_thread(self._negative_cache.missing, req)
+
+    async def _fetch(self,
+                     stn: 'Station',
+                     req: str,
+                     cached: Optional[dict] = None) -> dict:
+        """Execute and cache a request."""
+        self.log(logging.DEBUG, message=f'Adding request {req} to cache.')
+        resp, modified = await self._execute(stn=stn, req=req, cached=cached)
+        if cached is not None and resp.get('status') not in (200, NOT_FOUND):
+            self.log(logging.WARNING,
+                     station_id=stn.id_,
+                     message=(f'Failed to revalidate request {req}, status '
+                              f'{resp.get("status")}, serving the expired '
+                              'response.'))
+            return cached
+        await self._store(stn=stn, req=req, resp=resp, modified=modified)
+        return resp
+
+    async def _execute(self,
+                       stn: 'Station',
+                       req: str,
+                       cached: Optional[dict] = None) -> Tuple[dict, bool]:
+        """Execute a request, conditionally on the ``cached`` response.
+
+        Returns the response, which is the renewed ``cached`` response if
+        it was not modified, and whether it was modified.
+        """
+        headers = self._request_headers
+        if cached is not None:
+            headers = {**headers, **conditional_headers(cached)}
+        resp = await self.execute_request(url=req,
+                                          station_id=stn.id_,
+                                          headers=headers)
+        if cached is not None and resp.get('status') == NOT_MODIFIED:
+            self.log(logging.DEBUG, message=f'Request {req} not modified.')
+            return revalidated(cached, resp), False
+        return resp, True
+
+    async def _store(self,
+                     stn: 'Station',
+                     req: str,
+                     resp: dict,
+                     modified: bool = True) -> None:
+        """Cache a response in memory and, if configured, on disk."""
+        if resp.get('status') == NOT_FOUND:
+            if self._disk_cache is not None:
+                await asyncio.to_thread(self._negative_cache.add, req,
+                                        stn.id_)
+            else:
+                self._negative_cache.add(request=req, station_id=stn.id_)
+            stn.reqs.discard(request=req)
+            return
+        if resp.get('status') != 200:
+            return  # errors are requested again rather than cached
+        if self._disk_cache is not None:
+            store = (self._disk_cache.put
+                     if modified else self._disk_cache.refresh)
+            await asyncio.to_thread(store, req, resp, stn.id_)
+        stn.reqs.put(request=req, response=resp)
+
+    async def _fetch_tail(self, stn: 'Station', req: str,
+                          since: datetime) -> dict:
+        """Serve or execute the range requests of a realtime file.
+
+        The ranges are fetched by one task shared by all concurrent
+        coroutines, as in ``handle_request``.  Coroutines whose ``since``
+        is not covered by the ranges they awaited request further ranges.
+        """
+        key = req + TAIL_SUFFIX
+        while True:
+            cached = None
+            if key in stn.reqs.cache:
+                cached = stn.reqs.get(request=key)
+                created = stn.reqs.created(request=key)
+            if cached is not None and covers(cached, since):
+                if self._cache_policy.state(url=req,
+                                            created=created) == FRESH:
+                    return cached
+            else:
+                cached = None
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                inflight = asyncio.create_task(
+                    self._fetch_ranges(stn=stn,
+                                       req=req,
+                                       since=since,
+                                       cached=cached))
+                self._inflight[key] = inflight
+                inflight.add_done_callback(
+                    lambda _: self._inflight.pop(key, None))
+                # a cancelled caller must not cancel the shared ranges
+                return await asyncio.shield(inflight)
+            self.log(logging.DEBUG,
+                     message=f'Waiting for the ranges of request {req}.')
+            resp = await asyncio.shield(inflight)
+            if 'covers' not in resp or covers(resp, since):
+                return resp
+
+    async def _fetch_ranges(self,
+                            stn: 'Station',
+                            req: str,
+                            since: datetime,
+                            cached: Optional[dict] = None) -> dict:
+        """Execute and cache the range requests of a realtime file."""
+        resp = await self._execute_tail(stn=stn,
+                                        req=req,
+                                        since=since,
+                                        cached=cached)
+        if 'covers' in resp:
+            stn.reqs.put(request=req + TAIL_SUFFIX, response=resp)
+        else:
+            # the whole file, if the server ignored the range
+            await self._store(stn=stn, req=req, resp=resp)
+        return resp
+
+    async def _execute_tail(self,
+                            stn: 'Station',
+                            req: str,
+                            since: datetime,
+                            cached: Optional[dict] = None) -> dict:
+        """Request leading ranges of a realtime file until they cover ``since``.
+
+        The first range is requested conditionally on the ``cached``
+        response if any, which is renewed if it was not modified.
+        """
+        tail = TailFetch(since=since)
+        headers = {**self._request_headers, **tail.headers()}
+        if cached is not None:
+            headers.update(conditional_headers(cached))
+        resp = await self.execute_request(url=req,
+                                          station_id=stn.id_,
+                                          headers=headers)
+        if cached is not None and resp.get('status') == NOT_MODIFIED:
+            self.log(logging.DEBUG, message=f'Request {req} not modified.')
+            return revalidated(cached, resp)
+        while tail.feed(resp):
+            self.log(logging.DEBUG,
+                     message=f'Extending the range of request {req}.')
+            resp = await self.execute_request(
+                url=req,
+                station_id=stn.id_,
+                headers={
+                    **self._request_headers,
+                    **tail.headers()
+                })
+        return tail.response()
+
+    def _revalidate(self, stn: 'Station', req: str, cached: dict) -> None:
+        """Refresh a stale response in a background task, once at a time."""
+        pending = self._revalidations.get(req)
+        if req in self._inflight or (pending is not None and
+                                     not pending.done()):
+            return  # the request is already being fetched
+        self._revalidations = {
+            k: t for k, t in self._revalidations.items() if not t.done()
+        }
+        self._revalidations[req] = asyncio.create_task(
+            self._refresh(stn=stn, req=req, cached=cached))
+
+    async def _refresh(self, stn: 'Station', req: str, cached: dict) -> None:
+        """Refresh a stale response, keeping it if the request fails."""
+        try:
+            resp, modified = await self._execute(stn=stn, req=req,
+                                                 cached=cached)
+        except Exception as e:
+            self.log(logging.WARNING,
+                     station_id=stn.id_,
+                     message=f'Failed to revalidate request {req}: {e}')
+            return
+        if resp.get('status') != 200:
+            self.log(logging.WARNING,
+                     station_id=stn.id_,
+                     message=(f'Failed to revalidate request {req}, status '
+                              f'{resp.get("status")}.'))
+            return
+        await self._store(stn=stn, req=req, resp=resp, modified=modified)
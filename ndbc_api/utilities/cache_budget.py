@@ -0,0 +1,184 @@
+"""A memory budget shared by the in-memory response caches of every station.
+
+The `RequestHandler` and `AsyncRequestHandler` keep a `RequestCache` for each
+station, limited to a number of entries. The `CacheBudget` additionally bounds
+the total size of the cached responses across all stations, so that a
+long-running process has a predictable memory ceiling however many stations it
+queries.
+
+Responses are evicted using GreedyDual-Size: each entry is given a priority of
+`L + 1 / size`, refreshed on every hit, where `L` is the priority of the last
+evicted entry. Large responses which are rarely used (such as ADCP netCDF
+files) are evicted before small, frequently used ones (such as realtime text
+files), and entries which are not used age out as `L` rises. For fairness, only
+stations using more than an equal share of the budget have their responses
+evicted.
+
+Responses are only evicted from a `RequestCache` whose `lock` can be acquired
+without waiting, so that concurrent stations never deadlock; the budget may
+briefly exceed its limit while every candidate is in use.
+
+Example:
+    ```python3
+        budget = CacheBudget(limit=256 * 1024**2)
+        cache = RequestCache(capacity=36, budget=budget, station_id='tplm2')
+        cache.put(request=url, response={'status': 200, 'body': '...'})
+        budget.stats()
+    ```
+"""
+import heapq
+import itertools
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+def response_size(request: str, response: dict) -> int:
+    """The approximate memory used by a cached request and response, in bytes."""
+    return sys.getsizeof(request) + sys.getsizeof(response.get('body') or b'')
+
+
+class CacheBudget:
+    """A GreedyDual-Size byte budget over many `RequestCache`s.
+
+    Attributes:
+        limit (:int:): The maximum total size of the cached responses, in
+            bytes.
+        size (:int:): The current total size of the cached responses, in
+            bytes.
+        inflation (:float:): The GreedyDual-Size `L` value, the priority of
+            the most recently evicted response.
+        hits (:int:): The number of cached responses served.
+        evictions (:int:): The number of responses evicted to stay within
+            the `limit`.
+    """
+
+    __slots__ = ('limit', 'size', 'inflation', 'hits', 'evictions', '_entries',
+                 '_heap', '_station_sizes', '_counter', '_lock')
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.size = 0
+        self.inflation = 0.0
+        self.hits = 0
+        self.evictions = 0
+        # (station_id, request) -> [cache, size, priority, sequence]
+        self._entries: Dict[Tuple[str, str], list] = {}
+        self._heap: List[Tuple[float, int, str, str]] = []
+        self._station_sizes: Dict[str, int] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def admit(self, cache: 'RequestCache', station_id: str, request: str,
+              size: int) -> bool:
+        """Account for a response added to `cache`, evicting others if needed.
+
+        Returns:
+            `False` if the response alone exceeds the `limit`, in which case
+            it is not accounted for and should not be cached.
+        """
+        if size > self.limit:
+            with self._lock:
+                self._forget((station_id, request))
+            return False
+        key = (station_id, request)
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = [cache, size, 0.0, 0]
+            self.size += size
+            self._station_sizes[station_id] = self._station_sizes.get(
+                station_id, 0) + size
+            self._prioritize(key)
+            self._evict()
+        return True
+
+    def touch(self, station_id: str, request: str) -> None:
+        """Raise the priority of a response served from the cache."""
+        key = (station_id, request)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._prioritize(key)
+
+    def forget(self, station_id: str, request: str) -> None:
+        """Stop accounting for a response removed from its cache."""
+        with self._lock:
+            self._forget((station_id, request))
+
+    def clear(self) -> None:
+        """Stop accounting for every response, without evicting them."""
+        with self._lock:
+            self._entries = {}
+            self._heap = []
+            self._station_sizes = {}
+            self.size = 0
+
+    def stats(self) -> dict:
+        """The live occupancy of the budget.
+
+        Returns:
+            A `dict` of the `limit` and current `size` in bytes, the number of
+            cached `entries` and `stations`, the `hits` and `evictions` so
+            far, and the bytes used by each station as `station_sizes`.
+        """
+        with self._lock:
+            return dict(
+                limit=self.limit,
+                size=self.size,
+                entries=len(self._entries),
+                stations=len(self._station_sizes),
+                hits=self.hits,
+                evictions=self.evictions,
+                station_sizes=dict(self._station_sizes),
+            )
+
+    """ PRIVATE """
+
+    def _prioritize(self, key: Tuple[str, str]) -> None:
+        entry = self._entries[key]
+        entry[2] = self.inflation + 1.0 / max(entry[1], 1)
+        entry[3] = next(self._counter)
+        heapq.heappush(self._heap, (entry[2], entry[3], *key))
+        if len(self._heap) > 4 * len(self._entries) + 64:
+            # drop the superseded priorities of responses hit many times
+            self._heap = [(e[2], e[3], *k) for k, e in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _forget(self, key: Tuple[str, str]) -> Optional[list]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+            remaining = self._station_sizes[key[0]] - entry[1]
+            if remaining:
+                self._station_sizes[key[0]] = remaining
+            else:
+                del self._station_sizes[key[0]]
+        return entry
+
+    def _evict(self) -> None:
+        protected = []
+        while self.size > self.limit and self._heap:
+            item = heapq.heappop(self._heap)
+            priority, sequence, station_id, request = item
+            entry = self._entries.get((station_id, request))
+            if entry is None or entry[3] != sequence:
+                continue  # superseded by a later hit
+            share = self.limit / len(self._station_sizes)
+            lock = entry[0].lock
+            if self._station_sizes[station_id] <= share or (
+                    lock is not None and not lock.acquire(blocking=False)):
+                protected.append(item)
+                continue
+            try:
+                self._forget((station_id, request))
+                entry[0].evict(request)
+            finally:
+                if lock is not None:
+                    lock.release()
+            self.inflation = priority
+            self.evictions += 1
+        for item in protected:
+            heapq.heappush(self._heap, item)
@@ -0,0 +1,165 @@
+"""Classifies NDBC data service requests by how long their responses stay valid.
+
+This module defines the `CachePolicy` used by the `RequestHandler` and
+`AsyncRequestHandler` to decide whether a cached response may be served.
+Each URL built by the `api/requests` builders belongs to one of three
+classes:
+
+* `immutable`: yearly historical archives (`tplm2h2015.txt.gz`) and yearly
+  THREDDS files (`tplm2h2015.nc`), which are never revised once published,
+  as well as the hourly HF radar files, and the DAP2 requests for their
+  structure, attributes and subsets.
+* `monthly`: the monthly archives and current-month files of the past year,
+  which are republished as the NDBC quality-controls them.
+* `realtime`: the `data/realtime2/` files, the THREDDS `9999` files and any
+  other request (such as station pages), which are updated continuously.
+
+Each class has a time-to-live, after which the response is stale, and a
+stale-while-revalidate window, during which a stale response is still served
+while it is refreshed in the background. Responses older than both are
+expired and are fetched again before being served.
+
+Responses keep the `ETag` and `Last-Modified` validators sent with them, and
+are refreshed with a conditional request. A `304 Not Modified` reply renews
+the cached response without transferring its body again, which is the usual
+outcome of polling realtime files more often than the NDBC updates them.
+
+Requests which were not found, such as the archives of years in which a
+station did not report, are known to be missing for a negative time-to-live
+of their class, during which they are not requested again.
+
+Example:
+    ```python3
+        policy = CachePolicy(ttl={'realtime': 300})
+        policy.classify('https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt')
+        policy.state(url, created=time.time() - 600)  # 'stale'
+    ```
+"""
+import re
+import time
+from typing import Dict, Mapping, Optional
+
+from ..config import (CACHE_NEGATIVE_TTL, CACHE_STALE_WHILE_REVALIDATE,
+                      CACHE_TTL)
+
+IMMUTABLE = 'immutable'
+MONTHLY = 'monthly'
+REALTIME = 'realtime'
+DATA_CLASSES = (IMMUTABLE, MONTHLY, REALTIME)
+
+FRESH = 'fresh'
+STALE = 'stale'
+EXPIRED = 'expired'
+
+NOT_MODIFIED = 304
+# response key -> (response header, conditional request header)
+VALIDATORS = {
+    'etag': ('ETag', 'If-None-Match'),
+    'last_modified': ('Last-Modified', 'If-Modified-Since'),
+}
+
+_PATTERNS = (
+    # THREDDS realtime files use `9999` in place of the year
+    (REALTIME, re.compile(r'/thredds/.*9999\.nc(\.\w+(\?.*)?)?$')),
+    (IMMUTABLE, re.compile(r'/thredds/(fileServer|dodsC)/(data|hfradar)/')),
+    (IMMUTABLE, re.compile(r'data/historical/')),
+    (MONTHLY, re.compile(r'data/\w+/[A-Z][a-z]{2}/')),
+    (REALTIME, re.compile(r'data/realtime2/')),
+)
+
+
+def response_validators(headers: Mapping[str, str]) -> Dict[str, str]:
+    """The validators of a response, from its (case-insensitive) `headers`."""
+    validators = {}
+    for key, (header, _) in VALIDATORS.items():
+        value = headers.get(header)
+        if value:
+            validators[key] = value
+    return validators
+
+
+def conditional_headers(response: dict) -> Dict[str, str]:
+    """The headers revalidating a cached `response` against its validators."""
+    return {
+        condition: response[key]
+        for key, (_, condition) in VALIDATORS.items()
+        if response.get(key)
+    }
+
+
+def revalidated(cached: dict, response: dict) -> dict:
+    """The `cached` response renewed by a `304 Not Modified` `response`."""
+    renewed = dict(cached)
+    renewed.update({k: response[k] for k in VALIDATORS if response.get(k)})
+    return renewed
+
+
+class CachePolicy:
+    """Per data class time-to-live and stale-while-revalidate windows.
+
+    Attributes:
+        ttl (:dict:): The number of seconds for which a response of each
+            data class is fresh, `None` if it never becomes stale.
+        stale_while_revalidate (:dict:): The number of seconds after its
+            `ttl` for which a stale response of each data class is served
+            while it is refreshed, `None` to serve it indefinitely.
+        negative_ttl (:dict:): The number of seconds for which a request of
+            each data class which was not found is known to be missing,
+            `None` if it never is requested again.
+    """
+
+    __slots__ = 'ttl', 'stale_while_revalidate', 'negative_ttl'
+
+    def __init__(
+        self,
+        ttl: Optional[Dict[str, Optional[float]]] = None,
+        stale_while_revalidate: Optional[Dict[str, Optional[float]]] = None,
+        negative_ttl: Optional[Dict[str, Optional[float]]] = None,
+    ) -> None:
+        self.ttl = self._merge(CACHE_TTL, ttl)
+        self.stale_while_revalidate = self._merge(CACHE_STALE_WHILE_REVALIDATE,
+                                                  stale_while_revalidate)
+        self.negative_ttl = self._merge(CACHE_NEGATIVE_TTL, negative_ttl)
+
+    @staticmethod
+    def classify(url: str) -> str:
+        """Return the data class of the response to `url`."""
+        for data_class, pattern in _PATTERNS:
+            if pattern.search(url):
+                return data_class
+        return REALTIME
+
+    def state(self, url: str, created: float, now: Optional[float] = None) -> str:
+        """Whether a response to `url` stored at `created` is fresh, stale or expired."""
+        data_class = self.classify(url)
+        ttl = self.ttl[data_class]
+        if ttl is None:
+            return FRESH
+        age = (time.time() if now is None else now) - created
+        if age < ttl:
+            return FRESH
+        window = self.stale_while_revalidate[data_class]
+        if window is None or age < ttl + window:
+            return STALE
+        return EXPIRED
+
+    def missing(self, url: str, created: float, now: Optional[float] = None) -> bool:
+        """Whether `url`, not found at `created`, is still known to be missing."""
+        ttl = self.negative_ttl[self.classify(url)]
+        return ttl is None or (time.time() if now is None else now) - created < ttl
+
+    """ PRIVATE """
+
+    @staticmethod
+    def _merge(
+        default: Dict[str, Optional[float]],
+        overrides: Optional[Dict[str, Optional[float]]],
+    ) -> Dict[str, Optional[float]]:
+        merged = dict(default)
+        for data_class, seconds in (overrides or {}).items():
+            if data_class not in DATA_CLASSES:
+                raise ValueError(
+                    f'Unsupported data class {data_class}, must be one of '
+                    f'{DATA_CLASSES}.')
+            merged[data_class] = seconds
+        return merged
@@ -0,0 +1,341 @@
+"""A compact columnar representation of parsed NDBC text data.
+
+`ColumnarData` is the intermediate representation used by `get_data` between
+parsing and the final return-format conversion. Each measurement is stored
+as one typed `numpy` array (`int64`, `float64` with `NaN` for missing values,
+or `object` for non-numeric columns), alongside an optional `datetime64[ns]`
+timestamp column and an optional station column stored as integer codes into
+a short list of station ids.
+
+Time filtering, column selection and the coalescing of data across stations
+and modes all operate on whole columns, and rows are only materialized as
+`pandas`, `polars` or `dict` records when the data is returned.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+TIMESTAMP_COL = 'timestamp'
+STATION_COL = 'station_id'
+TIMESTAMP_DTYPE = 'datetime64[ns]'
+
+
+class ColumnarData:
+    """Typed column arrays with optional timestamp and station columns.
+
+    Attributes:
+        columns: The measurement columns, by name, in column order.
+        timestamp: The `datetime64[ns]` timestamp of each row, or `None` if
+            the data is not indexed by time.
+        station_codes: The index into `stations` of each row, or `None` if
+            the data has not been attributed to a station.
+        stations: The station ids referenced by `station_codes`.
+    """
+
+    __slots__ = 'columns', 'timestamp', 'station_codes', 'stations'
+
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        timestamp: Optional[np.ndarray] = None,
+        station_codes: Optional[np.ndarray] = None,
+        stations: Optional[List[str]] = None,
+    ) -> None:
+        self.columns = columns
+        self.timestamp = timestamp
+        self.station_codes = station_codes
+        self.stations = stations or []
+
+    def __len__(self) -> int:
+        if self.timestamp is not None:
+            return len(self.timestamp)
+        if self.station_codes is not None:
+            return len(self.station_codes)
+        for col in self.columns.values():
+            return len(col)
+        return 0
+
+    def __repr__(self) -> str:
+        return (f'{type(self).__name__}(rows={len(self)}, '
+                f'columns={list(self.columns)}, stations={self.stations})')
+
+    @classmethod
+    def from_records(cls, records: List[dict]) -> 'ColumnarData':
+        """Build columns from one `dict` per row, as the python parser returns.
+
+        Keys missing from a row are treated as missing values, and a
+        `timestamp` key (with `None` for invalid dates) becomes the timestamp
+        column.
+        """
+        names: Dict[str, None] = {}
+        for row in records:
+            names.update(dict.fromkeys(row))
+        timestamp = None
+        if TIMESTAMP_COL in names:
+            del names[TIMESTAMP_COL]
+            timestamp = np.array([r.get(TIMESTAMP_COL) for r in records],
+                                 dtype=TIMESTAMP_DTYPE)
+        columns = {
+            name: _column_from_values([r.get(name) for r in records])
+            for name in names
+        }
+        return cls(columns, timestamp)
+
+    @classmethod
+    def concat(cls, parts: Sequence['ColumnarData']) -> 'ColumnarData':
+        """Stack `parts` row-wise, taking the union of their columns.
+
+        Columns missing from a part are filled with missing values, and
+        columns which differ in type across parts are promoted (`int64` to
+        `float64`, and any mix with `object` to `object`).
+        """
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return cls({})
+        if len(parts) == 1:
+            return parts[0]
+        names: Dict[str, None] = {}
+        for part in parts:
+            names.update(dict.fromkeys(part.columns))
+        columns = {
+            name: _concat_columns([
+                part.columns.get(name, _missing(len(part))) for part in parts
+            ]) for name in names
+        }
+        timestamp = None
+        if any(p.timestamp is not None for p in parts):
+            timestamp = np.concatenate([
+                p.timestamp if p.timestamp is not None else np.full(
+                    len(p), np.datetime64('NaT'), dtype=TIMESTAMP_DTYPE)
+                for p in parts
+            ])
+        station_codes, stations = None, []
+        if any(p.station_codes is not None for p in parts):
+            stations = list(
+                dict.fromkeys(s for p in parts for s in p.stations))
+            lookup = {s: i for i, s in enumerate(stations)}
+            codes = []
+            for part in parts:
+                if part.station_codes is None:
+                    codes.append(np.full(len(part), -1, dtype=np.int32))
+                else:
+                    remap = np.array([lookup[s] for s in part.stations],
+                                     dtype=np.int32)
+                    codes.append(remap[part.station_codes])
+            station_codes = np.concatenate(codes)
+        return cls(columns, timestamp, station_codes, stations)
+
+    @classmethod
+    def merge(cls, parts: Sequence['ColumnarData']) -> 'ColumnarData':
+        """Coalesce `parts` into one row per timestamp and station.
+
+        Rows sharing a timestamp and station are combined, keeping the first
+        non-missing value of each column in the order of `parts`, and the
+        result is sorted by timestamp and then station id. Data without
+        timestamps is stacked as-is.
+        """
+        data = cls.concat(parts)
+        if data.timestamp is None or not len(data):
+            return data
+        keys = data.timestamp.view(np.int64)
+        codes = data.station_codes
+        stations = data.stations
+        if codes is not None:
+            # rank the station codes by station id, so rows sort by id
+            rank = np.empty(len(stations), dtype=np.int32)
+            rank[np.argsort(np.array(stations, dtype=object),
+                            kind='stable')] = np.arange(len(stations),
+                                                        dtype=np.int32)
+            stations = sorted(stations)
+            codes = np.where(codes >= 0, rank[codes], -1).astype(np.int32)
+            order = np.lexsort((codes, keys))
+            new_group = ((np.diff(keys[order]) != 0) |
+                         (np.diff(codes[order]) != 0))
+        else:
+            order = np.argsort(keys, kind='stable')
+            new_group = np.diff(keys[order]) != 0
+        starts = np.flatnonzero(np.concatenate(([True], new_group)))
+        if len(starts) == len(order):
+            columns = {n: c[order] for n, c in data.columns.items()}
+        else:
+            columns = {
+                n: _first_valid(c[order], starts)
+                for n, c in data.columns.items()
+            }
+        return cls(columns, data.timestamp[order][starts],
+                   None if codes is None else codes[order][starts], stations)
+
+    def take(self, indices: np.ndarray) -> 'ColumnarData':
+        """Select rows by integer index or boolean mask."""
+        return ColumnarData(
+            {n: c[indices] for n, c in self.columns.items()},
+            None if self.timestamp is None else self.timestamp[indices],
+            None if self.station_codes is None else self.station_codes[indices],
+            self.stations,
+        )
+
+    def filter_time(self, start_time: datetime,
+                    end_time: datetime) -> 'ColumnarData':
+        """Keep the rows with a timestamp in [`start_time`, `end_time`]."""
+        if self.timestamp is None:
+            return self.take(np.zeros(len(self), dtype=bool))
+        mask = ((self.timestamp >= np.datetime64(start_time, 'ns')) &
+                (self.timestamp <= np.datetime64(end_time, 'ns')))
+        return self if mask.all() else self.take(mask)
+
+    def select(self, cols: List[str]) -> 'ColumnarData':
+        """Keep the named columns, as well as the timestamp and station.
+
+        Raises:
+            KeyError: A requested column is not present in non-empty data.
+        """
+        if len(self):
+            for col in cols:
+                if col not in self.columns:
+                    raise KeyError(f"Column '{col}' not found in data.")
+        keep = set(cols)
+        return ColumnarData(
+            {n: c for n, c in self.columns.items() if n in keep},
+            self.timestamp, self.station_codes, self.stations)
+
+    def with_station(self, station_id: str) -> 'ColumnarData':
+        """Attribute every row to `station_id`."""
+        return ColumnarData(self.columns, self.timestamp,
+                            np.zeros(len(self), dtype=np.int32), [station_id])
+
+    def station_ids(self) -> Optional[np.ndarray]:
+        """The station id of each row as an `object` array."""
+        if self.station_codes is None:
+            return None
+        lookup = np.array(self.stations + [None], dtype=object)
+        return lookup[self.station_codes]
+
+    def to_pandas(self) -> 'pd.DataFrame':
+        """Convert to a `pd.DataFrame`, with `timestamp` and `station_id`
+        as the trailing columns."""
+        if pd is None:
+            raise ImportError(
+                "Pandas is not installed. Please install it using `pip install pandas`."
+            )
+        data = dict(self.columns)
+        if self.timestamp is not None:
+            data[TIMESTAMP_COL] = self.timestamp
+        if self.station_codes is not None:
+            data[STATION_COL] = self.station_ids()
+        return pd.DataFrame(data, copy=False)
+
+    def to_polars(self) -> 'pl.DataFrame':
+        """Convert to a `pl.DataFrame`, with missing values as nulls."""
+        if pl is None:
+            raise ImportError(
+                "Polars is not installed. Please install it using `pip install polars`."
+            )
+        series = []
+        for name, col in self.columns.items():
+            if col.dtype.kind == 'f':
+                series.append(pl.Series(name, col, nan_to_null=True))
+            elif col.dtype.kind == 'O':
+                series.append(pl.Series(name, to_python(col), strict=False))
+            else:
+                series.append(pl.Series(name, col))
+        if self.timestamp is not None:
+            series.append(
+                pl.Series(TIMESTAMP_COL,
+                          self.timestamp.astype('datetime64[us]')))
+        if self.station_codes is not None:
+            series.append(
+                pl.Series(STATION_COL, self.station_ids().tolist(),
+                          dtype=pl.Utf8))
+        return pl.DataFrame(series)
+
+    def to_records(self) -> List[dict]:
+        """Materialize one `dict` per row, with `None` for missing values."""
+        names = list(self.columns)
+        values = [to_python(c) for c in self.columns.values()]
+        if self.timestamp is not None:
+            names.append(TIMESTAMP_COL)
+            values.append(self.timestamp.astype('datetime64[us]').tolist())
+        if self.station_codes is not None:
+            names.append(STATION_COL)
+            values.append(self.station_ids().tolist())
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+
+""" PRIVATE """
+
+
+def _column_from_values(values: List[Any]) -> np.ndarray:
+    """Type a column of Python scalars as `int64`, `float64` or `object`."""
+    has_float = has_none = False
+    for val in values:
+        if val is None:
+            has_none = True
+        elif isinstance(val, float):
+            has_float = True
+        elif not isinstance(val, int) or isinstance(val, bool):
+            return np.array(values, dtype=object)
+    if has_float or has_none:
+        return np.array([np.nan if v is None else v for v in values],
+                        dtype=np.float64)
+    return np.array(values, dtype=np.int64)
+
+
+def _missing(length: int) -> np.ndarray:
+    return np.full(length, np.nan, dtype=np.float64)
+
+
+def _concat_columns(arrays: List[np.ndarray]) -> np.ndarray:
+    kinds = {a.dtype.kind for a in arrays}
+    if 'O' in kinds:
+        return np.concatenate([_as_object(a) for a in arrays])
+    if kinds == {'i'}:
+        return np.concatenate(arrays)
+    return np.concatenate([a.astype(np.float64, copy=False) for a in arrays])
+
+
+def _as_object(col: np.ndarray) -> np.ndarray:
+    if col.dtype.kind == 'O':
+        return col
+    values = col.astype(object)
+    if col.dtype.kind == 'f':
+        values[np.isnan(col)] = None
+    return values
+
+
+def _is_missing(col: np.ndarray) -> np.ndarray:
+    if col.dtype.kind == 'f':
+        return np.isnan(col)
+    if col.dtype.kind == 'O':
+        return np.array([v is None for v in col.tolist()], dtype=bool)
+    return np.zeros(len(col), dtype=bool)
+
+
+def _first_valid(col: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """The first non-missing value of each group of rows beginning at
+    `starts`, or the first value if every value in the group is missing."""
+    missing = _is_missing(col)
+    positions = np.arange(len(col))
+    candidates = np.where(missing, len(col), positions)
+    first = np.minimum.reduceat(candidates, starts)
+    first = np.where(first == len(col), starts, first)
+    return col[first]
+
+
+def to_python(col: np.ndarray) -> list:
+    """Convert a column to Python scalars, with `None` for missing values."""
+    if col.dtype.kind == 'f':
+        values = col.astype(object)
+        values[np.isnan(col)] = None
+        return values.tolist()
+    return col.tolist()
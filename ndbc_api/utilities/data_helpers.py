@@ -28,6 +28,7 @@ from ..exceptions import (
     ParserException,
     TimestampException,
 )
+from .columnar import ColumnarData
 from .opendap.dataset import merge_datasets
 
 
@@ -51,15 +52,18 @@ def handle_timestamp(timestamp: Union[datetime, str]) -> datetime:
 
 
 def enforce_timerange(
-    df: Union[List[dict], Any],
+    df: Union[ColumnarData, List[dict], Any],
     start_time: datetime,
     end_time: datetime,
-) -> Union[List[dict], Any]:
+) -> Union[ColumnarData, List[dict], Any]:
     """Down-select *df* to rows within [*start_time*, *end_time*].
 
     Raises:
         TimestampException: If the index slice fails.
     """
+    if isinstance(df, ColumnarData):
+        return df.filter_time(start_time, end_time)
+
     if isinstance(df, list):
         filtered = []
         for row in df:
@@ -100,7 +104,9 @@ def handle_data(
     """
     if cols:
         try:
-            if isinstance(data, list):
+            if isinstance(data, ColumnarData):
+                data = data.select(cols)
+            elif isinstance(data, list):
                 if data and cols:
                     first_row = data[0]
                     for col in cols:
@@ -131,7 +137,9 @@ def handle_data(
     if as_pl:
         if pl is None:
             raise ImportError("Polars is not installed. Please install it using `pip install polars`.")
-        if isinstance(data, list):
+        if isinstance(data, ColumnarData):
+            return data.to_polars()
+        elif isinstance(data, list):
             return pl.DataFrame(data, infer_schema_length=None)
         elif isinstance(data, dict):
             rows = []
@@ -156,7 +164,9 @@ def handle_data(
     if as_df:
         if pd is None:
             raise ImportError("Pandas is not installed. Please install it using `pip install pandas`.")
-        if isinstance(data, list):
+        if isinstance(data, ColumnarData):
+            return data.to_pandas()
+        elif isinstance(data, list):
             return pd.DataFrame(data)
         elif isinstance(data, dict):
             try:
@@ -215,6 +225,9 @@ def handle_accumulate_data(
     if isinstance(first_item, dict):
         return accumulated_data
 
+    if isinstance(first_item, ColumnarData):
+        return _accumulate_columnar(accumulated_data, as_df=as_df, as_pl=as_pl)
+
     # Funnel all data through the List[dict] IR
     raw_list = []
     for mode, station_data in accumulated_data.items():
@@ -278,3 +291,41 @@ def handle_accumulate_data(
         return df.where(df.notna())
 
     return accumulated_data
+
+
+def _accumulate_columnar(
+    accumulated_data: Dict[str, List[ColumnarData]],
+    as_df: bool,
+    as_pl: bool,
+) -> Any:
+    """Coalesce `ColumnarData` by timestamp and station before conversion."""
+    if not as_df and not as_pl:
+        return {
+            mode: [item.to_records() for item in station_data]
+            for mode, station_data in accumulated_data.items()
+        }
+
+    merged = ColumnarData.merge([
+        item for station_data in accumulated_data.values()
+        for item in station_data
+    ])
+
+    if as_pl:
+        if pl is None:
+            raise ImportError("Polars is not installed.")
+        if not len(merged):
+            return pl.DataFrame()
+        return merged.to_polars()
+
+    if pd is None:
+        raise ImportError("Pandas is not installed.")
+    if not len(merged):
+        return pd.DataFrame()
+    df = merged.to_pandas()
+    present_index_cols = [
+        col for col in ['timestamp', 'station_id'] if col in df.columns
+    ]
+    if present_index_cols:
+        df.set_index(present_index_cols, inplace=True)
+        df.sort_index(inplace=True)
+    return df.where(df.notna())
@@ -0,0 +1,313 @@
+"""A persistent response cache shared across processes and runs.
+
+This module defines the `DiskCache`, an on-disk tier behind the in-memory
+`RequestCache`s of the `RequestHandler` and `AsyncRequestHandler`. Successful
+responses are stored in a single sqlite database in write-ahead-log mode, so
+that many threads and processes on one host may read and write the cache
+concurrently. Bodies are optionally compressed with zlib, and the least
+recently used responses are evicted once the cache exceeds its size limit.
+The `ETag` and `Last-Modified` validators of each response are stored with it,
+so that a response revalidated by another process or run is renewed without
+rewriting its body. Requests which were not found are recorded in a separate
+table, so that other processes and runs know them to be missing.
+
+Example:
+    ```python3
+        cache = DiskCache(path='~/.cache/ndbc-api.sqlite', limit=2**30)
+        cache.put(request=url, response={'status': 200, 'body': '...'},
+                  station_id='tplm2')
+        response = cache.get(request=url)
+    ```
+"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+_TEXT = 1
+_COMPRESSED = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    request TEXT PRIMARY KEY,
+    station_id TEXT,
+    status INTEGER NOT NULL,
+    body BLOB NOT NULL,
+    flags INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    length INTEGER
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+CREATE TABLE IF NOT EXISTS missing (
+    request TEXT PRIMARY KEY,
+    station_id TEXT,
+    created REAL NOT NULL
+);
+"""
+# columns added since the first schema, for databases created before them
+_ADDED_COLUMNS = (('etag', 'TEXT'), ('last_modified', 'TEXT'),
+                  ('length', 'INTEGER'))
+_COLUMNS = ('request, station_id, status, body, flags, size, created, '
+            'accessed, etag, last_modified, length')
+
+
+class DiskCache:
+    """A size-limited, least-recently used response cache in sqlite.
+
+    Only successful (status 200) responses are stored, and the requests
+    which were not found are recorded apart from them. Each thread uses its
+    own connection to the database, and writes which may evict responses
+    are made in an immediate transaction so that concurrent processes
+    enforce the same limit.
+
+    Attributes:
+        path (:str:): The filepath of the sqlite database.
+        limit (:int:): The maximum total size of the stored responses, in
+            bytes, after compression.
+        compression (:int:): The zlib compression level of stored bodies,
+            `0` to store bodies uncompressed.
+        timeout (:float:): The time to wait for a lock held by another
+            connection before failing, in seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        limit: int,
+        compression: int = 6,
+        timeout: float = 30.0,
+    ) -> None:
+        self.path = os.path.expanduser(path)
+        self.limit = limit
+        self.compression = compression
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect()
+
+    def __len__(self) -> int:
+        return self._connect().execute(
+            'SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def __contains__(self, request: str) -> bool:
+        return self._connect().execute(
+            'SELECT 1 FROM responses WHERE request = ?',
+            (request,)).fetchone() is not None
+
+    def get(self, request: str) -> Optional[dict]:
+        """Return the cached response for `request`, or `None` on a miss."""
+        entry = self.get_entry(request)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, request: str) -> Optional[Tuple[dict, float]]:
+        """Return the cached response for `request` and when it was stored."""
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT status, body, flags, etag, last_modified, created '
+            'FROM responses WHERE request = ?', (request,)).fetchone()
+        if row is None:
+            return None
+        conn.execute('UPDATE responses SET accessed = ? WHERE request = ?',
+                     (time.time(), request))
+        return self._decode(*row[:5]), row[5]
+
+    def stat(self, request: str) -> Optional[Tuple[int, float]]:
+        """Return the body length and creation time of a cached response.
+
+        Unlike `get_entry`, the response is neither read nor marked as used.
+        Responses stored before body lengths were recorded report their
+        stored (compressed) size.
+        """
+        return self._connect().execute(
+            'SELECT COALESCE(length, size), created FROM responses '
+            'WHERE request = ?', (request,)).fetchone()
+
+    def put(self,
+            request: str,
+            response: dict,
+            station_id: Optional[str] = None,
+            created: Optional[float] = None) -> None:
+        """Store a successful response, evicting others if over the limit."""
+        if response.get('status') != 200:
+            return
+        body, flags, length = self._encode(response.get('body'))
+        size = len(body) + len(request)
+        if size > self.limit:
+            return
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                f'INSERT OR REPLACE INTO responses ({_COLUMNS}) VALUES '
+                '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (request, station_id, response['status'], body, flags, size,
+                 now if created is None else created, now,
+                 response.get('etag'), response.get('last_modified'), length))
+            conn.execute('DELETE FROM missing WHERE request = ?', (request,))
+            self._evict(conn)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def refresh(self,
+                request: str,
+                response: dict,
+                station_id: Optional[str] = None,
+                created: Optional[float] = None) -> None:
+        """Renew a stored response which was revalidated as not modified.
+
+        Only its validators and creation time are updated, the body is
+        stored again only if the response is no longer cached.
+        """
+        now = time.time()
+        updated = self._connect().execute(
+            'UPDATE responses SET created = ?, accessed = ?, etag = ?, '
+            'last_modified = ? WHERE request = ?',
+            (now if created is None else created, now, response.get('etag'),
+             response.get('last_modified'), request)).rowcount
+        if not updated:
+            self.put(request=request,
+                     response=response,
+                     station_id=station_id,
+                     created=created)
+
+    def put_missing(self,
+                    request: str,
+                    station_id: Optional[str] = None,
+                    created: Optional[float] = None) -> None:
+        """Record that `request` was not found."""
+        self._connect().execute(
+            'INSERT OR REPLACE INTO missing (request, station_id, created) '
+            'VALUES (?, ?, ?)',
+            (request, station_id, time.time() if created is None else created))
+
+    def get_missing(self, request: str) -> Optional[float]:
+        """Return when `request` was not found, or `None` if not recorded."""
+        row = self._connect().execute(
+            'SELECT created FROM missing WHERE request = ?',
+            (request,)).fetchone()
+        return None if row is None else row[0]
+
+    def delete(self, request: str) -> None:
+        """Remove the cached response for `request`, if any."""
+        conn = self._connect()
+        conn.execute('DELETE FROM responses WHERE request = ?', (request,))
+        conn.execute('DELETE FROM missing WHERE request = ?', (request,))
+
+    def clear(self) -> None:
+        """Remove every cached response and missing request."""
+        conn = self._connect()
+        conn.execute('DELETE FROM responses')
+        conn.execute('DELETE FROM missing')
+
+    def size(self) -> int:
+        """The total size of the stored responses, in bytes."""
+        return self._connect().execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def items(self) -> Iterator[Tuple[str, str, dict]]:
+        """Iterate over the `(station_id, request, response)` entries."""
+        rows = self._connect().execute(
+            'SELECT station_id, request, status, body, flags, etag, '
+            'last_modified FROM responses ORDER BY accessed')
+        for station_id, request, *response in rows:
+            yield station_id, request, self._decode(*response)
+
+    def load(self, data: Dict[str, Dict[str, dict]]) -> None:
+        """Store the `{station_id: {request: response}}` pairs of a dump."""
+        for station_id, reqs in data.items():
+            for request, response in reqs.items():
+                self.put(request=request,
+                         response=response,
+                         station_id=station_id)
+
+    def close(self) -> None:
+        """Close the connections of every thread which used the cache."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+    """ PRIVATE """
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path,
+                                   timeout=self.timeout,
+                                   isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            columns = {
+                row[1]
+                for row in conn.execute('PRAGMA table_info(responses)')
+            }
+            for column, type_ in _ADDED_COLUMNS:
+                if column not in columns:
+                    try:
+                        conn.execute(f'ALTER TABLE responses '
+                                     f'ADD COLUMN {column} {type_}')
+                    except sqlite3.OperationalError:
+                        pass  # added by a concurrent process
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        excess = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses'
+                             ).fetchone()[0] - self.limit
+        if excess <= 0:
+            return
+        evicted = []
+        for request, size in conn.execute(
+                'SELECT request, size FROM responses ORDER BY accessed'):
+            evicted.append((request,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany('DELETE FROM responses WHERE request = ?', evicted)
+
+    def _encode(self,
+                body: Union[str, bytes, None]) -> Tuple[bytes, int, int]:
+        flags = 0
+        if not isinstance(body, bytes):
+            body = (body or '').encode('utf-8')
+            flags |= _TEXT
+        length = len(body)
+        if self.compression:
+            body = zlib.compress(body, self.compression)
+            flags |= _COMPRESSED
+        return body, flags, length
+
+    @staticmethod
+    def _decode(status: int,
+                body: bytes,
+                flags: int,
+                etag: Optional[str] = None,
+                last_modified: Optional[str] = None) -> dict:
+        if flags & _COMPRESSED:
+            body = zlib.decompress(body)
+        if flags & _TEXT:
+            body = body.decode('utf-8')
+        response = dict(status=status, body=body)
+        if etag:
+            response['etag'] = etag
+        if last_modified:
+            response['last_modified'] = last_modified
+        return response
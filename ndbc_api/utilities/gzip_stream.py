@@ -0,0 +1,85 @@
+"""Incremental decompression of gzip-compressed response bodies.
+
+The NDBC publishes historical data as `.txt.gz` archives. Rather than holding
+the compressed response in memory and decompressing it afterwards, the
+`GzipStream` decompresses each chunk as it is received from the network, so
+that only the decompressed bytes are retained. The decompressed body is
+returned as `bytes`, which the text parsers read without decoding the data
+section to a `str`.
+
+Example:
+    ```python3
+        stream = GzipStream()
+        for chunk in response.iter_content(GZIP_CHUNK_SIZE):
+            stream.feed(chunk)
+        body = stream.close()
+    ```
+"""
+import zlib
+from typing import Iterable
+
+from ..exceptions import ResponseException
+
+GZIP_MAGIC = b'\x1f\x8b'
+GZIP_FILE_SUFFIX = '.gz'
+GZIP_CHUNK_SIZE = 64 * 1024
+
+
+class GzipStream:
+    """Decompress a gzip body one chunk at a time.
+
+    Bodies which do not begin with the gzip magic number (for example, those
+    already decoded because the server set a `Content-Encoding`) are passed
+    through unchanged. Concatenated gzip members are decompressed in turn.
+    """
+
+    __slots__ = '_decompressor', '_buffer', '_pending', '_passthrough'
+
+    def __init__(self) -> None:
+        self._decompressor = None
+        self._buffer = bytearray()
+        self._pending = b''
+        self._passthrough = None
+
+    def feed(self, chunk: bytes) -> None:
+        """Decompress the next chunk of the body."""
+        if self._passthrough is None:
+            self._pending += chunk
+            if len(self._pending) < len(GZIP_MAGIC):
+                return
+            chunk, self._pending = self._pending, b''
+            self._passthrough = not chunk.startswith(GZIP_MAGIC)
+        if self._passthrough:
+            self._buffer += chunk
+            return
+        while chunk:
+            if self._decompressor is None:
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            try:
+                self._buffer += self._decompressor.decompress(chunk)
+            except zlib.error as e:
+                raise ResponseException(
+                    'Failed to decompress gzip response body.') from e
+            if not self._decompressor.eof:
+                break
+            chunk = self._decompressor.unused_data
+            self._decompressor = None
+
+    def close(self) -> bytes:
+        """Return the decompressed body.
+
+        Raises:
+            ResponseException: The body ended partway through a gzip member.
+        """
+        self._buffer += self._pending
+        if self._decompressor is not None:
+            raise ResponseException('Truncated gzip response body.')
+        return bytes(self._buffer)
+
+
+def decompress_chunks(chunks: Iterable[bytes]) -> bytes:
+    """Decompress a gzip body from an iterable of its chunks."""
+    stream = GzipStream()
+    for chunk in chunks:
+        stream.feed(chunk)
+    return stream.close()
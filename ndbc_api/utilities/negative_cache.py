@@ -0,0 +1,105 @@
+"""Remembers the requests which were not found on the NDBC data service.
+
+The request builders cover a query with one file per year, month or realtime
+period, whether or not the station reported in it, so that long backfills
+request many archives which do not exist. The `NegativeCache` of the
+`RequestHandler` and `AsyncRequestHandler` records each request answered
+with a `404 Not Found`, so that it is answered from the cache, without a
+network call, for the negative time-to-live of its data class under the
+`CachePolicy`. Missing requests are kept apart from the per-station
+`RequestCache`s, where they would take the place of responses and be lost on
+eviction, and are persisted in the `DiskCache`, if any, across processes
+and runs.
+
+Example:
+    ```python3
+        missing = NegativeCache(cache_policy=CachePolicy(), disk_cache=cache)
+        missing.add(request=url, station_id='tplm2')
+        missing.missing(request=url)  # True, until the negative TTL passes
+    ```
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from .cache_policy import CachePolicy
+from .disk_cache import DiskCache
+
+NOT_FOUND = 404
+
+
+def not_found() -> dict:
+    """The response to a request which is known to be missing."""
+    return {'status': NOT_FOUND, 'body': ''}
+
+
+class NegativeCache:
+    """The requests which were not found, and when.
+
+    Attributes:
+        cache_policy (:obj:`ndbc_api.utilities.CachePolicy`): The negative
+            time-to-live of missing requests, by data class.
+        disk_cache (:obj:`ndbc_api.utilities.DiskCache`): An optional
+            persistent cache in which missing requests are also recorded.
+    """
+
+    __slots__ = 'cache_policy', 'disk_cache', '_entries', '_lock'
+
+    def __init__(self,
+                 cache_policy: Optional[CachePolicy] = None,
+                 disk_cache: Optional[DiskCache] = None) -> None:
+        self.cache_policy = cache_policy or CachePolicy()
+        self.disk_cache = disk_cache
+        self._entries: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self,
+            request: str,
+            station_id: Optional[str] = None,
+            created: Optional[float] = None) -> None:
+        """Record that `request` was not found."""
+        created = time.time() if created is None else created
+        with self._lock:
+            self._entries[request] = created
+        if self.disk_cache is not None:
+            self.disk_cache.put_missing(request=request,
+                                        station_id=station_id,
+                                        created=created)
+
+    def missing(self,
+                request: str,
+                persistent: bool = True,
+                now: Optional[float] = None) -> bool:
+        """Whether `request` is known to be missing.
+
+        Args:
+            request: The request.
+            persistent: Whether to look up the `disk_cache`, if any, for
+                requests which are not recorded in memory.
+        """
+        with self._lock:
+            created = self._entries.get(request)
+        if created is None and persistent and self.disk_cache is not None:
+            created = self.disk_cache.get_missing(request=request)
+            if created is not None:
+                with self._lock:
+                    self._entries[request] = created
+        if created is None:
+            return False
+        if self.cache_policy.missing(url=request, created=created, now=now):
+            return True
+        self.discard(request)
+        return False
+
+    def discard(self, request: str) -> None:
+        """Forget that `request` was not found, in memory."""
+        with self._lock:
+            self._entries.pop(request, None)
+
+    def clear(self) -> None:
+        """Forget every missing request recorded in memory."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,201 @@
+"""Assembles hourly datasets into one time cube, as they arrive.
+
+The HF radar data of the THREDDS server is published as one file per hour,
+each holding the `(time, lat, lon)` grid of one hour. Joining a week of those
+files with `xarray.concat` holds every opened dataset, and the result, at
+once. A `TimeCube` instead preallocates one array per time-dependent
+variable for every requested hour, and each hourly dataset is copied into
+its rows as soon as it is decoded, from any thread, and then released.
+
+Hours which are not found, or whose grid does not match that of the first
+hour, are recorded as `missing` and dropped when the cube is assembled, by
+moving the rows which follow them in place, so that the peak memory of a
+query is that of one cube.
+
+Example:
+    ```python3
+        cube = TimeCube(slots=len(reqs))
+        for index, dataset in enumerate(datasets):
+            cube.add(index, dataset)
+        dataset = cube.dataset()
+    ```
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import xarray
+except ImportError:
+    xarray = None
+
+
+class TimeCube:
+    """Preallocated time-dependent arrays, filled one dataset at a time.
+
+    Attributes:
+        slots (:int:): The number of datasets, such as hourly files, which
+            the cube holds, in order.
+        time_dim (:str:): The name of the dimension along which the datasets
+            are joined.
+        missing (:list:): The slots which were not filled, or were dropped.
+    """
+
+    __slots__ = ('slots', 'time_dim', 'missing', '_rows', '_arrays',
+                 '_variables', '_coords', '_template', '_filled', '_dataset',
+                 '_lock')
+
+    def __init__(self, slots: int, time_dim: str = 'time') -> None:
+        if xarray is None:
+            raise ImportError("xarray is required for OpenDAP support.")
+        self.slots = slots
+        self.time_dim = time_dim
+        self.missing: List[int] = []
+        self._rows = 0
+        self._arrays: Dict[str, np.ndarray] = {}
+        # the dimensions and attributes of each time-dependent variable
+        self._variables: Dict[str, Tuple[Tuple[str, ...], dict]] = {}
+        self._coords: List[str] = []
+        self._template: Optional['xarray.Dataset'] = None
+        self._filled = np.zeros(slots, dtype=bool)
+        self._dataset: Optional['xarray.Dataset'] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        # the lock is not pickled, so that the cube may be sent to a process
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if name != '_lock'
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return int(self._filled.sum())
+
+    @property
+    def nbytes(self) -> int:
+        """The size of the preallocated arrays, in bytes."""
+        return sum(a.nbytes for a in self._arrays.values())
+
+    def add(self, index: int, dataset: 'xarray.Dataset') -> bool:
+        """Copy `dataset` into the rows of slot `index`.
+
+        The first dataset added allocates the cube, and its variables which
+        do not depend on time, such as the site locations, are kept. Each
+        slot is written by one caller only, so that datasets may be added
+        concurrently.
+
+        Returns:
+            Whether the dataset was added, `False` if its grid does not
+            match that of the first dataset, in which case its slot is
+            recorded as `missing`.
+
+        Raises:
+            ValueError: The cube was already assembled, or the dataset has
+                no `time_dim`.
+        """
+        if self._dataset is not None:
+            raise ValueError('The cube was already assembled.')
+        with self._lock:
+            if self._template is None:
+                self._allocate(dataset)
+        if not self._matches(dataset):
+            self.drop(index)
+            return False
+        rows = slice(index * self._rows, (index + 1) * self._rows)
+        for name, array in self._arrays.items():
+            variable = dataset.variables[name]
+            axis = variable.dims.index(self.time_dim)
+            array[_along(axis, rows)] = variable.values
+        with self._lock:
+            self._filled[index] = True
+        return True
+
+    def drop(self, index: int) -> None:
+        """Record that slot `index` is missing, such as an hour not found."""
+        with self._lock:
+            self.missing.append(index)
+
+    def dataset(self) -> 'xarray.Dataset':
+        """Assemble the filled slots, in order, into one `xarray.Dataset`.
+
+        The rows of missing slots are dropped in place, and the variables of
+        the dataset are views of the cube, which is assembled once.
+
+        Raises:
+            ValueError: No slot was filled.
+        """
+        if self._dataset is not None:
+            return self._dataset
+        if self._template is None or not self._filled.any():
+            raise ValueError('No dataset was added to the cube.')
+        filled = np.flatnonzero(self._filled)
+        with self._lock:
+            self.missing = sorted(
+                set(range(self.slots)).difference(filled.tolist()))
+        rows = slice(0, filled.size * self._rows)
+        dataset = self._template.copy()
+        for name, array in self._arrays.items():
+            dims, attrs = self._variables[name]
+            axis = dims.index(self.time_dim)
+            _compact(array, axis, filled, self._rows)
+            dataset[name] = xarray.Variable(dims, array[_along(axis, rows)],
+                                            dict(attrs))
+        self._dataset = dataset.set_coords(self._coords)
+        return self._dataset
+
+    """ PRIVATE """
+
+    def _allocate(self, dataset: 'xarray.Dataset') -> None:
+        if self.time_dim not in dataset.dims:
+            raise ValueError(
+                f'The dataset has no {self.time_dim!r} dimension.')
+        self._rows = dataset.sizes[self.time_dim]
+        self._coords = list(dataset.coords)
+        for name, variable in dataset.variables.items():
+            if self.time_dim not in variable.dims:
+                continue
+            axis = variable.dims.index(self.time_dim)
+            shape = list(variable.shape)
+            shape[axis] = self.slots * self._rows
+            self._arrays[name] = np.empty(shape, dtype=variable.dtype)
+            self._variables[name] = (variable.dims, dict(variable.attrs))
+        # keep the variables which do not depend on time, loaded
+        self._template = dataset.drop_vars(list(self._arrays)).load()
+
+    def _matches(self, dataset: 'xarray.Dataset') -> bool:
+        if dataset.sizes.get(self.time_dim) != self._rows:
+            return False
+        for name, array in self._arrays.items():
+            variable = dataset.variables.get(name)
+            if variable is None or variable.dims != self._variables[name][0]:
+                return False
+            axis = variable.dims.index(self.time_dim)
+            if variable.shape[:axis] + variable.shape[axis + 1:] != (
+                    array.shape[:axis] + array.shape[axis + 1:]):
+                return False
+        return True
+
+
+def _along(axis: int, index: slice) -> Tuple[slice, ...]:
+    return (slice(None),) * axis + (index,)
+
+
+def _compact(array: np.ndarray, axis: int, filled: np.ndarray,
+             rows: int) -> None:
+    """Move the rows of the `filled` slots to the front of `array`, in place.
+
+    Rows only move towards the front, so that no row is overwritten before
+    it is moved.
+    """
+    for position, index in enumerate(filled.tolist()):
+        if position != index:
+            source = slice(index * rows, (index + 1) * rows)
+            target = slice(position * rows, (position + 1) * rows)
+            array[_along(axis, target)] = array[_along(axis, source)]
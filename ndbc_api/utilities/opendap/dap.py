@@ -0,0 +1,505 @@
+"""Subsets THREDDS datasets on the server, through DAP2.
+
+The `fileServer` endpoints of the THREDDS server only serve whole files, so
+that a query for one variable over a week downloads a year of every
+variable. The `dodsC` endpoints serve the same datasets through the Data
+Access Protocol, whose constraint expressions select variables and index
+ranges of their dimensions, so that only the subset of a query is
+downloaded.
+
+A `DapSubset` resolves a query in three stages, each a batch of requests
+which is executed, and cached, by the request handler like any other:
+
+1. `METADATA`: the `.dds` structure and `.das` attributes of each dataset.
+2. `COORDINATES`: the time, latitude and longitude coordinates of each
+   dataset, from which the index ranges of the query are resolved.
+3. `DATA`: the selected variables over those index ranges, at a stride of
+   the latitudes and longitudes if the grid is decimated.
+
+The binary `.dods` responses are decoded with the attributes of the `.das`
+into an `xarray.Dataset` of the same shape as the opened netCDF file.
+
+Example:
+    ```python3
+        subset = DapSubset(urls, variables=['wspd'], start_time=start,
+                           end_time=end)
+        while not subset.done:
+            subset.feed(handler.handle_requests(station_id=station_id,
+                                                reqs=subset.requests()))
+        datasets = subset.datasets()
+    ```
+"""
+import re
+import struct
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
+
+import numpy as np
+
+try:
+    import xarray
+except ImportError:
+    xarray = None
+
+from .dataset import LATITUDE_DIMS, LONGITUDE_DIMS
+
+DDS_SUFFIX = '.dds'
+DAS_SUFFIX = '.das'
+DODS_SUFFIX = '.dods'
+# the container of the global attributes of netCDF datasets
+GLOBAL_ATTRIBUTES = 'NC_GLOBAL'
+TIME_DIM = 'time'
+
+METADATA = 'metadata'
+COORDINATES = 'coordinates'
+DATA = 'data'
+DONE = 'done'
+
+# the XDR encoding of each DAP2 type, and its type once decoded
+_XDR_TYPES = {
+    'Byte': ('u1', 'u1'),
+    'Int16': ('>i4', 'i2'),
+    'UInt16': ('>u4', 'u2'),
+    'Int32': ('>i4', 'i4'),
+    'UInt32': ('>u4', 'u4'),
+    'Float32': ('>f4', 'f4'),
+    'Float64': ('>f8', 'f8'),
+}
+_STRING_TYPES = ('String', 'Url')
+_DATA_MARKER = re.compile(rb'\r?\nData:\r?\n')
+_DDS_TOKENS = re.compile(r'[{}\[\];=:]|[^\s{}\[\];=:]+')
+_DAS_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|[{};,]|[^\s{};,"]+')
+
+Body = Union[bytes, str]
+BoundingBox = Tuple[float, float, float, float]
+
+
+class DapVariable:
+    """A variable of a DAP2 dataset, as described by its DDS.
+
+    Attributes:
+        name (:str:): The name of the variable.
+        type (:str:): The DAP2 type of the variable, e.g. `'Float32'`.
+        dims (:tuple:): The names of the dimensions of the variable.
+        shape (:tuple:): The size of each dimension of the variable.
+        maps (:list:): The coordinate variables of a `Grid`, which are
+            sent after its array.
+    """
+
+    __slots__ = 'name', 'type', 'dims', 'shape', 'maps'
+
+    def __init__(self,
+                 name: str,
+                 type: str,
+                 dims: Sequence[str] = (),
+                 shape: Sequence[int] = (),
+                 maps: Optional[List['DapVariable']] = None) -> None:
+        self.name = name
+        self.type = type
+        self.dims = tuple(dims)
+        self.shape = tuple(shape)
+        self.maps = maps or []
+
+    def __repr__(self) -> str:
+        dims = ''.join(f'[{d} = {n}]' for d, n in zip(self.dims, self.shape))
+        return f'DapVariable({self.type} {self.name}{dims})'
+
+    @property
+    def is_coordinate(self) -> bool:
+        return self.dims == (self.name,)
+
+
+def parse_dds(text: str) -> List[DapVariable]:
+    """Parse the variables of a Dataset Descriptor Structure.
+
+    Raises:
+        ValueError: The DDS is malformed, or describes a `Structure` or
+            `Sequence`, which are not served for netCDF datasets.
+    """
+    tokens = _DDS_TOKENS.findall(text)
+    pos = _expect(tokens, 0, 'Dataset')
+    pos = _expect(tokens, pos, '{')
+    variables = []
+    while tokens[pos] != '}':
+        variable, pos = _parse_declaration(tokens, pos)
+        variables.append(variable)
+    return variables
+
+
+def _expect(tokens: List[str], pos: int, token: str) -> int:
+    if pos >= len(tokens) or tokens[pos] != token:
+        found = tokens[pos] if pos < len(tokens) else 'the end'
+        raise ValueError(f'Expected {token!r}, found {found!r}.')
+    return pos + 1
+
+
+def _parse_declaration(tokens: List[str],
+                       pos: int) -> Tuple[DapVariable, int]:
+    kind = tokens[pos]
+    if kind == 'Grid':
+        pos = _expect(tokens, pos + 1, '{')
+        pos = _expect(tokens, pos, 'ARRAY')
+        pos = _expect(tokens, pos, ':')
+        array, pos = _parse_declaration(tokens, pos)
+        pos = _expect(tokens, pos, 'MAPS')
+        pos = _expect(tokens, pos, ':')
+        while tokens[pos] != '}':
+            coordinate, pos = _parse_declaration(tokens, pos)
+            array.maps.append(coordinate)
+        # the grid is named after its array
+        return array, _expect(tokens, pos + 2, ';')
+    if kind not in _XDR_TYPES and kind not in _STRING_TYPES:
+        raise ValueError(f'Unsupported DAP2 type {kind!r}.')
+    name, pos = tokens[pos + 1], pos + 2
+    dims, shape = [], []
+    while tokens[pos] == '[':
+        if tokens[pos + 2] == '=':
+            dims.append(tokens[pos + 1])
+            shape.append(int(tokens[pos + 3]))
+            pos = _expect(tokens, pos + 4, ']')
+        else:
+            dims.append(f'{name}_{len(dims)}')
+            shape.append(int(tokens[pos + 1]))
+            pos = _expect(tokens, pos + 2, ']')
+    return DapVariable(name, kind, dims, shape), _expect(tokens, pos, ';')
+
+
+def parse_das(text: str) -> Dict[str, Dict[str, Any]]:
+    """Parse the attributes of each variable from a Dataset Attribute
+    Structure, with the global attributes under `GLOBAL_ATTRIBUTES`."""
+    tokens = _DAS_TOKENS.findall(text)
+    pos = _expect(tokens, 0, 'Attributes')
+    attributes, _ = _parse_container(tokens, pos)
+    return attributes
+
+
+def _parse_container(tokens: List[str], pos: int) -> Tuple[dict, int]:
+    pos = _expect(tokens, pos, '{')
+    container = {}
+    while tokens[pos] != '}':
+        if tokens[pos + 1] == '{':
+            container[tokens[pos]], pos = _parse_container(tokens, pos + 1)
+            continue
+        kind, name, pos = tokens[pos], tokens[pos + 1], pos + 2
+        values = []
+        while tokens[pos] != ';':
+            if tokens[pos] != ',':
+                values.append(_attribute_value(kind, tokens[pos]))
+            pos += 1
+        container[name] = values[0] if len(values) == 1 else np.array(values)
+        pos += 1
+    return container, pos + 1
+
+
+def _attribute_value(kind: str, token: str) -> Any:
+    if token.startswith('"'):
+        return re.sub(r'\\(.)', r'\1', token[1:-1])
+    if kind in _STRING_TYPES:
+        return token
+    if kind in _XDR_TYPES:
+        return np.dtype(_XDR_TYPES[kind][1]).type(token)
+    return token
+
+
+def hyperslab(slices: Iterable[slice]) -> str:
+    """The DAP2 hyperslab `[start:stride:stop]` of each of `slices`."""
+    return ''.join(f'[{s.start}:{s.step or 1}:{s.stop - 1}]' for s in slices)
+
+
+def dods_request(url: str, projections: Iterable[str]) -> str:
+    """The request for the binary data of `projections` of a dataset.
+
+    The constraint expression is percent-encoded, as servers may reject the
+    brackets of hyperslabs in the query string.
+    """
+    return f'{url}{DODS_SUFFIX}?{quote(",".join(projections), safe=",:")}'
+
+
+def index_range(values: np.ndarray,
+                lower: Any = None,
+                upper: Any = None) -> Optional[slice]:
+    """The smallest slice of `values` holding those within the bounds.
+
+    Returns:
+        The slice, or `None` if no value is within the bounds.
+    """
+    mask = np.ones(values.shape, dtype=bool)
+    if lower is not None:
+        mask &= values >= lower
+    if upper is not None:
+        mask &= values <= upper
+    index = np.flatnonzero(mask)
+    if not index.size:
+        return None
+    return slice(int(index[0]), int(index[-1]) + 1)
+
+
+def decode_dods(body: Body,
+                attributes: Optional[Dict[str, Dict[str, Any]]] = None
+               ) -> 'xarray.Dataset':
+    """Decode a binary `.dods` response into an `xarray.Dataset`.
+
+    Args:
+        body: The response, the DDS of the data followed by its XDR encoding.
+        attributes: The attributes of the dataset, as parsed from its DAS,
+            with which the variables are decoded under the CF conventions.
+
+    Raises:
+        ValueError: The response is not a DAP2 data response.
+    """
+    if xarray is None:
+        raise ImportError("xarray is required for OpenDAP support.")
+    if isinstance(body, str):
+        body = body.encode('latin-1')
+    marker = _DATA_MARKER.search(body)
+    if marker is None:
+        raise ValueError('The response is not a DAP2 data response.')
+    attributes = attributes or {}
+    view = memoryview(body)[marker.end():]
+    pos = 0
+    variables = {}
+    for variable in parse_dds(body[:marker.start()].decode()):
+        for member in [variable] + variable.maps:
+            data, pos = _read_xdr(view, pos, member)
+            if member.name not in variables:
+                variables[member.name] = xarray.Variable(
+                    member.dims, data, dict(attributes.get(member.name, {})))
+    dataset = xarray.Dataset(variables,
+                             attrs=dict(attributes.get(GLOBAL_ATTRIBUTES, {})))
+    return xarray.decode_cf(dataset)
+
+
+def _read_xdr(view: memoryview, pos: int,
+              variable: DapVariable) -> Tuple[np.ndarray, int]:
+    size = int(np.prod(variable.shape, dtype=np.int64))
+    if variable.shape:
+        # arrays are prefixed with their length, twice
+        pos += 8
+    if variable.type in _STRING_TYPES:
+        values = []
+        for _ in range(size):
+            (length,) = struct.unpack_from('>I', view, pos)
+            values.append(bytes(view[pos + 4:pos + 4 + length]).decode())
+            pos += 4 + _padded(length)
+        data = np.array(values, dtype=object)
+    else:
+        encoded, decoded = _XDR_TYPES[variable.type]
+        if encoded == 'u1' and not variable.shape:
+            # scalar bytes are encoded as 32 bit integers
+            encoded = '>u4'
+        dtype = np.dtype(encoded)
+        data = np.frombuffer(view, dtype=dtype, count=size, offset=pos)
+        pos += _padded(size * dtype.itemsize)
+        data = data.astype(decoded)
+    return data.reshape(variable.shape), pos
+
+
+def _padded(length: int) -> int:
+    return (length + 3) // 4 * 4
+
+
+class _DapDataset:
+    """The state of one dataset of a `DapSubset`."""
+
+    __slots__ = 'url', 'variables', 'attributes', 'slices', 'body'
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.variables: Dict[str, DapVariable] = {}
+        self.attributes: Dict[str, Dict[str, Any]] = {}
+        self.slices: Dict[str, slice] = {}
+        self.body: Optional[Body] = None
+
+    def coordinates(self, time: bool, bbox: bool) -> List[DapVariable]:
+        """The coordinates from which the index ranges are resolved."""
+        names = ((TIME_DIM,) if time else ()) + (
+            LATITUDE_DIMS + LONGITUDE_DIMS if bbox else ())
+        return [
+            v for name, v in self.variables.items()
+            if name in names and v.is_coordinate and v.shape[0]
+        ]
+
+    def projection(self,
+                   variable: DapVariable,
+                   stride: Optional[int] = None) -> str:
+        """The projection of `variable`, every `stride`-th grid cell."""
+        slices = []
+        for dim, size in zip(variable.dims, variable.shape):
+            index = self.slices.get(dim, slice(0, size))
+            if stride and dim in LATITUDE_DIMS + LONGITUDE_DIMS:
+                index = slice(index.start, index.stop, stride)
+            slices.append(index)
+        return variable.name + hyperslab(slices)
+
+    def projections(self,
+                    names: Optional[List[str]],
+                    stride: Optional[int] = None) -> List[str]:
+        """The projection of each selected variable, and its coordinates."""
+        if names is None:
+            selected = list(self.variables.values())
+        else:
+            selected = [self.variables[n] for n in names if n in self.variables]
+        dims = {dim for v in selected for dim in v.dims}
+        selected += [
+            v for v in self.variables.values()
+            if v.is_coordinate and v.name in dims and v not in selected
+        ]
+        return [self.projection(v, stride) for v in selected if all(v.shape)]
+
+
+class DapSubset:
+    """A query of THREDDS datasets, subset on the server through DAP2.
+
+    Attributes:
+        urls (:list:): The DAP2 urls of the datasets, without suffix.
+        variables (:list:): The names of the selected variables, all
+            variables if `None`.
+        start_time (:obj:`datetime.datetime`): The start of the query.
+        end_time (:obj:`datetime.datetime`): The end of the query.
+        bbox (:tuple:): The `(min_lon, min_lat, max_lon, max_lat)` bounds of
+            the query, if any.
+        stride (:int:): Every `stride`-th latitude and longitude is
+            requested, within the `bbox` if any, all if `None`.
+        stage (:str:): The current stage of the subset, one of `METADATA`,
+            `COORDINATES`, `DATA` and `DONE`.
+    """
+
+    __slots__ = ('urls', 'variables', 'start_time', 'end_time', 'bbox',
+                 'stride', 'stage', '_datasets', '_pending')
+
+    def __init__(self,
+                 urls: Iterable[str],
+                 variables: Optional[List[str]] = None,
+                 start_time: Optional[datetime] = None,
+                 end_time: Optional[datetime] = None,
+                 bbox: Optional[BoundingBox] = None,
+                 stride: Optional[int] = None) -> None:
+        if stride is not None and stride < 1:
+            raise ValueError('`stride` must be positive.')
+        self.urls = list(urls)
+        self.variables = list(variables) if variables else None
+        self.start_time = start_time
+        self.end_time = end_time
+        self.bbox = bbox
+        self.stride = stride
+        self.stage = METADATA
+        self._datasets = [_DapDataset(url) for url in self.urls]
+        self._pending = list(self._datasets)
+        if not self._pending:
+            self.stage = DONE
+
+    @property
+    def done(self) -> bool:
+        return self.stage == DONE
+
+    def requests(self) -> List[str]:
+        """The requests of the current stage."""
+        if self.stage == METADATA:
+            return [
+                url for ds in self._pending
+                for url in (ds.url + DDS_SUFFIX, ds.url + DAS_SUFFIX)
+            ]
+        if self.stage == COORDINATES:
+            return [
+                dods_request(ds.url, [
+                    ds.projection(v) for v in ds.coordinates(
+                        self._subsets_time, self.bbox is not None)
+                ]) for ds in self._pending
+            ]
+        if self.stage == DATA:
+            return [
+                dods_request(ds.url, ds.projections(self.variables,
+                                                    self.stride))
+                for ds in self._pending
+            ]
+        return []
+
+    def feed(self, responses: List[dict]) -> None:
+        """Handle the responses to the requests of the current stage, in
+        order, and advance to the next stage.
+
+        Datasets whose requests fail, such as those not found, are dropped,
+        as are those with no data within the query.
+        """
+        if self.stage == METADATA:
+            for ds, dds, das in zip(self._pending, responses[::2],
+                                    responses[1::2]):
+                if not (_ok(dds) and _ok(das)):
+                    continue
+                ds.variables = {
+                    v.name: v for v in parse_dds(_text(dds['body']))
+                }
+                ds.attributes = parse_das(_text(das['body']))
+            self._datasets = [ds for ds in self._datasets if ds.variables]
+            self._advance(COORDINATES, [
+                ds for ds in self._datasets
+                if ds.coordinates(self._subsets_time, self.bbox is not None)
+            ])
+        elif self.stage == COORDINATES:
+            dropped = []
+            for ds, response in zip(self._pending, responses):
+                if not _ok(response) or not self._resolve(
+                        ds, decode_dods(response['body'], ds.attributes)):
+                    dropped.append(ds)
+            self._datasets = [ds for ds in self._datasets if ds not in dropped]
+            self._advance(DATA, self._datasets)
+        elif self.stage == DATA:
+            for ds, response in zip(self._pending, responses):
+                if _ok(response):
+                    ds.body = response['body']
+            self._advance(DONE, [])
+
+    def datasets(self) -> List['xarray.Dataset']:
+        """Decode the subset of each dataset, once `done`."""
+        if not self.done:
+            raise ValueError(f'The subset is still in its {self.stage} stage.')
+        return [
+            decode_dods(ds.body, ds.attributes)
+            for ds in self._datasets
+            if ds.body is not None
+        ]
+
+    @property
+    def _subsets_time(self) -> bool:
+        return self.start_time is not None or self.end_time is not None
+
+    def _advance(self, stage: str, pending: List[_DapDataset]) -> None:
+        # skip stages without requests, e.g. when nothing was found
+        while stage != DONE and not pending:
+            stage = DATA if stage == COORDINATES else DONE
+            pending = self._datasets if stage == DATA else []
+        self.stage, self._pending = stage, pending
+
+    def _resolve(self, ds: _DapDataset, coordinates: 'xarray.Dataset') -> bool:
+        """Resolve the index ranges of a dataset, `False` if any is empty."""
+        bounds = {}
+        if self._subsets_time:
+            bounds[TIME_DIM] = (_datetime64(self.start_time),
+                                _datetime64(self.end_time))
+        if self.bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = self.bbox
+            bounds.update({dim: (min_lat, max_lat) for dim in LATITUDE_DIMS})
+            bounds.update({dim: (min_lon, max_lon) for dim in LONGITUDE_DIMS})
+        for name in coordinates.variables:
+            values = coordinates[name].values
+            if name == TIME_DIM and not np.issubdtype(values.dtype,
+                                                      np.datetime64):
+                continue
+            index = index_range(values, *bounds[name])
+            if index is None:
+                return False
+            ds.slices[name] = index
+        return True
+
+
+def _ok(response: dict) -> bool:
+    return response.get('status') == 200 and bool(response.get('body'))
+
+
+def _text(body: Body) -> str:
+    return body.decode() if isinstance(body, bytes) else body
+
+
+def _datetime64(value: Optional[datetime]) -> Optional[np.datetime64]:
+    return None if value is None else np.datetime64(value, 'ns')
@@ -1,11 +1,17 @@
 from datetime import datetime
-from typing import List, Union, TYPE_CHECKING
+from typing import List, Optional, Tuple, Union, TYPE_CHECKING
+
+import numpy as np
 
 try:
     import xarray
 except ImportError:
     xarray = None
 
+# the names of the spatial dimensions of station and HF radar datasets
+LATITUDE_DIMS = ('latitude', 'lat')
+LONGITUDE_DIMS = ('longitude', 'lon')
+
 
 def concat_datasets(
     datasets: List['xarray.Dataset'],
@@ -92,3 +98,50 @@ def filter_dataset_by_variable(
     if cols is None:
         return dataset
     return dataset[cols]
+
+
+def filter_dataset_by_grid(
+    dataset: 'xarray.Dataset',
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    stride: Optional[int] = None,
+) -> 'xarray.Dataset':
+    """
+    Filters a netCDF4 Dataset to a bounding box, and decimates its grid.
+
+    The latitude and longitude dimensions are indexed by slices, so that
+    only the selected cells of a lazily loaded dataset are ever read.
+
+    Args:
+        dataset: The netCDF4 Dataset object.
+        bbox: The `(min_lon, min_lat, max_lon, max_lat)` bounds of the data
+            to keep, applied to the latitude and longitude dimensions.
+        stride: Keep every `stride`-th latitude and longitude, within the
+            bounding box if any.
+
+    Returns:
+        The modified netCDF4 Dataset object with data outside the bounding
+        box, and between the strides, removed.
+
+    Raises:
+        ValueError: The `stride` is not positive.
+    """
+    if stride is not None and stride < 1:
+        raise ValueError('`stride` must be positive.')
+    bounds = {}
+    if bbox is not None:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        bounds.update({dim: (min_lat, max_lat) for dim in LATITUDE_DIMS})
+        bounds.update({dim: (min_lon, max_lon) for dim in LONGITUDE_DIMS})
+    indexers = {}
+    for dim in LATITUDE_DIMS + LONGITUDE_DIMS:
+        if dim not in dataset.dims or dim not in dataset.coords:
+            continue
+        start, stop = 0, dataset.sizes[dim]
+        if dim in bounds:
+            lower, upper = bounds[dim]
+            values = dataset[dim].values
+            index = np.flatnonzero((values >= lower) & (values <= upper))
+            start, stop = (index[0], index[-1] + 1) if index.size else (0, 0)
+        if (start, stop) != (0, dataset.sizes[dim]) or stride:
+            indexers[dim] = slice(int(start), int(stop), stride)
+    return dataset.isel(indexers) if indexers else dataset
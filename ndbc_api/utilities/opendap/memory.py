@@ -0,0 +1,186 @@
+"""Opens netCDF responses from memory, without temporary files.
+
+The THREDDS server returns netCDF-3 files and, for HF radar, netCDF-4 (HDF5)
+files. Both are opened from the response body through a read-only,
+seekable `BufferReader`, which reads from the body without copying it, so
+that variables are still loaded lazily. The `scipy` engine reads netCDF-3
+bodies, and the `h5netcdf` engine HDF5 bodies.
+
+Where the engine for a body is not installed, the body is written to a
+`SpillDirectory` instead and opened with the default engine. Spilled files
+are reference counted by the datasets opened from them, and are removed with
+the last of those datasets, and the directory with its last file, so that
+they are never removed while a lazily loaded variable may still read them.
+
+Example:
+    ```python3
+        dataset = open_netcdf(response['body'])
+        dataset['sea_surface_temperature'].mean()
+    ```
+"""
+import io
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+try:
+    import xarray
+except ImportError:
+    xarray = None
+
+HDF5_SIGNATURE = b'\x89HDF\r\n\x1a\n'
+# the modules required to open each kind of body from memory
+_HDF5_MODULES = ('h5netcdf', 'h5py')
+_NETCDF3_MODULES = ('scipy',)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class BufferReader(io.RawIOBase):
+    """A read-only, seekable file over a bytes-like object, without a copy.
+
+    Attributes:
+        size (:int:): The size of the buffer, in bytes.
+    """
+
+    def __init__(self, buffer: Buffer) -> None:
+        super().__init__()
+        self._view = memoryview(buffer).cast('B')
+        self._pos = 0
+        self.size = len(self._view)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError(f'Negative seek position {offset}.')
+        self._pos = offset
+        return self._pos
+
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), self.size - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+
+class SpillDirectory:
+    """A temporary directory of netCDF files, reference counted by datasets.
+
+    The directory is created with its first file and removed with its last.
+
+    Attributes:
+        prefix (:str:): The prefix of the name of the directory.
+        path (:str:): The path of the directory, `None` if it holds no file.
+    """
+
+    def __init__(self, prefix: str = 'ndbc-api-') -> None:
+        self.prefix = prefix
+        self.path: Optional[str] = None
+        self._refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._refs
+
+    def spill(self, content: Buffer) -> str:
+        """Write `content` to a new file, holding one reference to it."""
+        with self._lock:
+            if self.path is None:
+                self.path = tempfile.mkdtemp(prefix=self.prefix)
+            fd, path = tempfile.mkstemp(suffix='.nc', dir=self.path)
+            self._refs[path] = 1
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        return path
+
+    def hold(self, dataset: 'xarray.Dataset', paths: Iterable[str]) -> None:
+        """Keep the spilled `paths` until `dataset` is garbage collected."""
+        with self._lock:
+            paths = [p for p in paths if p in self._refs]
+            for path in paths:
+                self._refs[path] += 1
+        if paths:
+            weakref.finalize(dataset, self.release, *paths)
+
+    def release(self, *paths: str) -> None:
+        """Drop a reference to each of `paths`, removing unreferenced files."""
+        with self._lock:
+            for path in paths:
+                self._refs[path] -= 1
+                if self._refs[path]:
+                    continue
+                del self._refs[path]
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            if not self._refs and self.path is not None:
+                shutil.rmtree(self.path, ignore_errors=True)
+                self.path = None
+
+
+SPILL_DIRECTORY = SpillDirectory()
+
+
+def in_memory_engine(content: Buffer) -> Optional[str]:
+    """The engine opening `content` from memory, `None` if not installed."""
+    if bytes(memoryview(content).cast('B')[:len(HDF5_SIGNATURE)]) == (
+            HDF5_SIGNATURE):
+        engine, modules = 'h5netcdf', _HDF5_MODULES
+    else:
+        engine, modules = 'scipy', _NETCDF3_MODULES
+    return engine if _installed(modules) else None
+
+
+@lru_cache(maxsize=None)
+def _installed(modules: Tuple[str, ...]) -> bool:
+    return all(find_spec(m) is not None for m in modules)
+
+
+def open_netcdf(
+    content: Buffer,
+    spill: Optional[SpillDirectory] = None,
+) -> 'xarray.Dataset':
+    """Open a netCDF response body as a lazily loaded `xarray.Dataset`.
+
+    Args:
+        content: The body of the response, which is read without a copy.
+        spill: The directory to which the body is written if it cannot be
+            opened from memory, by default `SPILL_DIRECTORY`.
+
+    Returns:
+        The dataset, which holds a reference to its spilled file, if any.
+    """
+    if xarray is None:
+        raise ImportError("xarray is required for OpenDAP support.")
+    engine = in_memory_engine(content)
+    if engine is not None:
+        return xarray.open_dataset(BufferReader(content), engine=engine)
+    spill = SPILL_DIRECTORY if spill is None else spill
+    path = spill.spill(content)
+    try:
+        dataset = xarray.open_dataset(path)
+        spill.hold(dataset, [path])
+    finally:
+        spill.release(path)
+    return dataset
@@ -0,0 +1,329 @@
+"""Keeps the netCDF files of the THREDDS server on disk, by station and year.
+
+Each query of `use_opendap=True` downloads, or reads from the response
+cache, the yearly netCDF files of a station and mode, and opens them again.
+A `DatasetStore` instead keeps each file in a managed directory, keyed by
+its `(station, mode, year)`, from which it is reopened lazily, so that a
+repeated query requests none of its yearly files and reads only the slices
+it selects.
+
+Files are stored as netCDF-3 (64-bit offset) files whose `time` is the
+record dimension. The realtime `9999` file of a station is not replaced
+when it is requested again: the records after the last stored time are
+appended to the end of the stored file, and its record count updated, so
+that the file is never rewritten and its history is kept.
+
+Example:
+    ```python3
+        store = DatasetStore(path='~/.cache/ndbc-api-datasets')
+        reqs = store.pending(urls)
+        responses = dict(zip(reqs, handler.handle_requests(station_id, reqs)))
+        datasets = store.datasets(urls, responses)
+    ```
+"""
+import os
+import re
+import struct
+import tempfile
+import threading
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    import xarray
+except ImportError:
+    xarray = None
+
+from .dap import TIME_DIM
+from .memory import Buffer, BufferReader
+
+# the THREDDS realtime files use `9999` in place of the year
+REALTIME_YEAR = 9999
+NETCDF3_SIGNATURE = b'CDF'
+# e.g. `.../fileServer/data/stdmet/tplm2/tplm2h2021.nc`
+_KEY = re.compile(r'/data/(?P<mode>[^/]+)/(?P<station>[^/]+)/'
+                  r'[^/]*?(?P<year>\d{4})\.nc$')
+# the netCDF-3 header tags, and the sizes of its types
+_NC_DIMENSION, _NC_VARIABLE = 10, 11
+_NC_TYPES = {1: '>i1', 2: 'S1', 3: '>i2', 4: '>i4', 5: '>f4', 6: '>f8'}
+_NUMRECS_OFFSET = 4
+
+StoreKey = Tuple[str, str, int]
+
+
+def store_key(url: str) -> Optional[StoreKey]:
+    """The `(station, mode, year)` of a yearly or realtime netCDF file.
+
+    Returns:
+        The key, or `None` if the url is not that of a station file, such
+        as an hourly HF radar file.
+    """
+    match = _KEY.search(url)
+    if match is None:
+        return None
+    return match['station'], match['mode'], int(match['year'])
+
+
+class DatasetStore:
+    """A directory of netCDF files, by station, mode and year.
+
+    Each file is written and appended to by one thread at a time, and
+    replaced atomically, so that files opened by other threads or processes
+    are never read partially written.
+
+    Attributes:
+        path (:str:): The directory of the stored files.
+    """
+
+    def __init__(self, path: str) -> None:
+        if xarray is None:
+            raise ImportError("xarray is required for OpenDAP support.")
+        self.path = os.path.expanduser(path)
+        os.makedirs(self.path, exist_ok=True)
+        self._locks: Dict[StoreKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: StoreKey) -> bool:
+        return os.path.exists(self.file(key))
+
+    def file(self, key: StoreKey) -> str:
+        """The path of the stored file of `key`."""
+        station, mode, year = key
+        return os.path.join(self.path, station, mode, f'{year}.nc')
+
+    def open(self, key: StoreKey) -> Optional['xarray.Dataset']:
+        """Open the stored file of `key` lazily, `None` if it is not stored."""
+        if key not in self:
+            return None
+        return xarray.open_dataset(self.file(key), engine='scipy')
+
+    def put(self, key: StoreKey, body: Buffer) -> None:
+        """Store the netCDF-3 `body` as the file of `key`, replacing it."""
+        with self._key_lock(key):
+            self._write(key, body)
+
+    def append(self, key: StoreKey, body: Buffer) -> int:
+        """Append the records of `body` after the last stored time of `key`.
+
+        The file is stored from `body` if it is not yet, or if its variables
+        no longer match those of `body`.
+
+        Returns:
+            The number of records added to the stored file.
+        """
+        with self._key_lock(key):
+            if key in self:
+                with _open_raw(body) as raw:
+                    appended = _append_records(self.file(key), raw)
+                if appended is not None:
+                    return appended
+            return self._write(key, body)
+
+    def pending(self, reqs: List[str]) -> List[str]:
+        """The `reqs` which must still be requested.
+
+        These are the requests which are not stored, and those of realtime
+        files, whose new records are appended to the stored files.
+        """
+        pending = []
+        for req in reqs:
+            key = store_key(req)
+            if key is None or key[2] == REALTIME_YEAR or key not in self:
+                pending.append(req)
+        return pending
+
+    def datasets(
+        self,
+        reqs: List[str],
+        responses: Dict[str, dict],
+    ) -> List[Union[dict, 'xarray.Dataset']]:
+        """Store the `responses` to `reqs`, and open the stored files.
+
+        Args:
+            reqs: The requests of a query, in order.
+            responses: The response to each of the `pending` requests.
+
+        Returns:
+            The lazily opened dataset of each request which is stored, and
+            the response to each other request, in the order of `reqs`.
+        """
+        results = []
+        for req in reqs:
+            key, response = store_key(req), responses.get(req)
+            if key is not None and _storable(response):
+                try:
+                    if key[2] == REALTIME_YEAR:
+                        self.append(key, response['body'])
+                    else:
+                        self.put(key, response['body'])
+                except (OSError, ValueError):
+                    # the store is a cache, the response is still parsed
+                    results.append(response)
+                    continue
+            dataset = self.open(key) if key is not None else None
+            results.append(response if dataset is None else dataset)
+        return results
+
+    """ PRIVATE """
+
+    def _key_lock(self, key: StoreKey) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _write(self, key: StoreKey, body: Buffer) -> int:
+        path = self.file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix='.nc', dir=os.path.dirname(path))
+        os.close(fd)
+        try:
+            with _open_raw(body) as raw:
+                unlimited = [TIME_DIM] if TIME_DIM in raw.dims else None
+                raw.to_netcdf(tmp,
+                              engine='scipy',
+                              format='NETCDF3_64BIT',
+                              unlimited_dims=unlimited)
+                records = raw.sizes.get(TIME_DIM, 0)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        return records
+
+
+def _storable(response: Optional[dict]) -> bool:
+    if not response or response.get('status') != 200:
+        return False
+    body = response.get('body')
+    return isinstance(body, (bytes, bytearray, memoryview)) and bytes(
+        memoryview(body)[:len(NETCDF3_SIGNATURE)]) == NETCDF3_SIGNATURE
+
+
+def _open_raw(body: Buffer) -> 'xarray.Dataset':
+    """Open a netCDF-3 body from memory, with its values as stored."""
+    return xarray.open_dataset(BufferReader(body),
+                               engine='scipy',
+                               decode_cf=False)
+
+
+class _Records:
+    """The record layout of a netCDF-3 file, read from its header."""
+
+    __slots__ = 'numrecs', 'begin', 'recsize', 'variables'
+
+    def __init__(self, numrecs: int, begin: int, recsize: int,
+                 variables: Dict[str, Tuple[np.dtype, Tuple[int, ...], int]]):
+        self.numrecs = numrecs
+        self.begin = begin
+        self.recsize = recsize
+        # the dtype, shape of one record and offset in a record, by name
+        self.variables = variables
+
+    @classmethod
+    def read(cls, f: BinaryIO) -> Optional['_Records']:
+        """Read the record layout of a file, `None` if it has no records."""
+        magic = f.read(4)
+        if magic[:3] != NETCDF3_SIGNATURE or magic[3] not in (1, 2):
+            return None
+        offset_size = 4 if magic[3] == 1 else 8
+        numrecs = _int(f)
+        dims = []
+        if _int(f) == _NC_DIMENSION:
+            for _ in range(_int(f)):
+                dims.append((_name(f), _int(f)))
+        else:
+            _int(f)
+        _skip_attributes(f)
+        found = {}
+        if _int(f) == _NC_VARIABLE:
+            for _ in range(_int(f)):
+                name = _name(f)
+                dim_ids = [_int(f) for _ in range(_int(f))]
+                _skip_attributes(f)
+                nc_type, vsize = _int(f), _int(f)
+                begin = int.from_bytes(f.read(offset_size), 'big')
+                if dim_ids and dims[dim_ids[0]][1] == 0:
+                    shape = tuple(dims[i][1] for i in dim_ids[1:])
+                    found[name] = (np.dtype(_NC_TYPES[nc_type]), shape,
+                                   begin, vsize)
+        if not found:
+            return None
+        begin = min(v[2] for v in found.values())
+        return cls(numrecs=numrecs,
+                   begin=begin,
+                   recsize=sum(v[3] for v in found.values()),
+                   variables={
+                       name: (dtype, shape, start - begin)
+                       for name, (dtype, shape, start, _) in found.items()
+                   })
+
+
+def _append_records(path: str, raw: 'xarray.Dataset') -> Optional[int]:
+    """Append the records of `raw` after the last time stored in `path`.
+
+    Returns:
+        The number of records appended, or `None` if the records of `raw`
+        do not match those of the file.
+    """
+    with open(path, 'rb') as f:
+        records = _Records.read(f)
+    if records is None or TIME_DIM not in records.variables:
+        return None
+    with xarray.open_dataset(path, engine='scipy', decode_cf=False) as stored:
+        if (stored[TIME_DIM].attrs.get('units') != raw[TIME_DIM].attrs.get(
+                'units') or stored.sizes[TIME_DIM] != records.numrecs):
+            return None
+        last = stored[TIME_DIM].values[-1] if records.numrecs else None
+    for name, (dtype, shape, _) in records.variables.items():
+        variable = raw.variables.get(name)
+        if (variable is None or variable.dims[:1] != (TIME_DIM,) or
+                variable.shape[1:] != shape or
+            (variable.dtype.kind, variable.dtype.itemsize) !=
+            (dtype.kind, dtype.itemsize)):
+            return None
+    times = raw[TIME_DIM].values
+    new = np.flatnonzero(times > last) if last is not None else np.arange(
+        times.size)
+    if not new.size:
+        return 0
+    buffer = np.zeros((new.size, records.recsize), dtype=np.uint8)
+    for name, (dtype, shape, offset) in records.variables.items():
+        values = np.ascontiguousarray(
+            raw.variables[name].values[new].astype(dtype))
+        row = values.reshape(new.size, -1).view(np.uint8)
+        buffer[:, offset:offset + row.shape[1]] = row
+    end = records.begin + records.numrecs * records.recsize
+    with open(path, 'r+b') as f:
+        if os.fstat(f.fileno()).st_size < end:
+            return None
+        # records left by an interrupted append are overwritten
+        f.seek(end)
+        f.write(buffer.tobytes())
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+        # the new records are only read once they are counted
+        f.seek(_NUMRECS_OFFSET)
+        f.write(struct.pack('>i', records.numrecs + new.size))
+    return int(new.size)
+
+
+def _int(f: BinaryIO) -> int:
+    return struct.unpack('>i', f.read(4))[0]
+
+
+def _name(f: BinaryIO) -> str:
+    length = _int(f)
+    name = f.read(length + -length % 4)[:length]
+    return name.decode()
+
+
+def _skip_attributes(f: BinaryIO) -> None:
+    tag, count = _int(f), _int(f)
+    if not tag:
+        return
+    for _ in range(count):
+        _name(f)
+        nc_type, length = _int(f), _int(f)
+        size = length * np.dtype(_NC_TYPES[nc_type]).itemsize
+        f.seek(size + -size % 4, os.SEEK_CUR)
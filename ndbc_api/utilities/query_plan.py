@@ -0,0 +1,189 @@
+"""Plans data queries without executing their requests.
+
+This module supports the `plan` method of the `NdbcApi` and `AsyncNdbcApi`,
+which resolves the requests of a `get_data` query for each station and mode
+and describes how each would be handled: whether its response is cached in
+memory or on disk, or known to be missing, the state of the cached response
+under the `CachePolicy`, and the estimated size of the response and of the
+download.
+
+Sizes are those of the cached responses where available. Other responses are
+estimated from the number of days of observations in the requested file and
+a per-mode prior of bytes per day, `config.PLAN_BYTES_PER_DAY`. Requests
+served from a fresh cached response, or known to be missing, download
+nothing, and realtime files fetched by HTTP range only download the
+observations of the query.
+
+Example:
+    ```python3
+        rows = [
+            plan_row('tplm2', 'stdmet', req,
+                     handler.inspect('tplm2', req.url, since=start),
+                     since=start)
+            for req in planned_requests(StdmetRequest, 'tplm2', start, end)
+        ]
+    ```
+"""
+import re
+from datetime import datetime
+from typing import Any, List, Optional, Tuple, Union
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+from ..api.requests.http._base import PlannedRequest
+from ..config import PLAN_BYTES_PER_DAY, TAIL_FETCH_BYTES
+from .cache_policy import FRESH, CachePolicy
+from .req_cache import RequestCache
+from .tail_fetch import covers
+
+MEMORY = 'memory'
+DISK = 'disk'
+MISSING = 'missing'
+
+_DEFAULT_BYTES_PER_DAY = 8 * 1024
+# the days of observations in THREDDS files, which are not planned by family
+_FILE_DAYS = (
+    (re.compile(r'_hfr_'), 1 / 24),  # hourly HF radar files
+    (re.compile(r'9999\.nc$'), 45),
+    (re.compile(r'\d{4}\.nc$'), 365),
+)
+
+PLAN_COLUMNS = ('station_id', 'mode', 'url', 'family', 'cached', 'state',
+                'range', 'size', 'bytes')
+
+
+def body_size(response: dict) -> int:
+    """The size of the body of a response, in bytes."""
+    body = response.get('body') or b''
+    return len(body if isinstance(body, bytes) else body.encode())
+
+
+def memory_entry(reqs: RequestCache,
+                 request: str,
+                 since: Optional[datetime] = None
+                ) -> Optional[Tuple[int, float]]:
+    """The body size and creation time of a response cached in memory.
+
+    The entry is read without marking it as recently used. Responses to
+    range requests, cached under their url with the `TAIL_SUFFIX`, are only
+    considered if they cover the observations `since`.
+    """
+    node = reqs.cache.get(request)
+    if node is None or (since is not None and not covers(node.v, since)):
+        return None
+    return body_size(node.v), node.t
+
+
+def describe(cache_policy: CachePolicy, request: str, tail: bool,
+             cached: Optional[str],
+             entry: Optional[Tuple[int, float]]) -> dict:
+    """Describe a request given where, and when, its response is cached."""
+    if entry is None:
+        return dict(cached=None, state=None, size=None, range=tail)
+    size, created = entry
+    return dict(cached=cached,
+                state=cache_policy.state(url=request, created=created),
+                size=size,
+                range=tail)
+
+
+def describe_missing(tail: bool) -> dict:
+    """Describe a request which is known to be missing."""
+    return dict(cached=MISSING, state=FRESH, size=0, range=tail)
+
+
+def request_days(request: Union[str, PlannedRequest]) -> float:
+    """The number of days of observations in the file of a request."""
+    if isinstance(request, PlannedRequest):
+        return request.days
+    for pattern, days in _FILE_DAYS:
+        if pattern.search(request):
+            return days
+    return 1
+
+
+def planned_requests(builder: Any, station_id: str, start_time: datetime,
+                     end_time: datetime) -> List[Union[str, PlannedRequest]]:
+    """The requests of a station and mode, planned by family if supported."""
+    if hasattr(builder, 'plan'):
+        return builder.plan(station_id=station_id,
+                            start_time=start_time,
+                            end_time=end_time)
+    return builder.build_request(station_id=station_id,
+                                 start_time=start_time,
+                                 end_time=end_time)
+
+
+def plan_row(station_id: str,
+             mode: str,
+             request: Union[str, PlannedRequest],
+             info: dict,
+             since: datetime,
+             now: Optional[datetime] = None) -> dict:
+    """Describe a request of a data query, and estimate its cost.
+
+    Args:
+        station_id: The station of the request.
+        mode: The data mode of the request.
+        request: The request, or its `PlannedRequest`.
+        info: The description of the request by the `inspect` method of the
+            request handler.
+        since: The start of the query.
+
+    Returns:
+        A `dict` with the `PLAN_COLUMNS`, where `size` is the estimated size
+        of the response and `bytes` that of its download.
+    """
+    now = datetime.now() if now is None else now
+    bytes_per_day = PLAN_BYTES_PER_DAY.get(mode, _DEFAULT_BYTES_PER_DAY)
+    planned = isinstance(request, PlannedRequest)
+    size = info['size']
+    if size is None:
+        size = int(bytes_per_day * request_days(request))
+    if info['state'] == FRESH:
+        download = 0
+    elif info['range']:
+        days = max((now - since).total_seconds(), 0) / (24 * 60 * 60)
+        download = min(size, max(TAIL_FETCH_BYTES, int(bytes_per_day * days)))
+    else:
+        download = size
+    return dict(station_id=station_id,
+                mode=mode,
+                url=request.url if planned else request,
+                family=request.family if planned else None,
+                cached=info['cached'],
+                state=info['state'],
+                range=info['range'],
+                size=size,
+                bytes=download)
+
+
+def handle_plan_data(
+    rows: List[dict],
+    as_df: bool = True,
+    as_pl: bool = False,
+) -> Any:
+    """Convert the rows of a query plan to the return format.
+
+    Rows are returned as a list of `dict` unless a DataFrame is requested,
+    which has the `PLAN_COLUMNS` even if the plan is empty.
+    """
+    if as_pl:
+        if pl is None:
+            raise ImportError("Polars is not installed.")
+        return pl.DataFrame(rows,
+                            schema=list(PLAN_COLUMNS),
+                            infer_schema_length=None)
+    if as_df:
+        if pd is None:
+            raise ImportError("Pandas is not installed.")
+        return pd.DataFrame(rows, columns=list(PLAN_COLUMNS))
+    return rows
@@ -0,0 +1,103 @@
+"""Limits the rate of requests to each NDBC host.
+
+This module defines the `RateLimiter` used by the `RequestHandler` and
+`AsyncRequestHandler`. Each host (such as `www.ndbc.noaa.gov` for the text
+files and `dods.ndbc.noaa.gov` for THREDDS) has its own limit, given as a
+sustained rate in requests per second and a burst size. Limits are enforced
+with the generic cell rate algorithm (GCRA): each host stores only the
+theoretical arrival time of its next request, and a request is delayed until
+no more than `burst` requests have been sent ahead of the sustained rate.
+
+The limit is independent of the number of concurrent connections: requests
+wait for their turn before taking a connection, so slow responses never
+reduce the rate at which requests are sent.
+
+Example:
+    ```python3
+        limiter = RateLimiter(limits={'www.ndbc.noaa.gov': (10.0, 20)})
+        limiter.acquire('https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt')
+        await limiter.acquire_async(url)
+    ```
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from ..config import HTTP_DELAY, HTTP_RATE_LIMITS
+
+RateLimit = Tuple[float, int]
+
+
+class RateLimiter:
+    """A thread-safe, per-host GCRA rate limiter.
+
+    Attributes:
+        limits (:dict:): The `(requests per second, burst)` limit of each
+            host.
+        default (:tuple:): The limit of hosts without their own entry in
+            `limits`, or `None` to leave them unlimited.
+    """
+
+    __slots__ = 'limits', 'default', '_arrivals', '_lock'
+
+    def __init__(self,
+                 limits: Optional[Dict[str, RateLimit]] = None,
+                 default: Optional[RateLimit] = None) -> None:
+        for limit in (*(limits or {}).values(), default):
+            if limit is not None and (limit[0] <= 0 or limit[1] < 1):
+                raise ValueError(
+                    f'Invalid rate limit {limit}, the rate must be positive '
+                    'and the burst at least 1.')
+        self.limits = dict(limits or {})
+        self.default = default
+        self._arrivals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_delay(cls,
+                   delay: Optional[int] = None,
+                   limits: Optional[Dict[str, RateLimit]] = None) -> 'RateLimiter':
+        """Build a limiter from a request `delay`, in milliseconds.
+
+        Without a `delay`, the NDBC hosts use `config.HTTP_RATE_LIMITS` and
+        any other host is sent at most one request every `config.HTTP_DELAY`
+        milliseconds. A `delay` given explicitly applies to every host. The
+        hosts in `limits` use their own limit in either case.
+        """
+        if limits is None:
+            limits = HTTP_RATE_LIMITS if delay is None else {}
+        delay = HTTP_DELAY if delay is None else delay
+        return cls(limits=limits,
+                   default=(1000.0 / delay, 1) if delay else None)
+
+    def reserve(self, url: str, now: Optional[float] = None) -> float:
+        """Reserve the next request to the host of `url`.
+
+        Returns:
+            The number of seconds to wait before sending the request.
+        """
+        host = urlparse(url).hostname or ''
+        limit = self.limits.get(host, self.default)
+        if limit is None:
+            return 0.0
+        rate, burst = limit
+        interval = 1.0 / rate
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            arrival = max(self._arrivals.get(host, now), now)
+            self._arrivals[host] = arrival + interval
+        return max(arrival - (burst - 1) * interval - now, 0.0)
+
+    def acquire(self, url: str) -> None:
+        """Block until a request may be sent to the host of `url`."""
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url: str) -> None:
+        """Wait until a request may be sent to the host of `url`."""
+        wait = self.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
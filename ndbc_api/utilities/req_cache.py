@@ -1,16 +1,37 @@
+import threading
+import time
+from typing import Optional, TYPE_CHECKING
+
+from .cache_budget import response_size
+
+if TYPE_CHECKING:
+    from .cache_budget import CacheBudget
+
+
 class RequestCache:
 
     class Request:
 
-        __slots__ = 'k', 'v', 'next', 'prev'
+        __slots__ = 'k', 'v', 't', 'next', 'prev'
 
-        def __init__(self, request: str, response: dict):
+        def __init__(self,
+                     request: str,
+                     response: dict,
+                     created: Optional[float] = None):
             self.k = request
             self.v = response
+            self.t = time.time() if created is None else created
             self.next = self.prev = None
 
-    def __init__(self, capacity: int) -> None:
+    def __init__(self,
+                 capacity: int,
+                 budget: Optional['CacheBudget'] = None,
+                 station_id: Optional[str] = None,
+                 lock: Optional[threading.RLock] = None) -> None:
         self.capacity = capacity
+        self.budget = budget
+        self.station_id = station_id
+        self.lock = lock
         self.cache = dict()
         self.left = RequestCache.Request('$', '$')
         self.right = RequestCache.Request('$', '$')
@@ -31,18 +52,46 @@ class RequestCache:
         if request in self.cache:
             self.remove(self.cache[request])
             self.add(self.cache[request])
+            if self.budget is not None:
+                self.budget.touch(self.station_id, request)
             return self.cache[request].v
         else:  # request not made before
             return dict()
 
-    def put(self, request: str, response: dict) -> None:
+    def created(self, request: str) -> Optional[float]:
+        if request in self.cache:
+            return self.cache[request].t
+        return None
+
+    def put(self,
+            request: str,
+            response: dict,
+            created: Optional[float] = None) -> None:
         if request in self.cache:
             self.remove(self.cache[request])
 
-        self.cache[request] = RequestCache.Request(request, response)
+        self.cache[request] = RequestCache.Request(request, response, created)
         self.add(self.cache[request])
 
         if len(self.cache) > self.capacity:
             to_remove = self.left.next
             self.remove(to_remove)
             del self.cache[to_remove.k]
+            if self.budget is not None:
+                self.budget.forget(self.station_id, to_remove.k)
+
+        if self.budget is not None and not self.budget.admit(
+                self, self.station_id, request,
+                response_size(request, response)):
+            self.discard(request)
+
+    def discard(self, request: str) -> None:
+        if request in self.cache:
+            self.remove(self.cache.pop(request))
+            if self.budget is not None:
+                self.budget.forget(self.station_id, request)
+
+    def evict(self, request: str) -> None:
+        # called by the budget, which already stopped accounting for it
+        if request in self.cache:
+            self.remove(self.cache.pop(request))
@@ -21,17 +21,50 @@ Example:
     ```
 
 Attributes:
-    stations (:obj:`list`): A list of `Station`s to which requests have
-        been made.
+    stations (:obj:`dict`): The `Station`s to which requests have been made,
+        by station id.
 """
 import logging
-from typing import List, Union, Callable
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import (Any, Dict, List, Optional, Tuple, Union, Callable,
+                    TYPE_CHECKING)
 
 import requests
 from urllib3.util import Retry
 
+from .cache_budget import CacheBudget
+from .cache_policy import (
+    EXPIRED,
+    FRESH,
+    NOT_MODIFIED,
+    STALE,
+    CachePolicy,
+    conditional_headers,
+    response_validators,
+    revalidated,
+)
+from .disk_cache import DiskCache
+from .negative_cache import NOT_FOUND, NegativeCache, not_found
+from .query_plan import (DISK, MEMORY, describe, describe_missing,
+                         memory_entry)
+from .gzip_stream import GZIP_CHUNK_SIZE, GZIP_FILE_SUFFIX, decompress_chunks
+from .rate_limiter import RateLimiter
 from .req_cache import RequestCache
+from .scheduler import Scheduler
 from .singleton import Singleton
+from .tail_fetch import (
+    PARTIAL_CONTENT,
+    TAIL_SUFFIX,
+    TailFetch,
+    content_length,
+    covers,
+    tail_eligible,
+)
+
+if TYPE_CHECKING:
+    from .opendap.store import DatasetStore
 
 
 class RequestHandler(metaclass=Singleton):
@@ -53,7 +86,8 @@ class RequestHandler(metaclass=Singleton):
         logger (:obj:`logging.Logger`): The logger at which to register HTTP
             request and response status codes and headers used for debug
             purposes.
-        delay (:int:): The HTTP(s) request delay parameter, in seconds.
+        delay (:int:): The HTTP(s) request delay parameter, in milliseconds,
+            applied to hosts without a rate limit of their own.
         retries (:int:): = The number of times to retry a request to the NDBC data
             service.
         backoff_factor (:float:): The back-off parameter, used in conjunction with
@@ -65,8 +99,30 @@ class RequestHandler(metaclass=Singleton):
             private `RequestHandler` instance.
         verify_https (:bool:): A flag which indicates whether to attempt requests to the
             NDBC data service over HTTP or HTTPS.
+        disk_cache (:obj:`ndbc_api.utilities.DiskCache`): An optional
+            persistent cache, consulted on a miss of the in-memory station
+            cache and shared by every process using the same filepath.
+        cache_budget (:obj:`ndbc_api.utilities.CacheBudget`): The limit on
+            the total size of the responses cached in memory, shared by
+            every station.
+        cache_policy (:obj:`ndbc_api.utilities.CachePolicy`): The time-to-live
+            and stale-while-revalidate windows of cached responses, by the
+            data class of their request.
+        max_connections (:int:): The size of the HTTP connection pool.
+        rate_limiter (:obj:`ndbc_api.utilities.RateLimiter`): The per-host
+            limit on the rate of requests, by default
+            `RateLimiter.from_delay(delay)`.
+        scheduler (:obj:`ndbc_api.utilities.Scheduler`): An optional
+            scheduler, whose fetch threads execute the requests of
+            `handle_requests` concurrently.
+        dataset_store (:obj:`ndbc_api.utilities.opendap.store.DatasetStore`):
+            An optional store of the netCDF files of `use_opendap` queries,
+            which are then requested only if not stored.
     """
 
+    REVALIDATE_WORKERS = 4
+    LOCK_STRIPES = 64
+
     class Station:
         """The summary line for a class docstring should fit on one line.
 
@@ -83,35 +139,72 @@ class RequestHandler(metaclass=Singleton):
             reqs (:obj:`ndbc_api.utilities.RequestCache`): The `RequestCache`
                 for the Station with the given `id_`, uses the cache limit of
                 its parent `RequestHandler`.
+            lock (:obj:`threading.RLock`): The lock guarding `reqs`, shared
+                with the other stations in the same stripe.
         """
-        __slots__ = 'id_', 'reqs'
+        __slots__ = 'id_', 'reqs', 'lock'
 
-        def __init__(self, station_id: str, cache_limit: int) -> None:
+        def __init__(self,
+                     station_id: str,
+                     cache_limit: int,
+                     budget: Optional[CacheBudget] = None,
+                     lock: Optional[threading.RLock] = None) -> None:
             self.id_ = station_id
-            self.reqs = RequestCache(cache_limit)
+            self.lock = lock or threading.RLock()
+            self.reqs = RequestCache(cache_limit,
+                                     budget=budget,
+                                     station_id=station_id,
+                                     lock=self.lock)
 
     def __init__(
         self,
         cache_limit: int,
         log: Callable[[Union[str, int, dict]], None],
-        delay: int,
+        delay: Optional[int],
         retries: int,
         backoff_factor: float,
         headers: dict = None,
         debug: bool = True,
         verify_https: bool = True,
+        disk_cache: Optional[DiskCache] = None,
+        cache_policy: Optional[CachePolicy] = None,
+        cache_bytes_limit: Optional[int] = None,
+        max_connections: int = 10,
+        scheduler: Optional[Scheduler] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        dataset_store: Optional['DatasetStore'] = None,
     ) -> None:
         self._cache_limit = cache_limit
         self._request_headers = headers or {}
         self.log = log
-        self.stations = []
+        self.stations: Dict[str, RequestHandler.Station] = {}
         self._delay = delay
         self._retries = retries
         self._backoff_factor = backoff_factor
         self._debug = debug
         self._verify_https = verify_https
+        self._disk_cache = disk_cache
+        self._cache_policy = cache_policy or CachePolicy()
+        self._negative_cache = NegativeCache(cache_policy=self._cache_policy,
+                                             disk_cache=disk_cache)
+        self._cache_budget = (CacheBudget(limit=cache_bytes_limit)
+                              if cache_bytes_limit else None)
+        self._lock = threading.Lock()
+        self._stripes = [threading.RLock() for _ in range(self.LOCK_STRIPES)]
+        self._revalidator = None
+        self._revalidations: Dict[str, Future] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._max_connections = max_connections
+        self._scheduler = scheduler
+        self._dataset_store = dataset_store
+        self._rate_limiter = rate_limiter or RateLimiter.from_delay(delay)
         self._session = self._create_session()
 
+    @property
+    def dataset_store(self) -> Optional['DatasetStore']:
+        """The store of the netCDF files of `use_opendap` queries, if any."""
+        return self._dataset_store
+
     def get_cache_limit(self) -> int:
         """Return the current station-level cache limit for NDBC requests."""
         return self._cache_limit
@@ -132,60 +225,189 @@ class RequestHandler(metaclass=Singleton):
         """Reset the request headers using the new supplied headers."""
         self._request_headers = request_headers
 
+    def cache_stats(self) -> Optional[dict]:
+        """Return the occupancy of the in-memory cache's byte budget, if any."""
+        if self._cache_budget is None:
+            return None
+        return self._cache_budget.stats()
+
     def has_station(self, station_id: Union[str, int]) -> bool:
         """Determine if the NDBC API already made a request to this station."""
-        for s in self.stations:
-            if s.id_ == station_id:
-                return True
-        return False
+        return str(station_id) in self.stations
 
     def get_station(self, station_id: Union[str, int]) -> Station:
         """Get `RequestCache` with  `id_` matching the supplied `station_id`."""
-        if isinstance(station_id, int):
-            station_id = str(station_id)
-        if not self.has_station(station_id):
+        station_id = str(station_id)
+        stn = self.stations.get(station_id)
+        if stn is not None:
             self.log(logging.DEBUG,
                      station_id=station_id,
-                     message=f'Adding station {station_id} to cache.')
-            self.add_station(station_id=station_id)
-        for s in self.stations:
-            if s.id_ == station_id:
+                     message=f'Found station {station_id} in cache.')
+            return stn
+        with self._lock:
+            if not self.has_station(station_id):
                 self.log(logging.DEBUG,
                          station_id=station_id,
-                         message=f'Found station {station_id} in cache.')
-                return s
+                         message=f'Adding station {station_id} to cache.')
+                self.add_station(station_id=station_id)
+            return self.stations[station_id]
 
     def add_station(self, station_id: Union[str, int]) -> None:
         """Add new new `RequestCache` for the supplied `station_id`."""
-        self.stations.append(
-            RequestHandler.Station(station_id=station_id,
-                                   cache_limit=self._cache_limit))
+        station_id = str(station_id)
+        self.stations[station_id] = RequestHandler.Station(
+            station_id=station_id,
+            cache_limit=self._cache_limit,
+            budget=self._cache_budget,
+            lock=self._stripes[hash(station_id) % self.LOCK_STRIPES])
 
-    def handle_requests(self, station_id: Union[str, int],
-                        reqs: List[str]) -> List[str]:  # pragma: no cover
-        """Handle many string-valued requests against a supplied station."""
-        responses = []
+    def dump_responses(self) -> Dict[str, Dict[str, dict]]:
+        """Copy the `{station_id: {request: response}}` pairs of the cache.
+
+        Each station's cache is copied under its lock, so that the copy is
+        consistent while other threads add responses.
+        """
+        with self._lock:
+            stations = list(self.stations.values())
+        data = dict()
+        for stn in stations:
+            with stn.lock:
+                data[stn.id_] = {
+                    req: node.v for req, node in stn.reqs.cache.items()
+                }
+        return data
+
+    def load_responses(self, data: Dict[str, Dict[str, dict]]) -> None:
+        """Add the `{station_id: {request: response}}` pairs of a cache dump."""
+        for station_id, reqs in data.items():
+            stn = self.get_station(station_id=station_id)
+            with stn.lock:
+                for req, resp in reqs.items():
+                    stn.reqs.put(request=req, response=resp)
+        if self._disk_cache is not None:
+            self._disk_cache.load(data)
+
+    def handle_requests(
+            self,
+            station_id: Union[str, int],
+            reqs: List[str],
+            since: Optional[datetime] = None) -> List[str]:  # pragma: no cover
+        """Handle many string-valued requests against a supplied station.
+
+        The requests are executed concurrently by the `scheduler`, if any,
+        and the responses are returned in the order of `reqs`.
+        """
         self.log(
             logging.INFO,
             message=f'Handling {len(reqs)} requests for station {station_id}.')
+        if self._scheduler is not None:
+            return self._scheduler.fetch_all(
+                lambda req: self.handle_request(
+                    station_id=station_id, req=req, since=since), reqs)
+        responses = []
         for req in reqs:
-            responses.append(self.handle_request(station_id=station_id,
-                                                 req=req))
+            responses.append(
+                self.handle_request(station_id=station_id,
+                                    req=req,
+                                    since=since))
         return responses
 
-    def handle_request(self, station_id: Union[str, int], req: str) -> dict:
-        """Handle a string-valued requests against a supplied station."""
+    def stream_requests(self, station_id: Union[str, int], reqs: List[str],
+                        callback: Callable[[int, dict], Any]) -> List[Any]:
+        """Handle many requests, passing each response to `callback`.
+
+        The `callback` is called with the index of each request in `reqs`
+        and its response, in the thread which executed the request, so that
+        responses are processed as they are received rather than once all
+        of them are held.
+
+        Returns:
+            The value returned by `callback` for each request, in the order
+            of `reqs`.
+        """
+        self.log(
+            logging.INFO,
+            message=f'Streaming {len(reqs)} requests for station {station_id}.')
+
+        def handle(index: int) -> Any:
+            return callback(
+                index,
+                self.handle_request(station_id=station_id, req=reqs[index]))
+
+        if self._scheduler is not None:
+            return self._scheduler.fetch_all(handle, range(len(reqs)))
+        return [handle(index) for index in range(len(reqs))]
+
+    def handle_request(self,
+                       station_id: Union[str, int],
+                       req: str,
+                       since: Optional[datetime] = None) -> dict:
+        """Handle a string-valued requests against a supplied station.
+
+        Cached responses are served while fresh under the `cache_policy`.
+        Stale responses are served while they are refreshed in the
+        background, and expired responses are requested again. Both are
+        requested conditionally on their `ETag` and `Last-Modified`
+        validators, and renewed without their body if not modified.
+        Concurrent callers for a request which is already being executed
+        wait for its response rather than executing it again.
+
+        Realtime files are only requested up to the observations `since`,
+        if it is within `config.TAIL_FETCH_WINDOW`, using HTTP `Range`
+        requests. Requests which were not found are not requested again
+        for the negative time-to-live of the `cache_policy`.
+        """
         stn = self.get_station(station_id=station_id)
         self.log(logging.DEBUG, message=f'Handling request {req}.')
-        if req not in stn.reqs.cache:
-            self.log(logging.DEBUG, message=f'Adding request {req} to cache.')
-            resp = self.execute_request(url=req,
-                                        station_id=station_id,
-                                        headers=self._request_headers)
-            stn.reqs.put(request=req, response=resp)
-        else:
-            self.log(logging.DEBUG, message=f'Request {req} already in cache.')
-        return stn.reqs.get(request=req)
+        tail = tail_eligible(url=req, since=since)
+        entry = self._get_cached(stn=stn, req=req)
+        if entry is None and self._negative_cache.missing(request=req):
+            self.log(logging.DEBUG,
+                     message=f'Request {req} is known to be missing.')
+            return not_found()
+        if entry is not None:
+            resp, created = entry
+            state = self._cache_policy.state(url=req, created=created)
+            if state == FRESH or (state == STALE and not tail):
+                if state == STALE:
+                    self._revalidate(stn=stn, req=req, cached=resp)
+                return resp
+            if not tail:
+                self.log(logging.DEBUG,
+                         message=f'Request {req} expired in cache.')
+                return self._fetch(stn=stn, req=req, cached=resp)
+        if tail:
+            return self._fetch_tail(stn=stn, req=req, since=since)
+        return self._fetch(stn=stn, req=req)
+
+    def inspect(self,
+                station_id: Union[str, int],
+                req: str,
+                since: Optional[datetime] = None) -> dict:
+        """Describe how `handle_request` would handle a request, without it.
+
+        Returns:
+            A `dict` with where the response is `cached` (`'memory'`,
+            `'disk'`, `'missing'` or `None`), its `state` under the
+            `cache_policy` and body `size` if cached, and whether the
+            request would be made with HTTP `range` requests.
+        """
+        stn = self.get_station(station_id=station_id)
+        tail = tail_eligible(url=req, since=since)
+        with stn.lock:
+            entry = memory_entry(stn.reqs, req)
+        if entry is not None:
+            return describe(self._cache_policy, req, tail, MEMORY, entry)
+        if self._disk_cache is not None:
+            entry = self._disk_cache.stat(request=req)
+            if entry is not None:
+                return describe(self._cache_policy, req, tail, DISK, entry)
+        if self._negative_cache.missing(request=req):
+            return describe_missing(tail)
+        if tail:
+            with stn.lock:
+                entry = memory_entry(stn.reqs, req + TAIL_SUFFIX, since=since)
+        return describe(self._cache_policy, req, tail, MEMORY, entry)
 
     def execute_request(self, station_id: Union[str, int], url: str,
                         headers: dict) -> dict:  # pragma: no cover
@@ -194,26 +416,265 @@ class RequestHandler(metaclass=Singleton):
                  station_id=station_id,
                  message=f'GET: {url}',
                  extra_data={'headers': headers})
+        self._rate_limiter.acquire(url)
+        # gzip archives are decompressed while streaming the response
+        stream = url.endswith(GZIP_FILE_SUFFIX)
         response = self._session.get(
             url=url,
             headers=headers,
             allow_redirects=True,
             verify=self._verify_https,
+            stream=stream,
         )
         self.log(logging.DEBUG,
                  station_id=station_id,
                  message=f'Response status: {response.status_code}')
+        validators = response_validators(response.headers)
+        if response.status_code == NOT_MODIFIED:
+            response.close()
+            return dict(status=response.status_code, body='', **validators)
+        if response.status_code == PARTIAL_CONTENT:
+            return dict(status=response.status_code,
+                        body=response.text,
+                        length=content_length(
+                            response.headers.get('Content-Range')),
+                        **validators)
         if response.status_code != 200:  # web request did not succeed
+            response.close()
             return dict(status=response.status_code, body='')
+        elif stream:
+            with response:
+                body = decompress_chunks(
+                    response.iter_content(chunk_size=GZIP_CHUNK_SIZE))
+            return dict(status=response.status_code, body=body, **validators)
         elif any([
                 'netcdf' in response.headers.get('Content-Type').lower(),
                 'octet' in response.headers.get('Content-Type').lower()
         ]):
-            return dict(status=response.status_code, body=response.content)
-        return dict(status=response.status_code, body=response.text)
+            return dict(status=response.status_code,
+                        body=response.content,
+                        **validators)
+        return dict(status=response.status_code,
+                    body=response.text,
+                    **validators)
 
     """ PRIVATE """
 
+    def _get_cached(self, stn: Station,
+                    req: str) -> Optional[Tuple[dict, float]]:
+        """Find a cached response and its creation time, in memory or on disk."""
+        with stn.lock:
+            if req in stn.reqs.cache:
+                self.log(logging.DEBUG,
+                         message=f'Request {req} already in cache.')
+                return stn.reqs.get(request=req), stn.reqs.created(request=req)
+        if self._disk_cache is None:
+            return None
+        entry = self._disk_cache.get_entry(request=req)
+        if entry is not None:
+            self.log(logging.DEBUG,
+                     message=f'Request {req} found in disk cache.')
+            with stn.lock:
+                stn.reqs.put(request=req, response=entry[0], created=entry[1])
+        return entry
+
+    def _fetch(self,
+               stn: Station,
+               req: str,
+               cached: Optional[dict] = None) -> dict:
+        """Execute and cache a request, once for all concurrent callers."""
+        with self._lock:
+            inflight = self._inflight.get(req)
+            if inflight is None:
+                inflight = self._inflight[req] = Future()
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            self.log(logging.DEBUG,
+                     message=f'Waiting for request {req} in flight.')
+            return inflight.result()
+        try:
+            self.log(logging.DEBUG, message=f'Adding request {req} to cache.')
+            resp, modified = self._execute(stn=stn, req=req, cached=cached)
+            if cached is not None and resp.get('status') not in (200,
+                                                                 NOT_FOUND):
+                self.log(logging.WARNING,
+                         station_id=stn.id_,
+                         message=(f'Failed to revalidate request {req}, '
+                                  f'status {resp.get("status")}, serving '
+                                  'the expired response.'))
+                resp = cached
+            else:
+                self._store(stn=stn, req=req, resp=resp, modified=modified)
+        except BaseException as e:
+            inflight.set_exception(e)
+            raise
+        else:
+            inflight.set_result(resp)
+        finally:
+            with self._lock:
+                del self._inflight[req]
+        return resp
+
+    def _execute(self,
+                 stn: Station,
+                 req: str,
+                 cached: Optional[dict] = None) -> Tuple[dict, bool]:
+        """Execute a request, conditionally on the `cached` response if any.
+
+        Returns:
+            The response, which is the renewed `cached` response if it was
+            not modified, and whether it was modified.
+        """
+        headers = self._request_headers
+        if cached is not None:
+            headers = {**headers, **conditional_headers(cached)}
+        resp = self.execute_request(url=req,
+                                    station_id=stn.id_,
+                                    headers=headers)
+        if cached is not None and resp.get('status') == NOT_MODIFIED:
+            self.log(logging.DEBUG, message=f'Request {req} not modified.')
+            return revalidated(cached, resp), False
+        return resp, True
+
+    def _store(self,
+               stn: Station,
+               req: str,
+               resp: dict,
+               modified: bool = True) -> None:
+        """Cache a response in memory and, if configured, on disk."""
+        if resp.get('status') == NOT_FOUND:
+            self._negative_cache.add(request=req, station_id=stn.id_)
+            with stn.lock:
+                stn.reqs.discard(request=req)
+            return
+        if resp.get('status') != 200:
+            return  # errors are requested again rather than cached
+        if self._disk_cache is not None:
+            store = (self._disk_cache.put
+                     if modified else self._disk_cache.refresh)
+            store(request=req, response=resp, station_id=stn.id_)
+        with stn.lock:
+            stn.reqs.put(request=req, response=resp)
+
+    def _fetch_tail(self, stn: Station, req: str, since: datetime) -> dict:
+        """Serve or execute the range requests of a realtime file.
+
+        The ranges are executed once for all concurrent callers. Callers
+        whose `since` is not covered by the ranges they waited for request
+        further ranges.
+        """
+        key = req + TAIL_SUFFIX
+        while True:
+            cached = None
+            with stn.lock:
+                if key in stn.reqs.cache:
+                    cached = stn.reqs.get(request=key)
+                    created = stn.reqs.created(request=key)
+            if cached is not None and covers(cached, since):
+                if self._cache_policy.state(url=req,
+                                            created=created) == FRESH:
+                    return cached
+            else:
+                cached = None
+            with self._lock:
+                inflight = self._inflight.get(key)
+                if inflight is None:
+                    inflight = self._inflight[key] = Future()
+                    break
+            self.log(logging.DEBUG,
+                     message=f'Waiting for the ranges of request {req}.')
+            resp = inflight.result()
+            if 'covers' not in resp or covers(resp, since):
+                return resp
+        try:
+            resp = self._execute_tail(stn=stn,
+                                      req=req,
+                                      since=since,
+                                      cached=cached)
+            if 'covers' in resp:
+                with stn.lock:
+                    stn.reqs.put(request=key, response=resp)
+            else:
+                # the whole file, if the server ignored the range
+                self._store(stn=stn, req=req, resp=resp)
+        except BaseException as e:
+            inflight.set_exception(e)
+            raise
+        else:
+            inflight.set_result(resp)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return resp
+
+    def _execute_tail(self,
+                      stn: Station,
+                      req: str,
+                      since: datetime,
+                      cached: Optional[dict] = None) -> dict:
+        """Request leading ranges of a realtime file until they cover `since`.
+
+        The first range is requested conditionally on the `cached` response
+        if any, which is renewed if it was not modified.
+        """
+        tail = TailFetch(since=since)
+        headers = {**self._request_headers, **tail.headers()}
+        if cached is not None:
+            headers.update(conditional_headers(cached))
+        resp = self.execute_request(url=req,
+                                    station_id=stn.id_,
+                                    headers=headers)
+        if cached is not None and resp.get('status') == NOT_MODIFIED:
+            self.log(logging.DEBUG, message=f'Request {req} not modified.')
+            return revalidated(cached, resp)
+        while tail.feed(resp):
+            self.log(logging.DEBUG,
+                     message=f'Extending the range of request {req}.')
+            resp = self.execute_request(
+                url=req,
+                station_id=stn.id_,
+                headers={
+                    **self._request_headers,
+                    **tail.headers()
+                })
+        return tail.response()
+
+    def _revalidate(self, stn: Station, req: str, cached: dict) -> None:
+        """Refresh a stale response in the background, once at a time."""
+        with self._lock:
+            pending = self._revalidations.get(req)
+            if req in self._inflight or (pending is not None and
+                                         not pending.done()):
+                return  # the request is already being executed
+            if self._revalidator is None:
+                self._revalidator = ThreadPoolExecutor(
+                    max_workers=self.REVALIDATE_WORKERS,
+                    thread_name_prefix='ndbc-api-revalidate')
+            self._revalidations = {
+                k: f for k, f in self._revalidations.items() if not f.done()
+            }
+            self._revalidations[req] = self._revalidator.submit(
+                self._refresh, stn, req, cached)
+
+    def _refresh(self, stn: Station, req: str, cached: dict) -> None:
+        """Refresh a stale response, keeping it if the request fails."""
+        try:
+            resp, modified = self._execute(stn=stn, req=req, cached=cached)
+        except Exception as e:
+            self.log(logging.WARNING,
+                     station_id=stn.id_,
+                     message=f'Failed to revalidate request {req}: {e}')
+            return
+        if resp.get('status') != 200:
+            self.log(logging.WARNING,
+                     station_id=stn.id_,
+                     message=(f'Failed to revalidate request {req}, status '
+                              f'{resp.get("status")}.'))
+            return
+        self._store(stn=stn, req=req, resp=resp, modified=modified)
+
     def _create_session(self) -> requests.Session:
         """create a new `Session` using `RequestHandler` configuration."""
         self.log(logging.DEBUG, message='Creating new session.')
@@ -222,7 +683,8 @@ class RequestHandler(metaclass=Singleton):
             backoff_factor=self._backoff_factor,
             total=self._retries,
         )
-        http_adapter = requests.adapters.HTTPAdapter(max_retries=retry)
+        http_adapter = requests.adapters.HTTPAdapter(
+            max_retries=retry, pool_maxsize=self._max_connections)
         session.mount('https://', http_adapter)
         session.mount('http://', http_adapter)
         self.log(logging.INFO, message='Created session.')
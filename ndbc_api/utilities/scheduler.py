@@ -0,0 +1,93 @@
+"""Bounded, persistent worker pools shared by every `NdbcApi` data query.
+
+This module defines the `Scheduler` used by the `NdbcApi` and its
+`RequestHandler`. Each `(station, mode)` task of a `get_data` call, which
+builds the task's requests and parses its responses, runs on a pool of at most
+`max_workers` task threads. The requests of those tasks are executed on a
+second pool of at most `max_connections` fetch threads, matching the size of
+the handler's HTTP connection pool, so that network and parsing work overlap
+across all stations and modes without exhausting the pool.
+
+Task threads only wait on fetch threads, and fetch threads never wait on
+either pool, so tasks cannot deadlock however many are submitted. Both pools
+are created on first use and their threads are reused across calls.
+
+Example:
+    ```python3
+        scheduler = Scheduler(max_workers=16, max_connections=10)
+        future = scheduler.submit(parse_station, 'tplm2')
+        responses = scheduler.fetch_all(handle_request, urls)
+    ```
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional
+
+TASK_THREAD_PREFIX = 'ndbc-api-task'
+FETCH_THREAD_PREFIX = 'ndbc-api-fetch'
+
+
+class Scheduler:
+    """Task and fetch thread pools with fixed upper bounds.
+
+    Attributes:
+        max_workers (:int:): The maximum number of tasks run at once.
+        max_connections (:int:): The maximum number of requests executed at
+            once, which should not exceed the HTTP connection pool size.
+    """
+
+    __slots__ = 'max_workers', 'max_connections', '_tasks', '_fetches', '_lock'
+
+    def __init__(self, max_workers: int, max_connections: int) -> None:
+        if max_workers < 1 or max_connections < 1:
+            raise ValueError(
+                '`max_workers` and `max_connections` must be positive.')
+        self.max_workers = max_workers
+        self.max_connections = max_connections
+        self._tasks: Optional[ThreadPoolExecutor] = None
+        self._fetches: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Schedule a task, such as the requests and parsing of a station."""
+        return self._task_pool().submit(fn, *args, **kwargs)
+
+    def fetch_all(self, fn: Callable[[Any], Any],
+                  items: Iterable[Any]) -> List[Any]:
+        """Call `fn` on each of `items` concurrently, returning in order.
+
+        Calls made from a fetch thread are run in that thread, as waiting on
+        the fetch pool from within it could exhaust the pool.
+        """
+        items = list(items)
+        if len(items) < 2 or threading.current_thread().name.startswith(
+                FETCH_THREAD_PREFIX):
+            return [fn(item) for item in items]
+        return list(self._fetch_pool().map(fn, items))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads, they are restarted on the next call."""
+        with self._lock:
+            pools, self._tasks, self._fetches = (self._tasks,
+                                                 self._fetches), None, None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=wait)
+
+    """ PRIVATE """
+
+    def _task_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._tasks is None:
+                self._tasks = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=TASK_THREAD_PREFIX)
+            return self._tasks
+
+    def _fetch_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._fetches is None:
+                self._fetches = ThreadPoolExecutor(
+                    max_workers=self.max_connections,
+                    thread_name_prefix=FETCH_THREAD_PREFIX)
+            return self._fetches
@@ -0,0 +1,90 @@
+"""Parses the responses of one station and mode of a data query.
+
+This module supports the `AsyncNdbcApi`, which runs the CPU-bound stages of
+a data query in a thread or process pool. `parse_station_data` is kept at
+module level so that it can be sent to a process pool, and returns data
+which can be merged across stations by `data_helpers.handle_accumulate_data`.
+"""
+from datetime import datetime
+from typing import Any, List, Optional, Tuple, Union
+
+from ..exceptions import ParserException, ResponseException
+from .columnar import ColumnarData
+from .data_helpers import enforce_timerange, handle_data
+from .opendap.cube import TimeCube
+from .opendap.dap import DapSubset
+from .opendap.dataset import (
+    filter_dataset_by_time_range,
+    filter_dataset_by_variable,
+)
+
+
+def parse_station_data(
+    parser: Any,
+    responses: Union[List[dict], DapSubset, TimeCube],
+    station_id: str,
+    start_time: datetime,
+    end_time: datetime,
+    use_timestamp: bool = True,
+    cols: Optional[List[str]] = None,
+    use_opendap: bool = False,
+    load: bool = False,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    stride: Optional[int] = None,
+) -> Any:
+    """Parse, filter and attribute the responses of one station and mode.
+
+    These are the CPU-bound stages of a data query, kept at module level
+    so that they can be run in a thread or process pool.  Columnar data is
+    attributed to *station_id* and kept columnar until accumulation; if
+    *load* is ``True``, an ``xarray.Dataset`` is read into memory so that
+    it can be returned from another process.  The *responses* of an
+    ``xarray.Dataset`` query may be a completed ``DapSubset``, or a
+    ``TimeCube`` into which they were decoded as they were received.  Its
+    grid is bounded by the ``(min_lon, min_lat, max_lon, max_lat)`` *bbox*
+    and decimated to every *stride*-th cell, if any, as the responses are
+    decoded; those of a ``DapSubset`` or ``TimeCube`` already are.
+
+    Raises:
+        ResponseException: If the responses cannot be parsed.
+        ParserException: If column selection fails.
+    """
+    try:
+        if isinstance(responses, DapSubset):
+            data = parser.nc_from_dap(responses)
+        elif isinstance(responses, TimeCube):
+            data = parser.nc_from_cube(responses)
+        elif use_opendap:
+            data = parser.nc_from_responses(responses=responses,
+                                            use_timestamp=use_timestamp,
+                                            bbox=bbox,
+                                            stride=stride)
+        else:
+            data = parser.parse_columns(responses=responses,
+                                        use_timestamp=use_timestamp)
+    except Exception as e:  # pragma: no cover
+        raise ResponseException(
+            f'Failed to parse responses.\nRaised from {e}') from e
+
+    if use_timestamp:
+        if use_opendap:
+            data = filter_dataset_by_time_range(data, start_time, end_time)
+        else:
+            data = enforce_timerange(df=data,
+                                     start_time=start_time,
+                                     end_time=end_time)
+    try:
+        if use_opendap:
+            data = filter_dataset_by_variable(data, cols) if cols else data
+            return data.load() if load else data
+        # Keep the columnar data until accumulation to merge stations cheaply
+        data = handle_data(data, as_df=False, as_pl=False, cols=cols)
+    except (ValueError, KeyError, AttributeError) as e:  # pragma: no cover
+        raise ParserException(
+            f'Failed to handle returned data.\nRaised from {e}') from e
+
+    if isinstance(data, ColumnarData):
+        return data.with_station(station_id)
+    for row in data:
+        row['station_id'] = station_id
+    return data
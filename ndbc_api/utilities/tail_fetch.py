@@ -0,0 +1,163 @@
+"""Fetches the newest observations of realtime files with HTTP Range requests.
+
+The NDBC realtime files (`data/realtime2/` and `data/5day2/`) hold the last
+45 or 5 days of observations, newest first. When a query only covers the
+last few hours, the `RequestHandler` and `AsyncRequestHandler` request the
+leading bytes of the file with a `Range` header rather than the whole file. The range is extended, doubling in size,
+until its oldest complete observation is at or before the start of the
+query. Servers which ignore the `Range` header reply with the whole file,
+which is used as is.
+
+Responses to range requests are cached separately from the whole file, with
+the `covers` timestamp of their oldest observation, so that they are only
+served to queries which they cover.
+
+Example:
+    ```python3
+        tail = TailFetch(since=datetime.now() - timedelta(hours=1))
+        response = execute_request(url, headers=tail.headers())
+        while tail.feed(response):
+            response = execute_request(url, headers=tail.headers())
+        response = tail.response()
+    ```
+"""
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from ..config import TAIL_FETCH_BYTES, TAIL_FETCH_WINDOW
+from .cache_policy import VALIDATORS
+from .gzip_stream import GZIP_FILE_SUFFIX
+
+PARTIAL_CONTENT = 206
+RANGE_NOT_SATISFIABLE = 416
+REALTIME_URL_PREFIXES = ('data/realtime2/', 'data/5day2/')
+# responses to range requests are cached under the url with this suffix
+TAIL_SUFFIX = '#tail'
+
+_CONTENT_RANGE = re.compile(r'bytes\s+(?:\d+-\d+|\*)/(\d+)')
+
+
+def tail_eligible(url: str,
+                  since: Optional[datetime],
+                  now: Optional[datetime] = None) -> bool:
+    """Whether the observations of `url` since `since` are fetched by range."""
+    if since is None or not TAIL_FETCH_WINDOW:
+        return False
+    if url.endswith(GZIP_FILE_SUFFIX) or not any(
+            prefix in url for prefix in REALTIME_URL_PREFIXES):
+        return False
+    now = datetime.now() if now is None else now
+    return now - since < timedelta(seconds=TAIL_FETCH_WINDOW)
+
+
+def content_length(content_range: Optional[str]) -> Optional[int]:
+    """The complete length of a file, from a `Content-Range` header."""
+    match = _CONTENT_RANGE.match(content_range or '')
+    return int(match.group(1)) if match else None
+
+
+def covers(response: dict, since: datetime) -> bool:
+    """Whether a cached range `response` covers the observations `since`."""
+    return datetime.fromisoformat(response['covers']) <= since
+
+
+def oldest_observation(body: str) -> Optional[datetime]:
+    """The timestamp of the last complete line of a realtime file."""
+    end = body.rfind('\n')
+    if end < 0:
+        return None
+    line = body[body.rfind('\n', 0, end) + 1:end].split()
+    try:
+        return datetime(*(int(v) for v in line[:5]))
+    except (TypeError, ValueError):
+        return None
+
+
+class TailFetch:
+    """The leading ranges of a realtime file, until they cover `since`.
+
+    Attributes:
+        since (:obj:`datetime.datetime`): The timestamp of the oldest
+            observation required.
+        size (:int:): The size of the next range, in bytes.
+        offset (:int:): The number of bytes received so far.
+    """
+
+    __slots__ = 'since', 'size', 'offset', '_chunks', '_validators', '_final'
+
+    def __init__(self, since: datetime, size: int = TAIL_FETCH_BYTES) -> None:
+        self.since = since
+        self.size = size
+        self.offset = 0
+        self._chunks: List[str] = []
+        self._validators: Dict[str, str] = {}
+        self._final: Optional[dict] = None
+
+    def headers(self) -> Dict[str, str]:
+        """The headers requesting the next range of the file."""
+        end = self.offset + self.size - 1
+        headers = {'Range': f'bytes={self.offset}-{end}'}
+        if self.offset and self._validators.get('etag'):
+            # the whole file is sent instead if it changed in the meantime
+            headers['If-Range'] = self._validators['etag']
+        return headers
+
+    def feed(self, response: dict) -> bool:
+        """Add the response to a range request.
+
+        Returns:
+            Whether another range must be requested to cover `since`.
+        """
+        status = response.get('status')
+        if status == RANGE_NOT_SATISFIABLE and self.offset:
+            # the previous range ended exactly at the end of the file
+            self._final = self._response(complete=True)
+            return False
+        if status != PARTIAL_CONTENT:
+            # the whole file, if the range was ignored, or an error
+            self._final = response
+            return False
+        body = response.get('body') or ''
+        if not self.offset:
+            self._validators = {
+                k: response[k] for k in VALIDATORS if response.get(k)
+            }
+        received = len(body.encode())
+        self._chunks.append(body)
+        self.offset += received
+        length = response.get('length')
+        if received < self.size or (length is not None and
+                                    self.offset >= length):
+            self._final = self._response(complete=True)
+            return False
+        oldest = oldest_observation(''.join(self._chunks))
+        if oldest is not None and oldest <= self.since:
+            self._final = self._response(complete=False)
+            return False
+        self.size *= 2
+        return True
+
+    def response(self) -> dict:
+        """The response to the range requests.
+
+        Returns:
+            The response, with the `covers` timestamp of its oldest
+            observation unless it holds the whole file.
+        """
+        if self._final is None:
+            raise ValueError('The range requests are not complete.')
+        return self._final
+
+    """ PRIVATE """
+
+    def _response(self, complete: bool) -> dict:
+        body = ''.join(self._chunks)
+        response = dict(status=200, **self._validators)
+        if complete:
+            return dict(response, body=body)
+        # drop the last line, which may be cut short by the range
+        body = body[:body.rfind('\n') + 1]
+        return dict(response,
+                    body=body,
+                    covers=oldest_observation(body).isoformat())
@@ -76,7 +76,7 @@ def test_attrs(
             start_time=TEST_START,
             end_time=TEST_END,
         )
-        got = pd.DataFrame(got)
+        got = got.to_pandas()
         if 'timestamp' in got.columns:
             got.set_index('timestamp', inplace=True)
         assert isinstance(got, pd.DataFrame)
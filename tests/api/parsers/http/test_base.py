@@ -0,0 +1,114 @@
+import pandas as pd
+import pytest
+import yaml
+
+from ndbc_api.api.parsers.http._base import BaseParser
+from ndbc_api.api.parsers.http.adcp import AdcpParser
+from ndbc_api.api.parsers.http.cwind import CwindParser
+from ndbc_api.api.parsers.http.ocean import OceanParser
+from ndbc_api.api.parsers.http.spec import SpecParser
+from ndbc_api.api.parsers.http.stdmet import StdmetParser
+from ndbc_api.api.parsers.http.supl import SuplParser
+from ndbc_api.api.parsers.http.swden import SwdenParser
+from ndbc_api.api.parsers.http.swdir import SwdirParser
+from ndbc_api.api.parsers.http.swdir2 import Swdir2Parser
+from ndbc_api.api.parsers.http.swr1 import Swr1Parser
+from ndbc_api.api.parsers.http.swr2 import Swr2Parser
+from ndbc_api.exceptions import ParserException
+from ndbc_api.utilities.columnar import ColumnarData
+from tests.api.parsers.http._base import RESPONSES_TESTS_DIR
+
+TXT_DIR = RESPONSES_TESTS_DIR.joinpath('txt')
+TXT_PARSERS = {
+    '44013.txt': StdmetParser,
+    '44013.dmv': StdmetParser,
+    '44013.spec': SpecParser,
+    '44013.supl': SuplParser,
+    '44013.data_spec': SwdenParser,
+    '44013.swdir': SwdirParser,
+    '44013.swdir2': Swdir2Parser,
+    '44013.swr1': Swr1Parser,
+    '44013.swr2': Swr2Parser,
+    '44029.adcp': AdcpParser,
+    '44029.ocean': OceanParser,
+    'TPLM2.cwind': CwindParser,
+}
+YML_PARSERS = {
+    'stdmet': StdmetParser,
+    'ocean': OceanParser,
+    'spec': SpecParser,
+}
+
+
+def _assert_engines_match(parser, responses):
+    for use_timestamp in (True, False):
+        want = parser.parse_responses(responses,
+                                      use_timestamp=use_timestamp,
+                                      engine='python')
+        got = parser.parse_responses(responses,
+                                     use_timestamp=use_timestamp,
+                                     engine='numpy')
+        assert got == want
+        assert [list(r) for r in got] == [list(r) for r in want]
+        pd.testing.assert_frame_equal(pd.DataFrame(got), pd.DataFrame(want))
+        # bodies decompressed from `.txt.gz` archives are bytes
+        encoded = [
+            dict(r, body=r['body'].encode()) if r.get('body') else r
+            for r in responses
+        ]
+        for engine in parser.ENGINES:
+            assert parser.parse_responses(encoded,
+                                          use_timestamp=use_timestamp,
+                                          engine=engine) == want
+        want_df = ColumnarData.from_records(want).to_pandas()
+        for engine in parser.ENGINES:
+            got_df = parser.parse_columns(responses,
+                                          use_timestamp=use_timestamp,
+                                          engine=engine).to_pandas()
+            # columns only seen in dropped rows are kept, but empty
+            assert got_df.drop(columns=want_df.columns).isna().all().all()
+            pd.testing.assert_frame_equal(got_df[want_df.columns],
+                                          want_df,
+                                          check_dtype=False)
+
+
+@pytest.mark.private
+@pytest.mark.parametrize('name', list(TXT_PARSERS))
+def test_numpy_engine_matches_txt(name):
+    with open(TXT_DIR.joinpath(name), 'r') as f:
+        responses = [{'status': 200, 'body': f.read()}]
+    _assert_engines_match(TXT_PARSERS[name], responses)
+
+
+@pytest.mark.private
+@pytest.mark.parametrize('name', list(YML_PARSERS))
+def test_numpy_engine_matches_yml(name):
+    with open(RESPONSES_TESTS_DIR.joinpath(f'{name}.yml'), 'r') as f:
+        responses = yaml.safe_load(f)
+    _assert_engines_match(YML_PARSERS[name], responses)
+
+
+@pytest.mark.private
+def test_numpy_engine_edge_cases():
+    body = ('#YY  MM DD hh mm WDIR WSPD  PRES\n'
+            '2020 01 01 01 00  270  5.0    MM\n'
+            '2020 01 01 00 00  999  5.5 101.2\n'
+            '2020 02 30 00 00  280  6.0 101.3\n'
+            '2020 01 01 00 00  290  9.0 101.4\n'
+            '  99 01 01 00 00  300  1e5 101.5\n')
+    _assert_engines_match(StdmetParser, [{'status': 200, 'body': body}])
+    ragged = body.replace(' 101.3\n', '\n')
+    _assert_engines_match(StdmetParser, [{'status': 200, 'body': ragged}])
+    _assert_engines_match(StdmetParser, [
+        {'status': 404, 'body': ''},
+        {'status': 200, 'body': body.replace('\n', '\r\n')},
+        {'status': 200, 'body': body.replace('1e5', '4.5')},
+    ])
+
+
+@pytest.mark.private
+def test_engine_selection(monkeypatch):
+    with pytest.raises(ParserException):
+        StdmetParser.parse_responses([], engine='foo')
+    monkeypatch.setattr(BaseParser, 'ENGINE', 'python')
+    assert StdmetParser.parse_responses([]) == []
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ndbc_api.api.parsers.http.latest_observations import \
+    LatestObservationsParser
+from ndbc_api.exceptions import ResponseException
+
+LATEST_OBS_BODY = (
+    '#STN       LAT      LON  YYYY MM DD hh mm WDIR WSPD   GST WVHT  DPD APD'
+    ' MWD   PRES  PTDY  ATMP  WTMP  DEWP  VIS   TIDE\n'
+    '#text      deg      deg   yr mo day hr mn degT  m/s   m/s   m   sec sec'
+    ' degT   hPa   hPa  degC  degC  degC  nmi     ft\n'
+    '13001   12.000  -23.000 2024 05 20 12 00  50   7.0    MM   MM   MM  MM'
+    '  MM 1012.5    MM  26.0  26.3    MM   MM    MM\n'
+    '41001   34.724  -72.317 2024 05 20 11 50 200   6.0   8.0  1.5   8  5.9'
+    ' 150 1015.6  +0.5  22.1  23.4  19.9   MM    MM\n'
+    'ALSN6   40.451  -73.810 2024 05 20 12 00 230   4.1   5.2   MM   MM  MM'
+    '  MM 1016.0  -0.3  18.8    MM  15.0   MM    MM\n')
+
+
+@pytest.fixture
+def latest_obs_response():
+    yield {'status': 200, 'body': LATEST_OBS_BODY}
+
+
+@pytest.fixture
+def latest_observations():
+    yield LatestObservationsParser
+
+
+@pytest.mark.parametrize('engine', ['numpy', 'python'])
+def test_parse_response(latest_observations, latest_obs_response, engine):
+    got = latest_observations.parse_response(latest_obs_response,
+                                             engine=engine)
+    assert list(got.station_ids()) == ['13001', '41001', 'alsn6']
+    assert 'STN' not in got.columns
+    df = pd.DataFrame(got.to_records())
+    assert list(df['timestamp']) == list(
+        pd.to_datetime(
+            ['2024-05-20 12:00', '2024-05-20 11:50', '2024-05-20 12:00']))
+    assert np.isnan(df['GST'][0])
+    assert df['PRES'][1] == pytest.approx(1015.6)
+    assert df['LAT'][2] == pytest.approx(40.451)
+
+
+def test_parse_response_station_ids(latest_observations, latest_obs_response):
+    got = latest_observations.parse_response(latest_obs_response,
+                                             station_ids=['alsn6', '41001'])
+    assert list(got.station_ids()) == ['41001', 'alsn6']
+
+
+def test_parse_response_failed(latest_observations):
+    with pytest.raises(ResponseException):
+        latest_observations.parse_response({'status': 404, 'body': ''})
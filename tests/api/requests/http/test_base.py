@@ -1,8 +1,12 @@
+from datetime import datetime, timedelta
+
 import pytest
 
 from ndbc_api.api.requests.http._base import BaseRequest
 from ndbc_api.api.requests.http.adcp import AdcpRequest
-from tests.api.requests.http._base import HISTORICAL_START, REALTIME_END
+from ndbc_api.api.requests.http.stdmet import StdmetRequest
+from tests.api.requests.http._base import (BASE_URL, HISTORICAL_END,
+                                           HISTORICAL_START, REALTIME_END)
 
 TEST_STN = '41117'
 
@@ -31,3 +35,65 @@ def test_base_fail(base):
         raise AssertionError
     except ValueError:
         pass
+
+
+@pytest.mark.private
+def test_base_gzip_transport(monkeypatch):
+    monkeypatch.setenv('MOCKDATE', '2021-08-01')
+    monkeypatch.setattr(BaseRequest, 'HISTORICAL_TRANSPORT', 'gzip')
+    got = StdmetRequest.build_request('tplm2', HISTORICAL_START, HISTORICAL_END)
+    assert got[:2] == [
+        f'{BASE_URL}data/historical/stdmet/tplm2h2020.txt.gz',
+        f'{BASE_URL}data/stdmet/Jan/tplm212021.txt.gz',
+    ]
+    assert not any('view_text_file' in url for url in got)
+    monkeypatch.setattr(BaseRequest, 'HISTORICAL_TRANSPORT', 'foo')
+    with pytest.raises(ValueError):
+        StdmetRequest.build_request('tplm2', HISTORICAL_START, HISTORICAL_END)
+
+
+@pytest.mark.private
+def test_plan_five_day(monkeypatch):
+    monkeypatch.setenv('MOCKDATE', '2022-08-13')
+    now = datetime(2022, 8, 13)
+    plan = StdmetRequest.plan('tplm2', now - timedelta(days=2), now)
+    assert [p.family for p in plan] == ['5day']
+    assert plan[0].url == f'{BASE_URL}data/5day2/TPLM2_5day.txt'
+    assert plan[0].days == 5
+    # older windows, and modes without a 5-day file, use the 45-day file
+    plan = StdmetRequest.plan('tplm2', now - timedelta(days=10), now)
+    assert [p.url for p in plan] == [f'{BASE_URL}data/realtime2/TPLM2.txt']
+    plan = AdcpRequest.plan('41117', now - timedelta(days=2), now)
+    assert [p.family for p in plan] == ['realtime']
+
+
+@pytest.mark.private
+def test_plan_archives(monkeypatch):
+    monkeypatch.setenv('MOCKDATE', '2022-08-13')
+    plan = StdmetRequest.plan('tplm2', datetime(2021, 11, 1),
+                              datetime(2022, 3, 31))
+    assert [(p.family, p.start.year, p.start.month) for p in plan] == [
+        ('yearly', 2021, 1),
+        ('monthly', 2022, 1),
+        ('monthly', 2022, 2),
+        ('monthly', 2022, 3),
+    ]
+    assert plan[-1].end == datetime(2022, 4, 1)
+    assert StdmetRequest.build_request(
+        'tplm2', datetime(2021, 11, 1),
+        datetime(2022, 3, 31)) == [p.url for p in plan]
+
+
+@pytest.mark.private
+def test_plan_unarchived_year(monkeypatch):
+    # early in the year, the last year is still published monthly
+    monkeypatch.setenv('MOCKDATE', '2023-01-20')
+    plan = StdmetRequest.plan('tplm2', datetime(2021, 6, 1),
+                              datetime(2023, 1, 15))
+    families = [p.family for p in plan]
+    assert families == ['yearly'] + ['monthly'] * 12 + [
+        'current_month', 'realtime'
+    ]
+    assert plan[0].start.year == 2021
+    assert plan[1].start == datetime(2022, 1, 1)
+    assert plan[-2].url == f'{BASE_URL}data/stdmet/Dec/tplm2.txt'
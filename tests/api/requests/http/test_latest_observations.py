@@ -0,0 +1,17 @@
+import pytest
+
+from ndbc_api.api.requests.http.latest_observations import \
+    LatestObservationsRequest
+
+LATEST_OBS_URL = 'https://www.ndbc.noaa.gov/data/latest_obs/latest_obs.txt'
+
+
+@pytest.fixture
+def latest_observations():
+    yield LatestObservationsRequest
+
+
+def test_latest_observations_request(latest_observations):
+    want = LATEST_OBS_URL
+    got = latest_observations.build_request()
+    assert want == got
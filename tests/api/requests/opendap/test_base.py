@@ -2,7 +2,8 @@ import pytest
 
 from ndbc_api.api.requests.opendap._base import BaseRequest
 from ndbc_api.api.requests.opendap.adcp import AdcpRequest
-from tests.api.requests.opendap._base import HISTORICAL_START, REALTIME_END
+from tests.api.requests.opendap._base import (BASE_URL, HISTORICAL_START,
+                                              REALTIME_END)
 
 TEST_STN = '41117'
 
@@ -24,6 +25,16 @@ def test_base_request_builder(adcp):
     assert len(got) > 2
 
 
+@pytest.mark.private
+def test_base_dap_request_builder(adcp):
+    want = adcp.build_request(TEST_STN, HISTORICAL_START, REALTIME_END)
+    got = adcp.build_dap_request(TEST_STN, HISTORICAL_START, REALTIME_END)
+    assert len(got) == len(want)
+    assert all(url.startswith(f'{BASE_URL}dodsC/data/adcp/') for url in got)
+    assert [url.split('/')[-1] for url in got
+           ] == [url.split('/')[-1] for url in want]
+
+
 @pytest.mark.private
 def test_base_fail(base):
     try:
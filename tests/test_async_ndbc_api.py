@@ -7,15 +7,22 @@ assembly logic in ``AsyncNdbcApi``.
 """
 import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pandas as pd
 import pytest
 import pytest_asyncio
+import xarray
 import yaml
 
+from ndbc_api.api.requests.opendap._core import CoreRequest
 from ndbc_api.async_ndbc_api import AsyncNdbcApi
 from ndbc_api.utilities.async_req_handler import AsyncRequestHandler
+from ndbc_api.utilities.columnar import ColumnarData
+from ndbc_api.utilities.rate_limiter import RateLimiter
 from ndbc_api.exceptions import (
     RequestException,
     ResponseException,
@@ -26,6 +33,10 @@ from tests.api.handlers._base import (
     TEST_END,
     TEST_START,
 )
+from tests.api.parsers.http.test_latest_observations import LATEST_OBS_BODY
+from tests.api.parsers.opendap._base import \
+    RESPONSES_TESTS_DIR as OPENDAP_RESPONSES_TESTS_DIR
+from tests.utilities.opendap._dap_server import DapServer
 
 pytest_plugins = ('pytest_asyncio',)
 
@@ -126,7 +137,7 @@ async def test_headers(async_api):
 async def test_clear_cache(async_api):
     api = async_api
     api.clear_cache()
-    assert api._handler.stations == []
+    api._handler.clear.assert_called_once()
 
 
 # ---------------------------------------------------------------------------
@@ -169,6 +180,30 @@ async def test_stations_error(async_api):
         await api.stations()
 
 
+@pytest.mark.asyncio
+async def test_latest_observations(async_api):
+    """Test that latest_observations() is indexed by station id."""
+    api = async_api
+    api._handler.handle_request.return_value = {
+        'status': 200,
+        'body': LATEST_OBS_BODY,
+    }
+    result = await api.latest_observations(station_ids=['41001', 'ALSN6'])
+    assert isinstance(result, pd.DataFrame)
+    assert result.index.name == 'station_id'
+    assert list(result.index) == ['41001', 'alsn6']
+    api._handler.handle_request.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_latest_observations_error(async_api):
+    """Test that latest_observations() raises on a failed request."""
+    api = async_api
+    api._handler.handle_request.return_value = {'status': 503, 'body': ''}
+    with pytest.raises(ResponseException):
+        await api.latest_observations()
+
+
 # ---------------------------------------------------------------------------
 # Station metadata tests
 # ---------------------------------------------------------------------------
@@ -184,6 +219,34 @@ async def test_station_metadata(async_api, read_responses, read_parsed_yml):
     assert isinstance(result, dict)
 
 
+@pytest.mark.asyncio
+async def test_plan(async_api, monkeypatch):
+    """Test that plan() inspects, but does not execute, the requests."""
+    monkeypatch.setenv('MOCKDATE', '2022-08-13')
+    api = async_api
+
+    async def inspect(station_id, req, since=None):
+        if 'historical' in req:
+            return dict(cached='disk', state='fresh', size=10, range=False)
+        return dict(cached=None, state=None, size=None, range=False)
+
+    api._handler.inspect = AsyncMock(side_effect=inspect)
+    result = await api.plan(station_ids=[TEST_STN_STDMET, '41001'],
+                            mode='stdmet',
+                            start_time=TEST_START,
+                            end_time=TEST_END)
+    assert isinstance(result, pd.DataFrame)
+    assert set(result['station_id']) == {TEST_STN_STDMET.lower(), '41001'}
+    assert api._handler.inspect.await_count == len(result)
+    api._handler.handle_requests.assert_not_called()
+    yearly = result[result['family'] == 'yearly']
+    assert len(yearly) == 4
+    assert (yearly['cached'] == 'disk').all() and yearly['bytes'].sum() == 0
+    assert (result.loc[result['cached'].isna(), 'bytes'] > 0).all()
+    with pytest.raises(RequestException):
+        await api.plan(station_id=TEST_STN_STDMET, mode='not_a_mode')
+
+
 # ---------------------------------------------------------------------------
 # get_data validation tests
 # ---------------------------------------------------------------------------
@@ -277,6 +340,31 @@ async def test_get_data_stdmet(async_api, monkeypatch, read_responses,
     assert set(got.columns).issubset(set(want.columns))
 
 
+@pytest.mark.asyncio
+async def test_get_data_dap(monkeypatch):
+    """Test that get_data(use_dap=True) subsets the datasets on the server."""
+    monkeypatch.delenv('MOCKDATE', raising=False)
+    fp = OPENDAP_RESPONSES_TESTS_DIR / 'adcp.content'
+    with xarray.open_dataset(fp, decode_cf=False) as ds:
+        raw = ds.load()
+    start = pd.Timestamp(int(raw['time'][10]), unit='s').to_pydatetime()
+    end = pd.Timestamp(int(raw['time'][20]), unit='s').to_pydatetime()
+    with DapServer({f'data/adcp/41117/41117a{start.year}.nc': raw}) as server:
+        monkeypatch.setattr(CoreRequest, 'BASE_URL', server.base_url)
+        async with AsyncNdbcApi(cache_limit=TEST_CACHE_LIMIT,
+                                rate_limits={'127.0.0.1': (1e3, 10)}) as api:
+            got = await api.get_data(station_id='41117',
+                                     mode='adcp',
+                                     start_time=start,
+                                     end_time=end,
+                                     cols=['water_spd'],
+                                     use_dap=True)
+    want = xarray.open_dataset(fp)[['water_spd']].sel(time=slice(start, end))
+    assert isinstance(got, xarray.Dataset)
+    assert got['water_spd'].equals(want['water_spd'])
+    assert len(server.requests) == 4
+
+
 @pytest.mark.slow
 @pytest.mark.asyncio
 async def test_get_data_with_cols(async_api, monkeypatch, read_responses,
@@ -397,6 +485,182 @@ async def test_get_data_handler_error_logged(async_api, monkeypatch):
     assert isinstance(result, (pd.DataFrame, dict))
 
 
+# ---------------------------------------------------------------------------
+# Parse executor
+# ---------------------------------------------------------------------------
+
+class _ThreadRecordingParser:
+    """Records the thread each response is parsed on, as a column."""
+
+    @classmethod
+    def parse_columns(cls, responses, use_timestamp):
+        return ColumnarData.from_records([{
+            'timestamp': datetime(2022, 1, 1),
+            'thread': threading.current_thread().name,
+        }])
+
+
+def _thread_recording_dispatch():
+    return {
+        'stdmet': (
+            MagicMock(build_request=MagicMock(
+                return_value=['http://example.com/stdmet'])),
+            _ThreadRecordingParser,
+        )
+    }
+
+
+def test_invalid_executor():
+    with pytest.raises(ValueError):
+        AsyncNdbcApi(executor='fiber')
+
+
+@pytest.mark.asyncio
+async def test_get_data_parses_off_event_loop(async_api):
+    """Responses are parsed in the thread pool, not on the event loop."""
+    api = async_api
+    api._handler.handle_requests.return_value = [{'status': 200, 'body': ''}]
+    with patch.object(api, '_HTTP_DISPATCH', _thread_recording_dispatch()):
+        got = await api.get_data(station_ids=['a', 'b'],
+                                 mode='stdmet',
+                                 start_time='2021-12-01',
+                                 end_time='2022-02-01',
+                                 as_df=True)
+    assert len(got) == 2
+    assert all(t.startswith('ndbc-api-parse') for t in got['thread'])
+    await api.__aexit__(None, None, None)
+    assert api._executor is None  # shut down with the API
+
+
+@pytest.mark.asyncio
+async def test_get_data_user_executor(async_api):
+    """A caller-provided executor is used and left running."""
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='user')
+    api = AsyncNdbcApi(executor=executor)
+    api._handler = async_api._handler
+    api._handler.handle_requests.return_value = [{'status': 200, 'body': ''}]
+    with patch.object(api, '_HTTP_DISPATCH', _thread_recording_dispatch()):
+        got = await api.get_data(station_id='a',
+                                 mode='stdmet',
+                                 start_time='2021-12-01',
+                                 end_time='2022-02-01',
+                                 as_df=True)
+    await api.__aexit__(None, None, None)
+    assert list(got['thread']) == ['user_0']
+    assert executor.submit(lambda: 1).result() == 1
+    executor.shutdown()
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_get_data_process_executor(async_api, monkeypatch,
+                                         read_responses):
+    """Responses can be parsed in a process pool."""
+    monkeypatch.setenv('MOCKDATE', '2022-08-13')
+    resp_data = read_responses.get('stdmet')
+    if resp_data is None:
+        pytest.skip('No test responses for stdmet')
+    api = AsyncNdbcApi(executor='process', max_workers=1)
+    api._handler = async_api._handler
+    api._handler.handle_requests.return_value = resp_data
+    got = await api.get_data(station_id=TEST_STN_STDMET,
+                             mode='stdmet',
+                             start_time=TEST_START,
+                             end_time=TEST_END,
+                             as_df=True)
+    await api.__aexit__(None, None, None)
+    assert isinstance(got, pd.DataFrame) and not got.empty
+
+
+# ---------------------------------------------------------------------------
+# aiter_data
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_aiter_data_yields_as_completed(async_api):
+    """Each station is yielded as it completes, failures are skipped."""
+    api = async_api
+    delays = {'slow': 0.05, 'fast': 0.0}
+
+    async def handle_requests(station_id, reqs, since=None):
+        if station_id == 'broken':
+            raise ResponseException('mock fail')
+        await asyncio.sleep(delays[station_id])
+        return [{'status': 200, 'body': ''}]
+
+    api._handler.handle_requests.side_effect = handle_requests
+    with patch.object(api, '_HTTP_DISPATCH', _thread_recording_dispatch()):
+        got = [
+            item async for item in api.aiter_data(
+                station_ids=['slow', 'broken', 'fast'],
+                mode='stdmet',
+                start_time='2021-12-01',
+                end_time='2022-02-01')
+        ]
+    assert [(sid, m) for sid, m, _ in got] == [('fast', 'stdmet'),
+                                              ('slow', 'stdmet')]
+    assert all(isinstance(df, pd.DataFrame) and len(df) == 1
+               for _, _, df in got)
+
+
+@pytest.mark.asyncio
+async def test_aiter_data_backpressure(async_api):
+    """Fetching pauses while `max_buffered` results wait for the caller."""
+    api = AsyncNdbcApi(max_workers=2)
+    api._handler = async_api._handler
+    api._handler.handle_requests.return_value = [{'status': 200, 'body': ''}]
+    with patch.object(api, '_HTTP_DISPATCH', _thread_recording_dispatch()):
+        stream = api.aiter_data(station_ids=[str(i) for i in range(20)],
+                                mode='stdmet',
+                                start_time='2021-12-01',
+                                end_time='2022-02-01',
+                                max_buffered=1)
+        await stream.__anext__()
+        await asyncio.sleep(0.05)
+        # one yielded, one buffered and one parsed by each blocked worker
+        assert api._handler.handle_requests.await_count <= 4
+        await stream.aclose()
+    await asyncio.sleep(0.01)
+    assert api._handler.handle_requests.await_count <= 4
+    await api.__aexit__(None, None, None)
+
+
+@pytest.mark.asyncio
+async def test_aiter_data_validates(async_api):
+    with pytest.raises(ValueError):
+        await async_api.aiter_data(mode='stdmet').__anext__()
+
+
+@pytest.mark.asyncio
+async def test_get_data_validates_bbox_and_stride(async_api):
+    """bbox and stride apply only to xarray.Dataset queries."""
+    api = async_api
+    with pytest.raises(ValueError, match='`bbox` and `stride`'):
+        await api.get_data(station_id='tplm2',
+                           mode='stdmet',
+                           bbox=(-77, 38, -76, 39))
+    with pytest.raises(ValueError, match='`bbox` and `stride`'):
+        await api.aiter_data(station_id='tplm2',
+                             mode='stdmet',
+                             stride=2).__anext__()
+    with pytest.raises(ValueError, match='`use_dap`'):
+        await api.get_data(station_id='tplm2',
+                           mode='stdmet',
+                           use_opendap=False,
+                           use_dap=True)
+    for stride in (0, -1):
+        with pytest.raises(ValueError, match='`stride` must be positive'):
+            await api.get_data(station_id='tplm2',
+                               mode='stdmet',
+                               use_opendap=True,
+                               stride=stride)
+        with pytest.raises(ValueError, match='`stride` must be positive'):
+            await api.aiter_data(station_id='tplm2',
+                                 mode='stdmet',
+                                 use_dap=True,
+                                 stride=stride).__anext__()
+
+
 # ---------------------------------------------------------------------------
 # configure_logging coverage
 # ---------------------------------------------------------------------------
@@ -703,42 +967,56 @@ def test_get_modes_xarray_alias():
 
 @pytest.mark.asyncio
 async def test_handler_delay_fires():
-    """Verify that the inter-request delay is applied."""
+    """Verify that the inter-request delay is applied to each NDBC host."""
+    from aioresponses import aioresponses as aioresponses_ctx
+
     log_fn = MagicMock()
     delay_ms = 500  # 0.5s
+    urls = [f'https://www.ndbc.noaa.gov/test{i}' for i in range(3)]
+
+    def handler(rate_limits=None):
+        return AsyncRequestHandler(
+            cache_limit=10,
+            log=log_fn,
+            delay=delay_ms,
+            retries=0,
+            backoff_factor=0.5,
+            max_connections=5,
+            rate_limiter=(None if rate_limits is None else
+                          RateLimiter.from_delay(delay_ms, limits=rate_limits)),
+        )
 
-    handler = AsyncRequestHandler(
-        cache_limit=10,
-        log=log_fn,
-        delay=delay_ms,
-        retries=0,
-        backoff_factor=0.5,
-        max_connections=5,
-    )
-
-    sleep_calls = []
-
-    async def mock_sleep(seconds):
-        sleep_calls.append(seconds)
-        # Don't actually sleep — just record the call
-
-    with patch('ndbc_api.utilities.async_req_handler.asyncio.sleep',
-               side_effect=mock_sleep):
-        async with handler:
-            await handler.execute_request(
-                station_id='test',
-                url='https://www.ndbc.noaa.gov/test',
-                headers={},
-            )
-
-    # The delay should have been applied (delay_ms / 1000)
-    assert any(abs(s - delay_ms / 1000) < 0.001 for s in sleep_calls), \
+    async def sleeps(handler):
+        sleep_calls = []
+
+        async def mock_sleep(seconds):
+            sleep_calls.append(seconds)
+            # Don't actually sleep — just record the call
+
+        with aioresponses_ctx() as mocked, patch(
+                'ndbc_api.utilities.rate_limiter.asyncio.sleep',
+                side_effect=mock_sleep):
+            for url in urls:
+                mocked.get(url, body='foo', content_type='text/plain')
+            async with handler:
+                for url in urls:
+                    await handler.execute_request(station_id='test',
+                                                  url=url,
+                                                  headers={})
+        return sleep_calls
+
+    # the first request is sent at once, and each following one is spaced
+    # by the delay (delay_ms / 1000), as the mocked sleeps take no time
+    sleep_calls = await sleeps(handler())
+    assert sleep_calls == pytest.approx([0.5, 1.0], abs=0.1), \
         f'Expected sleep({delay_ms / 1000}), got calls: {sleep_calls}'
+    # an explicit rate limit overrides the delay for its host
+    assert await sleeps(handler({'www.ndbc.noaa.gov': (1e3, 10)})) == []
 
 
 @pytest.mark.asyncio
-async def test_handler_sequential_within_station():
-    """Verify requests within a station are processed sequentially."""
+async def test_handler_concurrent_within_station():
+    """Verify requests within a station are fetched concurrently, in order."""
     log_fn = MagicMock()
     execution_log = []
 
@@ -784,17 +1062,16 @@ async def test_handler_sequential_within_station():
         handler._session.close = AsyncMock()
 
         urls = [f'https://example.com/page{i}' for i in range(3)]
-        _ = await handler.handle_requests(
+        resps = await handler.handle_requests(
             station_id='test_stn', reqs=urls)
 
-    # Verify sequential: each (start, end) pair should be adjacent
-    # i.e. start_0, end_0, start_1, end_1, start_2, end_2
-    starts = [i for i, (op, _) in enumerate(execution_log) if op == 'start']
-    ends = [i for i, (op, _) in enumerate(execution_log) if op == 'end']
-    for s, e in zip(starts, ends):
-        assert e == s + 1, (
-            f'Expected start/end pairs to be adjacent (sequential), '
-            f'got execution_log: {execution_log}')
+    # Verify concurrent: every request starts before any ends
+    # i.e. start_0, start_1, start_2, end_0, end_1, end_2
+    ops = [op for op, _ in execution_log]
+    assert ops == ['start'] * 3 + ['end'] * 3, (
+        f'Expected requests to overlap (concurrent), '
+        f'got execution_log: {execution_log}')
+    assert resps == [{'status': 200, 'body': '<html>mock</html>'}] * 3
 
 
 @pytest.mark.asyncio
@@ -5,6 +5,7 @@ to bring coverage from 71 % to 95 %+.
 """
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 import pytest
 import xarray
@@ -21,6 +22,7 @@ from ndbc_api.utilities.data_helpers import (
     handle_timestamp,
     parse_station_id,
 )
+from ndbc_api.utilities.columnar import ColumnarData
 
 
 # ---------------------------------------------------------------------------
@@ -214,6 +216,25 @@ class TestHandleAccumulateData:
         # removes the duplicate, leaving 1 row
         assert isinstance(result, pd.DataFrame)
 
+    def test_columnar_accumulation(self):
+        """Columnar data is merged by timestamp + station_id."""
+        ts = np.array(['2023-01-01', '2023-01-02'], dtype='datetime64[ns]')
+        s1 = ColumnarData({'wind': np.array([5.0, np.nan])},
+                          ts).with_station('s1')
+        s2 = ColumnarData({'wind': np.array([7.0, 8.0])},
+                          ts).with_station('s2')
+        result = handle_accumulate_data({'stdmet': [s2, s1]})
+        assert isinstance(result, pd.DataFrame)
+        assert result.index.names == ['timestamp', 'station_id']
+        assert list(result.index.get_level_values('station_id')) == [
+            's1', 's2', 's1', 's2'
+        ]
+        result = handle_accumulate_data({'stdmet': [s1]}, as_df=False)
+        assert result == {'stdmet': [s1.to_records()]}
+        result = handle_accumulate_data({'stdmet': [s1.take(np.array([], dtype=int))]})
+        assert isinstance(result, pd.DataFrame)
+        assert result.empty
+
     def test_xarray_accumulation(self):
         """xarray Datasets are merged."""
         ds1 = xarray.Dataset({'temp': (['time'], [20.0, 21.0])},
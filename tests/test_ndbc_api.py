@@ -4,11 +4,14 @@ from os import path
 
 import pandas as pd
 import pytest
+import xarray
 
 from ndbc_api.api.requests.http.station_historical import HistoricalRequest
 from ndbc_api.api.requests.http.station_metadata import MetadataRequest
 from ndbc_api.api.requests.http.station_realtime import RealtimeRequest
 from ndbc_api.api.requests.http.active_stations import ActiveStationsRequest
+from ndbc_api.api.requests.http.latest_observations import \
+    LatestObservationsRequest
 from ndbc_api.api.requests.http.adcp import AdcpRequest
 from ndbc_api.api.requests.http.cwind import CwindRequest
 from ndbc_api.api.requests.http.ocean import OceanRequest
@@ -20,11 +23,15 @@ from ndbc_api.api.requests.http.swdir import SwdirRequest
 from ndbc_api.api.requests.http.swdir2 import Swdir2Request
 from ndbc_api.api.requests.http.swr1 import Swr1Request
 from ndbc_api.api.requests.http.swr2 import Swr2Request
+from ndbc_api.api.requests.opendap._core import CoreRequest
 from ndbc_api.exceptions import (HandlerException, ParserException,
                                  RequestException, TimestampException)
 from ndbc_api.ndbc_api import NdbcApi
 from tests.api.handlers._base import (PARSED_TESTS_DIR, TEST_END, TEST_START,
                                       mock_register_uri)
+from tests.api.parsers.http.test_latest_observations import LATEST_OBS_BODY
+from tests.api.parsers.opendap._base import RESPONSES_TESTS_DIR
+from tests.utilities.opendap._dap_server import DapServer
 
 TEST_STN_ADCP = 41117
 TEST_STN_CWIND = 'TPLM2'
@@ -111,6 +118,24 @@ def test_stations(ndbc_api, mock_socket, read_responses, read_parsed_df):
     ndbc_api._handler = handler
 
 
+@pytest.mark.usefixtures('mock_socket')
+def test_latest_observations(ndbc_api, mock_socket):
+    _ = mock_socket
+    reqs = LatestObservationsRequest.build_request()
+    mock_register_uri([reqs], [{'body': LATEST_OBS_BODY}])
+    got = ndbc_api.latest_observations()
+    assert isinstance(got, pd.DataFrame)
+    assert got.index.name == 'station_id'
+    assert list(got.index) == ['13001', '41001', 'alsn6']
+    got = ndbc_api.latest_observations(station_ids=['ALSN6'],
+                                       as_df=False,
+                                       cols=['WSPD'])
+    assert list(got) == ['alsn6']
+    assert got['alsn6']['WSPD'] == pytest.approx(4.1)
+    with pytest.raises(ParserException):
+        _ = ndbc_api.latest_observations(cols=['NOT_A_COLUMN'])
+
+
 def test_dump_cache_nonempty(ndbc_api):
     test_fp = None
     data = ndbc_api.dump_cache(dest_fp=test_fp)
@@ -123,6 +148,18 @@ def test_dump_cache_nonempty(ndbc_api):
     test_fp.unlink()
 
 
+def test_load_cache(ndbc_api, tmp_path):
+    url = 'https://www.ndbc.noaa.gov/data/realtime2/FOO.txt'
+    dump = {'foo': {url: {'status': 200, 'body': 'bar'}}}
+    ndbc_api.load_cache(dump)
+    assert ndbc_api.dump_cache()['foo'] == dump['foo']
+    assert ndbc_api._handler.handle_request('foo', url) == dump['foo'][url]
+    test_fp = tmp_path.joinpath('_dumped_cache.pickle')
+    ndbc_api.dump_cache(dest_fp=test_fp)
+    ndbc_api.load_cache(str(test_fp))
+    assert ndbc_api.dump_cache()['foo'] == dump['foo']
+
+
 def test_get_headers(ndbc_api):
     want = {}
     got = ndbc_api.get_headers()
@@ -287,6 +324,78 @@ def test_get_modes(ndbc_api):
     assert all([isinstance(v, str) for v in modes])
 
 
+def test_plan(ndbc_api, monkeypatch):
+    monkeypatch.setenv('MOCKDATE', '2022-08-13')
+    ndbc_api.clear_cache()
+    start, end = datetime(2022, 7, 1), datetime(2022, 7, 15)
+    url = StdmetRequest.build_request(TEST_STN_STDMET, start, end)[0]
+    ndbc_api.load_cache(
+        {TEST_STN_STDMET.lower(): {
+            url: {
+                'status': 200,
+                'body': 'x' * 100
+            }
+        }})
+    got = ndbc_api.plan(station_ids=[TEST_STN_STDMET, TEST_STN_SPEC],
+                        modes=['stdmet', 'spec'],
+                        start_time=start,
+                        end_time=end)
+    assert isinstance(got, pd.DataFrame)
+    assert len(got) == 4 and set(got['family']) == {'realtime'}
+    cached = got[got['url'] == url].iloc[0]
+    assert cached['cached'] == 'memory' and cached['state'] == 'fresh'
+    assert cached['size'] == 100 and cached['bytes'] == 0
+    assert got['cached'].isna().sum() == 3
+    # uncached responses are estimated from the per-mode priors
+    assert (got.loc[got['cached'].isna(), 'bytes'] > 0).all()
+    got = ndbc_api.plan(station_id=TEST_STN_STDMET,
+                        mode='stdmet',
+                        start_time=TEST_START,
+                        end_time=TEST_END,
+                        as_df=False)
+    assert [row['url'] for row in got] == StdmetRequest.build_request(
+        TEST_STN_STDMET.lower(), TEST_START, TEST_END)
+    assert got[0]['family'] == 'yearly'
+    assert got[0]['size'] > got[-1]['size']
+    with pytest.raises(RequestException):
+        _ = ndbc_api.plan(station_id=TEST_STN_STDMET, mode='not_a_mode')
+    ndbc_api.clear_cache()
+
+
+def test_get_data_dap(ndbc_api, monkeypatch):
+    monkeypatch.delenv('MOCKDATE', raising=False)
+    fp = RESPONSES_TESTS_DIR.joinpath('adcp.content')
+    with xarray.open_dataset(fp, decode_cf=False) as ds:
+        raw = ds.load()
+    start = pd.Timestamp(int(raw['time'][10]), unit='s').to_pydatetime()
+    end = pd.Timestamp(int(raw['time'][20]), unit='s').to_pydatetime()
+    ndbc_api.clear_cache()
+    monkeypatch.setitem(ndbc_api._rate_limiter.limits, '127.0.0.1', (1e3, 10))
+    with DapServer({f'data/adcp/41117/41117a{start.year}.nc': raw}) as server:
+        monkeypatch.setattr(CoreRequest, 'BASE_URL', server.base_url)
+        got = ndbc_api.get_data(station_id=TEST_STN_ADCP,
+                                mode='adcp',
+                                start_time=start,
+                                end_time=end,
+                                cols=['water_spd'],
+                                use_dap=True)
+        sent = server.sent
+        lat, lon = float(raw['latitude'][0]), float(raw['longitude'][0])
+        outside = ndbc_api.get_data(station_id=TEST_STN_ADCP,
+                                    mode='adcp',
+                                    start_time=start,
+                                    end_time=end,
+                                    use_dap=True,
+                                    bbox=(lon + 1, lat + 1, lon + 2, lat + 2))
+    want = xarray.open_dataset(fp)[['water_spd']].sel(time=slice(start, end))
+    assert isinstance(got, xarray.Dataset)
+    assert got['water_spd'].equals(want['water_spd'])
+    # only the time coordinate is downloaded whole, to resolve the range
+    assert sent < raw['time'].nbytes + raw.nbytes / 100
+    assert not outside.data_vars
+    ndbc_api.clear_cache()
+
+
 @pytest.mark.usefixtures('mock_socket', 'read_responses', 'read_parsed_yml')
 def test_station_realtime(ndbc_api, monkeypatch, mock_socket, read_responses,
                           read_parsed_yml):
@@ -474,3 +583,28 @@ class TestGetDataValidation:
         """mode=None and modes=None should raise (L573)."""
         with pytest.raises(ValueError, match='`mode` and `modes` are `None`'):
             ndbc_api.get_data(station_id='tplm2')
+
+    def test_bbox_and_stride_without_dataset(self, ndbc_api):
+        """bbox and stride apply only to xarray.Dataset queries."""
+        with pytest.raises(ValueError, match='`bbox` and `stride`'):
+            ndbc_api.get_data(
+                station_id='tplm2', mode='stdmet', bbox=(-77, 38, -76, 39),
+            )
+        with pytest.raises(ValueError, match='`bbox` and `stride`'):
+            ndbc_api.get_data(
+                station_id='tplm2', mode='stdmet', use_opendap=False, stride=2,
+            )
+        with pytest.raises(ValueError, match='`use_dap`'):
+            ndbc_api.get_data(
+                station_id='tplm2', mode='stdmet', use_opendap=False,
+                use_dap=True,
+            )
+
+    def test_stride_less_than_one(self, ndbc_api):
+        """stride must be a positive integer."""
+        for stride in (0, -1):
+            with pytest.raises(ValueError, match='`stride` must be positive'):
+                ndbc_api.get_data(
+                    station_id='tplm2', mode='stdmet', use_opendap=True,
+                    stride=stride,
+                )
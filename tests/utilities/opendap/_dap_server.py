@@ -0,0 +1,220 @@
+"""A local stand-in for the DAP2 endpoints of the THREDDS server.
+
+Serves fixture netCDF datasets under `/thredds/dodsC/<path>`, with their
+`.dds`, `.das` and constrained `.dods` responses, as the THREDDS server
+does for the files under `/thredds/fileServer/<path>`.
+"""
+import re
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import unquote, urlsplit
+
+import numpy as np
+import xarray
+
+DAP_PATH = '/thredds/dodsC/'
+_TYPES = {
+    'int8': 'Byte',
+    'uint8': 'Byte',
+    'int16': 'Int16',
+    'uint16': 'UInt16',
+    'int32': 'Int32',
+    'uint32': 'UInt32',
+    'float32': 'Float32',
+    'float64': 'Float64',
+}
+_XDR = {
+    'Int16': '>i4',
+    'UInt16': '>u4',
+    'Int32': '>i4',
+    'UInt32': '>u4',
+    'Float32': '>f4',
+    'Float64': '>f8',
+}
+_PROJECTION = re.compile(r'([^\[]+)((?:\[\d+:\d+:\d+\])*)')
+
+
+def dap_type(values: np.ndarray) -> str:
+    return _TYPES.get(values.dtype.name, 'String')
+
+
+def is_grid(ds: xarray.Dataset, name: str) -> bool:
+    dims = ds[name].dims
+    return bool(dims) and dims != (name,) and all(d in ds.variables
+                                                   for d in dims)
+
+
+def declaration(name: str, variable: xarray.Variable, indent: str) -> str:
+    dims = ''.join(
+        f'[{d} = {n}]' for d, n in zip(variable.dims, variable.shape))
+    return f'{indent}{dap_type(variable.values)} {name}{dims};\n'
+
+
+def encode_dds(ds: xarray.Dataset, name: str) -> str:
+    lines = ['Dataset {\n']
+    for var in ds.variables:
+        if not is_grid(ds, var):
+            lines.append(declaration(var, ds.variables[var], '    '))
+            continue
+        lines.append('    Grid {\n     ARRAY:\n')
+        lines.append(declaration(var, ds.variables[var], '        '))
+        lines.append('     MAPS:\n')
+        for dim in ds[var].dims:
+            lines.append(declaration(dim, ds.variables[dim], '        '))
+        lines.append(f'    }} {var};\n')
+    lines.append(f'}} {name};\n')
+    return ''.join(lines)
+
+
+def encode_attribute(name: str, value) -> str:
+    if isinstance(value, str):
+        escaped = value.replace('\\', '\\\\').replace('"', '\\"')
+        return f'String {name} "{escaped}";'
+    values = np.atleast_1d(value)
+    if values.dtype == np.int8:
+        values = values.view(np.uint8)
+    return f'{dap_type(values)} {name} {", ".join(str(v) for v in values)};'
+
+
+def encode_das(ds: xarray.Dataset) -> str:
+    lines = ['Attributes {\n']
+    containers = [(var, ds[var].attrs, ds[var].dtype) for var in ds.variables]
+    containers.append(('NC_GLOBAL', ds.attrs, None))
+    for name, attrs, dtype in containers:
+        lines.append(f'    {name} {{\n')
+        for key, value in attrs.items():
+            lines.append(f'        {encode_attribute(key, value)}\n')
+        if dtype == np.int8:
+            lines.append('        String _Unsigned "false";\n')
+        lines.append('    }\n')
+    lines.append('}\n')
+    return ''.join(lines)
+
+
+def encode_xdr(values: np.ndarray) -> bytes:
+    kind = dap_type(values)
+    flat = values.ravel()
+    header = struct.pack('>II', flat.size, flat.size) if values.ndim else b''
+    if kind == 'String':
+        body = b''
+        for value in flat:
+            encoded = str(value).encode()
+            body += struct.pack('>I', len(encoded)) + encoded
+            body += b'\0' * (-len(encoded) % 4)
+        return header + body
+    if kind == 'Byte':
+        if not values.ndim:
+            return struct.pack('>I', int(flat.view(np.uint8)[0]))
+        encoded = flat.view(np.uint8).tobytes()
+        return header + encoded + b'\0' * (-len(encoded) % 4)
+    return header + flat.astype(_XDR[kind]).tobytes()
+
+
+def encode_dods(ds: xarray.Dataset, name: str, constraint: str) -> bytes:
+    """Encode the projections of a constraint expression, as THREDDS."""
+    subset, grids = {}, []
+    for projection in filter(None, constraint.split(',')):
+        var, slabs = _PROJECTION.fullmatch(projection).groups()
+        index = {}
+        for dim, slab in zip(ds[var].dims, re.findall(r'\[([\d:]+)\]', slabs)):
+            start, stride, stop = (int(i) for i in slab.split(':'))
+            index[dim] = slice(start, stop + 1, stride)
+        subset[var] = ds[var].variable[tuple(
+            index.get(d, slice(None)) for d in ds[var].dims)]
+        if is_grid(ds, var):
+            grids.append(var)
+            for dim in ds[var].dims:
+                subset.setdefault(
+                    f'{var}.{dim}',
+                    ds.variables[dim][index.get(dim, slice(None))])
+    body = []
+    lines = ['Dataset {\n']
+    for var, variable in subset.items():
+        if '.' in var:
+            continue
+        if var in grids:
+            lines.append('    Grid {\n     ARRAY:\n')
+            lines.append(declaration(var, variable, '        '))
+            lines.append('     MAPS:\n')
+            body.append(encode_xdr(variable.values))
+            for dim in variable.dims:
+                coordinate = subset[f'{var}.{dim}']
+                lines.append(declaration(dim, coordinate, '        '))
+                body.append(encode_xdr(coordinate.values))
+            lines.append(f'    }} {var};\n')
+        else:
+            lines.append(declaration(var, variable, '    '))
+            body.append(encode_xdr(variable.values))
+    lines.append(f'}} {name};\n')
+    return ''.join(lines).encode() + b'\nData:\n' + b''.join(body)
+
+
+class DapServer:
+    """Serves `datasets`, by path, on an ephemeral port of localhost.
+
+    Attributes:
+        datasets (:dict:): The undecoded datasets served, by path, e.g.
+            `'data/stdmet/41008/41008h2012.nc'`.
+        requests (:list:): The path and query of each request served.
+        sent (:int:): The number of bytes of the responses served.
+    """
+
+    def __init__(self, datasets: Dict[str, xarray.Dataset]) -> None:
+        self.datasets = datasets
+        self.requests: List[str] = []
+        self.sent = 0
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/thredds/'
+
+    def __enter__(self) -> 'DapServer':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, target: str):
+        url = urlsplit(target)
+        if not url.path.startswith(DAP_PATH):
+            return 404, 'text/plain', b''
+        path, _, suffix = url.path[len(DAP_PATH):].rpartition('.')
+        ds = self.datasets.get(path)
+        if ds is None:
+            return 404, 'text/plain', b''
+        if suffix == 'dds':
+            return 200, 'text/plain', encode_dds(ds, path).encode()
+        if suffix == 'das':
+            return 200, 'text/plain', encode_das(ds).encode()
+        if suffix == 'dods':
+            body = encode_dods(ds, path, unquote(url.query))
+            return 200, 'application/octet-stream', body
+        return 400, 'text/plain', b''
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                server.requests.append(self.path)
+                status, content_type, body = server.respond(self.path)
+                server.sent += len(body)
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
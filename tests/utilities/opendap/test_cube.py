@@ -0,0 +1,123 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import xarray
+
+from ndbc_api.api.parsers.opendap.hfradar import HfradarParser
+from ndbc_api.exceptions import ParserException
+from ndbc_api.utilities.opendap.cube import TimeCube
+
+START = datetime(2012, 1, 5)
+
+
+def hour(index, lat=10, lon=10):
+    time = np.array([START + timedelta(hours=index)], dtype='datetime64[ns]')
+    u = np.full((1, lat, lon), index, dtype='float32')
+    return xarray.Dataset(
+        {
+            'u': (('time', 'lat', 'lon'), u, {
+                'units': 'm s-1'
+            }),
+            'site_lat': ('site', np.array([32.5, 33.5], dtype='float32')),
+        },
+        coords={
+            'time': time,
+            'lat': np.arange(lat, dtype='float32'),
+            'lon': np.arange(lon, dtype='float32'),
+        })
+
+
+@pytest.fixture
+def hours():
+    yield [hour(i) for i in range(6)]
+
+
+@pytest.mark.private
+def test_add_in_any_order(hours):
+    cube = TimeCube(slots=len(hours))
+    for index in [3, 0, 5, 1, 4, 2]:
+        assert cube.add(index, hours[index])
+    # the time-dependent variables, including time, are preallocated
+    assert len(cube) == 6
+    hourly = hours[0]['u'].nbytes + hours[0]['time'].nbytes
+    assert cube.nbytes == 6 * hourly
+    got = cube.dataset()
+    want = xarray.concat(hours, dim='time', data_vars='minimal')
+    assert got.identical(want)
+    assert cube.missing == [] and cube.dataset() is got
+    with pytest.raises(ValueError):
+        cube.add(0, hours[0])
+
+
+@pytest.mark.private
+def test_missing_hours_are_dropped(hours):
+    cube = TimeCube(slots=len(hours))
+    cube.drop(1)
+    for index in [5, 0, 3]:
+        cube.add(index, hours[index])
+    # a grid other than that of the first hour is dropped
+    assert not cube.add(2, hour(2, lat=5))
+    got = cube.dataset()
+    assert cube.missing == [1, 2, 4]
+    assert list(got['u'].values[:, 0, 0]) == [0, 3, 5]
+    assert list(got['time'].values) == [hours[i]['time'].values[0]
+                                        for i in (0, 3, 5)]
+    # the variables are views of the cube, rather than copies
+    assert not got['u'].values.flags.owndata
+
+
+@pytest.mark.private
+def test_empty_cube(hours):
+    cube = TimeCube(slots=2)
+    cube.drop(0)
+    with pytest.raises(ValueError):
+        cube.dataset()
+    with pytest.raises(ValueError):
+        cube.add(1, hours[0].isel(time=0))
+
+
+@pytest.mark.private
+def test_concurrent_add():
+    slots = 48
+    cube = TimeCube(slots=slots)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        added = list(
+            executor.map(lambda i: cube.add(i, hour(i)), range(slots)))
+    assert all(added)
+    got = pickle.loads(pickle.dumps(cube)).dataset()
+    assert list(got['u'].values[:, 0, 0]) == list(range(slots))
+
+
+@pytest.mark.private
+def test_hfradar_nc_from_responses(hours):
+    responses = [{
+        'status': 200,
+        'body': ds.to_netcdf(engine='scipy')
+    } for ds in hours]
+    responses[2] = {'status': 404, 'body': ''}
+    got = HfradarParser.nc_from_responses(responses)
+    assert list(got['u'].values[:, 0, 0]) == [0, 1, 3, 4, 5]
+    assert got['site_lat'].dims == ('site',)
+    with pytest.raises(ParserException):
+        HfradarParser.nc_from_responses([{'status': 404, 'body': ''}])
+    with pytest.raises(ParserException):
+        HfradarParser.nc_from_responses([{'status': 200, 'body': b'bad'}])
+
+
+@pytest.mark.private
+def test_hfradar_add_response_subsets_grid(hours):
+    cube = HfradarParser.time_cube(slots=2)
+    for index in range(2):
+        HfradarParser.add_response(cube,
+                                   index,
+                                   hours[index].to_netcdf(engine='scipy'),
+                                   bbox=(2, 2, 7, 7),
+                                   stride=2)
+    # only the selected cells are allocated, and read
+    assert cube.nbytes == 2 * (9 * 4 + 8)
+    got = cube.dataset()
+    assert list(got['lat'].values) == [2, 4, 6]
+    assert got['u'].shape == (2, 3, 3)
@@ -0,0 +1,212 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+import requests
+import xarray
+
+from ndbc_api.utilities.opendap.dap import (COORDINATES, DATA, DONE, METADATA,
+                                            DapSubset, decode_dods,
+                                            dods_request, index_range,
+                                            parse_das, parse_dds)
+from tests.api.parsers.opendap._base import RESPONSES_TESTS_DIR
+from tests.utilities.opendap._dap_server import DapServer
+
+ADCP_TEST_FP = RESPONSES_TESTS_DIR.joinpath('stdmet.content')
+ADCP_PATH = 'data/adcp/41008/41008a2012.nc'
+GRID_PATH = 'hfradar/201201050000_hfr_uswc_6km_rtv_uwls_NDBC.nc'
+START, END = datetime(2012, 1, 5), datetime(2012, 1, 6)
+
+DDS = '''Dataset {
+    Int32 time[time = 3];
+    String station;
+    Grid {
+     ARRAY:
+        Float32 wspd[time = 3][latitude = 1];
+     MAPS:
+        Int32 time[time = 3];
+        Float32 latitude[latitude = 1];
+    } wspd;
+} data/stdmet/tplm2/tplm2h2021.nc;
+'''
+DAS = '''Attributes {
+    wspd {
+        Float32 _FillValue 99.0;
+        String comment "a \\"quoted\\" comment; with separators, {}";
+        Int16 valid_range 0, 100;
+    }
+    NC_GLOBAL {
+        String station "tplm2";
+    }
+}
+'''
+
+
+def fetch(reqs):
+    resps = []
+    for req in reqs:
+        r = requests.get(req)
+        binary = 'octet' in r.headers['Content-Type']
+        resps.append(dict(status=r.status_code,
+                          body=r.content if binary else r.text))
+    return resps
+
+
+def run(subset):
+    stages = []
+    while not subset.done:
+        stages.append(subset.stage)
+        subset.feed(fetch(subset.requests()))
+    return stages
+
+
+@pytest.fixture
+def adcp():
+    with xarray.open_dataset(ADCP_TEST_FP, decode_cf=False) as ds:
+        yield ds.load()
+
+
+@pytest.fixture
+def grid():
+    time = np.arange(3, dtype='int32') * 3600 + 1325721600
+    lat = np.arange(30, 40, dtype='float32')
+    lon = np.arange(-125, -115, dtype='float32')
+    u = np.arange(300, dtype='float32').reshape(3, 10, 10)
+    yield xarray.Dataset(
+        {'u': (('time', 'lat', 'lon'), u, {
+            '_FillValue': np.float32(-999)
+        })},
+        coords={
+            'time': ('time', time, {
+                'units': 'seconds since 1970-01-01'
+            }),
+            'lat': lat,
+            'lon': lon,
+        })
+
+
+@pytest.fixture
+def server(adcp, grid):
+    with DapServer({ADCP_PATH: adcp, GRID_PATH: grid}) as server:
+        yield server
+
+
+@pytest.mark.private
+def test_parse_dds():
+    got = parse_dds(DDS)
+    assert [v.name for v in got] == ['time', 'station', 'wspd']
+    assert got[0].is_coordinate and got[0].shape == (3,)
+    assert got[1].dims == () and got[1].type == 'String'
+    assert got[2].dims == ('time', 'latitude')
+    assert [m.name for m in got[2].maps] == ['time', 'latitude']
+    with pytest.raises(ValueError):
+        parse_dds('Dataset { Structure { Int32 a; } s; } x;')
+
+
+@pytest.mark.private
+def test_parse_das():
+    got = parse_das(DAS)
+    assert got['wspd']['_FillValue'] == np.float32(99)
+    assert got['wspd']['_FillValue'].dtype == np.float32
+    assert got['wspd']['comment'] == (
+        'a "quoted" comment; with separators, {}')
+    assert list(got['wspd']['valid_range']) == [0, 100]
+    assert got['NC_GLOBAL'] == {'station': 'tplm2'}
+
+
+@pytest.mark.private
+def test_index_range():
+    values = np.array([1, 2, 3, 4, 5])
+    assert index_range(values, 2, 4) == slice(1, 4)
+    assert index_range(values, None, 2) == slice(0, 2)
+    assert index_range(values, 6, None) is None
+    # descending coordinates, such as latitudes
+    assert index_range(values[::-1], 2, 3) == slice(2, 4)
+
+
+@pytest.mark.private
+def test_dods_request():
+    got = dods_request('https://x/thredds/dodsC/a.nc', ['u[0:1:2]', 'time'])
+    assert got == 'https://x/thredds/dodsC/a.nc.dods?u%5B0:1:2%5D,time'
+
+
+@pytest.mark.private
+def test_decode_dods(server, adcp):
+    url = f'{server.base_url}dodsC/{ADCP_PATH}'
+    das = parse_das(requests.get(f'{url}.das').text)
+    body = requests.get(dods_request(url, ['flag1[0:1:3][0:1:0][0:1:16]'
+                                          ])).content
+    got = decode_dods(body, das)
+    want = xarray.decode_cf(adcp)[['flag1']].isel(time=slice(0, 4))
+    assert got.identical(want)
+    with pytest.raises(ValueError):
+        decode_dods(b'Dataset { } x;', das)
+
+
+@pytest.mark.private
+def test_subset(server, adcp):
+    urls = [
+        f'{server.base_url}dodsC/{ADCP_PATH}',
+        f'{server.base_url}dodsC/data/adcp/41008/41008a2013.nc',
+    ]
+    subset = DapSubset(urls,
+                       variables=['water_spd', 'latitude'],
+                       start_time=START,
+                       end_time=END)
+    assert run(subset) == [METADATA, COORDINATES, DATA]
+    assert subset.stage == DONE
+    got = subset.datasets()
+    # the missing dataset is dropped
+    assert len(got) == 1
+    want = xarray.decode_cf(adcp)[['water_spd', 'latitude']].sel(
+        time=slice(START, END))
+    assert got[0].identical(want)
+    assert server.sent < adcp.nbytes / 10
+
+
+@pytest.mark.private
+def test_subset_bbox(server, grid):
+    url = f'{server.base_url}dodsC/{GRID_PATH}'
+    subset = DapSubset([url],
+                       start_time=datetime(2012, 1, 5, 1),
+                       bbox=(-122, 32, -120.5, 33.5))
+    run(subset)
+    (got,) = subset.datasets()
+    assert list(got['lat'].values) == [32, 33]
+    assert list(got['lon'].values) == [-122, -121]
+    want = xarray.decode_cf(grid).isel(time=slice(1, 3),
+                                       lat=slice(2, 4),
+                                       lon=slice(3, 5))
+    assert got.identical(want)
+    # the grid is decimated on the server, within the bounding box
+    subset = DapSubset([url], bbox=(-124, 31, -116, 39), stride=3)
+    run(subset)
+    (got,) = subset.datasets()
+    assert got.identical(
+        xarray.decode_cf(grid).isel(lat=slice(1, 10, 3),
+                                    lon=slice(1, 10, 3)))
+    assert '%5B1:3:9%5D' in server.requests[-1]
+    with pytest.raises(ValueError):
+        DapSubset([url], stride=0)
+    # a subset outside of the dataset requests no data
+    subset = DapSubset([url], bbox=(0, 0, 1, 1))
+    assert run(subset) == [METADATA, COORDINATES]
+    assert subset.datasets() == []
+
+
+@pytest.mark.private
+def test_subset_without_coordinates(server, grid):
+    # the coordinates stage is skipped when only variables are selected
+    subset = DapSubset([f'{server.base_url}dodsC/{GRID_PATH}'],
+                       variables=['u'])
+    assert run(subset) == [METADATA, DATA]
+    (got,) = subset.datasets()
+    assert got.identical(xarray.decode_cf(grid))
+    # as when the grid is only decimated
+    subset = DapSubset([f'{server.base_url}dodsC/{GRID_PATH}'], stride=5)
+    assert run(subset) == [METADATA, DATA]
+    (got,) = subset.datasets()
+    assert got.identical(
+        xarray.decode_cf(grid).isel(lat=slice(0, 10, 5), lon=slice(0, 10, 5)))
+    with pytest.raises(ValueError):
+        DapSubset(['x']).datasets()
@@ -1,8 +1,10 @@
 
+import numpy as np
 import pytest
 import xarray
 
-from ndbc_api.utilities.opendap.dataset import (merge_datasets)
+from ndbc_api.utilities.opendap.dataset import (filter_dataset_by_grid,
+                                                merge_datasets)
 from tests.api.parsers.opendap._base import PARSED_TESTS_DIR
 
 STDMET_TEST_FP = PARSED_TESTS_DIR.joinpath('stdmet.nc')
@@ -28,3 +30,30 @@ def test_merge_datasets(parsed_stdmet, parsed_cwind):
         got.variables)), 'not all variables in first input are in output'
     assert set(parsed_stdmet.variables).issubset(set(
         got.variables)), 'not all variables in the second input are in output'
+
+
+@pytest.fixture
+def grid():
+    yield xarray.Dataset(
+        {'u': (('time', 'lat', 'lon'), np.arange(200.).reshape(2, 10, 10))},
+        coords={
+            'time': np.arange(2),
+            'lat': np.arange(30, 40.),
+            'lon': np.arange(-125, -115.),
+        })
+
+
+@pytest.mark.private
+def test_filter_dataset_by_grid(grid):
+    assert filter_dataset_by_grid(grid) is grid
+    got = filter_dataset_by_grid(grid, bbox=(-122, 32, -118, 36), stride=2)
+    assert list(got['lat'].values) == [32, 34, 36]
+    assert list(got['lon'].values) == [-122, -120, -118]
+    assert got.identical(grid.isel(lat=slice(2, 7, 2), lon=slice(3, 8, 2)))
+    got = filter_dataset_by_grid(grid, stride=4)
+    assert list(got['lat'].values) == [30, 34, 38]
+    assert got.sizes['time'] == 2
+    got = filter_dataset_by_grid(grid, bbox=(0, 0, 1, 1))
+    assert got.sizes['lat'] == got.sizes['lon'] == 0
+    with pytest.raises(ValueError):
+        filter_dataset_by_grid(grid, stride=0)
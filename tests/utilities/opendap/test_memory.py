@@ -0,0 +1,66 @@
+import gc
+import os
+
+import pytest
+import xarray
+
+from ndbc_api.api.parsers.opendap import _base
+from ndbc_api.api.parsers.opendap.stdmet import StdmetParser
+from ndbc_api.utilities.opendap import memory
+from ndbc_api.utilities.opendap.memory import (BufferReader, SpillDirectory,
+                                               open_netcdf)
+from tests.api.parsers.opendap._base import RESPONSES_TESTS_DIR
+
+STDMET_TEST_FP = RESPONSES_TESTS_DIR.joinpath('stdmet.content')
+
+
+@pytest.fixture
+def stdmet_content():
+    with open(STDMET_TEST_FP, 'rb') as f:
+        yield f.read()
+
+
+@pytest.mark.private
+def test_buffer_reader():
+    reader = BufferReader(bytearray(b'0123456789'))
+    assert reader.read(4) == b'0123'
+    assert reader.seek(-2, os.SEEK_END) == 8 and reader.read() == b'89'
+    assert reader.seek(2) == 2 and reader.seek(3, os.SEEK_CUR) == 5
+    assert reader.read(100) == b'56789' and reader.read(1) == b''
+    with pytest.raises(ValueError):
+        reader.seek(-1)
+
+
+@pytest.mark.private
+@pytest.mark.parametrize('wrap', [bytes, bytearray, memoryview])
+def test_open_netcdf_in_memory(stdmet_content, monkeypatch, wrap):
+    spill = SpillDirectory()
+    monkeypatch.setattr(memory, 'SPILL_DIRECTORY', spill)
+    got = open_netcdf(wrap(stdmet_content))
+    want = xarray.open_dataset(STDMET_TEST_FP)
+    assert set(got.variables) == set(want.variables)
+    # variables are loaded lazily, and without a spilled file
+    name = next(iter(got.data_vars))
+    assert not got[name].variable._in_memory
+    assert got[name].equals(want[name])
+    assert spill.path is None
+
+
+@pytest.mark.private
+def test_open_netcdf_spilled(stdmet_content, monkeypatch):
+    spill = SpillDirectory()
+    monkeypatch.setattr(memory, 'SPILL_DIRECTORY', spill)
+    monkeypatch.setattr(_base, 'SPILL_DIRECTORY', spill)
+    monkeypatch.setattr(memory, 'in_memory_engine', lambda content: None)
+    got = StdmetParser.nc_from_responses([stdmet_content, {'status': 404}])
+    # the spilled file is held by the parsed and the opened dataset
+    assert len(spill) == 1
+    directory = spill.path
+    path = os.listdir(directory)[0]
+    name = next(iter(got.data_vars))
+    assert got[name].load().size
+    del got
+    gc.collect()
+    assert len(spill) == 0 and spill.path is None
+    assert not os.path.exists(os.path.join(directory, path))
+    assert not os.path.exists(directory)
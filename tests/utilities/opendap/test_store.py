@@ -0,0 +1,120 @@
+import pytest
+import xarray
+
+from ndbc_api.api.handlers.opendap.data import OpenDapDataHandler
+from ndbc_api.utilities.opendap.store import (DatasetStore, REALTIME_YEAR,
+                                              store_key)
+from tests.api.parsers.opendap._base import RESPONSES_TESTS_DIR
+
+STDMET_TEST_FP = RESPONSES_TESTS_DIR.joinpath('stdmet.content')
+BASE_URL = 'https://dods.ndbc.noaa.gov/thredds/fileServer/data/stdmet/tplm2/'
+HISTORICAL_URL = f'{BASE_URL}tplm2h2021.nc'
+REALTIME_URL = f'{BASE_URL}tplm2h9999.nc'
+MISSING_URL = f'{BASE_URL}tplm2h2022.nc'
+
+
+def body(records=None):
+    with xarray.open_dataset(STDMET_TEST_FP, decode_cf=False) as ds:
+        if records is not None:
+            ds = ds.isel(time=slice(0, records))
+        return ds.to_netcdf(engine='scipy')
+
+
+def decoded(content):
+    with xarray.open_dataset(content, engine='scipy') as ds:
+        return ds.load()
+
+
+class FakeHandler:
+
+    def __init__(self, store):
+        self.dataset_store = store
+        self.requested = []
+
+    def handle_requests(self, station_id, reqs):
+        self.requested.extend(reqs)
+        return [
+            dict(status=404, body='') if req == MISSING_URL else dict(
+                status=200, body=body()) for req in reqs
+        ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    yield DatasetStore(path=str(tmp_path))
+
+
+@pytest.mark.private
+def test_store_key():
+    assert store_key(HISTORICAL_URL) == ('tplm2', 'stdmet', 2021)
+    assert store_key(REALTIME_URL) == ('tplm2', 'stdmet', REALTIME_YEAR)
+    assert store_key('https://x/thredds/fileServer/hfradar/'
+                     '201201050000_hfr_uswc_6km_rtv_uwls_NDBC.nc') is None
+
+
+@pytest.mark.private
+def test_put_and_open(store):
+    key = store_key(HISTORICAL_URL)
+    assert key not in store and store.open(key) is None
+    store.put(key, body())
+    assert key in store
+    with store.open(key) as got:
+        # the stored file is opened lazily
+        assert not got['water_spd'].variable._in_memory
+        assert got.load().identical(decoded(body()))
+
+
+@pytest.mark.private
+def test_append(store):
+    key = store_key(REALTIME_URL)
+    records = decoded(body()).sizes['time']
+    assert store.append(key, body(records // 2)) == records // 2
+    with open(store.file(key), 'rb') as f:
+        stored = f.read()
+    assert store.append(key, body()) == records - records // 2
+    with open(store.file(key), 'rb') as f:
+        appended = f.read()
+    # the stored records are not rewritten
+    assert appended[8:len(stored)] == stored[8:]
+    assert decoded(store.file(key)).identical(decoded(body()))
+    # only the records after the last stored time are appended
+    assert store.append(key, body()) == 0
+    assert decoded(store.file(key)).identical(decoded(body()))
+
+
+@pytest.mark.private
+def test_append_mismatched_variables(store):
+    key = store_key(REALTIME_URL)
+    store.append(key, body(2))
+    with xarray.open_dataset(STDMET_TEST_FP, decode_cf=False) as ds:
+        renamed = ds.rename_vars({'water_spd': 'speed'}).to_netcdf(
+            engine='scipy')
+    # the stored file is replaced
+    assert store.append(key, renamed) == decoded(renamed).sizes['time']
+    assert decoded(store.file(key)).identical(decoded(renamed))
+
+
+@pytest.mark.private
+def test_datasets(store):
+    reqs = [HISTORICAL_URL, MISSING_URL, REALTIME_URL]
+    assert store.pending(reqs) == reqs
+    handler = FakeHandler(store)
+    resps = dict(zip(reqs, handler.handle_requests('tplm2', reqs)))
+    got = store.datasets(reqs, resps)
+    assert isinstance(got[0], xarray.Dataset)
+    assert got[1] == dict(status=404, body='')
+    assert isinstance(got[2], xarray.Dataset)
+    # stored yearly files are not requested again, realtime files are
+    assert store.pending(reqs) == [MISSING_URL, REALTIME_URL]
+
+
+@pytest.mark.private
+def test_handler_requests_pending_files(monkeypatch, store):
+    monkeypatch.setattr(
+        'ndbc_api.api.requests.opendap.stdmet.StdmetRequest.build_request',
+        lambda **_: [HISTORICAL_URL, REALTIME_URL])
+    handler = FakeHandler(store)
+    first = OpenDapDataHandler.stdmet(handler=handler, station_id='tplm2')
+    second = OpenDapDataHandler.stdmet(handler=handler, station_id='tplm2')
+    assert handler.requested == [HISTORICAL_URL, REALTIME_URL, REALTIME_URL]
+    assert second.load().identical(first.load())
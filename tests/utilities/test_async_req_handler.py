@@ -4,11 +4,20 @@ Covers the synchronous delegator methods (cache/headers), station
 management, cache-hit path, and retry/backoff logic.
 """
 
+import asyncio
+import gzip
+import time
+from datetime import datetime, timedelta
+
 import aiohttp
 import pytest
 from aioresponses import aioresponses
 
 from ndbc_api.utilities.async_req_handler import AsyncRequestHandler
+from ndbc_api.utilities.cache_policy import CachePolicy
+from ndbc_api.utilities.disk_cache import DiskCache
+from ndbc_api.utilities.rate_limiter import RateLimiter
+from tests.utilities.test_tail_fetch import range_response, realtime_body
 
 
 # ---------------------------------------------------------------------------
@@ -83,6 +92,17 @@ class TestStationManagement:
         stn = handler.get_station(41001)
         assert stn.id_ == '41001'
 
+    def test_station_int_id(self):
+        handler = AsyncRequestHandler(
+            cache_limit=5, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1,
+        )
+        handler.add_station(41013)
+        assert handler.has_station(41013)
+        assert handler.has_station('41013')
+        assert handler.get_station('41013').id_ == '41013'
+        assert len(handler.stations) == 1
+
     def test_get_station_returns_same_instance(self):
         handler = AsyncRequestHandler(
             cache_limit=5, log=_noop_log, delay=0,
@@ -119,6 +139,342 @@ class TestCacheHit:
             assert resp1 == resp2
             assert resp1['body'] == 'first-call'
 
+    async def test_disk_cache_hit_does_not_refetch(self, tmp_path):
+        disk_cache = DiskCache(path=str(tmp_path.joinpath('ndbc.sqlite')),
+                               limit=2**20)
+        url = 'https://www.ndbc.noaa.gov/test'
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1, disk_cache=disk_cache,
+        )
+        async with handler:
+            with aioresponses() as m:
+                m.get(url, status=200, body='first-call')
+                resp1 = await handler.handle_request('tplm2', url)
+        # A new handler (e.g. in another process) reads the disk tier.
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1, disk_cache=disk_cache,
+        )
+        async with handler:
+            resp2 = await handler.handle_request('tplm2', url)
+        assert resp1 == resp2 == {'status': 200, 'body': 'first-call'}
+        disk_cache.close()
+
+    async def test_missing_request_is_not_refetched(self, tmp_path):
+        disk_cache = DiskCache(path=str(tmp_path.joinpath('ndbc.sqlite')),
+                               limit=2**20)
+        url = ('https://www.ndbc.noaa.gov/data/historical/stdmet/'
+               'tplm2h1985.txt.gz')
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1, disk_cache=disk_cache,
+        )
+        async with handler:
+            with aioresponses() as m:
+                m.get(url, status=404)
+                resp1 = await handler.handle_request('tplm2', url)
+            # no mock registered, the request is known to be missing
+            resp2 = await handler.handle_request('tplm2', url)
+            assert url not in handler.get_station('tplm2').reqs.cache
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1, disk_cache=disk_cache,
+        )
+        async with handler:
+            resp3 = await handler.handle_request('tplm2', url)
+            info = await handler.inspect('tplm2', url)
+        assert resp1 == resp2 == resp3 == {'status': 404, 'body': ''}
+        assert info['cached'] == 'missing' and info['size'] == 0
+        disk_cache.close()
+
+    async def test_cache_stats(self):
+        url = 'https://www.ndbc.noaa.gov/test'
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1, cache_bytes_limit=2**20,
+        )
+        assert handler.cache_stats()['size'] == 0
+        async with handler:
+            with aioresponses() as m:
+                m.get(url, status=200, body='first-call')
+                await handler.handle_request('tplm2', url)
+            await handler.handle_request('tplm2', url)
+        stats = handler.cache_stats()
+        assert stats['entries'] == 1 and stats['hits'] == 1
+        assert 0 < stats['station_sizes']['tplm2'] == stats['size']
+        handler.clear()
+        assert handler.stations == []
+        assert handler.cache_stats()['size'] == 0
+
+    async def test_single_flight_per_url(self, monkeypatch):
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1,
+        )
+        calls, active, peak = [], [0], [0]
+
+        async def execute_request(station_id, url, headers):
+            calls.append(url)
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.05)
+            active[0] -= 1
+            return {'status': 200, 'body': url}
+
+        monkeypatch.setattr(handler, 'execute_request', execute_request)
+        urls = [f'https://www.ndbc.noaa.gov/test/{i}' for i in range(3)]
+        resps = await asyncio.gather(
+            *[handler.handle_request('tplm2', u) for u in urls * 4])
+        assert [r['body'] for r in resps] == urls * 4
+        assert sorted(calls) == urls  # one request per URL
+        assert peak[0] == len(urls)  # different URLs run in parallel
+        assert handler._inflight == {}
+
+    async def test_handle_requests_concurrent_in_order(self, monkeypatch):
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1, max_connections=3,
+        )
+        active, peak = [0], [0]
+
+        async def execute_request(station_id, url, headers):
+            async with handler._semaphore:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+                # later requests finish first
+                await asyncio.sleep(0.01 * (10 - int(url.rsplit('/', 1)[1])))
+                active[0] -= 1
+            return {'status': 200, 'body': url}
+
+        monkeypatch.setattr(handler, 'execute_request', execute_request)
+        urls = [f'https://www.ndbc.noaa.gov/test/{i}' for i in range(8)]
+        resps = await handler.handle_requests('tplm2', urls)
+        assert [r['body'] for r in resps] == urls
+        assert peak[0] == 3  # concurrent, bounded by the semaphore
+
+    async def test_stream_requests_decodes_as_received(self, monkeypatch):
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1,
+        )
+        received = []
+
+        async def execute_request(station_id, url, headers):
+            # later requests finish first
+            await asyncio.sleep(0.01 * (10 - int(url.rsplit('/', 1)[1])))
+            return {'status': 200, 'body': url}
+
+        def callback(index, response):
+            received.append(index)
+            return response['body']
+
+        monkeypatch.setattr(handler, 'execute_request', execute_request)
+        urls = [f'https://www.ndbc.noaa.gov/test/{i}' for i in range(5)]
+        got = await handler.stream_requests('tplm2', urls, callback)
+        assert got == urls
+        assert received == sorted(received, reverse=True)
+
+    async def test_station_fan_out_uses_whole_pool(self, monkeypatch):
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1, max_connections=4,
+        )
+        calls, active, peak = [], [0], [0]
+
+        async def execute_request(station_id, url, headers):
+            async with handler._semaphore:
+                calls.append(url)
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+                await asyncio.sleep(0.02)
+                active[0] -= 1
+            return {'status': 200, 'body': url}
+
+        monkeypatch.setattr(handler, 'execute_request', execute_request)
+        base = 'https://www.ndbc.noaa.gov'
+        history = [f'{base}/data/historical/stdmet/tplm2h{y}.txt.gz'
+                   for y in range(2015, 2021)]
+        pages = [f'{base}/station_page.php?station=tplm2',
+                 f'{base}/data/stations/station_table.txt']
+        # dashboard panels for one station, overlapping in their requests
+        resps = await asyncio.gather(
+            handler.handle_requests('tplm2', history),
+            handler.handle_requests('tplm2', history[-2:] + pages),
+            *[handler.handle_request('tplm2', p) for p in pages])
+        assert [r['body'] for r in resps[0]] == history
+        assert sorted(calls) == sorted(history + pages)
+        assert peak[0] == 4
+
+    async def test_realtime_tail_is_fetched_by_range(self):
+        url = 'https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt'
+        now = datetime.now().replace(second=0, microsecond=0)
+        body = realtime_body(newest=now, n=6 * 24 * 45)
+        part = range_response(body, 'bytes=0-4095')
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1,
+        )
+        since = now - timedelta(hours=1)
+        async with handler:
+            with aioresponses() as m:
+                m.get(url, status=206, body=part['body'],
+                      headers={'Content-Range':
+                               f'bytes 0-4095/{part["length"]}',
+                               'ETag': '"v1"'})
+                resp1 = await handler.handle_request('tplm2', url,
+                                                     since=since)
+                # the response is served from the cache to covered queries
+                resp2 = await handler.handle_request('tplm2', url,
+                                                     since=since)
+                sent = [call.kwargs['headers'] for call in
+                        next(iter(m.requests.values()))]
+        assert [h['Range'] for h in sent] == ['bytes=0-4095']
+        assert resp1 == resp2
+        assert resp1['etag'] == '"v1"' and body.startswith(resp1['body'])
+        assert len(resp1['body']) <= 4096
+        assert resp1['covers'] <= since.isoformat()
+
+    async def test_realtime_tail_is_single_flight(self, monkeypatch):
+        url = 'https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt'
+        now = datetime.now().replace(second=0, microsecond=0)
+        body = realtime_body(newest=now, n=6 * 24 * 45)
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1,
+        )
+        ranges = []
+
+        async def execute_request(station_id, url, headers):
+            ranges.append(headers['Range'])
+            await asyncio.sleep(0.05)
+            return range_response(body, headers['Range'])
+
+        monkeypatch.setattr(handler, 'execute_request', execute_request)
+        hour, day = now - timedelta(hours=1), now - timedelta(hours=23)
+        resps = await asyncio.gather(*[
+            handler.handle_request('tplm2', url, since=since)
+            for since in [hour, day] * 8
+        ])
+        # the queries covered by the first ranges share them, and the others
+        # share the further ranges requested by one of them
+        assert len({r['body'] for r in resps[::2]}) == 1
+        assert len({r['body'] for r in resps[1::2]}) == 1
+        assert ranges == ['bytes=0-4095', 'bytes=0-4095', 'bytes=4096-12287']
+        assert handler._inflight == {}
+
+    async def test_stale_response_is_revalidated(self):
+        url = 'https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt'
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1,
+            cache_policy=CachePolicy(
+                ttl={'realtime': 0},
+                stale_while_revalidate={'realtime': 3600}),
+        )
+        async with handler:
+            with aioresponses() as m:
+                m.get(url, status=200, body='first-call')
+                m.get(url, status=200, body='second-call')
+                resp1 = await handler.handle_request('tplm2', url)
+                # served stale while a background task refreshes it
+                resp2 = await handler.handle_request('tplm2', url)
+                await asyncio.gather(*handler._revalidations.values())
+            resp3 = handler.get_station('tplm2').reqs.get(url)
+        assert resp1 == resp2 == {'status': 200, 'body': 'first-call'}
+        assert resp3 == {'status': 200, 'body': 'second-call'}
+
+    async def test_not_modified_response_is_renewed(self, tmp_path):
+        url = 'https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt'
+        disk_cache = DiskCache(path=str(tmp_path / 'ndbc.sqlite'),
+                               limit=2**20)
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1, disk_cache=disk_cache,
+            cache_policy=CachePolicy(ttl={'realtime': 0},
+                                     stale_while_revalidate={'realtime': 0}),
+        )
+        async with handler:
+            with aioresponses() as m:
+                m.get(url, status=200, body='first-call',
+                      headers={'ETag': '"v1"'})
+                m.get(url, status=304, headers={'ETag': '"v2"'})
+                resp1 = await handler.handle_request('tplm2', url)
+                disk_cache.put(request=url, response=resp1, created=1.0)
+                resp2 = await handler.handle_request('tplm2', url)
+                sent = [call.kwargs['headers'] for call in
+                        next(iter(m.requests.values()))]
+        assert resp1 == {'status': 200, 'body': 'first-call', 'etag': '"v1"'}
+        assert resp2 == {**resp1, 'etag': '"v2"'}
+        assert [h.get('If-None-Match') for h in sent] == [None, '"v1"']
+        resp, created = disk_cache.get_entry(url)
+        assert resp == resp2 and created > 1.0
+        disk_cache.close()
+
+    async def test_expired_response_is_refetched(self):
+        url = 'https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt'
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1,
+            cache_policy=CachePolicy(ttl={'realtime': 0},
+                                     stale_while_revalidate={'realtime': 0}),
+        )
+        async with handler:
+            with aioresponses() as m:
+                m.get(url, status=200, body='first-call')
+                m.get(url, status=200, body='second-call')
+                resp1 = await handler.handle_request('tplm2', url)
+                resp2 = await handler.handle_request('tplm2', url)
+        assert resp1['body'] == 'first-call'
+        assert resp2['body'] == 'second-call'
+
+    async def test_failed_revalidation_serves_expired_response(self):
+        url = 'https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt'
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1,
+            cache_policy=CachePolicy(ttl={'realtime': 0},
+                                     stale_while_revalidate={'realtime': 0}),
+        )
+        stn = handler.get_station('tplm2')
+        async with handler:
+            with aioresponses() as m:
+                m.get(url, status=200, body='first-call')
+                m.get(url, status=503)
+                m.get(url, status=500)
+                resp1 = await handler.handle_request('tplm2', url)
+                resp2 = await handler.handle_request('tplm2', url)
+                assert stn.reqs.cache[url].v == resp1
+                # without a cached response, the error is returned
+                stn.reqs.discard(url)
+                resp3 = await handler.handle_request('tplm2', url)
+        assert resp1['body'] == resp2['body'] == 'first-call'
+        assert resp3['status'] == 500
+        assert url not in stn.reqs.cache
+
+
+@pytest.mark.asyncio
+class TestRateLimit:
+    """Verify requests wait for the per-host rate limit."""
+
+    async def test_requests_are_rate_limited(self):
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1, max_connections=1,
+            rate_limiter=RateLimiter(limits={'www.ndbc.noaa.gov': (20.0, 1)}),
+        )
+        urls = [f'https://www.ndbc.noaa.gov/test/{i}' for i in range(4)]
+        async with handler:
+            with aioresponses() as m:
+                for url in urls:
+                    m.get(url, status=200, body=url)
+                start = time.monotonic()
+                resps = await asyncio.gather(
+                    *[handler.handle_request('tplm2', u) for u in urls])
+                elapsed = time.monotonic() - start
+        assert [r['body'] for r in resps] == urls
+        assert elapsed >= 0.14
+
 
 # ---------------------------------------------------------------------------
 # retry / backoff
@@ -175,3 +531,19 @@ class TestRetryBackoff:
                     station_id='tplm2', url=url, headers={})
                 assert resp['status'] == 200
                 assert resp['body'] == b'\x00\x01\x02'
+
+    async def test_gzip_archive_decompressed(self):
+        handler = AsyncRequestHandler(
+            cache_limit=10, log=_noop_log, delay=0,
+            retries=0, backoff_factor=0.1,
+        )
+        body = b'#YY  MM DD hh mm WSPD\n2020 01 01 00 00  5.0\n'
+        url = ('https://www.ndbc.noaa.gov/data/historical/stdmet/'
+               'tplm2h2020.txt.gz')
+        async with handler:
+            with aioresponses() as m:
+                m.get(url, status=200, body=gzip.compress(body),
+                      content_type='application/x-gzip')
+                resp = await handler.execute_request(
+                    station_id='tplm2', url=url, headers={})
+                assert resp == {'status': 200, 'body': body}
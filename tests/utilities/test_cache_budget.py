@@ -0,0 +1,83 @@
+import pytest
+
+from ndbc_api.utilities.cache_budget import CacheBudget, response_size
+from ndbc_api.utilities.req_cache import RequestCache
+
+
+def _response(size: int) -> dict:
+    return {'status': 200, 'body': b'x' * size}
+
+
+@pytest.fixture
+def budget():
+    yield CacheBudget(limit=response_size('a', _response(1000)) * 4)
+
+
+@pytest.mark.private
+def test_cache_budget_accounting(budget):
+    cache = RequestCache(capacity=10, budget=budget, station_id='tplm2')
+    cache.put(request='a', response=_response(1000))
+    cache.put(request='b', response=_response(1000))
+    cache.put(request='a', response=_response(1000))  # replaced, not added
+    assert budget.size == 2 * response_size('a', _response(1000))
+    cache.get('a')
+    stats = budget.stats()
+    assert stats['entries'] == 2
+    assert stats['hits'] == 1
+    assert stats['station_sizes'] == {'tplm2': budget.size}
+
+
+@pytest.mark.private
+def test_cache_budget_discard(budget):
+    cache = RequestCache(capacity=10, budget=budget, station_id='tplm2')
+    cache.put(request='a', response=_response(1000))
+    cache.discard('a')
+    assert cache.cache == {}
+    assert len(budget) == 0 and budget.size == 0
+
+
+@pytest.mark.private
+def test_cache_budget_evicts_large_responses_first(budget):
+    cache = RequestCache(capacity=10, budget=budget, station_id='tplm2')
+    cache.put(request='large', response=_response(2500))
+    for req in 'abc':
+        cache.put(request=req, response=_response(300))
+    cache.put(request='d', response=_response(1000))
+    assert 'large' not in cache.cache
+    assert set(cache.cache) == {'a', 'b', 'c', 'd'}
+    assert budget.size <= budget.limit
+    assert budget.evictions == 1
+    assert budget.inflation > 0
+
+
+@pytest.mark.private
+def test_cache_budget_station_fairness(budget):
+    light = RequestCache(capacity=10, budget=budget, station_id='light')
+    heavy = RequestCache(capacity=10, budget=budget, station_id='heavy')
+    light.put(request='z', response=_response(1000))
+    for req in 'abcdef':
+        heavy.put(request=req, response=_response(1000))
+    # the light station is within its share, so keeps its larger response
+    assert 'z' in light.cache
+    assert len(heavy.cache) == 3
+    assert budget.stats()['stations'] == 2
+
+
+@pytest.mark.private
+def test_cache_budget_rejects_oversized_responses(budget):
+    cache = RequestCache(capacity=10, budget=budget, station_id='tplm2')
+    cache.put(request='huge', response=_response(10**6))
+    assert 'huge' not in cache.cache
+    assert len(budget) == 0 and budget.size == 0
+
+
+@pytest.mark.private
+def test_cache_budget_follows_station_eviction(budget):
+    cache = RequestCache(capacity=1, budget=budget, station_id='tplm2')
+    cache.put(request='a', response=_response(10))
+    cache.put(request='b', response=_response(10))
+    assert list(cache.cache) == ['b']
+    assert len(budget) == 1
+    assert budget.size == response_size('b', _response(10))
+    budget.clear()
+    assert budget.stats()['entries'] == 0
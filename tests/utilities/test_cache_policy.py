@@ -0,0 +1,109 @@
+from datetime import datetime
+
+import pytest
+
+from ndbc_api.api.requests.http.stdmet import StdmetRequest
+from ndbc_api.api.requests.opendap.hfradar import HfradarRequest
+from ndbc_api.api.requests.opendap.stdmet import StdmetRequest as DapRequest
+from ndbc_api.utilities.cache_policy import (EXPIRED, FRESH, IMMUTABLE,
+                                             MONTHLY, REALTIME, STALE,
+                                             CachePolicy, conditional_headers,
+                                             response_validators, revalidated)
+
+
+@pytest.fixture
+def policy():
+    yield CachePolicy(ttl={MONTHLY: 100, REALTIME: 10},
+                      stale_while_revalidate={MONTHLY: None, REALTIME: 20})
+
+
+@pytest.mark.private
+@pytest.mark.parametrize('transport', ['text', 'gzip'])
+def test_classify_http(monkeypatch, transport):
+    monkeypatch.setenv('MOCKDATE', '2023-06-15')
+    monkeypatch.setattr(StdmetRequest, 'HISTORICAL_TRANSPORT', transport)
+    reqs = StdmetRequest.build_request(station_id='tplm2',
+                                       start_time=datetime(2021, 1, 1),
+                                       end_time=datetime(2023, 6, 15))
+    got = [CachePolicy.classify(r) for r in reqs]
+    assert got == [IMMUTABLE] * 2 + [MONTHLY] * 6 + [REALTIME]
+
+
+@pytest.mark.private
+def test_classify_opendap(monkeypatch):
+    monkeypatch.setenv('MOCKDATE', '2023-06-15')
+    reqs = DapRequest.build_request(station_id='tplm2',
+                                    start_time=datetime(2021, 1, 1),
+                                    end_time=datetime(2023, 6, 15))
+    assert reqs[-1].endswith('9999.nc')
+    got = [CachePolicy.classify(r) for r in reqs]
+    assert got == [IMMUTABLE] * 2 + [REALTIME]
+    reqs = HfradarRequest.build_request(station_id='uswc_1km',
+                                        start_time=datetime(2023, 6, 1),
+                                        end_time=datetime(2023, 6, 1, 2))
+    assert {CachePolicy.classify(r) for r in reqs} == {IMMUTABLE}
+    # the DAP2 requests of a dataset are cached like its file
+    reqs = DapRequest.build_dap_request(station_id='tplm2',
+                                        start_time=datetime(2022, 1, 1),
+                                        end_time=datetime(2023, 6, 15))
+    got = [
+        CachePolicy.classify(r + suffix)
+        for r in reqs
+        for suffix in ('.dds', '.dods?time%5B0:1:9%5D')
+    ]
+    assert got == [IMMUTABLE] * 2 + [REALTIME] * 2
+
+
+@pytest.mark.private
+def test_classify_other_requests():
+    url = 'https://www.ndbc.noaa.gov/station_page.php?station=tplm2'
+    assert CachePolicy.classify(url) == REALTIME
+
+
+@pytest.mark.private
+def test_state(policy):
+    realtime = 'https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt'
+    assert policy.state(realtime, created=0, now=5) == FRESH
+    assert policy.state(realtime, created=0, now=15) == STALE
+    assert policy.state(realtime, created=0, now=30) == EXPIRED
+    monthly = 'https://www.ndbc.noaa.gov/data/stdmet/Jun/tplm2.txt'
+    assert policy.state(monthly, created=0, now=50) == FRESH
+    assert policy.state(monthly, created=0, now=10**9) == STALE
+    archive = 'https://www.ndbc.noaa.gov/data/historical/stdmet/tplm2h2015.txt.gz'
+    assert policy.state(archive, created=0, now=10**12) == FRESH
+
+
+@pytest.mark.private
+def test_missing():
+    policy = CachePolicy(negative_ttl={IMMUTABLE: None, REALTIME: 10})
+    realtime = 'https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt'
+    assert policy.missing(realtime, created=0, now=5)
+    assert not policy.missing(realtime, created=0, now=15)
+    archive = 'https://www.ndbc.noaa.gov/data/historical/stdmet/tplm2h1985.txt.gz'
+    assert policy.missing(archive, created=0, now=10**12)
+
+
+@pytest.mark.private
+def test_unsupported_data_class():
+    with pytest.raises(ValueError):
+        CachePolicy(ttl={'yearly': 10})
+
+
+@pytest.mark.private
+def test_validators():
+    headers = {
+        'ETag': '"abc"',
+        'Last-Modified': 'Wed, 01 Jan 2025 00:00:00 GMT',
+    }
+    validators = response_validators(headers)
+    assert validators == {'etag': '"abc"',
+                          'last_modified': headers['Last-Modified']}
+    assert response_validators({'Content-Type': 'text/plain'}) == {}
+    cached = {'status': 200, 'body': 'foo', **validators}
+    assert conditional_headers(cached) == {
+        'If-None-Match': '"abc"',
+        'If-Modified-Since': headers['Last-Modified'],
+    }
+    assert conditional_headers({'status': 200, 'body': 'foo'}) == {}
+    renewed = revalidated(cached, {'status': 304, 'body': '', 'etag': '"def"'})
+    assert renewed == {**cached, 'etag': '"def"'}
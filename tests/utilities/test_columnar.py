@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import pytest
+
+from ndbc_api.utilities.columnar import ColumnarData
+
+
+@pytest.fixture
+def records():
+    yield [
+        {'WSPD': 5.0, 'WDIR': 270, 'timestamp': datetime(2023, 1, 1, 1)},
+        {'WSPD': None, 'WDIR': 280, 'timestamp': datetime(2023, 1, 1, 0)},
+        {'WSPD': 6.5, 'WDIR': 290, 'timestamp': None},
+    ]
+
+
+@pytest.mark.private
+def test_from_records(records):
+    data = ColumnarData.from_records(records)
+    assert len(data) == 3
+    assert list(data.columns) == ['WSPD', 'WDIR']
+    assert data.columns['WSPD'].dtype == np.float64
+    assert data.columns['WDIR'].dtype == np.int64
+    assert np.isnat(data.timestamp[2])
+    assert data.to_records() == records
+    mixed = ColumnarData.from_records([{'a': 'x'}, {'a': 1}, {}])
+    assert mixed.columns['a'].dtype == object
+    assert mixed.to_records() == [{'a': 'x'}, {'a': 1}, {'a': None}]
+
+
+@pytest.mark.private
+def test_filter_time_and_select(records):
+    data = ColumnarData.from_records(records).with_station('tplm2')
+    filtered = data.filter_time(datetime(2023, 1, 1), datetime(2023, 1, 1, 1))
+    assert len(filtered) == 2
+    assert filtered.stations == ['tplm2']
+    selected = filtered.select(['WDIR'])
+    assert selected.to_records() == [
+        {'WDIR': 270, 'timestamp': datetime(2023, 1, 1, 1), 'station_id': 'tplm2'},
+        {'WDIR': 280, 'timestamp': datetime(2023, 1, 1, 0), 'station_id': 'tplm2'},
+    ]
+    with pytest.raises(KeyError):
+        filtered.select(['foo'])
+    assert len(filtered.filter_time(datetime(2024, 1, 1),
+                                    datetime(2024, 1, 2)).select(['foo'])) == 0
+    assert len(ColumnarData.from_records([{'a': 1}]).filter_time(
+        datetime(2023, 1, 1), datetime(2024, 1, 1))) == 0
+
+
+@pytest.mark.private
+def test_concat_promotes_types():
+    ints = ColumnarData({'a': np.array([1, 2])})
+    floats = ColumnarData({'a': np.array([np.nan]), 'b': np.array([0.5])})
+    objects = ColumnarData({'a': np.array(['x'], dtype=object)})
+    data = ColumnarData.concat([ints, floats])
+    assert data.columns['a'].dtype == np.float64
+    assert np.isnan(data.columns['b'][:2]).all()
+    data = ColumnarData.concat([ints, floats, objects])
+    assert data.columns['a'].tolist() == [1, 2, None, 'x']
+    assert len(ColumnarData.concat([])) == 0
+
+
+@pytest.mark.private
+def test_merge_coalesces_by_timestamp_and_station():
+    ts = np.array(['2023-01-01T01', '2023-01-01T00'], dtype='datetime64[ns]')
+    stdmet = ColumnarData({'WSPD': np.array([np.nan, 5.0])}, ts)
+    ocean = ColumnarData({
+        'WSPD': np.array([7.0, 8.0]),
+        'OTMP': np.array([10.0, np.nan]),
+    }, ts)
+    merged = ColumnarData.merge([
+        stdmet.with_station('s2'),
+        ocean.with_station('s2'),
+        stdmet.with_station('s1'),
+    ])
+    assert merged.to_records() == [
+        {'WSPD': 5.0, 'OTMP': None, 'timestamp': datetime(2023, 1, 1, 0), 'station_id': 's1'},
+        {'WSPD': 5.0, 'OTMP': None, 'timestamp': datetime(2023, 1, 1, 0), 'station_id': 's2'},
+        {'WSPD': None, 'OTMP': None, 'timestamp': datetime(2023, 1, 1, 1), 'station_id': 's1'},
+        {'WSPD': 7.0, 'OTMP': 10.0, 'timestamp': datetime(2023, 1, 1, 1), 'station_id': 's2'},
+    ]
+    untimed = ColumnarData({'a': np.array([1, 1])}).with_station('s1')
+    assert len(ColumnarData.merge([untimed, untimed])) == 4
+
+
+@pytest.mark.private
+def test_conversions(records):
+    data = ColumnarData.from_records(records).with_station('tplm2')
+    df = data.to_pandas()
+    assert list(df.columns) == ['WSPD', 'WDIR', 'timestamp', 'station_id']
+    pd.testing.assert_frame_equal(df, pd.DataFrame(data.to_records()))
+    pl_df = data.to_polars()
+    assert pl_df.columns == list(df.columns)
+    assert pl_df['WSPD'].null_count() == 1
+    assert pl_df['timestamp'].dtype == pl.Datetime('us')
+    assert pl_df['station_id'].to_list() == ['tplm2'] * 3
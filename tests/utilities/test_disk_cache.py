@@ -0,0 +1,173 @@
+import multiprocessing
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ndbc_api.utilities.disk_cache import DiskCache
+
+TEST_URL = 'https://www.ndbc.noaa.gov/data/historical/stdmet/tplm2h2020.txt.gz'
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    cache = DiskCache(path=str(tmp_path.joinpath('cache', 'ndbc.sqlite')),
+                      limit=2**20)
+    yield cache
+    cache.close()
+
+
+def _put_many(path: str, worker: int) -> None:
+    cache = DiskCache(path=path, limit=2**20)
+    for i in range(25):
+        cache.put(request=f'{worker}-{i}',
+                  response={'status': 200, 'body': f'{worker} {i}\n' * 10},
+                  station_id=str(worker))
+    cache.close()
+
+
+@pytest.mark.private
+def test_disk_cache_put_get(disk_cache):
+    assert disk_cache.get(TEST_URL) is None
+    text = {'status': 200, 'body': '#YY  MM DD hh mm WSPD\n' * 100}
+    disk_cache.put(request=TEST_URL, response=text, station_id='tplm2')
+    assert TEST_URL in disk_cache
+    assert disk_cache.get(TEST_URL) == text
+    assert disk_cache.size() < len(text['body'])  # compressed
+    raw = {'status': 200, 'body': b'\x00\x01\x02'}
+    disk_cache.put(request='raw', response=raw)
+    assert disk_cache.get('raw') == raw
+    disk_cache.put(request='missing', response={'status': 404, 'body': ''})
+    assert 'missing' not in disk_cache
+    assert len(disk_cache) == 2
+    disk_cache.delete('raw')
+    assert [(s, r) for s, r, _ in disk_cache.items()] == [('tplm2', TEST_URL)]
+    disk_cache.clear()
+    assert len(disk_cache) == 0
+
+
+@pytest.mark.private
+def test_disk_cache_get_entry(disk_cache):
+    assert disk_cache.get_entry(TEST_URL) is None
+    resp = {'status': 200, 'body': 'foo'}
+    disk_cache.put(request=TEST_URL, response=resp, created=100.0)
+    assert disk_cache.get_entry(TEST_URL) == (resp, 100.0)
+    disk_cache.clear()
+
+
+@pytest.mark.private
+def test_disk_cache_stat(disk_cache):
+    assert disk_cache.stat(TEST_URL) is None
+    body = '#YY  MM DD hh mm WSPD\n' * 100
+    disk_cache.put(request=TEST_URL,
+                   response={'status': 200, 'body': body},
+                   created=100.0)
+    # the uncompressed length of the body
+    assert disk_cache.stat(TEST_URL) == (len(body), 100.0)
+    disk_cache.clear()
+
+
+@pytest.mark.private
+def test_disk_cache_missing(disk_cache):
+    assert disk_cache.get_missing(TEST_URL) is None
+    disk_cache.put_missing(request=TEST_URL, station_id='tplm2', created=1.0)
+    assert disk_cache.get_missing(TEST_URL) == 1.0
+    assert TEST_URL not in disk_cache
+    disk_cache.delete(TEST_URL)
+    assert disk_cache.get_missing(TEST_URL) is None
+    disk_cache.put_missing(request=TEST_URL, created=2.0)
+    disk_cache.clear()
+    assert disk_cache.get_missing(TEST_URL) is None
+
+
+@pytest.mark.private
+def test_disk_cache_validators(disk_cache):
+    resp = {'status': 200, 'body': 'foo', 'etag': '"v1"',
+            'last_modified': 'Wed, 01 Jan 2025 00:00:00 GMT'}
+    disk_cache.put(request=TEST_URL, response=resp, created=100.0)
+    assert disk_cache.get_entry(TEST_URL) == (resp, 100.0)
+    assert list(disk_cache.items()) == [(None, TEST_URL, resp)]
+    # a response renewed as not modified keeps its body
+    renewed = {**resp, 'body': None, 'etag': '"v2"'}
+    disk_cache.refresh(request=TEST_URL, response=renewed, created=200.0)
+    assert disk_cache.get_entry(TEST_URL) == ({**resp, 'etag': '"v2"'}, 200.0)
+    # and is stored in full if it was evicted
+    disk_cache.refresh(request='evicted', response=resp, created=300.0)
+    assert disk_cache.get_entry('evicted') == (resp, 300.0)
+    disk_cache.clear()
+
+
+@pytest.mark.private
+def test_disk_cache_adds_validator_columns(tmp_path):
+    path = str(tmp_path.joinpath('ndbc.sqlite'))
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE responses (request TEXT PRIMARY KEY, '
+                 'station_id TEXT, status INTEGER NOT NULL, body BLOB NOT NULL, '
+                 'flags INTEGER NOT NULL, size INTEGER NOT NULL, '
+                 'created REAL NOT NULL, accessed REAL NOT NULL)')
+    conn.execute("INSERT INTO responses VALUES "
+                 "('old', 'tplm2', 200, X'666f6f', 0, 3, 1.0, 1.0)")
+    conn.commit()
+    conn.close()
+    cache = DiskCache(path=path, limit=2**20)
+    assert cache.get_entry('old') == ({'status': 200, 'body': b'foo'}, 1.0)
+    assert cache.stat('old') == (3, 1.0)
+    resp = {'status': 200, 'body': 'bar', 'etag': '"v1"'}
+    cache.put(request='new', response=resp)
+    assert cache.get('new') == resp
+    cache.close()
+
+
+@pytest.mark.private
+def test_disk_cache_uncompressed(tmp_path):
+    cache = DiskCache(path=str(tmp_path.joinpath('ndbc.sqlite')),
+                      limit=2**20,
+                      compression=0)
+    cache.put(request='foo', response={'status': 200, 'body': 'bar'})
+    assert cache.size() == len('foo') + len('bar')
+    assert cache.get('foo') == {'status': 200, 'body': 'bar'}
+    cache.close()
+
+
+@pytest.mark.private
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(path=str(tmp_path.joinpath('ndbc.sqlite')),
+                      limit=300,
+                      compression=0)
+    for name in ('a', 'b', 'c'):
+        cache.put(request=name, response={'status': 200, 'body': name * 99})
+    assert len(cache) == 3
+    assert cache.get('a') is not None  # `b` is now least recently used
+    cache.put(request='d', response={'status': 200, 'body': 'd' * 99})
+    assert 'b' not in cache
+    assert all(name in cache for name in ('a', 'c', 'd'))
+    assert cache.size() <= cache.limit
+    cache.put(request='e', response={'status': 200, 'body': 'e' * 1000})
+    assert 'e' not in cache  # larger than the limit
+    cache.close()
+
+
+@pytest.mark.private
+def test_disk_cache_load(disk_cache):
+    dump = {'tplm2': {TEST_URL: {'status': 200, 'body': 'foo'}}}
+    disk_cache.load(dump)
+    assert disk_cache.get(TEST_URL) == {'status': 200, 'body': 'foo'}
+
+
+@pytest.mark.private
+def test_disk_cache_concurrent_access(tmp_path):
+    path = str(tmp_path.joinpath('ndbc.sqlite'))
+    DiskCache(path=path, limit=2**20).close()
+    ctx = multiprocessing.get_context('spawn')
+    procs = [ctx.Process(target=_put_many, args=(path, i)) for i in range(4)]
+    for proc in procs:
+        proc.start()
+    cache = DiskCache(path=path, limit=2**20)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda i: _put_many(path, i), range(4, 8)))
+    for proc in procs:
+        proc.join()
+        assert proc.exitcode == 0
+    assert len(cache) == 8 * 25
+    assert cache.get('7-24') == {'status': 200, 'body': '7 24\n' * 10}
+    cache.close()
@@ -0,0 +1,41 @@
+import gzip
+
+import pytest
+
+from ndbc_api.exceptions import ResponseException
+from ndbc_api.utilities.gzip_stream import GzipStream, decompress_chunks
+
+BODY = b'#YY  MM DD hh mm WSPD\n2020 01 01 00 00  5.0\n' * 64
+
+
+def _chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.private
+@pytest.mark.parametrize('size', [1, 7, 1024])
+def test_decompress_chunks(size):
+    assert decompress_chunks(_chunks(gzip.compress(BODY), size)) == BODY
+
+
+@pytest.mark.private
+def test_decompress_concatenated_members():
+    data = gzip.compress(BODY) + gzip.compress(b'tail\n')
+    assert decompress_chunks(_chunks(data, 5)) == BODY + b'tail\n'
+
+
+@pytest.mark.private
+def test_passthrough_uncompressed():
+    assert decompress_chunks(_chunks(BODY, 3)) == BODY
+    assert decompress_chunks([b'x']) == b'x'
+    assert decompress_chunks([]) == b''
+
+
+@pytest.mark.private
+def test_truncated_or_corrupt_body_raises():
+    stream = GzipStream()
+    stream.feed(gzip.compress(BODY)[:-8])
+    with pytest.raises(ResponseException):
+        stream.close()
+    with pytest.raises(ResponseException):
+        decompress_chunks([b'\x1f\x8b\x08', b'not a gzip member'])
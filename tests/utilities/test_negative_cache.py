@@ -0,0 +1,49 @@
+import pytest
+
+from ndbc_api.utilities.cache_policy import CachePolicy
+from ndbc_api.utilities.disk_cache import DiskCache
+from ndbc_api.utilities.negative_cache import NegativeCache, not_found
+
+ARCHIVE_URL = 'https://www.ndbc.noaa.gov/data/historical/stdmet/tplm2h1985.txt.gz'
+REALTIME_URL = 'https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt'
+
+
+@pytest.fixture
+def policy():
+    yield CachePolicy(negative_ttl={'immutable': None, 'realtime': 10})
+
+
+@pytest.mark.private
+def test_negative_cache(policy):
+    cache = NegativeCache(cache_policy=policy)
+    assert not cache.missing(ARCHIVE_URL)
+    cache.add(ARCHIVE_URL, created=0.0)
+    cache.add(REALTIME_URL, created=0.0)
+    assert len(cache) == 2
+    assert cache.missing(ARCHIVE_URL, now=10.0**9)
+    assert cache.missing(REALTIME_URL, now=5.0)
+    # the negative ttl of realtime files has passed
+    assert not cache.missing(REALTIME_URL, now=15.0)
+    assert len(cache) == 1
+    cache.clear()
+    assert not cache.missing(ARCHIVE_URL)
+    assert not_found() == {'status': 404, 'body': ''}
+
+
+@pytest.mark.private
+def test_negative_cache_persistent(policy, tmp_path):
+    disk_cache = DiskCache(path=str(tmp_path.joinpath('ndbc.sqlite')),
+                           limit=2**20)
+    NegativeCache(cache_policy=policy,
+                  disk_cache=disk_cache).add(ARCHIVE_URL, station_id='tplm2')
+    # a new cache (e.g. in another process) reads the disk tier
+    cache = NegativeCache(cache_policy=policy, disk_cache=disk_cache)
+    assert not cache.missing(ARCHIVE_URL, persistent=False)
+    assert cache.missing(ARCHIVE_URL)
+    assert cache.missing(ARCHIVE_URL, persistent=False)
+    # a response stored once the file is published replaces the record
+    disk_cache.put(request=ARCHIVE_URL, response={'status': 200, 'body': 'x'})
+    assert disk_cache.get_missing(ARCHIVE_URL) is None
+    assert not NegativeCache(cache_policy=policy,
+                             disk_cache=disk_cache).missing(ARCHIVE_URL)
+    disk_cache.close()
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from ndbc_api.api.requests.http._base import YEARLY, PlannedRequest
+from ndbc_api.config import PLAN_BYTES_PER_DAY, TAIL_FETCH_BYTES
+from ndbc_api.utilities.query_plan import (PLAN_COLUMNS, handle_plan_data,
+                                           plan_row, request_days)
+
+NOW = datetime(2024, 5, 20, 12, 0)
+YEARLY_URL = 'https://www.ndbc.noaa.gov/data/historical/stdmet/tplm2h2023.txt.gz'
+REALTIME_URL = 'https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt'
+UNCACHED = dict(cached=None, state=None, size=None, range=False)
+
+
+@pytest.mark.private
+def test_request_days():
+    planned = PlannedRequest(YEARLY_URL, YEARLY, datetime(2023, 1, 1),
+                             datetime(2024, 1, 1))
+    assert request_days(planned) == 365
+    assert request_days('https://dods.ndbc.noaa.gov/thredds/dodsC/data/'
+                        'stdmet/tplm2/tplm2h2023.nc') == 365
+    assert request_days('https://dods.ndbc.noaa.gov/thredds/dodsC/data/'
+                        'stdmet/tplm2/tplm2h9999.nc') == 45
+    assert request_days(REALTIME_URL) == 1
+
+
+@pytest.mark.private
+def test_plan_row():
+    planned = PlannedRequest(YEARLY_URL, YEARLY, datetime(2023, 1, 1),
+                             datetime(2024, 1, 1))
+    row = plan_row('tplm2', 'stdmet', planned, UNCACHED, since=NOW, now=NOW)
+    assert row['url'] == YEARLY_URL and row['family'] == YEARLY
+    assert row['size'] == row['bytes'] == 365 * PLAN_BYTES_PER_DAY['stdmet']
+    # fresh responses are served from the cache
+    cached = dict(cached='disk', state='fresh', size=1000, range=False)
+    row = plan_row('tplm2', 'stdmet', planned, cached, since=NOW, now=NOW)
+    assert row['size'] == 1000 and row['bytes'] == 0
+    row = plan_row('tplm2', 'stdmet', planned, {**cached, 'state': 'stale'},
+                   since=NOW, now=NOW)
+    assert row['bytes'] == 1000
+    # realtime files fetched by range only download the recent observations
+    tail = dict(UNCACHED, range=True)
+    row = plan_row('tplm2', 'stdmet', REALTIME_URL, tail,
+                   since=NOW - timedelta(hours=1), now=NOW)
+    assert row['family'] is None
+    assert row['bytes'] == TAIL_FETCH_BYTES < row['size']
+    row = plan_row('tplm2', 'stdmet', REALTIME_URL, tail,
+                   since=NOW - timedelta(days=3), now=NOW)
+    assert row['bytes'] == row['size']
+
+
+@pytest.mark.private
+def test_handle_plan_data():
+    row = plan_row('tplm2', 'stdmet', REALTIME_URL, UNCACHED, since=NOW,
+                   now=NOW)
+    assert handle_plan_data([row], as_df=False) == [row]
+    df = handle_plan_data([row])
+    assert list(df.columns) == list(PLAN_COLUMNS) and len(df) == 1
+    # an empty plan still has the columns
+    assert list(handle_plan_data([]).columns) == list(PLAN_COLUMNS)
+    assert handle_plan_data([], as_pl=True).columns == list(PLAN_COLUMNS)
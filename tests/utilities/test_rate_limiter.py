@@ -0,0 +1,90 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ndbc_api.config import HTTP_DELAY, HTTP_POOL_SIZE, HTTP_RATE_LIMITS
+from ndbc_api.utilities.rate_limiter import RateLimiter
+
+WWW_URL = 'https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt'
+DODS_URL = 'https://dods.ndbc.noaa.gov/thredds/fileServer/data/stdmet/tplm2/tplm2h9999.nc'
+
+
+@pytest.mark.private
+def test_rate_limiter_burst_then_rate():
+    limiter = RateLimiter(limits={'www.ndbc.noaa.gov': (10.0, 3)})
+    waits = [limiter.reserve(WWW_URL, now=100.0) for _ in range(5)]
+    assert waits == pytest.approx([0.0, 0.0, 0.0, 0.1, 0.2])
+    # the bucket refills at the sustained rate
+    assert limiter.reserve(WWW_URL, now=101.0) == 0.0
+
+
+@pytest.mark.private
+def test_rate_limiter_per_host():
+    limiter = RateLimiter(limits={'www.ndbc.noaa.gov': (1.0, 1)},
+                          default=(2.0, 1))
+    assert limiter.reserve(WWW_URL, now=0.0) == 0.0
+    assert limiter.reserve(DODS_URL, now=0.0) == 0.0
+    assert limiter.reserve(WWW_URL, now=0.0) == pytest.approx(1.0)
+    assert limiter.reserve(DODS_URL, now=0.0) == pytest.approx(0.5)
+    unlimited = RateLimiter()
+    assert {unlimited.reserve(WWW_URL) for _ in range(100)} == {0.0}
+
+
+@pytest.mark.private
+def test_rate_limiter_from_delay():
+    limiter = RateLimiter.from_delay()
+    assert limiter.limits == HTTP_RATE_LIMITS
+    assert limiter.default == (1000.0 / HTTP_DELAY, 1)
+    # an explicit delay limits the NDBC hosts, unless given their own limit
+    limiter = RateLimiter.from_delay(500)
+    assert limiter.limits == {}
+    assert limiter.default == (2.0, 1)
+    assert limiter.reserve(WWW_URL, now=0.0) == 0.0
+    assert limiter.reserve(WWW_URL, now=0.0) == pytest.approx(0.5)
+    limiter = RateLimiter.from_delay(500,
+                                     limits={'www.ndbc.noaa.gov': (10.0, 2)})
+    assert limiter.reserve(WWW_URL, now=0.0) == 0.0
+    assert limiter.reserve(WWW_URL, now=0.0) == 0.0
+    assert limiter.reserve(DODS_URL, now=0.0) == 0.0
+    assert limiter.reserve(DODS_URL, now=0.0) == pytest.approx(0.5)
+    assert RateLimiter.from_delay(0, limits={}).default is None
+
+
+@pytest.mark.private
+def test_rate_limiter_default_throughput():
+    limiter = RateLimiter.from_delay()
+    rate, burst = HTTP_RATE_LIMITS['www.ndbc.noaa.gov']
+    assert burst >= HTTP_POOL_SIZE
+    # a burst of concurrent requests is sent at once, then at the full rate
+    with ThreadPoolExecutor(max_workers=HTTP_POOL_SIZE) as executor:
+        start = time.monotonic()
+        list(executor.map(limiter.acquire, [WWW_URL] * burst))
+    assert time.monotonic() - start < 0.5
+    waits = [limiter.reserve(DODS_URL, now=0.0) for _ in range(burst + 3)]
+    assert waits == pytest.approx([0.0] * burst + [i / rate for i in (1, 2, 3)])
+
+
+@pytest.mark.private
+def test_rate_limiter_invalid():
+    with pytest.raises(ValueError):
+        RateLimiter(limits={'www.ndbc.noaa.gov': (0, 1)})
+    with pytest.raises(ValueError):
+        RateLimiter(default=(1.0, 0))
+
+
+@pytest.mark.private
+def test_rate_limiter_acquire():
+    limiter = RateLimiter(default=(50.0, 1))
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire(WWW_URL)
+    assert time.monotonic() - start >= 0.035
+
+    async def acquire_all():
+        await asyncio.gather(*[limiter.acquire_async(DODS_URL) for _ in range(3)])
+
+    start = time.monotonic()
+    asyncio.run(acquire_all())
+    assert time.monotonic() - start >= 0.035
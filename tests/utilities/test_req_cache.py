@@ -62,3 +62,12 @@ def test_request_cache_overwrite(request_handler, response_foo,
     want = response_foobar
     got = request_handler.get('foo')
     assert got == want
+
+
+@pytest.mark.private
+def test_request_cache_created(request_handler, response_foo):
+    assert request_handler.created('qux') is None
+    request_handler.put(request='qux', response=response_foo, created=100.0)
+    assert request_handler.created('qux') == 100.0
+    request_handler.put(request='qux', response=response_foo)
+    assert request_handler.created('qux') > 100.0
@@ -1,6 +1,21 @@
+import gzip
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+import httpretty
 import pytest
 
+from ndbc_api.exceptions import RequestException
+from ndbc_api.utilities.cache_budget import CacheBudget, response_size
+from ndbc_api.utilities.cache_policy import CachePolicy
+from ndbc_api.utilities.disk_cache import DiskCache
+from ndbc_api.utilities.negative_cache import NegativeCache
 from ndbc_api.utilities.req_handler import RequestHandler
+from ndbc_api.utilities.scheduler import FETCH_THREAD_PREFIX, Scheduler
+from ndbc_api.utilities.tail_fetch import TAIL_SUFFIX
+from tests.utilities.test_tail_fetch import range_response, realtime_body
 
 
 @pytest.fixture(scope='module')
@@ -58,7 +73,9 @@ def test_update_headers(request_handler, request_header_baz):
 @pytest.mark.private
 def test_add_station(request_handler):
     cur_len = len(request_handler.stations)
-    request_handler.add_station('foo')
+    request_handler.add_station('add_station')
+    assert len(request_handler.stations) == cur_len + 1
+    request_handler.add_station('add_station')
     assert len(request_handler.stations) == cur_len + 1
 
 
@@ -76,3 +93,460 @@ def test_get_station(request_handler):
     want = request_handler.get_station(101)
     got = request_handler.get_station('101')
     assert want == got
+
+
+@pytest.mark.private
+def test_station_int_id(request_handler, monkeypatch):
+    monkeypatch.setattr(request_handler, 'stations', {})
+    request_handler.add_station(41013)
+    assert request_handler.has_station(41013)
+    assert request_handler.has_station('41013')
+    assert list(request_handler.stations) == ['41013']
+    stn = request_handler.get_station('41013')
+    assert stn is request_handler.get_station(41013)
+    # the lock stripe is the same whichever type of id is given
+    stripe = hash('41013') % request_handler.LOCK_STRIPES
+    assert stn.lock is request_handler._stripes[stripe]
+    request_handler.add_station('41013')
+    assert len(request_handler.stations) == 1
+
+
+@pytest.mark.private
+@pytest.mark.usefixtures('mock_socket')
+def test_execute_request_gzip(request_handler, monkeypatch):
+    body = b'#YY  MM DD hh mm WSPD\n2020 01 01 00 00  5.0\n'
+    url = 'https://www.ndbc.noaa.gov/data/historical/stdmet/tplm2h2020.txt.gz'
+    httpretty.register_uri(httpretty.GET,
+                           url,
+                           body=gzip.compress(body),
+                           content_type='application/x-gzip')
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    got = request_handler.execute_request(station_id='tplm2',
+                                          url=url,
+                                          headers={})
+    assert got == {'status': 200, 'body': body}
+
+
+@pytest.mark.private
+@pytest.mark.usefixtures('mock_socket')
+def test_handle_request_disk_cache(request_handler, monkeypatch, tmp_path):
+    url = 'https://www.ndbc.noaa.gov/data/realtime2/DISK.txt'
+    httpretty.register_uri(httpretty.GET, url, body='foo')
+    disk_cache = DiskCache(path=str(tmp_path.joinpath('ndbc.sqlite')),
+                           limit=2**20)
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    monkeypatch.setattr(request_handler, '_disk_cache', disk_cache)
+    monkeypatch.setattr(request_handler, 'stations', {})
+    want = request_handler.handle_request(station_id='disk', req=url)
+    assert disk_cache.get(url) == want == {'status': 200, 'body': 'foo'}
+    httpretty.reset()  # the disk tier serves the request without the network
+    request_handler.stations = {}
+    assert request_handler.handle_request(station_id='disk', req=url) == want
+    disk_cache.close()
+
+
+@pytest.mark.private
+@pytest.mark.usefixtures('mock_socket')
+def test_handle_request_missing(request_handler, monkeypatch, tmp_path):
+    url = 'https://www.ndbc.noaa.gov/data/historical/stdmet/tplm2h1985.txt.gz'
+    httpretty.register_uri(httpretty.GET, url, status=404)
+    disk_cache = DiskCache(path=str(tmp_path.joinpath('ndbc.sqlite')),
+                           limit=2**20)
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    monkeypatch.setattr(request_handler, 'stations', {})
+    monkeypatch.setattr(request_handler, '_disk_cache', disk_cache)
+    monkeypatch.setattr(request_handler, '_negative_cache',
+                        NegativeCache(disk_cache=disk_cache))
+    want = {'status': 404, 'body': ''}
+    assert request_handler.handle_request('missing', url) == want
+    assert len(httpretty.latest_requests()) == 1
+    # missing requests are kept apart from the responses of the station
+    assert url not in request_handler.get_station('missing').reqs.cache
+    assert request_handler.handle_request('missing', url) == want
+    assert request_handler.inspect('missing', url)['cached'] == 'missing'
+    # and are known to be missing across handlers, without the network
+    httpretty.reset()
+    monkeypatch.setattr(request_handler, '_negative_cache',
+                        NegativeCache(disk_cache=disk_cache))
+    assert request_handler.handle_request('missing', url) == want
+    assert httpretty.latest_requests() == []
+    disk_cache.close()
+
+
+@pytest.mark.private
+def test_handle_request_stale_while_revalidate(request_handler, monkeypatch):
+    url = 'https://www.ndbc.noaa.gov/data/realtime2/SWR.txt'
+    bodies = iter(['first', 'second', 'third'])
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    monkeypatch.setattr(request_handler, 'stations', {})
+    monkeypatch.setattr(request_handler, 'execute_request',
+                        lambda **kwargs: {'status': 200, 'body': next(bodies)})
+    monkeypatch.setattr(
+        request_handler, '_cache_policy',
+        CachePolicy(ttl={'realtime': 0},
+                    stale_while_revalidate={'realtime': 3600}))
+    assert request_handler.handle_request('swr', url)['body'] == 'first'
+    # the stale response is served while it is refreshed in the background
+    assert request_handler.handle_request('swr', url)['body'] == 'first'
+    wait(list(request_handler._revalidations.values()))
+    stn = request_handler.get_station('swr')
+    assert stn.reqs.get(url)['body'] == 'second'
+    # expired responses are requested again before being served
+    monkeypatch.setattr(
+        request_handler, '_cache_policy',
+        CachePolicy(ttl={'realtime': 0},
+                    stale_while_revalidate={'realtime': 0}))
+    assert request_handler.handle_request('swr', url)['body'] == 'third'
+
+
+@pytest.mark.private
+@pytest.mark.usefixtures('mock_socket')
+def test_handle_request_conditional(request_handler, monkeypatch, tmp_path):
+    url = 'https://www.ndbc.noaa.gov/data/realtime2/ETAG.txt'
+    modified = 'Wed, 01 Jan 2025 00:00:00 GMT'
+    conditions = []
+
+    def respond(request, uri, response_headers):
+        conditions.append((request.headers.get('If-None-Match'),
+                           request.headers.get('If-Modified-Since')))
+        response_headers.update({'ETag': '"v1"', 'Last-Modified': modified})
+        if request.headers.get('If-None-Match') == '"v1"':
+            return [304, response_headers, '']
+        return [200, response_headers, 'foo']
+
+    httpretty.register_uri(httpretty.GET, url, body=respond)
+    disk_cache = DiskCache(path=str(tmp_path.joinpath('ndbc.sqlite')),
+                           limit=2**20)
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    monkeypatch.setattr(request_handler, 'stations', {})
+    monkeypatch.setattr(request_handler, '_disk_cache', disk_cache)
+    monkeypatch.setattr(
+        request_handler, '_cache_policy',
+        CachePolicy(ttl={'realtime': 0},
+                    stale_while_revalidate={'realtime': 0}))
+    want = {'status': 200, 'body': 'foo', 'etag': '"v1"',
+            'last_modified': modified}
+    assert request_handler.handle_request('etag', url) == want
+    disk_cache.put(request=url, response=want, created=1.0)
+    # the expired response is renewed without its body
+    assert request_handler.handle_request('etag', url) == want
+    assert conditions == [(None, None), ('"v1"', modified)]
+    resp, created = disk_cache.get_entry(url)
+    assert resp == want and created > 1.0
+    disk_cache.close()
+
+
+@pytest.mark.private
+@pytest.mark.usefixtures('mock_socket')
+def test_handle_request_failed_revalidation(request_handler, monkeypatch):
+    url = 'https://www.ndbc.noaa.gov/data/realtime2/UNAVAILABLE.txt'
+    statuses = [200, 503, 200]
+
+    def respond(request, uri, response_headers):
+        status = statuses.pop(0)
+        return [status, response_headers, 'foo' if status == 200 else '']
+
+    httpretty.register_uri(httpretty.GET, url, body=respond)
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    monkeypatch.setattr(request_handler, 'stations', {})
+    monkeypatch.setattr(request_handler, '_disk_cache', None)
+    monkeypatch.setattr(
+        request_handler, '_cache_policy',
+        CachePolicy(ttl={'realtime': 0},
+                    stale_while_revalidate={'realtime': 0}))
+    want = {'status': 200, 'body': 'foo'}
+    assert request_handler.handle_request('unavailable', url) == want
+    # the expired response is served, and kept, if the server fails
+    assert request_handler.handle_request('unavailable', url) == want
+    stn = request_handler.get_station('unavailable')
+    assert stn.reqs.cache[url].v == want
+    assert request_handler.handle_request('unavailable', url) == want
+    assert statuses == []
+
+
+@pytest.mark.private
+def test_inspect(request_handler, monkeypatch, tmp_path):
+    url = 'https://www.ndbc.noaa.gov/data/realtime2/PLAN.txt'
+    now = datetime.now()
+    disk_cache = DiskCache(path=str(tmp_path.joinpath('ndbc.sqlite')),
+                           limit=2**20)
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    monkeypatch.setattr(request_handler, 'stations', {})
+    monkeypatch.setattr(request_handler, '_disk_cache', disk_cache)
+    assert request_handler.inspect('plan', url) == dict(cached=None,
+                                                        state=None,
+                                                        size=None,
+                                                        range=False)
+    # realtime files are fetched by range for recent queries
+    since = now - timedelta(hours=1)
+    assert request_handler.inspect('plan', url, since=since)['range']
+    stn = request_handler.get_station('plan')
+    stn.reqs.put(url + TAIL_SUFFIX, {
+        'status': 200,
+        'body': 'foo',
+        'covers': (now - timedelta(hours=2)).isoformat()
+    })
+    got = request_handler.inspect('plan', url, since=since)
+    assert got == dict(cached='memory', state='fresh', size=3, range=True)
+    assert request_handler.inspect(
+        'plan', url, since=now - timedelta(hours=3))['cached'] is None
+    disk_cache.put(request=url,
+                   response={'status': 200, 'body': 'foobar'},
+                   created=1.0)
+    got = request_handler.inspect('plan', url)
+    assert got == dict(cached='disk', state='expired', size=6, range=False)
+    stn.reqs.put(url, {'status': 200, 'body': 'foo bar'})
+    assert request_handler.inspect('plan', url)['cached'] == 'memory'
+    disk_cache.close()
+
+
+@pytest.mark.private
+@pytest.mark.usefixtures('mock_socket')
+@pytest.mark.parametrize('honor_range', [True, False])
+def test_handle_request_tail(request_handler, monkeypatch, honor_range):
+    url = 'https://www.ndbc.noaa.gov/data/realtime2/TAIL.txt'
+    now = datetime.now().replace(second=0, microsecond=0)
+    body = realtime_body(newest=now, n=6 * 24 * 45)
+    ranges = []
+
+    def respond(request, uri, response_headers):
+        ranges.append(request.headers.get('Range'))
+        if not honor_range or request.headers.get('Range') is None:
+            return [200, response_headers, body]
+        resp = range_response(body, request.headers['Range'])
+        response_headers['Content-Range'] = (
+            f'bytes {ranges[-1][len("bytes="):]}/{resp["length"]}')
+        return [resp['status'], response_headers, resp['body']]
+
+    httpretty.register_uri(httpretty.GET, url, body=respond)
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    monkeypatch.setattr(request_handler, 'stations', {})
+    monkeypatch.setattr(request_handler, '_disk_cache', None)
+    since = now - timedelta(hours=1)
+    resp = request_handler.handle_request('tail', url, since=since)
+    assert ranges == ['bytes=0-4095']
+    assert resp['status'] == 200 and body.startswith(resp['body'])
+    # the response is served from the cache to the queries it covers
+    assert request_handler.handle_request('tail', url, since=since) == resp
+    assert len(ranges) == 1
+    stn = request_handler.get_station('tail')
+    week = now - timedelta(days=7)
+    if honor_range:
+        assert len(resp['body']) <= 4096
+        assert resp['covers'] <= since.isoformat()
+        assert list(stn.reqs.cache) == [url + TAIL_SUFFIX]
+        old = request_handler.handle_request('tail',
+                                             url,
+                                             since=now - timedelta(hours=23))
+        assert ranges[1:] == ['bytes=0-4095', 'bytes=4096-12287']
+        assert body.startswith(old['body'])
+        assert len(old['body']) > len(resp['body'])
+        # older queries request the whole file
+        assert request_handler.handle_request('tail', url,
+                                              since=week)['body'] == body
+        assert ranges[-1] is None
+    else:
+        assert resp['body'] == body and 'covers' not in resp
+        assert list(stn.reqs.cache) == [url]
+        assert request_handler.handle_request('tail', url, since=week) == resp
+        assert len(ranges) == 1
+
+
+@pytest.mark.private
+def test_handle_request_missing_forgets_budget(request_handler, monkeypatch):
+    url = 'https://www.ndbc.noaa.gov/data/realtime2/GONE.txt'
+    budget = CacheBudget(limit=2**20)
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    monkeypatch.setattr(request_handler, 'stations', {})
+    monkeypatch.setattr(request_handler, '_cache_budget', budget)
+    monkeypatch.setattr(request_handler, '_disk_cache', None)
+    monkeypatch.setattr(request_handler, '_negative_cache', NegativeCache())
+    stn = request_handler.get_station('gone')
+    request_handler._store(stn, url, {'status': 200, 'body': 'x' * 5000})
+    assert budget.stats()['entries'] == 1
+    # a response which is no longer found is no longer charged to the budget
+    request_handler._store(stn, url, {'status': 404, 'body': ''})
+    assert stn.reqs.cache == {}
+    assert budget.stats()['entries'] == 0
+    assert budget.stats()['station_sizes'] == {}
+
+
+@pytest.mark.private
+def test_handle_request_thread_safety(request_handler, monkeypatch):
+    n_threads, n_stations, n_urls = 64, 500, 5
+
+    def execute_request(station_id, url, headers):
+        return {'status': 200, 'body': url * (1 + hash(url) % 50)}
+
+    budget = CacheBudget(limit=2**20)
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    monkeypatch.setattr(request_handler, 'stations', {})
+    monkeypatch.setattr(request_handler, '_cache_limit', 3)
+    monkeypatch.setattr(request_handler, '_cache_budget', budget)
+    monkeypatch.setattr(request_handler, '_disk_cache', None)
+    monkeypatch.setattr(request_handler, 'execute_request', execute_request)
+
+    def hammer(seed):
+        for i in range(400):
+            station_id = f's{(seed * 7919 + i * 31) % n_stations}'
+            url = (f'https://www.ndbc.noaa.gov/data/realtime2/'
+                   f'{station_id}_{i % n_urls}.txt')
+            resp = request_handler.handle_request(station_id=station_id,
+                                                  req=url)
+            assert resp['body'].startswith(url)
+
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        for future in [executor.submit(hammer, s) for s in range(n_threads)]:
+            future.result()
+
+    assert len(request_handler.stations) == n_stations
+    cached = set()
+    for station_id, stn in request_handler.stations.items():
+        assert stn.id_ == station_id
+        node, walked = stn.reqs.left.next, []
+        while node is not stn.reqs.right:
+            assert node.next.prev is node
+            walked.append(node.k)
+            node = node.next
+        assert sorted(walked) == sorted(stn.reqs.cache)
+        assert len(walked) <= 3
+        cached.update((station_id, req) for req in walked)
+    assert set(budget._entries) == cached
+    assert budget.size == sum(
+        response_size(req, request_handler.stations[s].reqs.cache[req].v)
+        for s, req in cached)
+    assert budget.evictions > 0
+
+
+@pytest.mark.private
+def test_dump_responses_thread_safety(request_handler, monkeypatch):
+
+    def execute_request(station_id, url, headers):
+        return {'status': 200, 'body': url}
+
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    monkeypatch.setattr(request_handler, 'stations', {})
+    monkeypatch.setattr(request_handler, '_cache_limit', 3)
+    monkeypatch.setattr(request_handler, '_cache_budget', None)
+    monkeypatch.setattr(request_handler, '_disk_cache', None)
+    monkeypatch.setattr(request_handler, 'execute_request', execute_request)
+    done = threading.Event()
+
+    def hammer(seed):
+        for i in range(500):
+            url = f'https://www.ndbc.noaa.gov/data/realtime2/{seed}_{i}.txt'
+            request_handler.handle_request(station_id=f's{i % 200}', req=url)
+
+    def dump():
+        dumps = 0
+        while not done.is_set() or not dumps:
+            for reqs in request_handler.dump_responses().values():
+                assert len(reqs) <= 3
+                assert all(resp['body'] == req for req, resp in reqs.items())
+            dumps += 1
+        return dumps
+
+    with ThreadPoolExecutor(max_workers=9) as executor:
+        dumper = executor.submit(dump)
+        for future in [executor.submit(hammer, s) for s in range(8)]:
+            future.result()
+        done.set()
+        assert dumper.result() > 0
+    assert set(request_handler.dump_responses()) == set(
+        request_handler.stations)
+
+
+@pytest.mark.private
+def test_handle_request_single_flight(request_handler, monkeypatch):
+    url = 'https://www.ndbc.noaa.gov/data/realtime2/FLIGHT.txt'
+    calls, release = [], threading.Event()
+
+    def execute_request(station_id, url, headers):
+        calls.append(url)
+        release.wait(timeout=10)
+        if len(calls) == 1:
+            raise RequestException('upstream failure')
+        return {'status': 200, 'body': 'foo'}
+
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    monkeypatch.setattr(request_handler, 'stations', {})
+    monkeypatch.setattr(request_handler, '_disk_cache', None)
+    monkeypatch.setattr(request_handler, 'execute_request', execute_request)
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        futures = [
+            executor.submit(request_handler.handle_request, 'flight', url)
+            for _ in range(16)
+        ]
+        time.sleep(0.2)
+        release.set()
+    # every caller shares the single upstream request, and its failure
+    for future in futures:
+        with pytest.raises(RequestException):
+            future.result()
+    assert len(calls) == 1
+    assert request_handler._inflight == {}
+    assert request_handler.handle_request('flight', url)['body'] == 'foo'
+    assert len(calls) == 2
+
+
+@pytest.mark.private
+def test_handle_request_tail_single_flight(request_handler, monkeypatch):
+    url = 'https://www.ndbc.noaa.gov/data/realtime2/TAILFLIGHT.txt'
+    now = datetime.now().replace(second=0, microsecond=0)
+    body = realtime_body(newest=now, n=6 * 24 * 45)
+    ranges, release = [], threading.Event()
+
+    def execute_request(station_id, url, headers):
+        ranges.append(headers['Range'])
+        release.wait(timeout=10)
+        return range_response(body, headers['Range'])
+
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    monkeypatch.setattr(request_handler, 'stations', {})
+    monkeypatch.setattr(request_handler, '_disk_cache', None)
+    monkeypatch.setattr(request_handler, 'execute_request', execute_request)
+    hour, day = now - timedelta(hours=1), now - timedelta(hours=23)
+    with ThreadPoolExecutor(max_workers=17) as executor:
+        leader = executor.submit(request_handler.handle_request, 'tail', url,
+                                 hour)
+        while not ranges:
+            time.sleep(0.01)
+        futures = [
+            executor.submit(request_handler.handle_request, 'tail', url,
+                            since) for since in [hour, day] * 8
+        ]
+        time.sleep(0.2)
+        release.set()
+        want = leader.result()
+    # callers covered by the ranges in flight share them, and the others
+    # share the further ranges requested by one of them
+    assert [f.result() for f in futures[::2]] == [want] * 8
+    assert len({f.result()['body'] for f in futures[1::2]}) == 1
+    assert ranges == ['bytes=0-4095', 'bytes=0-4095', 'bytes=4096-12287']
+    assert request_handler._inflight == {}
+
+
+@pytest.mark.private
+@pytest.mark.parametrize('scheduler', [None, Scheduler(4, 4)])
+def test_stream_requests(request_handler, monkeypatch, scheduler):
+    urls = [f'https://www.ndbc.noaa.gov/data/STREAM_{i}.nc' for i in range(8)]
+    threads = set()
+
+    def execute_request(station_id, url, headers):
+        return {'status': 200, 'body': url}
+
+    def callback(index, response):
+        threads.add(threading.current_thread().name)
+        assert response['body'] == urls[index]
+        return index
+
+    monkeypatch.setattr(request_handler, 'log', lambda *args, **kwargs: None)
+    monkeypatch.setattr(request_handler, 'stations', {})
+    monkeypatch.setattr(request_handler, '_disk_cache', None)
+    monkeypatch.setattr(request_handler, '_scheduler', scheduler)
+    monkeypatch.setattr(request_handler, 'execute_request', execute_request)
+    got = request_handler.stream_requests('stream', urls, callback)
+    assert got == list(range(len(urls)))
+    # responses are handled in the threads which received them
+    assert all(t.startswith(FETCH_THREAD_PREFIX)
+               for t in threads) == (scheduler is not None)
@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+
+from ndbc_api.utilities.scheduler import FETCH_THREAD_PREFIX, Scheduler
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = Scheduler(max_workers=4, max_connections=3)
+    yield scheduler
+    scheduler.shutdown()
+
+
+@pytest.mark.private
+def test_scheduler_invalid_limits():
+    with pytest.raises(ValueError):
+        Scheduler(max_workers=0, max_connections=1)
+
+
+@pytest.mark.private
+def test_scheduler_fetch_all_bounded(scheduler):
+    lock, active, peak = threading.Lock(), [0], [0]
+
+    def fetch(i):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return i * 2
+
+    assert scheduler.fetch_all(fetch, range(12)) == [i * 2 for i in range(12)]
+    assert peak[0] == scheduler.max_connections
+
+
+@pytest.mark.private
+def test_scheduler_tasks_share_fetch_pool(scheduler):
+    fetch_threads = set()
+
+    def fetch(i):
+        name = threading.current_thread().name
+        if name.startswith(FETCH_THREAD_PREFIX):  # single requests run inline
+            fetch_threads.add(name)
+        # nested calls from a fetch thread run inline rather than deadlock
+        return scheduler.fetch_all(lambda j: j, [i, i])[0]
+
+    def task(n):
+        return scheduler.fetch_all(fetch, range(n))
+
+    futures = [scheduler.submit(task, n) for n in range(1, 9)]
+    assert [f.result(timeout=10) for f in futures] == [
+        list(range(n)) for n in range(1, 9)
+    ]
+    assert 0 < len(fetch_threads) <= scheduler.max_connections
+    # threads are reused by later calls
+    scheduler.fetch_all(fetch, range(6))
+    assert len(fetch_threads) <= scheduler.max_connections
+
+
+@pytest.mark.private
+def test_scheduler_shutdown_restarts(scheduler):
+    assert scheduler.submit(sum, [1, 2]).result() == 3
+    scheduler.shutdown()
+    assert scheduler.submit(sum, [3, 4]).result() == 7
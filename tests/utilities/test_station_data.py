@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import numpy as np
+
+from ndbc_api.utilities.columnar import ColumnarData
+from ndbc_api.utilities.station_data import parse_station_data
+
+
+class _RecordsParser:
+    """A parser returning three daily rows of two columns."""
+
+    @classmethod
+    def parse_columns(cls, responses, use_timestamp):
+        return ColumnarData.from_records([{
+            'timestamp': datetime(2023, 1, day),
+            'wind': float(day),
+            'wave': 1.0,
+        } for day in (1, 2, 3)])
+
+
+class TestParseStationData:
+
+    def test_filters_selects_and_attributes(self):
+        result = parse_station_data(_RecordsParser, [], 'tplm2',
+                                    start_time=datetime(2023, 1, 2),
+                                    end_time=datetime(2023, 1, 3),
+                                    cols=['wind'])
+        assert isinstance(result, ColumnarData)
+        assert list(result.columns) == ['wind']
+        np.testing.assert_array_equal(result.columns['wind'], [2.0, 3.0])
+        assert list(result.station_ids()) == ['tplm2', 'tplm2']
+
+    def test_without_timestamp_keeps_every_row(self):
+        result = parse_station_data(_RecordsParser, [], 'tplm2',
+                                    start_time=datetime(2023, 1, 2),
+                                    end_time=datetime(2023, 1, 2),
+                                    use_timestamp=False)
+        assert len(result) == 3
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from ndbc_api.utilities.tail_fetch import (TailFetch, content_length, covers,
+                                           oldest_observation, tail_eligible)
+
+NEWEST = datetime(2024, 5, 20, 12, 0)
+HEADER = ('#YY  MM DD hh mm WDIR WSPD GST\n'
+          '#yr  mo dy hr mn degT m/s  m/s\n')
+
+
+def realtime_body(newest: datetime = NEWEST, n: int = 300) -> str:
+    lines = [(newest - timedelta(minutes=10 * i)).strftime('%Y %m %d %H %M') +
+             ' 200  5.0  6.0\n' for i in range(n)]
+    return HEADER + ''.join(lines)
+
+
+def range_response(body: str, range_header: str) -> dict:
+    start, end = (int(v) for v in range_header[len('bytes='):].split('-'))
+    data = body.encode()
+    if start >= len(data):
+        return {'status': 416, 'body': ''}
+    part = data[start:end + 1].decode()
+    return {'status': 206, 'body': part, 'length': len(data), 'etag': '"v1"'}
+
+
+def fetch(body: str, since: datetime, size: int = 256):
+    tail, ranges = TailFetch(since=since, size=size), []
+    while True:
+        headers = tail.headers()
+        ranges.append(headers)
+        if not tail.feed(range_response(body, headers['Range'])):
+            return tail.response(), ranges
+
+
+@pytest.mark.private
+def test_tail_eligible():
+    url = 'https://www.ndbc.noaa.gov/data/realtime2/TPLM2.txt'
+    assert tail_eligible(url, NEWEST - timedelta(hours=1), now=NEWEST)
+    assert not tail_eligible(url, NEWEST - timedelta(days=3), now=NEWEST)
+    assert not tail_eligible(url, None, now=NEWEST)
+    assert not tail_eligible(url.replace('realtime2', 'stdmet/Jan'),
+                             NEWEST - timedelta(hours=1),
+                             now=NEWEST)
+
+
+@pytest.mark.private
+def test_content_length():
+    assert content_length('bytes 0-1023/45000') == 45000
+    assert content_length('bytes */45000') == 45000
+    assert content_length(None) is None
+
+
+@pytest.mark.private
+def test_oldest_observation():
+    assert oldest_observation(realtime_body(n=3)) == NEWEST - timedelta(
+        minutes=20)
+    assert oldest_observation(HEADER) is None
+    assert oldest_observation('2024 05 20') is None
+
+
+@pytest.mark.private
+def test_tail_fetch_extends_until_covered():
+    body = realtime_body()
+    since = NEWEST - timedelta(hours=8)
+    resp, ranges = fetch(body, since)
+    # the range is doubled until it covers `since`
+    assert [h['Range'] for h in ranges] == [
+        'bytes=0-255', 'bytes=256-767', 'bytes=768-1791'
+    ]
+    assert 'If-Range' not in ranges[0] and ranges[1]['If-Range'] == '"v1"'
+    assert resp['status'] == 200 and resp['etag'] == '"v1"'
+    assert body.startswith(resp['body']) and resp['body'].endswith('\n')
+    assert len(resp['body']) < len(body)
+    assert covers(resp, since)
+    assert not covers(resp, since - timedelta(days=1))
+
+
+@pytest.mark.private
+def test_tail_fetch_whole_file():
+    body = realtime_body(n=10)
+    resp, ranges = fetch(body, NEWEST - timedelta(days=1))
+    assert resp['body'] == body
+    assert 'covers' not in resp
+    # a range ending exactly at the end of a file of unknown length
+    tail = TailFetch(since=NEWEST - timedelta(days=1), size=len(body))
+    resp = range_response(body, tail.headers()['Range'])
+    del resp['length']
+    assert tail.feed(resp)
+    assert not tail.feed(range_response(body, tail.headers()['Range']))
+    assert tail.response()['body'] == body
+
+
+@pytest.mark.private
+def test_tail_fetch_range_ignored():
+    tail = TailFetch(since=NEWEST)
+    whole = {'status': 200, 'body': realtime_body()}
+    assert not tail.feed(whole)
+    assert tail.response() is whole
+    tail = TailFetch(since=NEWEST)
+    with pytest.raises(ValueError):
+        tail.response()